@@ -21,10 +21,12 @@ class Paths:
     config: Path
     version: Path
     logs: Path
+    cache: Path
     temp: Path
     softsub: Path
     hardsub: Path
     logo: Path
+    fonts: Path
 
     def __init__(self, cwd: str):
         self.appdata = Path(os.getenv("APPDATA") or "")
@@ -33,14 +35,16 @@ class Paths:
         self.config = Path(self.config_dir, "config.ini")
         self.version = Path(self.config_dir, "current_version.ini")
         self.logs = Path(cwd, "logs")
+        self.cache = Path(cwd, "cache")
         self.temp = Path(cwd, "tmp")
         self.softsub = Path("")
         self.hardsub = Path(cwd, "HARDSUB")
         self.logo = Path(cwd, "logo/AniBaza_Logo16x9.ass")
+        self.fonts = Path(cwd, "fonts")
         self.create_missing_folders()
 
     def create_missing_folders(self):
-        for dir in [self.config_dir, self.logs, self.temp, self.hardsub]:
+        for dir in [self.config_dir, self.logs, self.cache, self.temp, self.hardsub]:
             if not os.path.exists(dir):
                 os.mkdir(dir)
 
@@ -254,6 +258,35 @@ class Config:
         self.update_search = True
         self.potato_PC = False
 
+        # Chunked encoding: split software encodes into segments encoded in parallel
+        self.chunked_encoding = False
+        self.chunk_workers = 0  # 0 = pick from CPU count
+
+        # Pick the CRF per raw by measuring quality on sampled segments
+        self.crf_search = False
+
+        # Patch the existing hardsub where the subtitles changed since it was rendered
+        self.auto_patch_hardsub = False
+
+        # Check that the fonts of burned subtitles are available before queueing a job
+        self.font_audit = True
+
+        # Parallel queue: jobs run at once, within the encoder budget below
+        self.parallel_jobs = 1
+        self.cpu_encode_slots = 1  # Software encodes at once (each already uses every core)
+        self.nvenc_sessions = 3  # NVENC sessions the GPU driver allows at once
+
+        # Waiting jobs prepared (probe, fonts, logo, audio) while the running ones encode (0 = off)
+        self.lookahead_jobs = 1
+
+        # Copy the inputs of prepared jobs from network shares to a local scratch dir
+        self.input_staging = False
+        self.staging_dir = ''  # Scratch dir for staged inputs (empty = app temp dir)
+        self.staging_cap_gb = 50  # Size the staged inputs may take
+
+        # Encode outputs to local disk, then move them to their folders in the background
+        self.output_scratch = False
+
         # Rendering paths - backward compatibility with old UI code
         self.rendering_paths = {
             'raw': '',
@@ -0,0 +1,287 @@
+"""Advanced SubStation Alpha (.ass) subtitle model and diff.
+
+Pure parsing and comparison of the subtitle files burned into hardsubs.
+No side effects, easy to test, reusable.
+
+The diff answers one question for partial re-renders: which time ranges
+of the episode look different with the new subtitles? Events are compared
+as a multiset (file order does not matter), a changed style affects every
+event drawn with it, and changes to rendering-wide settings (script
+resolution, fonts) affect the whole episode.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from models.patching import TimeRange
+
+
+@dataclass(frozen=True)
+class AssEvent:
+    """One Dialogue line.
+
+    Immutable and hashable, so events can be compared as a multiset.
+    """
+
+    layer: int
+    start_sec: float
+    end_sec: float
+    style: str
+    fields: tuple[str, ...]  # Name, margins, effect and text, verbatim
+
+    @property
+    def text(self) -> str:
+        return self.fields[-1] if self.fields else ''
+
+
+@dataclass(frozen=True)
+class AssDocument:
+    """Parsed subtitle file.
+
+    Immutable to prevent accidental modification.
+    """
+
+    script_info: dict[str, str] = field(default_factory=dict)
+    styles: dict[str, tuple[str, ...]] = field(default_factory=dict)  # Name -> remaining fields
+    events: tuple[AssEvent, ...] = ()
+    fonts: tuple[str, ...] = ()  # Raw lines of the [Fonts] section
+
+
+@dataclass(frozen=True)
+class AssDiff:
+    """Result of comparing two subtitle files.
+
+    Immutable to prevent accidental modification.
+    """
+
+    full: bool  # A rendering-wide change: the whole episode is affected
+    ranges: tuple[TimeRange, ...] = ()  # Affected time ranges, sorted and disjoint
+
+
+# [Script Info] keys that change how every event is rendered
+RENDER_KEYS = frozenset({
+    'playresx', 'playresy', 'wrapstyle', 'scaledborderandshadow',
+    'ycbcr matrix', 'layoutresx', 'layoutresy', 'kerning',
+})
+
+
+def parse_ass(text: str) -> AssDocument:
+    """Parse the contents of an .ass file.
+
+    Only what affects rendering is kept: [Script Info] key/values, styles,
+    Dialogue events (Comment lines are never drawn) and embedded fonts.
+    Single-pass line parser; a typesetting file with thousands of events
+    parses in milliseconds.
+
+    Args:
+        text: File contents
+
+    Returns:
+        AssDocument
+    """
+    script_info: dict[str, str] = {}
+    styles: dict[str, tuple[str, ...]] = {}
+    events: list[AssEvent] = []
+    fonts: list[str] = []
+    event_fields = 0
+    section = ''
+
+    for line in text.lstrip('\ufeff').splitlines():
+        line = line.strip()
+        if section == 'fonts' and line and not (line.startswith('[') and line.endswith(']')):
+            fonts.append(line)  # Encoded data may start with ';'
+            continue
+        if not line or line.startswith(';'):
+            continue
+        if line.startswith('[') and line.endswith(']'):
+            section = line[1:-1].strip().lower()
+            continue
+
+        key, sep, value = line.partition(':')
+        if not sep:
+            continue
+        key = key.strip().lower()
+        value = value.lstrip()
+
+        if section == 'script info':
+            script_info[key] = value.strip()
+        elif section in ('v4+ styles', 'v4 styles'):
+            if key == 'style':
+                parts = [p.strip() for p in value.split(',')]
+                styles[parts[0]] = tuple(parts[1:])
+        elif section == 'events':
+            if key == 'format':
+                event_fields = len(value.split(','))
+            elif key == 'dialogue':
+                event = _parse_event(value, event_fields or 10)
+                if event is not None:
+                    events.append(event)
+
+    return AssDocument(script_info=script_info, styles=styles, events=tuple(events), fonts=tuple(fonts))
+
+
+def diff_ass(old: AssDocument, new: AssDocument) -> AssDiff:
+    """Find the time ranges that render differently with the new subtitles.
+
+    Args:
+        old: Subtitles burned into the existing output
+        new: Subtitles to burn now
+
+    Returns:
+        AssDiff; `full` when rendering-wide settings or embedded fonts changed
+    """
+    if _render_info(old) != _render_info(new) or old.fonts != new.fonts:
+        return AssDiff(full=True)
+
+    changed_styles = {name for name in old.styles.keys() | new.styles.keys()
+                      if old.styles.get(name) != new.styles.get(name)}
+
+    old_events, new_events = Counter(old.events), Counter(new.events)
+    affected = list(((old_events - new_events) + (new_events - old_events)).elements())
+    if changed_styles:
+        affected.extend(event for event in (*old.events, *new.events)
+                        if _uses_style(event, changed_styles))
+
+    return AssDiff(full=False, ranges=merge_ranges(
+        TimeRange(event.start_sec, event.end_sec) for event in affected
+    ))
+
+
+def is_static(document: AssDocument, duration_sec: float) -> bool:
+    """True if the subtitles look the same on every frame of the episode.
+
+    Every event must cover the whole episode without effects, animation
+    or karaoke tags; such a file (e.g. a logo) can be rendered once into
+    an image instead of by libass on each frame.
+
+    Args:
+        document: Parsed subtitles
+        duration_sec: Episode duration
+
+    Returns:
+        True for subtitles with a single, unchanging look
+    """
+    if not document.events:
+        return False
+    for event in document.events:
+        if event.start_sec > 0 or event.end_sec < duration_sec:
+            return False
+        if len(event.fields) > 1 and event.fields[-2]:
+            return False  # Effect field (scrolling, banners)
+        if _ANIMATION_TAG.search(event.text):
+            return False
+    return True
+
+
+def merge_ranges(ranges: Iterable[TimeRange], max_gap_sec: float = 0.0) -> tuple[TimeRange, ...]:
+    """Sort ranges and merge those overlapping or closer than max_gap_sec.
+
+    Coalescing nearby ranges trades a few re-encoded seconds for fewer
+    splice points (each costs a segment encode and a GOP boundary).
+
+    Args:
+        ranges: Time ranges in any order
+        max_gap_sec: Ranges separated by at most this much are merged
+
+    Returns:
+        Sorted, disjoint ranges
+    """
+    merged: list[list[float]] = []
+    for time_range in sorted(ranges, key=lambda r: (r.start_sec, r.end_sec)):
+        if time_range.end_sec <= time_range.start_sec:
+            continue
+        if merged and time_range.start_sec - merged[-1][1] <= max_gap_sec:
+            merged[-1][1] = max(merged[-1][1], time_range.end_sec)
+        else:
+            merged.append([time_range.start_sec, time_range.end_sec])
+    return tuple(TimeRange(start, end) for start, end in merged)
+
+
+def referenced_fonts(document: AssDocument) -> set[str]:
+    """Font names the events are drawn with: their styles' fonts and \\fn overrides.
+
+    Args:
+        document: Parsed subtitles
+
+    Returns:
+        Font names (a leading @ for vertical text is dropped)
+    """
+    fonts = set()
+    for event in document.events:
+        blocks = _OVERRIDE_BLOCK.findall(event.text)
+        styles = {event.style}
+        names = []
+        for block in blocks:
+            styles.update(name.strip() for name in _RESET_TAG.findall(block) if name.strip())
+            names.extend(_FONT_TAG.findall(block))
+        for style in styles:
+            fields = document.styles.get(style)
+            if fields:
+                names.append(fields[0])  # Fontname follows Name in V4 and V4+ styles
+        fonts.update(name.strip().lstrip('@') for name in names if name.strip().lstrip('@'))
+    return fonts
+
+
+def embedded_fonts(document: AssDocument) -> dict[str, list[str]]:
+    """Encoded fonts of the [Fonts] section (see models.font_names.decode_embedded_font).
+
+    Args:
+        document: Parsed subtitles
+
+    Returns:
+        File name -> encoded lines
+    """
+    fonts: dict[str, list[str]] = {}
+    lines: Optional[list[str]] = None
+    for line in document.fonts:
+        key, sep, value = line.partition(':')
+        if sep and key.strip().lower() == 'fontname':
+            lines = fonts.setdefault(value.strip(), [])
+        elif lines is not None:
+            lines.append(line)
+    return fonts
+
+
+# Override tags that change an event's look over time
+_ANIMATION_TAG = re.compile(r'\\(?:t\(|move\(|fade?\(|[kK][fo]?\d)')
+_OVERRIDE_BLOCK = re.compile(r'\{([^}]*)\}')
+_FONT_TAG = re.compile(r'\\fn([^\\}]*)')
+_RESET_TAG = re.compile(r'\\r([^\\}]*)')
+
+
+def _parse_event(value: str, field_count: int) -> Optional[AssEvent]:
+    """Parse the value of a Dialogue line (Layer, Start, End, Style, ..., Text)."""
+    parts = value.split(',', field_count - 1)
+    if len(parts) < 4:
+        return None
+    try:
+        layer = int(parts[0].strip() or 0)
+        start = _parse_time(parts[1])
+        end = _parse_time(parts[2])
+    except ValueError:
+        return None
+    # Text (last field) is kept verbatim; it may contain commas and meaningful spaces
+    rest = parts[4:]
+    fields = tuple(p.strip() for p in rest[:-1]) + tuple(rest[-1:])
+    return AssEvent(layer=layer, start_sec=start, end_sec=end, style=parts[3].strip(), fields=fields)
+
+
+def _parse_time(value: str) -> float:
+    """Parse an ASS timestamp (H:MM:SS.cc) into seconds."""
+    hours, minutes, seconds = value.strip().split(':')
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def _render_info(document: AssDocument) -> dict[str, str]:
+    """Script Info entries that affect rendering."""
+    return {key: value for key, value in document.script_info.items() if key in RENDER_KEYS}
+
+
+def _uses_style(event: AssEvent, styles: set[str]) -> bool:
+    """True if the event is drawn with one of the styles (directly or via \\r)."""
+    if event.style in styles:
+        return True
+    text = event.text
+    return '\\r' in text and any(f'\\r{name}' in text for name in styles)
@@ -0,0 +1,270 @@
+"""Merging the logo script into episode subtitles.
+
+Pure text transformation, no side effects, easy to test, reusable.
+
+Burning the logo and the subtitles with two subtitles filters initializes
+libass twice and rasterizes every frame twice. Merged into one script,
+both are drawn in a single pass. The merge keeps the picture identical:
+
+- Logo styles and events are converted to the episode's Format order,
+  rescaled when the two scripts use different PlayRes, and renamed when
+  a style of the same name but different look already exists.
+- Logo events go first on layer 0, so episode lines are still drawn on
+  top of the logo, as when the logo was burned first.
+- Logo events get an explicit \\pos computed from their alignment and
+  margins. Positioned events are exempt from libass collision handling,
+  so the logo never pushes dialogue or signs aside (or vice versa).
+
+Scripts that cannot be merged faithfully (no PlayRes, different border
+scaling, embedded fonts or drawings in the logo) are left alone and the
+caller keeps two filters.
+"""
+
+import re
+from typing import Optional
+
+
+def merge_logo(episode_text: str, logo_text: str) -> Optional[str]:
+    """Merge a logo script into episode subtitles.
+
+    Args:
+        episode_text: Contents of the episode .ass file
+        logo_text: Contents of the logo .ass file
+
+    Returns:
+        Contents of the merged script, or None if it cannot be merged
+    """
+    try:
+        return _merge(episode_text, logo_text)
+    except (ValueError, ZeroDivisionError):
+        return None  # Malformed numbers in either script
+
+
+def _merge(episode_text: str, logo_text: str) -> Optional[str]:
+    episode = _sections(episode_text)
+    logo = _sections(logo_text)
+    if not {'v4+ styles', 'events'} <= episode.keys() or not {'v4+ styles', 'events'} <= logo.keys():
+        return None
+    if 'fonts' in logo or 'graphics' in logo:
+        return None
+
+    episode_info = _key_values(episode['script info'] if 'script info' in episode else [])
+    logo_info = _key_values(logo['script info'] if 'script info' in logo else [])
+    episode_res, logo_res = _play_res(episode_info), _play_res(logo_info)
+    if episode_res is None or logo_res is None:
+        return None
+    border = episode_info.get('scaledborderandshadow', 'no').lower()
+    if border != logo_info.get('scaledborderandshadow', 'no').lower():
+        return None
+    scale = _Scale(episode_res[0] / logo_res[0], episode_res[1] / logo_res[1], border == 'yes')
+
+    style_format = _format(episode['v4+ styles'])
+    event_format = _format(episode['events'])
+    if not style_format or not {'layer', 'style', 'text'} <= set(event_format):
+        return None
+
+    episode_styles = {style['name']: style for style in _rows(episode['v4+ styles'], 'style', style_format)}
+    logo_styles = {}
+    renames = {}
+    for style in _rows(logo['v4+ styles'], 'style', _format(logo['v4+ styles'])):
+        style = scale.style(style)
+        name = style['name']
+        existing = episode_styles.get(name)
+        if existing is not None and all(existing.get(f) == style.get(f) for f in style_format if f != 'name'):
+            logo_styles[name] = existing  # Same look; reuse the episode's style
+            continue
+        if existing is not None:
+            renames[name] = _unique_name(f"{name}_logo", episode_styles.keys() | logo_styles.keys())
+            style = {**style, 'name': renames[name]}
+        logo_styles[style['name']] = style
+
+    style_lines = []
+    for style in logo_styles.values():
+        if style['name'] in episode_styles:
+            continue
+        if any(field not in style for field in style_format):
+            return None  # Episode format needs a field the logo does not define
+        style_lines.append('Style: ' + ','.join(style[field] for field in style_format))
+
+    event_lines = []
+    for event in _rows(logo['events'], 'dialogue', _format(logo['events'])):
+        name = renames.get(event.get('style', ''), event.get('style', ''))
+        style = logo_styles.get(name)
+        text = scale.text(event.get('text', ''))
+        if style is None or text is None:
+            return None
+        event = {**event, 'layer': '0', 'style': name, 'text': text}
+        for margin in ('marginl', 'marginr', 'marginv'):
+            event[margin] = scale.margin(margin, event.get(margin, '0'))
+        event['text'] = _positioned(event, style, episode_res)
+        event_lines.append('Dialogue: ' + ','.join(event.get(field, _EVENT_DEFAULTS.get(field, ''))
+                                                   for field in event_format))
+
+    return _insert(episode_text, style_lines, event_lines)
+
+
+class _Scale:
+    """Rescaling of logo coordinates and sizes to the episode's PlayRes."""
+
+    def __init__(self, x: float, y: float, scale_borders: bool):
+        self.x, self.y, self.scale_borders = x, y, scale_borders
+
+    @property
+    def identity(self) -> bool:
+        return self.x == 1 and self.y == 1
+
+    def style(self, style: dict[str, str]) -> dict[str, str]:
+        if self.identity:
+            return style
+        factors = {'fontsize': self.y, 'spacing': self.x, 'scalex': self.x / self.y,
+                   'marginl': self.x, 'marginr': self.x, 'marginv': self.y}
+        if self.scale_borders:
+            factors.update(outline=self.y, shadow=self.y)
+        scaled = dict(style)
+        for field, factor in factors.items():
+            if field in scaled:
+                value = float(scaled[field]) * factor
+                scaled[field] = str(round(value)) if field.startswith('margin') else _number(value)
+        return scaled
+
+    def margin(self, field: str, value: str) -> str:
+        factor = self.y if field == 'marginv' else self.x
+        return str(round(int(value or 0) * factor))
+
+    def text(self, text: str) -> Optional[str]:
+        """Rescale override tags, or None if the text cannot be rescaled."""
+        if self.identity:
+            return text
+        if _DRAWING.search(text) or _VECTOR_CLIP.search(text):
+            return None
+
+        def coordinates(match: re.Match) -> str:
+            values = match.group(2).split(',')
+            for i in range(min(len(values), 4)):  # \move's trailing times are kept
+                values[i] = _number(float(values[i]) * (self.x if i % 2 == 0 else self.y))
+            return f"{match.group(1)}({','.join(values)})"
+
+        def size(match: re.Match) -> str:
+            tag = match.group(1)
+            if tag in ('fs', 'fsp'):
+                factor = self.y if tag == 'fs' else self.x
+            elif not self.scale_borders:
+                return match.group(0)
+            else:
+                factor = self.x if tag.startswith('x') else self.y
+            return f"\\{tag}{_number(float(match.group(2)) * factor)}"
+
+        text = _COORDINATE_TAG.sub(coordinates, text)
+        return _SIZE_TAG.sub(size, text)
+
+
+def _positioned(event: dict[str, str], style: dict[str, str], play_res: tuple[int, int]) -> str:
+    """Event text with an explicit \\pos where libass would have placed it."""
+    text = event['text']
+    if _POSITION_TAG.search(text):
+        return text
+    override = re.search(r'\\an([1-9])', text)
+    alignment = int(override.group(1) if override else style.get('alignment', '2'))
+    margins = {field: int(event.get(field) or 0) or int(float(style.get(field, '0')))
+               for field in ('marginl', 'marginr', 'marginv')}
+    width, height = play_res
+
+    column = (alignment - 1) % 3
+    x = (margins['marginl'], (width + margins['marginl'] - margins['marginr']) / 2,
+         width - margins['marginr'])[column]
+    row = (alignment - 1) // 3
+    y = (height - margins['marginv'], height / 2, margins['marginv'])[row]
+    return f"{{\\pos({_number(x)},{_number(y)})}}{text}"
+
+
+def _insert(episode_text: str, style_lines: list[str], event_lines: list[str]) -> str:
+    """Episode text with lines added after the style and event Format lines."""
+    lines = []
+    section = ''
+    for line in episode_text.lstrip('\ufeff').splitlines():
+        lines.append(line)
+        stripped = line.strip()
+        if stripped.startswith('[') and stripped.endswith(']'):
+            section = stripped[1:-1].strip().lower()
+        elif stripped.lower().startswith('format:'):
+            if section == 'v4+ styles':
+                lines.extend(style_lines)
+                style_lines = []
+            elif section == 'events':
+                lines.extend(event_lines)
+                event_lines = []
+    return '\n'.join(lines) + '\n'
+
+
+def _sections(text: str) -> dict[str, list[str]]:
+    """Non-empty, non-comment lines of each section (first occurrence wins)."""
+    sections: dict[str, list[str]] = {}
+    current: Optional[list[str]] = None
+    for line in text.lstrip('\ufeff').splitlines():
+        line = line.strip()
+        if not line or line.startswith(';'):
+            continue
+        if line.startswith('[') and line.endswith(']'):
+            current = sections.setdefault(line[1:-1].strip().lower(), [])
+        elif current is not None:
+            current.append(line)
+    return sections
+
+
+def _key_values(lines: list[str]) -> dict[str, str]:
+    values = {}
+    for line in lines:
+        key, sep, value = line.partition(':')
+        if sep:
+            values[key.strip().lower()] = value.strip()
+    return values
+
+
+def _play_res(info: dict[str, str]) -> Optional[tuple[int, int]]:
+    try:
+        return int(info['playresx']), int(info['playresy'])
+    except (KeyError, ValueError):
+        return None
+
+
+def _format(lines: list[str]) -> list[str]:
+    """Lowercase field names of a section's Format line."""
+    for line in lines:
+        key, _, value = line.partition(':')
+        if key.strip().lower() == 'format':
+            return [field.strip().lower() for field in value.split(',')]
+    return []
+
+
+def _rows(lines: list[str], kind: str, fields: list[str]) -> list[dict[str, str]]:
+    """Lines of one kind (Style, Dialogue) as field -> value dicts."""
+    rows = []
+    for line in lines:
+        key, _, value = line.partition(':')
+        if key.strip().lower() != kind or not fields:
+            continue
+        values = value.lstrip().split(',', len(fields) - 1)
+        if len(values) == len(fields):
+            # Text (last event field) is kept verbatim; it may contain commas and meaningful spaces
+            rows.append({field: v if field == 'text' else v.strip() for field, v in zip(fields, values)})
+    return rows
+
+
+def _unique_name(name: str, taken) -> str:
+    candidate, counter = name, 2
+    while candidate in taken:
+        candidate = f"{name}{counter}"
+        counter += 1
+    return candidate
+
+
+def _number(value: float) -> str:
+    return f"{value:.3f}".rstrip('0').rstrip('.')
+
+
+_EVENT_DEFAULTS = {'layer': '0', 'marginl': '0', 'marginr': '0', 'marginv': '0'}
+_POSITION_TAG = re.compile(r'\\(?:pos|move)\(')
+_COORDINATE_TAG = re.compile(r'(\\(?:pos|move|org|clip|iclip))\(([-\d.,\s]+)\)')
+_SIZE_TAG = re.compile(r'\\(fsp|fs|[xy]?bord|[xy]?shad)(-?\d+(?:\.\d+)?)')
+_DRAWING = re.compile(r'\\p[1-9]')
+_VECTOR_CLIP = re.compile(r'\\i?clip\([^)]*[a-z]')
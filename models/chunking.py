@@ -0,0 +1,73 @@
+"""Segment planning for chunked parallel encoding.
+
+Pure functions that turn a raw's keyframe index into keyframe-aligned
+segments. No side effects, easy to test, reusable.
+
+Every segment starts on a keyframe of the raw, so each one can be seeked
+to exactly and encoded independently; the encoded segments are then
+joined with the concat demuxer without re-encoding.
+"""
+
+from dataclasses import dataclass
+
+from models.keyframe_index import KeyframeIndex
+
+
+@dataclass(frozen=True)
+class Segment:
+    """One keyframe-aligned slice of the raw.
+
+    Immutable to prevent accidental modification.
+    """
+
+    index: int
+    start_sec: float
+    end_sec: float  # Exclusive; the last segment ends at the raw's duration
+    final: bool = False  # Last segment: encoded to the end of the raw, not cut at end_sec
+
+    @property
+    def duration_sec(self) -> float:
+        """Segment length in seconds."""
+        return self.end_sec - self.start_sec
+
+
+def plan_segments(
+    keyframes: KeyframeIndex,
+    duration_sec: float,
+    count: int,
+    min_segment_sec: float = 30.0
+) -> list[Segment]:
+    """Split the raw into up to `count` keyframe-aligned segments.
+
+    Ideal boundaries are evenly spaced; each one snaps to the nearest
+    keyframe. Boundaries that would produce a segment shorter than
+    `min_segment_sec` are dropped, so short raws yield fewer segments.
+
+    Args:
+        keyframes: Keyframe index, relative to the raw's start time
+        duration_sec: Duration of the raw in seconds
+        count: Desired number of segments
+        min_segment_sec: Minimum length of any segment
+
+    Returns:
+        Contiguous segments covering [0, duration); a single segment if the
+        raw cannot be split, empty if the duration is unknown
+    """
+    if duration_sec <= 0:
+        return []
+
+    boundaries = [0.0]
+    if count > 1 and len(keyframes):
+        step = duration_sec / count
+        for i in range(1, count):
+            boundary = keyframes.nearest(step * i)
+            if boundary - boundaries[-1] >= min_segment_sec and duration_sec - boundary >= min_segment_sec:
+                boundaries.append(boundary)
+
+    boundaries.append(duration_sec)
+    return [
+        Segment(index=i, start_sec=boundaries[i], end_sec=boundaries[i + 1],
+                final=i == len(boundaries) - 2)
+        for i in range(len(boundaries) - 1)
+    ]
+
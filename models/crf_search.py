@@ -0,0 +1,121 @@
+"""Content-adaptive CRF search.
+
+Pure planning, parsing and selection logic for picking the cheapest CRF
+that still meets a quality target on sampled segments of the raw. No side
+effects, easy to test, reusable; the encodes themselves are run by
+modules.crf_search.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional, Sequence
+
+from models.chunking import Segment
+
+
+@dataclass(frozen=True)
+class CrfSearchResult:
+    """Outcome of a CRF search.
+
+    Immutable to prevent accidental modification.
+    """
+
+    crf: int
+    score: float  # Mean metric score of the samples at the chosen CRF
+    met_target: bool  # False if even the lowest candidate missed the target
+
+
+def plan_samples(duration_sec: float, count: int, length_sec: float) -> list[Segment]:
+    """Pick evenly spaced sample windows across the raw.
+
+    Each window is centred in one of `count` equal slices of the raw, so
+    the opening and ending (often static credits) weigh no more than any
+    other part of the episode.
+
+    Args:
+        duration_sec: Duration of the raw
+        count: Number of samples
+        length_sec: Length of each sample
+
+    Returns:
+        Sample windows (empty if the raw is shorter than one sample)
+    """
+    if duration_sec < length_sec or count < 1:
+        return []
+
+    slice_sec = duration_sec / count
+    length = min(length_sec, slice_sec)
+    return [
+        Segment(index=i, start_sec=round(slice_sec * (i + 0.5) - length / 2, 3),
+                end_sec=round(slice_sec * (i + 0.5) + length / 2, 3))
+        for i in range(count)
+    ]
+
+
+def parse_metric_score(lines: Iterable[str], metric: str) -> Optional[float]:
+    """Parse the summary score printed by ffmpeg's ssim/psnr filter.
+
+    Examples:
+        "[Parsed_ssim_0 @ 0x..] SSIM Y:0.99 (20.1) U:.. V:.. All:0.987 (18.9)" -> 0.987
+        "[Parsed_psnr_0 @ 0x..] PSNR y:44.1 u:.. v:.. average:43.2 min:.. max:.." -> 43.2
+
+    Args:
+        lines: ffmpeg output lines
+        metric: "ssim" or "psnr"
+
+    Returns:
+        Overall score, or None if the summary line was not found
+    """
+    pattern = _SSIM_PATTERN if metric == 'ssim' else _PSNR_PATTERN
+    score = None
+    for line in lines:
+        match = pattern.search(line)
+        if match:
+            value = match.group(1)
+            score = float('inf') if value == 'inf' else float(value)
+    return score
+
+
+def search_crf(
+    candidates: Sequence[int],
+    measure: Callable[[int], float],
+    target: float
+) -> CrfSearchResult:
+    """Binary-search the highest (cheapest) CRF whose score meets the target.
+
+    Quality falls monotonically as CRF rises, so only about log2(n)
+    candidates are measured.
+
+    Args:
+        candidates: CRF values to consider
+        measure: Returns the quality score of a CRF (higher is better)
+        target: Minimum acceptable score
+
+    Returns:
+        CrfSearchResult; the lowest candidate if none meets the target
+    """
+    ordered = sorted(set(candidates))
+    scores: dict[int, float] = {}
+
+    def score_of(crf: int) -> float:
+        if crf not in scores:
+            scores[crf] = measure(crf)
+        return scores[crf]
+
+    low, high = 0, len(ordered) - 1
+    best: Optional[int] = None
+    while low <= high:
+        mid = (low + high) // 2
+        if score_of(ordered[mid]) >= target:
+            best = ordered[mid]
+            low = mid + 1
+        else:
+            high = mid - 1
+
+    if best is None:
+        return CrfSearchResult(crf=ordered[0], score=score_of(ordered[0]), met_target=False)
+    return CrfSearchResult(crf=best, score=scores[best], met_target=True)
+
+
+_SSIM_PATTERN = re.compile(r'SSIM .*All:([0-9.]+|inf)')
+_PSNR_PATTERN = re.compile(r'PSNR .*average:([0-9.]+|inf)')
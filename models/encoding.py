@@ -1,6 +1,12 @@
 """Encoding parameters and defaults for video rendering."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Optional
+
+from models.video_info import VideoInfo
+
+if TYPE_CHECKING:
+    from models.job import VideoSettings  # models.job imports this module
 
 
 @dataclass(frozen=True)
@@ -33,7 +39,13 @@ class EncodingDefaults:
 
     # Video encoding
     VIDEO_BITRATE = "3500k"  # Default average bitrate
-    MAX_BITRATE_CAP = 6  # Maximum bitrate in Mbps
+    BITS_PER_PIXEL = 0.1  # Average bits per pixel per frame for anime at our CRFs
+    MIN_BITRATE_KBPS = 500  # Floor for very low-bitrate sources
+    MIN_TARGET_BITRATE_KBPS = 100  # Floor for a target size too small to hold the video at all
+    # Average bitrate caps by frame height: (max height, cap in kbit/s)
+    BITRATE_CAPS_KBPS = ((480, 2500), (720, 4000), (1080, 6000), (1440, 10000), (2160, 20000))
+    MAXRATE_RATIO = 1.5  # maxrate = average * ratio
+    BUFSIZE_RATIO = 2.0  # bufsize = maxrate * ratio
 
     # Frame rate (23.976 fps = 24000/1001)
     FRAME_RATE_NUM = 24000
@@ -42,11 +54,251 @@ class EncodingDefaults:
     # CRF values by resolution
     CRF_1080P = 18
     CRF_720P = 20
+    CRF_SD = 23
     CRF_POTATO = 23
 
     # CQ offsets from CRF for NVENC
     CQ_OFFSET = 1  # CQ = CRF + 1
+    CQ_SD = 23
+    CQ_POTATO = 21
+
+    # Progress reporting (-stats_period, seconds between -progress blocks)
+    PROGRESS_STATS_PERIOD = 0.5
+
+    # Chunked encoding (software encoders only)
+    CHUNK_THREADS_PER_WORKER = 8  # x264/x265 scale well up to about this many threads
+    CHUNKS_PER_WORKER = 2  # More segments than workers evens out uneven segment speeds
+    CHUNK_MIN_SECONDS = 30.0  # Shorter segments cost more in keyframes than they save
+
+    # Softsub video stream copy: raw codec and the raw profiles each target profile accepts
+    COPY_VIDEO_CODEC = "h264"
+    COPY_PROFILES = {
+        "main": ("main",),
+        "high": ("main", "high"),
+        "high10": ("main", "high", "high10"),
+    }
+
+    # Content-adaptive CRF search on sampled segments
+    CRF_SEARCH_CANDIDATES = (16, 18, 20, 22, 24, 26)
+    CRF_SEARCH_SAMPLES = 5
+    CRF_SEARCH_SAMPLE_SECONDS = 4.0
+    CRF_SEARCH_METRIC = "ssim"  # "ssim" or "psnr"
+    CRF_SEARCH_TARGET = {"ssim": 0.985, "psnr": 42.0}
+
+    # Automatic hardsub patching: changed subtitle ranges closer than this are re-encoded together
+    PATCH_COALESCE_SEC = 3.0
 
     # Quantizer ranges
     QMIN_OFFSET = 2  # qmin = cq - 2
     QMAX_OFFSET = 4  # qmax = cq + 4
+
+
+def estimate_encoding_params(
+    info: VideoInfo,
+    potato: bool = False,
+    target_size_bytes: Optional[int] = None
+) -> EncodingParams:
+    """Derive rate control parameters from the probed raw.
+
+    The average bitrate is the lowest of:
+    - the source video bitrate (re-encoding above it only wastes space),
+    - a bits-per-pixel budget for the resolution and frame rate,
+    - the cap for the resolution from EncodingDefaults.
+    A target output size, when given, sets the bitrate on its own: the
+    user asked for that size, so neither the caps, the source bitrate nor
+    potato mode change it (only MIN_TARGET_BITRATE_KBPS bounds it).
+
+    Pure function: same input always produces same output.
+
+    Args:
+        info: Probed raw metadata
+        potato: Potato mode (halved bitrate, faster-decoding settings)
+        target_size_bytes: Optional desired output size
+
+    Returns:
+        EncodingParams for the raw
+    """
+    height = info.height or _height_from_label(info.resolution)
+    width = info.width or height * 16 // 9
+    fps = info.frame_rate or EncodingDefaults.FRAME_RATE_NUM / EncodingDefaults.FRAME_RATE_DEN
+
+    target_kbps = target_bitrate_kbps(info, target_size_bytes)
+    if target_kbps is not None:
+        avg_kbps = max(target_kbps, EncodingDefaults.MIN_TARGET_BITRATE_KBPS)
+    else:
+        cap_kbps = _bitrate_cap_kbps(height or 1080)  # Unknown size: treat as 1080p
+        if height:
+            budget_kbps = width * height * fps * EncodingDefaults.BITS_PER_PIXEL / 1000
+        else:
+            budget_kbps = cap_kbps
+
+        avg_kbps = min(budget_kbps, cap_kbps)
+        source_kbps = _source_video_kbps(info)
+        if source_kbps:
+            avg_kbps = min(avg_kbps, source_kbps)
+
+        if potato:
+            avg_kbps /= 2
+        avg_kbps = max(avg_kbps, EncodingDefaults.MIN_BITRATE_KBPS)
+
+    max_kbps = avg_kbps * EncodingDefaults.MAXRATE_RATIO
+    buffer_kbps = max_kbps * EncodingDefaults.BUFSIZE_RATIO
+
+    if potato:
+        crf, cq = EncodingDefaults.CRF_POTATO, EncodingDefaults.CQ_POTATO
+    elif height >= 1080:
+        crf = EncodingDefaults.CRF_1080P
+        cq = crf + EncodingDefaults.CQ_OFFSET
+    elif height >= 720:
+        crf = EncodingDefaults.CRF_720P
+        cq = crf + EncodingDefaults.CQ_OFFSET
+    else:
+        crf, cq = EncodingDefaults.CRF_SD, EncodingDefaults.CQ_SD
+
+    return EncodingParams(
+        avg_bitrate=f"{int(avg_kbps)}k",
+        max_bitrate=f"{int(max_kbps)}k",
+        buffer_size=f"{int(buffer_kbps)}k",
+        crf=crf,
+        cq=cq,
+        qmin=cq - EncodingDefaults.QMIN_OFFSET,
+        qmax=cq + EncodingDefaults.QMAX_OFFSET
+    )
+
+
+@dataclass(frozen=True)
+class AudioPlan:
+    """How the audio input is turned into the delivery AAC track.
+
+    Immutable to prevent accidental modification.
+    """
+
+    transcode: bool  # False: input is already deliverable and is stream-copied
+    resample: bool = False  # Input sample rate differs from the delivery rate
+
+
+def plan_audio(info: Optional[VideoInfo]) -> AudioPlan:
+    """Decide whether the audio input needs transcoding and resampling.
+
+    AAC at the delivery sample rate and no more than the delivery bitrate
+    is passed through untouched. Unknown streams are transcoded and
+    resampled to be safe (resampling to the same rate is a no-op), and so
+    are streams of unknown bitrate.
+
+    Args:
+        info: Probe of the audio input, or None if it could not be probed
+
+    Returns:
+        AudioPlan for the input
+    """
+    streams = info.audio_streams if info is not None else ()
+    if not streams:
+        return AudioPlan(transcode=True, resample=True)
+
+    resample = any(s.sample_rate != EncodingDefaults.AUDIO_SAMPLE_RATE for s in streams)
+    deliverable = all(
+        s.codec_name == EncodingDefaults.AUDIO_CODEC and 0 < s.bit_rate <= _audio_kbps() * 1000
+        for s in streams
+    )
+    return AudioPlan(transcode=resample or not deliverable, resample=resample)
+
+
+def can_copy_video(info: VideoInfo, settings: 'VideoSettings') -> bool:
+    """Check whether the raw's video can be stream-copied into the softsub.
+
+    The raw must already be H.264 in the target pixel format, in a known
+    profile the target profile decodes, and within the softsub bitrate budget for
+    its resolution. Unknown bitrates never qualify.
+
+    Args:
+        info: Probed raw metadata
+        settings: Softsub video settings the encode would use
+
+    Returns:
+        True if re-encoding the video would not improve compatibility or size
+    """
+    if info.codec_name != EncodingDefaults.COPY_VIDEO_CODEC:
+        return False
+    if info.source_pixel_format != settings.pixel_format:
+        return False
+    if info.video_profile is None:
+        return False  # Unknown profile: the target profile may not decode it
+    if info.video_profile not in EncodingDefaults.COPY_PROFILES.get(settings.video_profile, ()):
+        return False
+
+    source_kbps = _source_video_kbps(info)
+    return 0 < source_kbps <= _bitrate_cap_kbps(info.height)
+
+
+def with_crf(params: EncodingParams, crf: int) -> EncodingParams:
+    """Return params with a new CRF and the matching NVENC quantizers.
+
+    Args:
+        params: Current encoding parameters
+        crf: New constant rate factor
+
+    Returns:
+        EncodingParams with crf, cq, qmin and qmax updated
+    """
+    cq = crf + EncodingDefaults.CQ_OFFSET
+    return replace(
+        params,
+        crf=crf,
+        cq=cq,
+        qmin=cq - EncodingDefaults.QMIN_OFFSET,
+        qmax=cq + EncodingDefaults.QMAX_OFFSET
+    )
+
+
+def _source_video_kbps(info: VideoInfo) -> float:
+    """Video bitrate of the raw in kbit/s, 0 if unknown.
+
+    Uses the container bitrate (or size / duration) minus the known
+    bitrates of the raw's audio streams.
+    """
+    total_bps = info.bit_rate
+    if not total_bps and info.size_bytes and info.duration_seconds > 0:
+        total_bps = info.size_bytes * 8 / info.duration_seconds
+    if not total_bps:
+        return 0.0
+
+    audio_bps = sum(stream.bit_rate for stream in info.audio_streams)
+    video_bps = total_bps - audio_bps
+    return (video_bps if video_bps > 0 else total_bps) / 1000
+
+
+def target_bitrate_kbps(info: VideoInfo, target_size_bytes: Optional[int]) -> Optional[float]:
+    """Video bitrate that fills a target output size, before any floor.
+
+    Args:
+        info: Probed raw metadata
+        target_size_bytes: Desired output size
+
+    Returns:
+        Bitrate in kbit/s (may be below zero if the audio alone is larger),
+        or None without a target size or a known duration
+    """
+    if not target_size_bytes or info.duration_seconds <= 0:
+        return None
+    return target_size_bytes * 8 / info.duration_seconds / 1000 - _audio_kbps()
+
+
+def _audio_kbps() -> float:
+    """Bitrate of the encoded audio track in kbit/s."""
+    return int(EncodingDefaults.AUDIO_BITRATE.rstrip('Kk'))
+
+
+def _bitrate_cap_kbps(height: int) -> int:
+    """Average bitrate cap for a frame height."""
+    for max_height, cap in EncodingDefaults.BITRATE_CAPS_KBPS:
+        if height <= max_height:
+            return cap
+    return EncodingDefaults.BITRATE_CAPS_KBPS[-1][1]
+
+
+def _height_from_label(resolution: str) -> int:
+    """Frame height from a resolution label such as "720p" (0 if unknown)."""
+    try:
+        return int(resolution.rstrip('p')) if resolution.endswith('p') else 0
+    except ValueError:
+        return 0
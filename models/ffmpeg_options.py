@@ -6,9 +6,9 @@ No logic, no side effects - just typed data.
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
-from models.encoding import EncodingParams
+from models.encoding import EncodingDefaults, EncodingParams
 from models.job import VideoSettings
 from models.render_paths import RenderPaths
 
@@ -16,7 +16,7 @@ from models.render_paths import RenderPaths
 @dataclass(frozen=True)
 class CodecOptions:
     """Codec selection options."""
-    video_codec: str  # 'libx264', 'h264_nvenc', 'hevc', 'hevc_nvenc'
+    video_codec: str  # 'libx264', 'h264_nvenc', 'hevc', 'hevc_nvenc' or 'copy'
     audio_codec: str = 'aac'
     subtitle_codec: str = 'copy'
 
@@ -34,6 +34,8 @@ class FilterOptions:
     """Video filter configuration."""
     logo_path: Optional[Path] = None
     subtitle_path: Optional[Path] = None
+    logo_overlay: Optional[Path] = None  # Pre-rendered RGBA logo image, composited instead of logo_path
+    fonts_dir: Optional[Path] = None  # Extra fonts for libass (bundled and attached fonts)
 
     def to_filter_string(self) -> Optional[str]:
         """Build -vf filter string.
@@ -41,15 +43,55 @@ class FilterOptions:
         Returns:
             Filter string for -vf argument, or None if no filters.
         """
-        filters = []
-        if self.logo_path:
-            escaped = _escape_path_for_filter(self.logo_path)
-            filters.append(f"subtitles='{escaped}'")
-        if self.subtitle_path:
-            escaped = _escape_path_for_filter(self.subtitle_path)
-            filters.append(f"subtitles='{escaped}'")
+        return self.to_filter_graph()
+
+    def to_filter_graph(
+        self,
+        source: str = '',
+        tag: str = '',
+        before: Sequence[str] = (),
+        after: Sequence[str] = ()
+    ) -> Optional[str]:
+        """Build the filters as a graph fragment with an unlabeled output.
+
+        Without a logo overlay this is a plain chain. The overlay needs a
+        second input, so the logo image is loaded with the movie source and
+        composited onto the video; the rest of the chain follows it.
+
+        Args:
+            source: Input link label (e.g. "[0:v:0]"); empty for a -vf graph
+            tag: Prefix keeping the fragment's internal link labels unique
+            before: Filters applied before the logo and subtitles
+            after: Filters applied after them
 
-        return ", ".join(filters) if filters else None
+        Returns:
+            Graph fragment, or None if no filters.
+        """
+        burned = [self._subtitles_filter(path) for path in (self.logo_path, self.subtitle_path) if path]
+        chain = [", ".join(burned)] if burned else []
+        chain.extend(after)
+
+        if not self.logo_overlay:
+            filters = [*before, *chain]
+            return source + ",".join(filters) if filters else None
+
+        # The overlay's main input must be labeled; -vf graphs call theirs "in"
+        source = source or '[in]'
+        escaped = escape_path_for_filter(self.logo_overlay)
+        graph = f"movie='{escaped}'[{tag}logo];"
+        if before:
+            graph += f"{source}{','.join(before)}[{tag}main];"
+            source = f'[{tag}main]'
+        # A single-image input repeats its only frame for the whole video
+        graph += f"{source}[{tag}logo]overlay=format=auto"
+        return ",".join([graph, *chain])
+
+    def _subtitles_filter(self, path: Path) -> str:
+        subtitles = f"subtitles='{escape_path_for_filter(path)}'"
+        if self.fonts_dir:
+            # Fonts are looked up here before the system fonts
+            subtitles += f":fontsdir='{escape_path_for_filter(self.fonts_dir)}'"
+        return subtitles
 
 
 @dataclass(frozen=True)
@@ -82,13 +124,32 @@ class FFmpegOptions:
     # Preset
     preset: str = 'faster'
 
+    # Seconds between machine-readable progress blocks
+    stats_period: float = EncodingDefaults.PROGRESS_STATS_PERIOD
+
+    # Two-pass encoding: 0 = single pass, 1 = analysis pass, 2 = final pass
+    pass_number: int = 0
+    passlog_prefix: Optional[Path] = None  # Per-job first-pass stats location
+
     # Flags
     use_nvenc: bool = False
     include_audio: bool = True
     include_subtitles: bool = True
 
 
-def _escape_path_for_filter(path: Path) -> str:
+@dataclass(frozen=True)
+class MultiOutputOptions:
+    """Options for a single-decode render that writes softsub and hardsub.
+
+    The raw is demuxed and decoded once; the decoded frames are split with a
+    filter graph and fed to both encoders. Each branch keeps its own codec,
+    rate control, filters and output settings.
+    """
+    softsub: FFmpegOptions
+    hardsub: FFmpegOptions
+
+
+def escape_path_for_filter(path: Path) -> str:
     """Escape path for use in FFmpeg filter string.
 
     Windows paths need special escaping for FFmpeg filter syntax.
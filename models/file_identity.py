@@ -0,0 +1,49 @@
+"""File identity for cache keys.
+
+A file is identified by its resolved path, size and modification time.
+Cheap to compute (one stat call) and changes whenever the file is
+replaced or rewritten, so cached data derived from the file stays valid
+exactly as long as the key matches.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class FileIdentity:
+    """Identity of a file on disk: (path, size, mtime)."""
+
+    path: str  # Resolved absolute path
+    size: int  # Size in bytes
+    mtime_ns: int  # Modification time in nanoseconds
+
+    @classmethod
+    def of(cls, path: Path) -> 'FileIdentity':
+        """Stat a file and build its identity.
+
+        Args:
+            path: File to identify
+
+        Returns:
+            FileIdentity for the file's current state
+
+        Raises:
+            OSError: If the file cannot be accessed
+        """
+        resolved = Path(path).resolve()
+        stat = resolved.stat()
+        return cls(path=str(resolved), size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+    def key(self) -> str:
+        """Stable string key for use in cache manifests."""
+        return f"{self.path}|{self.size}|{self.mtime_ns}"
+
+
+def file_key(path: Path) -> Optional[str]:
+    """Cache key for a file's current state, or None if it cannot be accessed."""
+    try:
+        return FileIdentity.of(path).key()
+    except OSError:
+        return None
@@ -0,0 +1,136 @@
+"""Font names from TrueType/OpenType data.
+
+Pure functions for reading the names libass matches fonts by, and for
+checking subtitle fonts against them. No side effects, easy to test,
+reusable. Only the table directory and the `name` table are parsed, so
+callers can read a few KB of a multi-MB font instead of the whole file.
+"""
+
+import struct
+from typing import Iterable, Optional
+
+# Family, full name, PostScript name, typographic family
+NAME_IDS = frozenset({1, 4, 6, 16})
+
+TTC_HEADER_SIZE = 12
+SFNT_HEADER_SIZE = 12
+TABLE_RECORD_SIZE = 16
+
+
+def collection_offsets(header: bytes) -> list[int]:
+    """Offsets of the fonts in a file (one for plain fonts, several for .ttc collections).
+
+    Args:
+        header: At least the first 12 bytes of the file (plus the offset
+            table of a collection, 4 bytes per font)
+
+    Returns:
+        Offsets of each font's table directory
+    """
+    if header[:4] != b'ttcf':
+        return [0]
+    (count,) = struct.unpack_from('>I', header, 8)
+    return list(struct.unpack_from(f'>{count}I', header, TTC_HEADER_SIZE))
+
+
+def table_count(header: bytes) -> int:
+    """Number of tables in a font's table directory (header at its offset)."""
+    (count,) = struct.unpack_from('>H', header, 4)
+    return count
+
+
+def find_table(directory: bytes, tag: bytes) -> Optional[tuple[int, int]]:
+    """(offset, length) of a table, from a font's header and table records."""
+    for i in range(table_count(directory)):
+        record = SFNT_HEADER_SIZE + i * TABLE_RECORD_SIZE
+        if directory[record:record + 4] == tag:
+            offset, length = struct.unpack_from('>II', directory, record + 8)
+            return offset, length
+    return None
+
+
+def parse_name_table(data: bytes) -> set[str]:
+    """Names libass can match a font by, from its `name` table.
+
+    Args:
+        data: Contents of the name table
+
+    Returns:
+        Names as stored in the font (case kept)
+    """
+    _, count, strings = struct.unpack_from('>HHH', data, 0)
+    names = set()
+    for i in range(count):
+        platform, encoding, _, name_id, length, offset = struct.unpack_from('>6H', data, 6 + i * 12)
+        if name_id not in NAME_IDS:
+            continue
+        raw = data[strings + offset:strings + offset + length]
+        if platform in (0, 3):
+            name = raw.decode('utf-16-be', errors='replace')
+        elif platform == 1 and encoding == 0:
+            name = raw.decode('mac_roman', errors='replace')
+        else:
+            continue
+        name = name.strip('\x00').strip()
+        if name:
+            names.add(name)
+    return names
+
+
+def font_names(data: bytes) -> set[str]:
+    """Names of every font in the contents of a font file.
+
+    Args:
+        data: Whole font file (.ttf, .otf, .ttc)
+
+    Returns:
+        Names, empty if the data is not a readable font
+    """
+    names = set()
+    try:
+        for offset in collection_offsets(data):
+            directory = data[offset:]
+            table = find_table(directory, b'name')
+            if table is not None:
+                names |= parse_name_table(data[table[0]:table[0] + table[1]])
+    except struct.error:
+        pass  # Truncated or not a font
+    return names
+
+
+def decode_embedded_font(lines: Iterable[str]) -> bytes:
+    """Decode a font embedded in an .ass [Fonts] section.
+
+    Each 4 characters encode 3 bytes, 6 bits per character offset by 33;
+    a trailing group of 2 or 3 characters encodes 1 or 2 bytes.
+
+    Args:
+        lines: Encoded lines of one font (without its fontname: line)
+
+    Returns:
+        Font file contents
+    """
+    text = ''.join(line.strip() for line in lines)
+    data = bytearray()
+    for start in range(0, len(text), 4):
+        group = text[start:start + 4]
+        value = 0
+        for char in group:
+            value = (value << 6) | ((ord(char) - 33) & 0x3F)
+        value <<= 6 * (4 - len(group))
+        data.extend(value.to_bytes(3, 'big')[:len(group) - 1])
+    return bytes(data)
+
+
+def missing_fonts(required: Iterable[str], available: Iterable[str]) -> list[str]:
+    """Required fonts without a match, compared case-insensitively like fontconfig.
+
+    Args:
+        required: Font names used by subtitles
+        available: Names of installed, bundled and attached fonts
+
+    Returns:
+        Sorted names of the missing fonts
+    """
+    known = {name.casefold() for name in available}
+    return sorted({name for name in required if name.casefold() not in known}, key=str.casefold)
@@ -5,6 +5,7 @@ from pathlib import Path
 
 from models.encoding import EncodingParams
 from models.enums import BuildState, LogoState, NvencState
+from models.patching import TimeRange
 from models.render_paths import RenderPaths
 
 
@@ -52,6 +53,20 @@ class VideoPresets:
     )
 
 
+@dataclass(frozen=True)
+class JobOptions:
+    """Options of the next job, set in the queue panel.
+
+    They belong to one job only: the panel resets them once the job is
+    queued or started, and they are never saved in the config.
+    Immutable to prevent accidental modification.
+    """
+
+    subtitle_remux: bool = False  # Re-release: remux new subtitles into the existing softsub
+    target_size_mb: int = 0  # Two-pass encode to this output size in MiB (0 = off)
+    patch_ranges: tuple[TimeRange, ...] = ()  # Re-encode only these ranges of the existing hardsub
+
+
 @dataclass
 class RenderJob:
     """Complete description of a render job.
@@ -74,12 +89,21 @@ class RenderJob:
     # Encoding parameters (calculated from analysis)
     encoding_params: EncodingParams
 
-    # Video settings for this specific encode
+    # Video settings for this specific encode (softsub; hardsub_settings below)
     video_settings: VideoSettings
 
+    # Video settings of the hardsub encode
+    hardsub_settings: VideoSettings = VideoPresets.HARDSUB
+
     # Flags
     potato_mode: bool = False
 
+    # Two-pass encode to this output size in MiB (0 = quality-based single pass)
+    target_size_mb: int = 0
+
+    # Re-encode only these ranges of the hardsub and splice them into the existing output
+    patch_ranges: tuple[TimeRange, ...] = ()
+
     # Runtime state (mutable fields)
     total_duration_sec: float = field(default=0.0, init=False)
     total_frames: float = field(default=0.0, init=False)
@@ -0,0 +1,121 @@
+"""Keyframe index of a raw file.
+
+Pure data structure and parsing for the keyframe timestamps of a raw's
+video stream. No side effects, easy to test, reusable.
+
+Timestamps are held in an `array('d')` (8 bytes per keyframe), so the
+index of a full episode is a few kilobytes and serializes to a compact
+binary blob for the on-disk cache (see modules.keyframe_cache).
+"""
+
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+
+@dataclass(frozen=True)
+class KeyframeIndex:
+    """Sorted keyframe timestamps (seconds) of a raw's first video stream.
+
+    Immutable by convention: the array is never modified after creation.
+    """
+
+    times: array = field(default_factory=lambda: array('d'))
+
+    MAGIC = b'KFI1'
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def relative_to(self, start_time: float) -> 'KeyframeIndex':
+        """Shift timestamps so they are relative to the container start time.
+
+        Seek positions (`-ss`) are relative to the start time, while packet
+        timestamps are absolute. Keyframes at or before the start are dropped.
+
+        Args:
+            start_time: Container start time in seconds
+
+        Returns:
+            New index with shifted timestamps
+        """
+        if not start_time:
+            return self
+        return KeyframeIndex(array('d', (t - start_time for t in self.times if t > start_time)))
+
+    def at_or_before(self, seconds: float) -> Optional[float]:
+        """Last keyframe at or before a timestamp, or None."""
+        pos = bisect_right(self.times, seconds)
+        return self.times[pos - 1] if pos else None
+
+    def at_or_after(self, seconds: float) -> Optional[float]:
+        """First keyframe at or after a timestamp, or None."""
+        pos = bisect_left(self.times, seconds)
+        return self.times[pos] if pos < len(self.times) else None
+
+    def nearest(self, seconds: float) -> Optional[float]:
+        """Keyframe closest to a timestamp, or None if the index is empty."""
+        candidates = [t for t in (self.at_or_before(seconds), self.at_or_after(seconds)) if t is not None]
+        return min(candidates, key=lambda t: abs(t - seconds)) if candidates else None
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a little-endian binary blob."""
+        times = array('d', self.times)
+        if sys.byteorder == 'big':
+            times.byteswap()
+        return self.MAGIC + struct.pack('<I', len(times)) + times.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'KeyframeIndex':
+        """Deserialize a blob produced by to_bytes.
+
+        Raises:
+            ValueError: If the blob is not a valid index
+        """
+        header = len(cls.MAGIC) + 4
+        if data[:len(cls.MAGIC)] != cls.MAGIC or len(data) < header:
+            raise ValueError("Not a keyframe index")
+        (count,) = struct.unpack('<I', data[len(cls.MAGIC):header])
+        if len(data) != header + count * 8:
+            raise ValueError("Truncated keyframe index")
+
+        times = array('d')
+        times.frombytes(data[header:])
+        if sys.byteorder == 'big':
+            times.byteswap()
+        return cls(times)
+
+
+def parse_keyframe_lines(lines: Iterable[str]) -> KeyframeIndex:
+    """Build a keyframe index from ffprobe packet CSV output.
+
+    Expects output of `-show_entries packet=pts_time,flags -of csv=p=0`,
+    one "pts_time,flags" line per packet; packets flagged "K" are
+    keyframes. Lines are consumed one at a time, so the probe's stdout can
+    be streamed without buffering the whole packet list.
+
+    Example line: "12.345000,K__" -> keyframe at 12.345
+
+    Args:
+        lines: ffprobe stdout lines (or the full output split into lines)
+
+    Returns:
+        KeyframeIndex with sorted, de-duplicated timestamps
+    """
+    times = array('d')
+    for line in lines:
+        pts, sep, flags = line.strip().partition(',')
+        if not sep or 'K' not in flags:
+            continue
+        try:
+            times.append(float(pts))
+        except ValueError:
+            continue  # N/A timestamps
+
+    # Packets arrive in decode order; keyframe pts are almost always monotonic
+    if any(a >= b for a, b in zip(times, times[1:])):
+        times = array('d', sorted(set(times)))
+    return KeyframeIndex(times)
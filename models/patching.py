@@ -0,0 +1,132 @@
+"""Planning for partial re-renders spliced into an existing output.
+
+Pure functions that turn the time ranges needing a fix into a list of
+pieces: parts of the existing output that are kept as is, and parts that
+are re-encoded from the raw. No side effects, easy to test, reusable.
+
+Piece boundaries sit on keyframes of the existing output, so the kept
+parts can be cut with the concat demuxer's inpoint/outpoint without
+re-encoding, and every re-encoded part starts a fresh GOP. This holds
+only for outputs encoded with closed GOPs: the keyframe probe also flags
+open-GOP (CRA) pictures, whose leading frames reference the GOP before.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterable
+
+from models.chunking import Segment
+from models.keyframe_index import KeyframeIndex
+
+
+@dataclass(frozen=True)
+class TimeRange:
+    """A span of the episode in seconds.
+
+    Immutable to prevent accidental modification.
+    """
+
+    start_sec: float
+    end_sec: float
+
+
+@dataclass(frozen=True)
+class PatchPiece:
+    """One piece of a patched output.
+
+    Immutable to prevent accidental modification.
+    """
+
+    start_sec: float
+    end_sec: float
+    reencode: bool  # True: encoded from the raw; False: copied from the existing output
+
+    def segment(self, index: int, final: bool) -> Segment:
+        """Raw segment to encode for this piece."""
+        return Segment(index=index, start_sec=self.start_sec, end_sec=self.end_sec, final=final)
+
+
+def parse_time_ranges(text: str) -> tuple[TimeRange, ...]:
+    """Parse user-given time ranges.
+
+    Examples:
+        "12:30-12:45" -> (TimeRange(750.0, 765.0),)
+        "1:02:03.5-1:02:10, 90-95" -> two ranges
+
+    Args:
+        text: Comma-separated "start-end" pairs of [[h:]m:]s timestamps
+
+    Returns:
+        Ranges in the given order (empty for blank text)
+
+    Raises:
+        ValueError: If a range is malformed or ends before it starts
+    """
+    ranges = []
+    for part in filter(None, (p.strip() for p in text.split(','))):
+        match = _RANGE_PATTERN.fullmatch(part)
+        if not match:
+            raise ValueError(f"Invalid time range: {part!r}")
+        start, end = _parse_timestamp(match.group(1)), _parse_timestamp(match.group(2))
+        if end <= start:
+            raise ValueError(f"Time range ends before it starts: {part!r}")
+        ranges.append(TimeRange(start, end))
+    return tuple(ranges)
+
+
+def plan_patch(
+    ranges: Iterable[TimeRange],
+    keyframes: KeyframeIndex,
+    duration_sec: float
+) -> list[PatchPiece]:
+    """Split the existing output into kept and re-encoded pieces.
+
+    Each range is widened to the surrounding keyframes of the existing
+    output (the start of the file and its end count as boundaries);
+    widened ranges that touch or overlap are merged.
+
+    Args:
+        ranges: Time ranges that must be re-encoded
+        keyframes: Keyframe index of the existing output
+        duration_sec: Duration of the existing output
+
+    Returns:
+        Contiguous pieces covering [0, duration), in playback order; empty
+        if there is nothing to re-encode
+    """
+    spans: list[list[float]] = []
+    for time_range in sorted(ranges, key=lambda r: r.start_sec):
+        start = max(0.0, min(time_range.start_sec, duration_sec))
+        end = max(0.0, min(time_range.end_sec, duration_sec))
+        if end <= start:
+            continue
+
+        start = keyframes.at_or_before(start) or 0.0
+        end = keyframes.at_or_after(end) or duration_sec
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([start, end])
+
+    pieces = []
+    position = 0.0
+    for start, end in spans:
+        if start > position:
+            pieces.append(PatchPiece(position, start, reencode=False))
+        pieces.append(PatchPiece(start, end, reencode=True))
+        position = end
+    if pieces and position < duration_sec:
+        pieces.append(PatchPiece(position, duration_sec, reencode=False))
+    return pieces
+
+
+def _parse_timestamp(text: str) -> float:
+    """Parse a [[h:]m:]s timestamp into seconds."""
+    seconds = 0.0
+    for part in text.split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+_TIMESTAMP = r'(?:\d+:){0,2}\d+(?:\.\d+)?'
+_RANGE_PATTERN = re.compile(rf'({_TIMESTAMP})\s*-\s*({_TIMESTAMP})')
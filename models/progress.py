@@ -0,0 +1,201 @@
+"""FFmpeg progress parsing from `-progress` key=value output.
+
+Pure parsing of the machine-readable progress stream into typed samples.
+No side effects, easy to test, reusable.
+
+FFmpeg writes one block of `key=value` lines per stats period and closes
+each block with `progress=continue` (or `progress=end` for the last one).
+"""
+
+from dataclasses import dataclass, replace
+from typing import Iterable, Iterator, Optional
+
+
+@dataclass(frozen=True)
+class ProgressSample:
+    """One progress tick reported by ffmpeg.
+
+    All fields have sensible defaults if ffmpeg reports N/A.
+    Immutable to prevent accidental modification.
+    """
+
+    frame: int = 0
+    fps: float = 0.0
+    out_time_sec: float = 0.0
+    speed: float = 0.0  # Realtime multiplier (1.0 = realtime), 0 if unknown
+    bitrate_kbps: float = 0.0
+    total_size: int = 0  # Bytes written so far
+    finished: bool = False  # True for the final `progress=end` block
+
+
+class ProgressParser:
+    """Incremental parser for ffmpeg `-progress` output.
+
+    Lines are fed one at a time; a ProgressSample is returned whenever a
+    block is closed by its `progress=` line. Lines that are not progress
+    keys (regular log output merged into the same pipe) are ignored.
+    """
+
+    def __init__(self):
+        self._block: dict[str, str] = {}
+
+    def feed(self, line: str) -> Optional[ProgressSample]:
+        """Consume one output line.
+
+        Args:
+            line: Single line from ffmpeg output
+
+        Returns:
+            ProgressSample when the line closes a block, otherwise None
+        """
+        key, value = split_progress_line(line)
+        if key is None:
+            return None
+        return self.feed_pair(key, value)
+
+    def feed_pair(self, key: str, value: str) -> Optional[ProgressSample]:
+        """Consume one already-split progress key/value pair.
+
+        Args:
+            key: Progress key (e.g. "frame", "out_time_us")
+            value: Raw value string
+
+        Returns:
+            ProgressSample when the pair closes a block, otherwise None
+        """
+        self._block[key] = value
+        if key != 'progress':
+            return None
+
+        sample = _sample_from_block(self._block)
+        self._block = {}
+        return sample
+
+
+def split_progress_line(line: str) -> tuple[Optional[str], str]:
+    """Split a progress line into key and value.
+
+    Example: "out_time_us=1500000" -> ("out_time_us", "1500000")
+
+    Args:
+        line: Single line from ffmpeg output
+
+    Returns:
+        (key, value), or (None, "") if the line is not a progress key
+    """
+    key, sep, value = line.strip().partition('=')
+    if not sep or not key or not all(c.isalnum() or c == '_' for c in key):
+        return None, ""
+    return key, value.strip()
+
+
+def parse_progress_lines(lines: Iterable[str]) -> Iterator[ProgressSample]:
+    """Yield progress samples from ffmpeg output lines.
+
+    Args:
+        lines: Output lines from ffmpeg run with `-progress pipe:1`
+
+    Yields:
+        ProgressSample for each completed block
+    """
+    parser = ProgressParser()
+    for line in lines:
+        sample = parser.feed(line)
+        if sample is not None:
+            yield sample
+
+
+def aggregate_progress(samples: Iterable[ProgressSample]) -> ProgressSample:
+    """Combine the latest samples of concurrently running encodes.
+
+    Frames, encoded time and size add up; fps and speed add up too, since
+    the encodes run side by side (combined throughput). The result is
+    finished only when every encode is.
+
+    Args:
+        samples: Latest sample of each running encode
+
+    Returns:
+        Single ProgressSample describing the whole job
+    """
+    samples = list(samples)
+    out_time_sec = sum(s.out_time_sec for s in samples)
+    total_size = sum(s.total_size for s in samples)
+    return ProgressSample(
+        frame=sum(s.frame for s in samples),
+        fps=sum(s.fps for s in samples),
+        out_time_sec=out_time_sec,
+        speed=sum(s.speed for s in samples),
+        bitrate_kbps=total_size * 8 / out_time_sec / 1000 if out_time_sec else 0.0,
+        total_size=total_size,
+        finished=bool(samples) and all(s.finished for s in samples),
+    )
+
+
+def scale_to_pass(
+    sample: ProgressSample,
+    pass_index: int,
+    pass_count: int,
+    total_frames: float,
+    total_duration_sec: float
+) -> ProgressSample:
+    """Map a sample of one pass onto the progress of a multi-pass encode.
+
+    Frames and time are placed on a single scale covering all passes (so
+    the progress bar fills once), and speed is reduced accordingly so
+    time-based ETAs include the passes still to run.
+
+    Args:
+        sample: Sample reported by the running pass
+        pass_index: 0-based index of the running pass
+        pass_count: Total number of passes
+        total_frames: Frames in the episode
+        total_duration_sec: Duration of the episode
+
+    Returns:
+        ProgressSample on the whole-encode scale
+    """
+    if pass_count <= 1:
+        return sample
+    return replace(
+        sample,
+        frame=int((pass_index * total_frames + sample.frame) / pass_count),
+        out_time_sec=(pass_index * total_duration_sec + sample.out_time_sec) / pass_count,
+        speed=sample.speed / pass_count,
+        fps=sample.fps / pass_count,
+        finished=sample.finished and pass_index == pass_count - 1,
+    )
+
+
+def _sample_from_block(block: dict[str, str]) -> ProgressSample:
+    """Build a ProgressSample from one block of key=value pairs."""
+    out_time_us = _parse_int(block.get('out_time_us'))
+    if out_time_us is None:
+        # Older ffmpeg builds: out_time_ms is also in microseconds
+        out_time_us = _parse_int(block.get('out_time_ms'))
+
+    return ProgressSample(
+        frame=_parse_int(block.get('frame')) or 0,
+        fps=_parse_float(block.get('fps')) or 0.0,
+        out_time_sec=max(out_time_us or 0, 0) / 1_000_000,
+        speed=_parse_float(block.get('speed', '').rstrip('x')) or 0.0,
+        bitrate_kbps=_parse_float(block.get('bitrate', '').replace('kbits/s', '')) or 0.0,
+        total_size=_parse_int(block.get('total_size')) or 0,
+        finished=block.get('progress') == 'end',
+    )
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    """Parse an integer field, returning None for N/A or garbage."""
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    """Parse a float field, returning None for N/A or garbage."""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
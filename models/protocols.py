@@ -19,14 +19,22 @@ class ProcessHandle(Protocol):
         """Wait for process and return (stdout, stderr)."""
         ...
 
-    def wait(self) -> int:
+    def wait(self, timeout: float | None = None) -> int:
         """Wait for process to complete and return exit code."""
         ...
 
+    def poll(self) -> int | None:
+        """Exit code, or None while the process is running."""
+        ...
+
     def terminate(self) -> None:
         """Terminate the process."""
         ...
 
+    def kill(self) -> None:
+        """Kill the process (when terminate is ignored)."""
+        ...
+
 
 class ProcessRunner(Protocol):
     """Interface for running ffmpeg/ffprobe subprocesses.
@@ -63,9 +71,9 @@ class ProcessRunner(Protocol):
         ...
 
     def kill_ffmpeg(self) -> None:
-        """Terminate the currently running ffmpeg process (if any).
+        """Terminate the running ffmpeg processes started by this runner (if any).
 
         This is safer than platform-specific process killing as it only
-        terminates the process we started, not all ffmpeg processes.
+        terminates the processes we started, not all ffmpeg processes.
         """
         ...
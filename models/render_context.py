@@ -0,0 +1,150 @@
+"""Job-scoped render settings.
+
+Pure functions for resolving what the encode steps of one job use: its
+build, NVENC and logo states, the softsub and hardsub video settings
+(refined by the probe of the raw) and the per-job options. The context
+is immutable and built per job, so jobs running in parallel never see
+each other's settings and the shared config is never written. No side
+effects, easy to test, reusable.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from models.enums import BuildState, LogoState, NvencState
+from models.job import RenderJob, VideoPresets, VideoSettings
+from models.patching import TimeRange
+from models.video_info import VideoInfo
+
+SOFTSUB_NVENC = (NvencState.NVENC_BOTH, NvencState.NVENC_SOFT_ONLY)
+HARDSUB_NVENC = (NvencState.NVENC_BOTH, NvencState.NVENC_HARD_ONLY)
+SOFTSUB_LOGO = (LogoState.LOGO_BOTH, LogoState.LOGO_SOFT_ONLY)
+HARDSUB_LOGO = (LogoState.LOGO_BOTH, LogoState.LOGO_HARD_ONLY)
+
+
+def frozen_video_settings(settings) -> VideoSettings:
+    """Immutable copy of video settings (the config holds mutable ones)."""
+    return VideoSettings(
+        video_tune=settings.video_tune,
+        video_profile=settings.video_profile,
+        profile_level=settings.profile_level,
+        pixel_format=settings.pixel_format,
+    )
+
+
+def map_pixel_formats(parsed_format: str, nvenc_state: NvencState) -> tuple[str, str]:
+    """Map parsed pixel format to softsub and hardsub formats.
+
+    Handles codec compatibility - 10-bit formats need conversion for softsub.
+
+    Args:
+        parsed_format: Pixel format from video metadata
+        nvenc_state: NVENC state of the job
+
+    Returns:
+        Tuple of (softsub_format, hardsub_format)
+    """
+    if parsed_format in ['yuv420p10le', 'p010le']:
+        # 10-bit formats: softsub uses 8-bit, hardsub preserves 10-bit (NVENC takes p010le)
+        hardsub_fmt = 'p010le' if nvenc_state in HARDSUB_NVENC else 'yuv420p10le'
+        return 'yuv420p', hardsub_fmt
+    # 8-bit: use as-is for both
+    return parsed_format, parsed_format
+
+
+def map_profiles(parsed_profile: Optional[str], nvenc_state: NvencState,
+                 pixel_format: str = 'yuv420p') -> tuple[str, str]:
+    """Map parsed video profile to softsub and hardsub profiles.
+
+    Different codecs need different profile mappings for compatibility.
+    An unknown raw profile gets the profiles of a High (8-bit) or High 10
+    raw, which encode any source of that bit depth.
+
+    Args:
+        parsed_profile: Video profile from metadata (None if unknown)
+        nvenc_state: NVENC state of the job
+        pixel_format: Normalized pixel format of the raw
+
+    Returns:
+        Tuple of (softsub_profile, hardsub_profile)
+    """
+    # h264_nvenc has no high10 profile
+    soft_10bit = 'high' if nvenc_state in SOFTSUB_NVENC else 'high10'
+    profile_map = {
+        'main': ('main', 'main'),
+        'main10': (soft_10bit, 'main10'),
+        'high': ('high', 'main10'),
+        'high10': (soft_10bit, 'main10'),
+    }
+    if parsed_profile is None:
+        parsed_profile = 'high' if pixel_format == 'yuv420p' else 'high10'
+    return profile_map.get(parsed_profile, (parsed_profile, parsed_profile))
+
+
+@dataclass(frozen=True)
+class RenderContext:
+    """Settings the encode steps of one job read, fixed when the job is created."""
+
+    build_state: BuildState
+    nvenc_state: NvencState
+    logo_state: LogoState
+    softsub_settings: VideoSettings = VideoPresets.SOFTSUB
+    hardsub_settings: VideoSettings = VideoPresets.HARDSUB
+
+    # Per-job options (see RenderJob)
+    potato_mode: bool = False
+    target_size_mb: int = 0
+    patch_ranges: tuple[TimeRange, ...] = ()
+
+    @classmethod
+    def from_job(cls, job: RenderJob) -> 'RenderContext':
+        """Context of a queued job."""
+        return cls(
+            build_state=job.build_state,
+            nvenc_state=job.nvenc_state,
+            logo_state=job.logo_state,
+            softsub_settings=frozen_video_settings(job.video_settings),
+            hardsub_settings=frozen_video_settings(job.hardsub_settings),
+            potato_mode=job.potato_mode,
+            target_size_mb=job.target_size_mb,
+            patch_ranges=job.patch_ranges,
+        )
+
+    def with_video_info(self, info: VideoInfo) -> 'RenderContext':
+        """Context with pixel formats and profiles matched to the probed raw.
+
+        Potato mode forces yuv420p and the main profile for both outputs.
+
+        Args:
+            info: Probed raw metadata
+
+        Returns:
+            New context (this one is unchanged)
+        """
+        if self.potato_mode:
+            soft_fmt = hard_fmt = 'yuv420p'
+            soft_profile = hard_profile = 'main'
+        else:
+            soft_fmt, hard_fmt = map_pixel_formats(info.pixel_format, self.nvenc_state)
+            soft_profile, hard_profile = map_profiles(info.video_profile, self.nvenc_state, info.pixel_format)
+        return replace(
+            self,
+            softsub_settings=replace(self.softsub_settings, pixel_format=soft_fmt, video_profile=soft_profile),
+            hardsub_settings=replace(self.hardsub_settings, pixel_format=hard_fmt, video_profile=hard_profile),
+        )
+
+    @property
+    def softsub_nvenc(self) -> bool:
+        return self.nvenc_state in SOFTSUB_NVENC
+
+    @property
+    def hardsub_nvenc(self) -> bool:
+        return self.nvenc_state in HARDSUB_NVENC
+
+    @property
+    def softsub_logo(self) -> bool:
+        return self.logo_state in SOFTSUB_LOGO
+
+    @property
+    def hardsub_logo(self) -> bool:
+        return self.logo_state in HARDSUB_LOGO
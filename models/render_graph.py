@@ -0,0 +1,76 @@
+"""Render steps of a job as a dependency graph.
+
+Pure functions for ordering a job's steps (probe, audio pre-encode,
+subtitle preparation, encodes, verification, cleanup). A step starts
+once every step it comes after has finished, so independent steps - a
+software hardsub next to an NVENC softsub, the audio encode next to the
+probe - can run at once. No side effects, easy to test, reusable.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Iterable, Sequence
+
+from models.resources import ResourceDemand
+
+
+@dataclass(frozen=True)
+class RenderStep:
+    """One step of a job's render graph."""
+
+    name: str
+    action: Callable[[], None]
+    after: tuple[str, ...] = ()  # Names of the steps that must finish first
+    demand: ResourceDemand = ResourceDemand()  # Encoder slots held while the step runs
+    retries: int = 0  # Extra attempts after the step raises
+
+
+@dataclass(frozen=True)
+class StepResult:
+    """Timing of a finished step."""
+
+    name: str
+    seconds: float
+    attempts: int
+
+
+def check_graph(steps: Sequence[RenderStep]) -> None:
+    """Validate a render graph.
+
+    Args:
+        steps: Steps of the graph
+
+    Raises:
+        ValueError: On duplicate names, unknown dependencies or cycles
+    """
+    names = [step.name for step in steps]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate render steps: {', '.join(duplicates)}")
+    known = set(names)
+    for step in steps:
+        unknown = [name for name in step.after if name not in known]
+        if unknown:
+            raise ValueError(f"Render step {step.name} comes after unknown steps: {', '.join(unknown)}")
+
+    finished: set[str] = set()
+    while len(finished) < len(steps):
+        ready = ready_steps(steps, finished, finished)
+        if not ready:
+            cycle = sorted(known - finished)
+            raise ValueError(f"Render steps depend on each other: {', '.join(cycle)}")
+        finished.update(step.name for step in ready)
+
+
+def ready_steps(steps: Iterable[RenderStep], finished: set[str], started: set[str]) -> list[RenderStep]:
+    """Steps that can start now, in graph order.
+
+    Args:
+        steps: Steps of the graph
+        finished: Names of the finished steps
+        started: Names of the started steps (running or finished)
+
+    Returns:
+        Steps not started yet whose dependencies have all finished
+    """
+    return [step for step in steps
+            if step.name not in started and all(name in finished for name in step.after)]
@@ -1,9 +1,13 @@
 """Render paths dataclass for type-safe path management."""
 
+import hashlib
+import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+from models.file_identity import file_key
+
 
 @dataclass(frozen=True)
 class RenderPaths:
@@ -17,6 +21,9 @@ class RenderPaths:
     softsub: Path
     hardsub: Path
 
+    # Subtitle-only re-release: existing softsub whose subtitle track is replaced
+    previous_softsub: Optional[Path] = None
+
     @classmethod
     def from_ui_state(
         cls,
@@ -25,7 +32,8 @@ class RenderPaths:
         sub_path: str,
         episode_name: str,
         softsub_dir: Path,
-        hardsub_dir: Path
+        hardsub_dir: Path,
+        subtitle_remux: bool = False
     ) -> 'RenderPaths':
         """Factory method: construct from MainWindow UI state.
 
@@ -36,6 +44,8 @@ class RenderPaths:
             episode_name: Episode name for output files
             softsub_dir: Directory for softsub output (Path or str)
             hardsub_dir: Directory for hardsub output (Path or str)
+            subtitle_remux: Re-release: remux the new subtitles into the
+                episode's existing softsub instead of encoding it again
 
         Returns:
             RenderPaths instance with validated paths
@@ -44,12 +54,14 @@ class RenderPaths:
         softsub_dir = Path(softsub_dir) if not isinstance(softsub_dir, Path) else softsub_dir
         hardsub_dir = Path(hardsub_dir) if not isinstance(hardsub_dir, Path) else hardsub_dir
 
+        softsub = softsub_dir / f"{episode_name}.mkv"
         return cls(
             raw=Path(raw_path),
             audio=Path(audio_path) if audio_path else None,
             sub=Path(sub_path) if sub_path else None,
-            softsub=softsub_dir / f"{episode_name}.mkv",
+            softsub=softsub,
             hardsub=hardsub_dir / f"{episode_name}.mp4",
+            previous_softsub=softsub if subtitle_remux else None,
         )
 
     def validate(self) -> list[str]:
@@ -60,7 +72,13 @@ class RenderPaths:
         """
         errors = []
 
-        if not self.raw.exists():
+        if self.previous_softsub is not None:
+            # Re-release: video and audio come from the previous softsub
+            if not self.previous_softsub.exists():
+                errors.append(f"Previous softsub not found: {self.previous_softsub}")
+            if not self.sub:
+                errors.append("Subtitle file is required for a subtitle-only re-release")
+        elif not self.raw.exists():
             errors.append(f"Raw video not found: {self.raw}")
 
         if self.audio and not self.audio.exists():
@@ -70,3 +88,39 @@ class RenderPaths:
             errors.append(f"Subtitle file not found: {self.sub}")
 
         return errors
+
+    def validate_outputs(self) -> list[str]:
+        """Validate that the output files can be written.
+
+        A missing output directory is fine as long as its nearest existing
+        parent is writable.
+
+        Returns:
+            List of error messages. Empty list means validation passed.
+        """
+        errors = []
+        for directory in dict.fromkeys([self.softsub.parent, self.hardsub.parent]):
+            existing = directory
+            while not existing.exists() and existing != existing.parent:
+                existing = existing.parent
+            if not existing.is_dir() or not os.access(existing, os.W_OK | os.X_OK):
+                errors.append(f"Output directory is not writable: {directory}")
+        return errors
+
+
+def job_temp_dir(temp_dir: Path, paths: RenderPaths) -> Path:
+    """Temp dir of a job (named after its hardsub, so reruns and the lookahead share it)."""
+    digest = hashlib.sha1(str(paths.hardsub.resolve()).encode('utf-8')).hexdigest()[:12]
+    return temp_dir / f'job_{digest}'
+
+
+def prepared_audio_path(job_dir: Path, audio: Path) -> Optional[Path]:
+    """Shared audio encode of a job, named after the audio input's current state.
+
+    Returns:
+        Path in the job's temp dir, or None if the audio input cannot be accessed
+    """
+    key = file_key(audio)
+    if key is None:
+        return None
+    return job_dir / f"audio_{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}.mka"
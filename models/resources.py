@@ -0,0 +1,91 @@
+"""Machine resources a queued job needs while it runs.
+
+Pure functions for scheduling parallel queue jobs. A job's demand is
+derived from its build and NVENC states; the queue starts a job only
+when its demand fits next to the jobs already running. No side effects,
+easy to test, reusable.
+"""
+
+from dataclasses import dataclass
+
+from models.enums import BuildState
+from models.job import RenderJob
+from models.render_context import HARDSUB_NVENC, SOFTSUB_NVENC
+
+SOFTSUB_STATES = (BuildState.SOFT_AND_HARD, BuildState.SOFT_ONLY)
+HARDSUB_STATES = (BuildState.SOFT_AND_HARD, BuildState.HARD_ONLY, BuildState.FOR_HARDSUBBERS)
+
+
+@dataclass(frozen=True)
+class ResourceDemand:
+    """Encoder slots held by a job (or available in a budget)."""
+
+    cpu_encodes: int = 0  # Software encodes (libx264 uses every core)
+    nvenc_sessions: int = 0  # NVENC sessions open at once (the driver caps them)
+    io: int = 0  # Stream-copy remuxes (bound by disk throughput)
+
+    def __add__(self, other: 'ResourceDemand') -> 'ResourceDemand':
+        return ResourceDemand(
+            self.cpu_encodes + other.cpu_encodes,
+            self.nvenc_sessions + other.nvenc_sessions,
+            self.io + other.io
+        )
+
+    def __sub__(self, other: 'ResourceDemand') -> 'ResourceDemand':
+        return ResourceDemand(
+            self.cpu_encodes - other.cpu_encodes,
+            self.nvenc_sessions - other.nvenc_sessions,
+            self.io - other.io
+        )
+
+
+def job_demand(job: RenderJob) -> ResourceDemand:
+    """Resources a job holds from its first step to its last.
+
+    The softsub and hardsub of a job may be encoded by one ffmpeg (see
+    RenderThread.softsub_and_hardsub), so both of its NVENC sessions count.
+
+    Args:
+        job: Queued job
+
+    Returns:
+        Demand of the job
+    """
+    remux = job.paths.previous_softsub is not None
+    if job.build_state == BuildState.RAW_REPAIR:
+        return ResourceDemand(cpu_encodes=1)
+
+    outputs = []  # use_nvenc per encoded output
+    if job.build_state in SOFTSUB_STATES and not remux:
+        outputs.append(job.nvenc_state in SOFTSUB_NVENC)
+    if job.build_state in HARDSUB_STATES:
+        outputs.append(job.nvenc_state in HARDSUB_NVENC)
+    return ResourceDemand(
+        cpu_encodes=1 if not all(outputs) else 0,
+        nvenc_sessions=sum(outputs),
+        io=1 if remux else 0
+    )
+
+
+def fits_budget(demand: ResourceDemand, in_use: ResourceDemand, capacity: ResourceDemand) -> bool:
+    """Whether a job can start next to the running ones.
+
+    A demand larger than the whole budget is admitted while that resource
+    is idle, so such a job runs alone instead of waiting forever.
+
+    Args:
+        demand: Demand of the job to start
+        in_use: Summed demand of the running jobs
+        capacity: Budget
+
+    Returns:
+        True if every resource the job needs has room
+    """
+    for need, used, limit in zip(
+        (demand.cpu_encodes, demand.nvenc_sessions, demand.io),
+        (in_use.cpu_encodes, in_use.nvenc_sessions, in_use.io),
+        (capacity.cpu_encodes, capacity.nvenc_sessions, capacity.io)
+    ):
+        if need and used and used + need > limit:
+            return False
+    return True
@@ -2,11 +2,31 @@
 
 Pure functions for parsing ffmpeg/ffprobe output into structured data.
 No side effects, easy to test, reusable.
+
+Two input formats are supported:
+- JSON from `ffprobe -print_format json -show_streams -show_format`
+  (preferred, see parse_ffprobe_json)
+- Human-readable ffprobe text (legacy, see parse_ffprobe_output)
 """
 
+import json
 import re
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional
+
+
+@dataclass(frozen=True)
+class StreamInfo:
+    """Metadata for a single audio, subtitle or attachment stream."""
+
+    index: int
+    codec_name: str = ""
+    language: str = ""
+    title: str = ""
+    channels: int = 0
+    sample_rate: int = 0
+    bit_rate: int = 0  # bits/s, 0 if unknown
+    filename: str = ""  # Attachments only
 
 
 @dataclass(frozen=True)
@@ -20,8 +40,124 @@ class VideoInfo:
     duration_seconds: float = 0.0
     total_frames: float = 0.0
     resolution: str = "unknown"
-    pixel_format: str = "yuv420p"
-    video_profile: str = "main"
+    pixel_format: str = "yuv420p"  # Normalized: yuv420p, yuv420p10le or p010le
+    video_profile: Optional[str] = None  # Encoder profile name (see _normalize_profile), None if unknown
+
+    # Filled by the JSON probe only
+    codec_name: str = ""
+    width: int = 0
+    height: int = 0
+    source_pixel_format: str = ""  # pix_fmt exactly as reported by ffprobe
+    r_frame_rate: str = ""  # e.g. "24000/1001"
+    avg_frame_rate: str = ""
+    frame_rate: float = 0.0  # fps used for frame counts
+    nb_frames: int = 0  # Exact frame count (container or counted packets), 0 if unknown
+    bit_depth: int = 8
+    color_space: str = ""
+    color_transfer: str = ""
+    color_primaries: str = ""
+    color_range: str = ""
+    bit_rate: int = 0  # Container bitrate in bits/s
+    size_bytes: int = 0  # Container size in bytes
+    start_time: float = 0.0  # Container start time in seconds (seek positions are relative to it)
+    audio_streams: tuple[StreamInfo, ...] = ()
+    subtitle_streams: tuple[StreamInfo, ...] = ()
+    font_attachments: tuple[StreamInfo, ...] = ()  # Fonts muxed into the container for its subtitles
+
+
+def parse_ffprobe_json(output: str) -> VideoInfo:
+    """Parse video info from ffprobe JSON output.
+
+    Pure function: same input always produces same output.
+    Tolerates log lines before the JSON document (stderr merged into stdout).
+
+    Args:
+        output: Output of `ffprobe -print_format json -show_streams -show_format`
+
+    Returns:
+        VideoInfo with parsed metadata
+
+    Raises:
+        ValueError: If output contains no JSON document
+    """
+    return video_info_from_probe_data(load_ffprobe_json(output))
+
+
+def load_ffprobe_json(output: str) -> dict[str, Any]:
+    """Extract the JSON document from ffprobe output.
+
+    Args:
+        output: Raw ffprobe output, possibly preceded by log lines
+
+    Returns:
+        Decoded probe data ({"streams": [...], "format": {...}})
+
+    Raises:
+        ValueError: If output contains no JSON document
+    """
+    start = output.find('{')
+    if start < 0:
+        raise ValueError("ffprobe output contains no JSON document")
+    data, _ = json.JSONDecoder().raw_decode(output[start:])
+    if not isinstance(data, dict):
+        raise ValueError("ffprobe JSON output is not an object")
+    return data
+
+
+def video_info_from_probe_data(data: dict[str, Any]) -> VideoInfo:
+    """Build VideoInfo from decoded ffprobe JSON data.
+
+    Args:
+        data: Decoded probe data (see load_ffprobe_json)
+
+    Returns:
+        VideoInfo with parsed metadata
+    """
+    streams = data.get('streams') or []
+    fmt = data.get('format') or {}
+    video = next((st for st in streams if st.get('codec_type') == 'video'
+                  and not st.get('disposition', {}).get('attached_pic')), {})
+
+    width = _int(video.get('width'))
+    height = _int(video.get('height'))
+    source_pix_fmt = video.get('pix_fmt', '')
+    bit_depth = _parse_bit_depth(video.get('bits_per_raw_sample'), source_pix_fmt)
+
+    r_frame_rate = video.get('r_frame_rate', '')
+    avg_frame_rate = video.get('avg_frame_rate', '')
+    # avg_frame_rate reflects the real rate of VFR raws; r_frame_rate is the fallback
+    frame_rate = _parse_rate(avg_frame_rate) or _parse_rate(r_frame_rate)
+
+    duration = _float(fmt.get('duration')) or _float(video.get('duration'))
+    nb_frames = _parse_frame_count(video)
+    total_frames = float(nb_frames) if nb_frames else duration * frame_rate
+
+    return VideoInfo(
+        duration_seconds=duration,
+        total_frames=total_frames,
+        resolution=_format_resolution(height) if height else "unknown",
+        pixel_format=_normalize_pixel_format(source_pix_fmt, bit_depth),
+        video_profile=_normalize_profile(video.get('profile', '')),
+        codec_name=video.get('codec_name', ''),
+        width=width,
+        height=height,
+        source_pixel_format=source_pix_fmt,
+        r_frame_rate=r_frame_rate,
+        avg_frame_rate=avg_frame_rate,
+        frame_rate=frame_rate,
+        nb_frames=nb_frames,
+        bit_depth=bit_depth,
+        color_space=video.get('color_space', ''),
+        color_transfer=video.get('color_transfer', ''),
+        color_primaries=video.get('color_primaries', ''),
+        color_range=video.get('color_range', ''),
+        bit_rate=_int(fmt.get('bit_rate')),
+        size_bytes=_int(fmt.get('size')),
+        start_time=_float(fmt.get('start_time')),
+        audio_streams=tuple(_stream_info(st) for st in streams if st.get('codec_type') == 'audio'),
+        subtitle_streams=tuple(_stream_info(st) for st in streams if st.get('codec_type') == 'subtitle'),
+        font_attachments=tuple(_stream_info(st) for st in streams if _is_font_attachment(st)),
+    )
 
 
 def parse_ffprobe_output(lines: list[str]) -> VideoInfo:
@@ -63,10 +199,124 @@ def parse_ffprobe_output(lines: list[str]) -> VideoInfo:
         total_frames=total_frames,
         resolution=resolution or "unknown",
         pixel_format=pixel_format or "yuv420p",
-        video_profile=video_profile or "main"
+        video_profile=video_profile
     )
 
 
+def _stream_info(stream: dict[str, Any]) -> StreamInfo:
+    """Build StreamInfo from one ffprobe JSON stream entry."""
+    tags = stream.get('tags') or {}
+    return StreamInfo(
+        index=_int(stream.get('index')),
+        codec_name=stream.get('codec_name', ''),
+        language=tags.get('language', ''),
+        title=tags.get('title', ''),
+        channels=_int(stream.get('channels')),
+        sample_rate=_int(stream.get('sample_rate')),
+        bit_rate=_int(stream.get('bit_rate')) or _int(tags.get('BPS')),
+        filename=tags.get('filename', ''),
+    )
+
+
+_FONT_SUFFIXES = ('.ttf', '.otf', '.ttc', '.otc')
+
+
+def _is_font_attachment(stream: dict[str, Any]) -> bool:
+    """True for attachment streams holding a font (MKV fonts for styled subtitles)."""
+    if stream.get('codec_type') != 'attachment':
+        return False
+    tags = stream.get('tags') or {}
+    mimetype = tags.get('mimetype', '').lower()
+    return (stream.get('codec_name') in ('ttf', 'otf') or 'font' in mimetype or 'opentype' in mimetype
+            or tags.get('filename', '').lower().endswith(_FONT_SUFFIXES))
+
+
+def _parse_frame_count(video: dict[str, Any]) -> int:
+    """Exact frame count of the video stream, or 0 if unknown.
+
+    Priority: counted packets (-count_packets) > container nb_frames >
+    mkvmerge NUMBER_OF_FRAMES statistics tag.
+    """
+    tags = video.get('tags') or {}
+    for value in (video.get('nb_read_packets'), video.get('nb_frames'),
+                  tags.get('NUMBER_OF_FRAMES'), tags.get('NUMBER_OF_FRAMES-eng')):
+        count = _int(value)
+        if count:
+            return count
+    return 0
+
+
+def _parse_rate(rate: str) -> float:
+    """Parse an ffprobe rational rate like "24000/1001" to fps (0.0 if invalid)."""
+    num, _, den = (rate or '').partition('/')
+    try:
+        num_f = float(num)
+        den_f = float(den) if den else 1.0
+    except ValueError:
+        return 0.0
+    return num_f / den_f if num_f > 0 and den_f > 0 else 0.0
+
+
+def _parse_bit_depth(bits_per_raw_sample: Optional[str], pix_fmt: str) -> int:
+    """Bit depth from bits_per_raw_sample, falling back to the pixel format name.
+
+    Example: "yuv420p10le" -> 10, "p010le" -> 10, "yuv420p" -> 8
+    """
+    depth = _int(bits_per_raw_sample)
+    if depth:
+        return depth
+    match = re.search(r'p0?(\d{2})(?:le|be)?$', pix_fmt or '')
+    return int(match.group(1)) if match else 8
+
+
+def _normalize_pixel_format(pix_fmt: str, bit_depth: int) -> str:
+    """Map a source pixel format onto the formats the encode paths support."""
+    if pix_fmt in ('p010le', 'yuv420p10le', 'yuv420p'):
+        return pix_fmt
+    return 'yuv420p10le' if bit_depth > 8 else 'yuv420p'
+
+
+def _normalize_profile(profile: str) -> Optional[str]:
+    """Map an ffprobe profile name to the encoder profile name.
+
+    Example: "High 10" -> "high10", "Main" -> "main"
+
+    Returns:
+        Profile name, or None for profiles the encoders are not mapped for
+        (e.g. "High 4:4:4 Predictive"), which must never count as "main"
+    """
+    profile_map = {
+        'main': 'main',
+        'main 10': 'main10',
+        'high': 'high',
+        'high 10': 'high10',
+    }
+    return profile_map.get((profile or '').strip().lower())
+
+
+def _format_resolution(height: int) -> str:
+    """Format a frame height as a resolution label ("1080p", or "K" above 4096)."""
+    if height < 4096:
+        return f"{height}p"
+    return f"{height/1024}K"
+
+
+def _int(value: Any) -> int:
+    """Parse an ffprobe integer field, 0 if missing or N/A."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _float(value: Any) -> float:
+    """Parse an ffprobe float field, 0.0 if missing or N/A."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
 def _parse_duration(line: str) -> Optional[float]:
     """Parse duration from ffprobe line.
 
@@ -101,11 +351,7 @@ def _parse_resolution(line: str) -> Optional[str]:
     match = re.search(r'(\d{3,4})x(\d{3,4})', line)
     if match:
         _, height = match.groups()
-        height_int = int(height)
-        if height_int < 4096:
-            return f"{height}p"
-        else:
-            return f"{height_int/1024}K"
+        return _format_resolution(int(height))
     return None
 
 
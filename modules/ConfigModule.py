@@ -59,6 +59,32 @@ def load_configs(config):
 
         config.update_search = get_config_value(config, parser, 'main settings', 'update_search', bool)
         config.potato_PC = get_config_value(config, parser, 'main settings', 'potato_PC', bool)
+        chunked_encoding = get_config_value(config, parser, 'main settings', 'chunked_encoding', bool)
+        chunk_workers = get_config_value(config, parser, 'main settings', 'chunk_workers', int)
+        config.chunked_encoding = chunked_encoding if chunked_encoding is not None else False
+        config.chunk_workers = chunk_workers if chunk_workers is not None else 0
+        crf_search = get_config_value(config, parser, 'main settings', 'crf_search', bool)
+        config.crf_search = crf_search if crf_search is not None else False
+        auto_patch_hardsub = get_config_value(config, parser, 'main settings', 'auto_patch_hardsub', bool)
+        config.auto_patch_hardsub = auto_patch_hardsub if auto_patch_hardsub is not None else False
+        font_audit = get_config_value(config, parser, 'main settings', 'font_audit', bool)
+        config.font_audit = font_audit if font_audit is not None else True
+        parallel_jobs = get_config_value(config, parser, 'main settings', 'parallel_jobs', int)
+        config.parallel_jobs = parallel_jobs if parallel_jobs is not None else 1
+        cpu_encode_slots = get_config_value(config, parser, 'main settings', 'cpu_encode_slots', int)
+        config.cpu_encode_slots = cpu_encode_slots if cpu_encode_slots is not None else 1
+        nvenc_sessions = get_config_value(config, parser, 'main settings', 'nvenc_sessions', int)
+        config.nvenc_sessions = nvenc_sessions if nvenc_sessions is not None else 3
+        lookahead_jobs = get_config_value(config, parser, 'main settings', 'lookahead_jobs', int)
+        config.lookahead_jobs = lookahead_jobs if lookahead_jobs is not None else 1
+        input_staging = get_config_value(config, parser, 'main settings', 'input_staging', bool)
+        config.input_staging = input_staging if input_staging is not None else False
+        staging_dir = get_config_value(config, parser, 'main settings', 'staging_dir', str)
+        config.staging_dir = staging_dir if staging_dir is not None else ''
+        staging_cap_gb = get_config_value(config, parser, 'main settings', 'staging_cap_gb', int)
+        config.staging_cap_gb = staging_cap_gb if staging_cap_gb is not None else 50
+        output_scratch = get_config_value(config, parser, 'main settings', 'output_scratch', bool)
+        config.output_scratch = output_scratch if output_scratch is not None else False
         config.log('ConfigModule', 'load_configs', f"Settings loaded from file {config.main_paths.config}")
 
     parser = load_parser(config, config.main_paths.version)
@@ -87,6 +113,19 @@ def save_config(config):
         parser.set('main settings', 'nvenc_state', str(int(config.build_settings.nvenc_state)))
         parser.set('main settings', 'update_search', str(config.update_search))
         parser.set('main settings', 'potato_PC', str(config.potato_PC))
+        parser.set('main settings', 'chunked_encoding', str(config.chunked_encoding))
+        parser.set('main settings', 'chunk_workers', str(config.chunk_workers))
+        parser.set('main settings', 'crf_search', str(config.crf_search))
+        parser.set('main settings', 'auto_patch_hardsub', str(config.auto_patch_hardsub))
+        parser.set('main settings', 'font_audit', str(config.font_audit))
+        parser.set('main settings', 'parallel_jobs', str(config.parallel_jobs))
+        parser.set('main settings', 'cpu_encode_slots', str(config.cpu_encode_slots))
+        parser.set('main settings', 'nvenc_sessions', str(config.nvenc_sessions))
+        parser.set('main settings', 'lookahead_jobs', str(config.lookahead_jobs))
+        parser.set('main settings', 'input_staging', str(config.input_staging))
+        parser.set('main settings', 'staging_dir', config.staging_dir)
+        parser.set('main settings', 'staging_cap_gb', str(config.staging_cap_gb))
+        parser.set('main settings', 'output_scratch', str(config.output_scratch))
 
         with open(config.main_paths.config, 'w') as config_file:
             parser.write(config_file)
@@ -0,0 +1,212 @@
+"""Caches of parsed, merged and burned subtitle files.
+
+AssCache keeps parsed subtitle files in memory keyed by content hash, so
+the same .ass is parsed once however often it is diffed (queue retries,
+the softsub and hardsub steps, unchanged files saved under a new name).
+
+MergedAssCache keeps the logo merged into episode subtitles keyed by the
+contents of both, so re-rendering an episode (or its retry) reuses the
+merge.
+
+BurnedSubtitleCache remembers which subtitles were burned into each
+hardsub. A copy of the burned file is kept next to the index, so the next
+render of the episode can diff the new subtitles against exactly what the
+existing hardsub shows, even after the user overwrote the .ass in place.
+"""
+
+import hashlib
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from models.ass import AssDocument, parse_ass
+from models.ass_merge import merge_logo
+from models.file_identity import file_key
+from modules.json_cache import JsonCache
+
+
+class AssCache:
+    """In-memory LRU cache of parsed subtitle files.
+
+    All operations are thread-safe using a lock.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        """Initialize cache.
+
+        Args:
+            max_entries: Maximum number of parsed files kept (least recently used evicted)
+        """
+        self.max_entries = max_entries
+        self._documents: OrderedDict[str, AssDocument] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, path: Path) -> AssDocument:
+        """Read and parse a subtitle file, reusing a previous parse of the same contents.
+
+        Args:
+            path: .ass file
+
+        Returns:
+            AssDocument
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        data = Path(path).read_bytes()
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            document = self._documents.get(digest)
+            if document is not None:
+                self._documents.move_to_end(digest)
+                return document
+
+        document = parse_ass(data.decode('utf-8-sig', errors='replace'))
+        with self._lock:
+            self._documents[digest] = document
+            while len(self._documents) > self.max_entries:
+                self._documents.popitem(last=False)
+        return document
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._documents)
+
+
+class MergedAssCache:
+    """In-memory LRU cache of logo-merged subtitles.
+
+    All operations are thread-safe using a lock.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        """Initialize cache.
+
+        Args:
+            max_entries: Maximum number of merges kept (least recently used evicted)
+        """
+        self.max_entries = max_entries
+        self._merged: OrderedDict[str, Optional[str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def merged(self, sub_path: Path, logo_path: Path) -> Optional[str]:
+        """Episode subtitles with the logo merged in.
+
+        Args:
+            sub_path: Episode .ass file
+            logo_path: Logo .ass file
+
+        Returns:
+            Merged script, or None if the files cannot be merged (see models.ass_merge)
+
+        Raises:
+            OSError: If a file cannot be read
+        """
+        sub_data, logo_data = Path(sub_path).read_bytes(), Path(logo_path).read_bytes()
+        key = f"{hashlib.sha1(sub_data).hexdigest()}|{hashlib.sha1(logo_data).hexdigest()}"
+        with self._lock:
+            if key in self._merged:
+                self._merged.move_to_end(key)
+                return self._merged[key]
+
+        merged = merge_logo(sub_data.decode('utf-8-sig', errors='replace'),
+                            logo_data.decode('utf-8-sig', errors='replace'))
+        with self._lock:
+            self._merged[key] = merged
+            while len(self._merged) > self.max_entries:
+                self._merged.popitem(last=False)
+        return merged
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._merged)
+
+
+class BurnedSubtitleCache:
+    """On-disk record of the subtitles burned into each hardsub.
+
+    An entry is trusted only while both the raw and the hardsub are
+    unchanged since it was recorded; a re-rendered raw or a hardsub
+    replaced by another tool needs a full encode.
+    """
+
+    DIR_NAME = "burned_subs"
+    INDEX_NAME = "index.json"
+    VERSION = 1
+
+    def __init__(self, cache_dir: Path, max_entries: int = 256, ass_cache: Optional[AssCache] = None):
+        """Initialize cache.
+
+        Args:
+            cache_dir: Cache root (entries live in a burned_subs subdirectory)
+            max_entries: Maximum number of hardsubs remembered (least recently used evicted)
+            ass_cache: Parsed subtitle cache (a private one is used if omitted)
+        """
+        self.cache_dir = Path(cache_dir) / self.DIR_NAME
+        self.ass_cache = ass_cache or AssCache()
+        self._store = JsonCache(self.cache_dir / self.INDEX_NAME, max_entries, self.VERSION)
+
+    def previous(self, raw: Path, output: Path) -> Optional[AssDocument]:
+        """Subtitles burned into an existing hardsub.
+
+        Args:
+            raw: Raw the hardsub is rendered from
+            output: Existing hardsub
+
+        Returns:
+            AssDocument, or None if unknown or the raw or hardsub changed since
+        """
+        entry = self._store.get(self._key(output))
+        if not entry or entry.get('raw') != file_key(raw) or entry.get('output') != file_key(output):
+            return None
+        try:
+            return self.ass_cache.load(self.cache_dir / f"{entry['sub']}.ass")
+        except (OSError, KeyError, TypeError):
+            return None  # Copy removed or corrupt entry
+
+    def closed_gop(self, output: Path) -> bool:
+        """True if an existing hardsub is known to have closed GOPs (safe to splice a patch into).
+
+        Only hardsubs recorded since every HEVC encode closes its GOPs
+        qualify, and only while they are unchanged.
+
+        Args:
+            output: Existing hardsub
+        """
+        entry = self._store.get(self._key(output))
+        return bool(entry) and entry.get('closed_gop') is True and entry.get('output') == file_key(output)
+
+    def record(self, raw: Path, sub: Path, output: Path) -> None:
+        """Remember the subtitles just burned into a hardsub.
+
+        Args:
+            raw: Raw the hardsub was rendered from
+            sub: Burned .ass file
+            output: Finished hardsub (encoded with closed GOPs)
+        """
+        raw_key, output_key = file_key(raw), file_key(output)
+        if raw_key is None or output_key is None:
+            return
+        try:
+            data = Path(sub).read_bytes()
+            digest = hashlib.sha1(data).hexdigest()
+            copy_path = self.cache_dir / f"{digest}.ass"
+            if not copy_path.exists():
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = copy_path.with_suffix('.tmp')
+                shutil.copyfile(sub, tmp_path)
+                tmp_path.replace(copy_path)
+        except OSError:
+            return  # Cache is an optimization; never fail a render
+        # Every hardsub encoded here has closed GOPs (see ffmpeg_builder), so it may be patched
+        self._store.put(self._key(output),
+                        {'raw': raw_key, 'output': output_key, 'sub': digest, 'closed_gop': True})
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    @staticmethod
+    def _key(output: Path) -> str:
+        return str(Path(output).resolve())
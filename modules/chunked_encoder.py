@@ -0,0 +1,118 @@
+"""Concurrent execution of segment encodes for chunked rendering.
+
+Software x264/x265 stops scaling well past a handful of threads, so a
+single encode leaves most cores of a large machine idle. The chunked mode
+splits the raw into keyframe-aligned segments (see models.chunking) and
+encodes several of them at once; this module runs those ffmpeg processes
+and folds their progress into one stream of samples.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from models.progress import ProgressParser, ProgressSample, aggregate_progress, split_progress_line
+from models.protocols import ProcessHandle, ProcessRunner
+
+
+class ChunkedEncoder:
+    """Runs segment encodes through a ProcessRunner with bounded concurrency.
+
+    Progress callbacks are invoked from worker threads; emitting a Qt
+    signal from the callback is safe.
+    """
+
+    def __init__(
+        self,
+        runner: ProcessRunner,
+        workers: int,
+        log: Optional[Callable[[str], None]] = None
+    ):
+        """Initialize encoder.
+
+        Args:
+            runner: ProcessRunner used to start ffmpeg
+            workers: Maximum number of segment encodes running at once
+            log: Optional sink for ffmpeg log lines and status messages
+        """
+        self.runner = runner
+        self.workers = max(1, workers)
+        self._log = log or (lambda message: None)
+        self._lock = threading.Lock()
+        self._processes: list[ProcessHandle] = []
+        self._samples: dict[int, ProgressSample] = {}
+        self._cancelled = False
+
+    def run(self, jobs: list[list[str]], on_progress: Callable[[ProgressSample], None]) -> None:
+        """Encode all segments and wait for them to finish.
+
+        Args:
+            jobs: FFmpeg argument lists, one per segment
+            on_progress: Receives the aggregated progress of all segments
+
+        Raises:
+            RuntimeError: If a segment encode exits with an error
+        """
+        self._samples = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._encode_segment, index, args, on_progress)
+                       for index, args in enumerate(jobs)]
+            try:
+                for future in futures:
+                    future.result()
+            except Exception:
+                # One failed segment dooms the output; don't waste time on the rest
+                self.cancel()
+                raise
+
+    def cancel(self) -> None:
+        """Stop pending segments and terminate running ones."""
+        with self._lock:
+            self._cancelled = True
+            processes = list(self._processes)
+        for process in processes:
+            try:
+                process.terminate()
+            except OSError:
+                pass  # Already exited
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancel() has been called."""
+        return self._cancelled
+
+    def _encode_segment(
+        self,
+        index: int,
+        args: list[str],
+        on_progress: Callable[[ProgressSample], None]
+    ) -> None:
+        """Run one segment encode and report its progress."""
+        with self._lock:
+            if self._cancelled:
+                return
+            process = self.runner.run_ffmpeg(args)
+            self._processes.append(process)
+
+        parser = ProgressParser()
+        for line in process.stdout:
+            key, value = split_progress_line(line)
+            if key is None:
+                self._log(f"[segment {index}] {line.rstrip()}")
+                continue
+
+            sample = parser.feed_pair(key, value)
+            if sample is None:
+                continue
+
+            with self._lock:
+                self._samples[index] = sample
+                total = aggregate_progress(self._samples.values())
+            on_progress(total)
+
+        exit_code = process.wait()
+        with self._lock:
+            self._processes.remove(process)
+            cancelled = self._cancelled
+        if exit_code and not cancelled:
+            raise RuntimeError(f"Segment {index} encode failed with exit code {exit_code}")
@@ -0,0 +1,223 @@
+"""Content-adaptive CRF search on sampled segments of the raw.
+
+A fixed CRF ladder over-spends bits on static scenes and under-spends on
+action. The search encodes a few short, evenly spaced samples of the raw
+at candidate CRF values, scores each against the raw with ffmpeg's ssim or
+psnr filter, and keeps the cheapest CRF whose mean score meets the target
+(see models.crf_search). Results are cached per raw, so retries and
+re-renders of the same episode skip the search.
+"""
+
+import shutil
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+from models.chunking import Segment
+from models.crf_search import CrfSearchResult, parse_metric_score, plan_samples, search_crf
+from models.encoding import EncodingDefaults, with_crf
+from models.ffmpeg_options import FFmpegOptions, FilterOptions
+from models.file_identity import file_key
+from models.protocols import ProcessRunner
+from modules.ffmpeg_builder import build_quality_metric_args, build_segment_args, output_path_for
+from modules.json_cache import JsonCache
+
+
+class CrfSearchCache:
+    """On-disk LRU cache of CRF search results.
+
+    Entries are keyed by raw identity and every setting that affects the
+    outcome (metric, target, candidates, encoder), so changing any of them
+    triggers a new search. All operations are thread-safe using a lock.
+    """
+
+    FILE_NAME = "crf_search.json"
+    VERSION = 1
+
+    def __init__(self, cache_dir: Path, max_entries: int = 256):
+        """Initialize cache.
+
+        Args:
+            cache_dir: Directory holding the cache file
+            max_entries: Maximum number of results kept (least recently used evicted)
+        """
+        self.cache_dir = Path(cache_dir)
+        self._store = JsonCache(self.cache_dir / self.FILE_NAME, max_entries, self.VERSION)
+
+    def get(self, media_path: Path, settings_key: str) -> Optional[CrfSearchResult]:
+        """Look up the search result for a raw.
+
+        Args:
+            media_path: Raw file
+            settings_key: Search settings (see search_settings_key)
+
+        Returns:
+            CrfSearchResult if the raw was searched in its current state, else None
+        """
+        key = self._key(media_path, settings_key)
+        entry = self._store.get(key) if key is not None else None
+        if entry is None:
+            return None
+        try:
+            return CrfSearchResult(crf=int(entry['crf']), score=float(entry['score']),
+                                   met_target=bool(entry['met_target']))
+        except (KeyError, TypeError, ValueError):
+            return None  # Corrupt entry
+
+    def put(self, media_path: Path, settings_key: str, result: CrfSearchResult) -> None:
+        """Store the search result for a raw and persist the cache.
+
+        Args:
+            media_path: Raw file
+            settings_key: Search settings (see search_settings_key)
+            result: Search outcome
+        """
+        key = self._key(media_path, settings_key)
+        if key is not None:
+            self._store.put(key, {'crf': result.crf, 'score': result.score,
+                                  'met_target': result.met_target})
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    @staticmethod
+    def _key(media_path: Path, settings_key: str) -> Optional[str]:
+        identity = file_key(media_path)
+        return f"{identity}|{settings_key}" if identity is not None else None
+
+
+def search_settings_key(options: FFmpegOptions, metric: str, target: float, candidates: Sequence[int]) -> str:
+    """Describe every setting that affects a search's outcome.
+
+    Args:
+        options: Options of the encode the CRF is searched for
+        metric: "ssim" or "psnr"
+        target: Minimum mean score
+        candidates: CRF values considered
+
+    Returns:
+        Stable string usable as part of a cache key
+    """
+    encoding = options.encoding
+    return "|".join([
+        metric, f"{target:g}", ",".join(str(c) for c in sorted(set(candidates))),
+        options.codecs.video_codec, options.preset,
+        options.video.pixel_format, options.video.video_tune, options.video.video_profile,
+        encoding.max_bitrate, encoding.buffer_size
+    ])
+
+
+class CrfSearch:
+    """Runs the sample encodes and quality measurements of a CRF search."""
+
+    def __init__(
+        self,
+        runner: ProcessRunner,
+        temp_dir: Path,
+        log: Optional[Callable[[str], None]] = None
+    ):
+        """Initialize search.
+
+        Args:
+            runner: ProcessRunner used to start ffmpeg
+            temp_dir: Directory for the sample encodes (a private subdir is used)
+            log: Optional sink for status messages
+        """
+        self.runner = runner
+        self.temp_dir = Path(temp_dir)
+        self._log = log or (lambda message: None)
+
+    def run(
+        self,
+        options: FFmpegOptions,
+        duration_sec: float,
+        metric: str = EncodingDefaults.CRF_SEARCH_METRIC,
+        target: Optional[float] = None,
+        candidates: Sequence[int] = EncodingDefaults.CRF_SEARCH_CANDIDATES,
+        cache: Optional[CrfSearchCache] = None
+    ) -> Optional[CrfSearchResult]:
+        """Find the cheapest CRF meeting the quality target for a raw.
+
+        Samples are encoded with the step's encoder settings but without
+        filters (subtitles, logo), so the score measures compression loss
+        only.
+
+        Args:
+            options: Options of the encode the CRF is searched for
+            duration_sec: Duration of the raw
+            metric: "ssim" or "psnr"
+            target: Minimum mean score (default per metric)
+            candidates: CRF values to consider
+            cache: Optional shared result cache
+
+        Returns:
+            CrfSearchResult, or None if the raw is too short to sample
+
+        Raises:
+            RuntimeError: If a sample encode or measurement fails
+        """
+        if target is None:
+            target = EncodingDefaults.CRF_SEARCH_TARGET[metric]
+        settings_key = search_settings_key(options, metric, target, candidates)
+        if cache is not None:
+            cached = cache.get(options.paths.raw, settings_key)
+            if cached is not None:
+                self._log(f"Cached CRF search result: {cached}")
+                return cached
+
+        samples = plan_samples(duration_sec, EncodingDefaults.CRF_SEARCH_SAMPLES,
+                               EncodingDefaults.CRF_SEARCH_SAMPLE_SECONDS)
+        if not samples:
+            return None
+
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        work_dir = Path(tempfile.mkdtemp(prefix='crfsearch_', dir=self.temp_dir))
+        try:
+            sample_options = replace(options, filters=FilterOptions())
+            result = search_crf(
+                candidates,
+                lambda crf: self._measure(sample_options, crf, samples, metric, work_dir),
+                target
+            )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        self._log(f"CRF search result: {result}")
+        if cache is not None:
+            cache.put(options.paths.raw, settings_key, result)
+        return result
+
+    def _measure(
+        self,
+        options: FFmpegOptions,
+        crf: int,
+        samples: list[Segment],
+        metric: str,
+        work_dir: Path
+    ) -> float:
+        """Mean score of all samples encoded at one CRF."""
+        options = replace(options, encoding=with_crf(options.encoding, crf))
+        scores = []
+        for sample in samples:
+            sample_path = work_dir / f"sample_{sample.index}_crf{crf}{output_path_for(options).suffix}"
+
+            process = self.runner.run_ffmpeg(build_segment_args(options, sample, sample_path))
+            process.communicate()
+            if process.returncode:
+                raise RuntimeError(f"Sample {sample.index} encode at CRF {crf} failed "
+                                   f"with exit code {process.returncode}")
+
+            process = self.runner.run_ffmpeg(
+                build_quality_metric_args(sample_path, options.paths.raw, sample, metric)
+            )
+            output, _ = process.communicate()
+            score = parse_metric_score((output or '').splitlines(), metric)
+            if score is None:
+                raise RuntimeError(f"No {metric} score for sample {sample.index} at CRF {crf}")
+            scores.append(score)
+            sample_path.unlink(missing_ok=True)
+
+        mean = sum(scores) / len(scores)
+        self._log(f"CRF {crf}: mean {metric} {mean:.4f}")
+        return mean
@@ -6,8 +6,14 @@ No state, no side effects, no file I/O.
 All functions are pure: same input always produces same output.
 """
 
-from models.ffmpeg_options import FFmpegOptions, FilterOptions
+from dataclasses import replace
+from pathlib import Path
+from typing import Iterable, Optional
+
+from models.chunking import Segment
+from models.ffmpeg_options import FFmpegOptions, FilterOptions, MultiOutputOptions
 from models.encoding import EncodingDefaults
+from models.patching import PatchPiece
 
 
 def build_ffmpeg_args(options: FFmpegOptions) -> list[str]:
@@ -22,10 +28,14 @@ def build_ffmpeg_args(options: FFmpegOptions) -> list[str]:
     Returns:
         List of ffmpeg arguments (safe for subprocess.Popen without shell=True)
     """
+    if options.pass_number == 1:
+        return _build_analysis_pass_args(options)
+
     args = []
 
     # Basic flags
     args.extend(['-y'])  # Override output
+    args.extend(progress_args(options.stats_period))
 
     # Inputs
     _add_inputs(args, options)
@@ -44,22 +54,633 @@ def build_ffmpeg_args(options: FFmpegOptions) -> list[str]:
 
     # Audio encoding
     if options.include_audio:
-        _add_audio_encoding(args)
+        _add_audio_encoding(args, options)
 
     # Subtitle handling (for softsub - copy subtitle stream)
     if options.include_subtitles and options.paths.sub:
         args.extend(['-c:s', options.codecs.subtitle_codec])
 
     # Output file
-    output_path = options.paths.softsub if options.include_subtitles else options.paths.hardsub
+    args.append(str(output_path_for(options)))
+
+    return args
+
+
+def output_path_for(options: FFmpegOptions) -> Path:
+    """Return the file a single-output encode writes to.
+
+    Args:
+        options: Encoding options
+
+    Returns:
+        Softsub path when subtitles are kept as a stream, else hardsub path
+    """
+    return options.paths.softsub if options.include_subtitles else options.paths.hardsub
+
+
+def build_multi_output_args(options: MultiOutputOptions) -> list[str]:
+    """Build one FFmpeg command that writes both softsub and hardsub.
+
+    The raw is decoded once. A filter graph splits the frames into a
+    softsub branch (logo only) and a hardsub branch (logo + subtitles),
+    and each branch is fed to its own encoder and output file.
+
+    Pure function: same input always produces same output.
+
+    Args:
+        options: Softsub and hardsub options sharing the same inputs
+
+    Returns:
+        List of ffmpeg arguments (safe for subprocess.Popen without shell=True)
+    """
+    soft, hard = options.softsub, options.hardsub
+    args = ['-y']
+    args.extend(progress_args(soft.stats_period))
+
+    # Inputs are shared; softsub needs every stream hardsub does
+    _add_inputs(args, soft)
+
+    # Decode once, split frames between both encoders
+    args.extend(['-filter_complex', _build_split_filter_graph(soft, hard)])
+
+    # Softsub output
+    _add_output(args, soft, '[vsoft]', soft.paths.softsub)
+
+    # Hardsub output
+    _add_output(args, hard, '[vhard]', hard.paths.hardsub)
+
+    return args
+
+
+def build_segment_args(options: FFmpegOptions, segment: Segment, output_path: Path) -> list[str]:
+    """Build FFmpeg arguments encoding the video of one raw segment.
+
+    Only the video stream is encoded; audio and subtitle streams are added
+    once when the segments are joined (see build_segment_concat_args).
+    Burned subtitles/logo are shifted so they line up with the segment's
+    position in the episode.
+
+    Pure function: same input always produces same output.
+
+    Args:
+        options: Encoding options for the full output
+        segment: Keyframe-aligned slice of the raw
+        output_path: Segment file to write
+
+    Returns:
+        List of ffmpeg arguments (safe for subprocess.Popen without shell=True)
+    """
+    args = ['-y']
+    args.extend(progress_args(options.stats_period))
+    args.extend(_segment_seek_args(segment))
+    args.extend(['-i', str(options.paths.raw)])
+
+    graph = _shift_filter_graph(options.filters, segment.start_sec)
+    if graph:
+        args.extend(['-vf', graph])
+
+    _add_segment_output(args, options, f'{options.streams.video_input_index}:v:0', segment, output_path)
+    return args
+
+
+def build_multi_output_segment_args(
+    options: MultiOutputOptions,
+    segment: Segment,
+    softsub_path: Path,
+    hardsub_path: Path
+) -> list[str]:
+    """Build one FFmpeg command encoding a raw segment for both outputs.
+
+    Chunked counterpart of build_multi_output_args: the segment is decoded
+    once and split between the softsub and hardsub encoders.
+
+    Pure function: same input always produces same output.
+
+    Args:
+        options: Softsub and hardsub options sharing the same inputs
+        segment: Keyframe-aligned slice of the raw
+        softsub_path: Softsub segment file to write
+        hardsub_path: Hardsub segment file to write
+
+    Returns:
+        List of ffmpeg arguments (safe for subprocess.Popen without shell=True)
+    """
+    soft, hard = options.softsub, options.hardsub
+    args = ['-y']
+    args.extend(progress_args(soft.stats_period))
+    args.extend(_segment_seek_args(segment))
+    args.extend(['-i', str(soft.paths.raw)])
+    args.extend(['-filter_complex', _build_split_filter_graph(soft, hard, segment.start_sec)])
+
+    _add_segment_output(args, soft, '[vsoft]', segment, softsub_path)
+    _add_segment_output(args, hard, '[vhard]', segment, hardsub_path)
+    return args
+
+
+def build_concat_list(segment_paths: Iterable[Path]) -> str:
+    """Build a concat demuxer list file joining segments in order.
+
+    Args:
+        segment_paths: Encoded segment files, in playback order
+
+    Returns:
+        Content of the list file for `-f concat`
+    """
+    return ''.join(_concat_file_line(path) for path in segment_paths)
+
+
+def build_patch_concat_list(
+    pieces: Iterable[PatchPiece],
+    existing_path: Path,
+    segment_paths: Iterable[Path]
+) -> str:
+    """Build a concat demuxer list splicing re-encoded pieces into an output.
+
+    Kept pieces reference the existing output, cut with inpoint/outpoint
+    on its keyframes; re-encoded pieces reference their segment files.
+
+    Args:
+        pieces: Patch plan (see models.patching.plan_patch)
+        existing_path: Output being patched
+        segment_paths: Encoded files of the re-encoded pieces, in order
+
+    Returns:
+        Content of the list file for `-f concat`
+    """
+    segments = iter(segment_paths)
+    lines = []
+    for piece in pieces:
+        if piece.reencode:
+            lines.append(_concat_file_line(next(segments)))
+            continue
+        lines.append(_concat_file_line(existing_path))
+        if piece.start_sec:
+            lines.append(f"inpoint {_format_seconds(piece.start_sec)}\n")
+        lines.append(f"outpoint {_format_seconds(piece.end_sec)}\n")
+    return ''.join(lines)
+
+
+def build_patch_splice_args(list_path: Path, existing_path: Path, output_path: Path) -> list[str]:
+    """Build FFmpeg arguments writing a patched output.
+
+    Video comes from the spliced pieces; audio and any other streams are
+    copied whole from the existing output, so only the video is cut.
+
+    Pure function: same input always produces same output.
+
+    Args:
+        list_path: Concat demuxer list file (see build_patch_concat_list)
+        existing_path: Output being patched
+        output_path: Patched output file
+
+    Returns:
+        List of ffmpeg arguments (safe for subprocess.Popen without shell=True)
+    """
+    args = ['-y']
+    args.extend(progress_args())
+    args.extend(['-f', 'concat', '-safe', '0', '-i', str(list_path)])
+    args.extend(['-i', str(existing_path)])
+    args.extend(['-map', '0:v:0', '-map', '1', '-map', '-1:v'])
+    args.extend(['-map_metadata', '1', '-c', 'copy'])
+    args.append(str(output_path))
+    return args
+
+
+def build_segment_concat_args(options: FFmpegOptions, list_path: Path, output_path: Path) -> list[str]:
+    """Build FFmpeg arguments joining encoded segments into the final file.
+
+    The video segments are copied without re-encoding; audio and subtitle
+    streams are muxed (and audio encoded) once for the whole episode.
+
+    Pure function: same input always produces same output.
+
+    Args:
+        options: Encoding options the segments were encoded with
+        list_path: Concat demuxer list file (see build_concat_list)
+        output_path: Final output file
+
+    Returns:
+        List of ffmpeg arguments (safe for subprocess.Popen without shell=True)
+    """
+    args = ['-y']
+    args.extend(progress_args(options.stats_period))
+
+    # Joined segments replace the raw as input 0
+    _add_inputs(args, options, video_input=['-f', 'concat', '-safe', '0', '-i', str(list_path)])
+    _add_stream_mapping(args, options)
+    _add_metadata(args, options)
+
+    args.extend(['-c:v', 'copy'])
+
+    if options.include_audio:
+        _add_audio_encoding(args, options)
+
+    if options.include_subtitles and options.paths.sub:
+        args.extend(['-c:s', options.codecs.subtitle_codec])
+
+    args.append(str(output_path))
+    return args
+
+
+def build_subtitle_remux_args(
+    previous_softsub: Path,
+    sub_path: Path,
+    output_path: Path,
+    stats_period: float = EncodingDefaults.PROGRESS_STATS_PERIOD
+) -> list[str]:
+    """Build FFmpeg arguments replacing the subtitle track of a softsub.
+
+    Every stream of the previous release except its subtitles (video,
+    audio, font attachments) is stream-copied; the new subtitle file is
+    added in their place. Nothing is decoded, so the remux is I/O bound.
+
+    Pure function: same input always produces same output.
+
+    Args:
+        previous_softsub: Softsub MKV produced by an earlier render
+        sub_path: New subtitle file
+        output_path: Re-released softsub
+        stats_period: Seconds between progress reports
+
+    Returns:
+        List of ffmpeg arguments (safe for subprocess.Popen without shell=True)
+    """
+    args = ['-y']
+    args.extend(progress_args(stats_period))
+    args.extend(['-i', str(previous_softsub), '-i', str(sub_path)])
+    args.extend(['-map', '0', '-map', '-0:s', '-map', '1:s'])
+    args.extend(['-c', 'copy'])
+    args.extend([
+        '-metadata:s:s:0', 'title=Caption',
+        '-metadata:s:s:0', 'language=rus'
+    ])
+    args.append(str(output_path))
+    return args
+
+
+def build_audio_transcode_args(
+    audio_path: Path,
+    output_path: Path,
+    resample: bool = True,
+    stats_period: float = EncodingDefaults.PROGRESS_STATS_PERIOD
+) -> list[str]:
+    """Build FFmpeg arguments encoding the audio input to the delivery AAC.
+
+    The result is stream-copied into every output of the job, so the audio
+    is encoded once instead of once per output.
+
+    Pure function: same input always produces same output.
+
+    Args:
+        audio_path: Audio input (WAV, FLAC, ...)
+        output_path: Encoded audio file (.mka)
+        resample: Resample to the delivery rate (only when the rate differs)
+        stats_period: Seconds between progress reports
+
+    Returns:
+        List of ffmpeg arguments (safe for subprocess.Popen without shell=True)
+    """
+    args = ['-y']
+    args.extend(progress_args(stats_period))
+    args.extend(['-i', str(audio_path)])
+    args.extend(['-map', '0:a', '-vn', '-sn', '-dn'])
+    args.extend(['-c:a', EncodingDefaults.AUDIO_CODEC])
+    args.extend(['-b:a', EncodingDefaults.AUDIO_BITRATE])
+    if resample:
+        args.extend(['-ar', str(EncodingDefaults.AUDIO_SAMPLE_RATE)])
     args.append(str(output_path))
+    return args
+
+
+def build_logo_render_args(
+    logo_path: Path,
+    width: int,
+    height: int,
+    output_path: Path,
+    fonts_dir: Optional[Path] = None
+) -> list[str]:
+    """Build FFmpeg arguments rendering a static logo into an RGBA image.
+
+    libass draws the logo once onto a fully transparent frame of the
+    video's size; encodes then composite the image instead of running
+    libass for the logo on every frame.
+
+    Pure function: same input always produces same output.
+
+    Args:
+        logo_path: Logo .ass file
+        width: Frame width of the video the logo is burned into
+        height: Frame height of the video
+        output_path: PNG file to write
+        fonts_dir: Optional directory of fonts used by the logo
+
+    Returns:
+        List of ffmpeg arguments (safe for subprocess.Popen without shell=True)
+    """
+    filters = FilterOptions(logo_path=logo_path, fonts_dir=fonts_dir).to_filter_string()
+    return [
+        '-y', '-v', 'error',
+        '-f', 'lavfi', '-i', f'color=c=black@0.0:s={width}x{height}:r=1,format=rgba',
+        # alpha=1: libass blends onto the transparent frame, keeping the logo's alpha
+        '-vf', f"{filters}:alpha=1",
+        '-frames:v', '1', '-update', '1',
+        str(output_path)
+    ]
+
+
+def build_attachment_dump_args(input_path: Path, attachments: Iterable[tuple[int, Path]]) -> list[str]:
+    """Build FFmpeg arguments extracting attachment streams to files.
+
+    Attachments are written when the input is opened; ffmpeg then exits
+    with an error because no output is given, so callers check the files
+    instead of the exit code.
+
+    Pure function: same input always produces same output.
+
+    Args:
+        input_path: Container holding the attachments
+        attachments: (stream index, file to write) pairs
+
+    Returns:
+        List of ffmpeg arguments (safe for subprocess.Popen without shell=True)
+    """
+    args = ['-y', '-v', 'error']
+    for index, output_path in attachments:
+        args.extend([f'-dump_attachment:{index}', str(output_path)])
+    args.extend(['-i', str(input_path)])
+    return args
+
 
+def build_font_warmup_args(subtitle_path: Path, fonts_dir: Optional[Path] = None) -> list[str]:
+    """Build FFmpeg arguments burning subtitles into one tiny frame and discarding it.
+
+    The first libass run after boot makes fontconfig scan every system
+    font and write its cache; later encodes read the cache instead.
+
+    Pure function: same input always produces same output.
+
+    Args:
+        subtitle_path: Any .ass file (the logo)
+        fonts_dir: Optional directory of extra fonts, scanned as in real encodes
+
+    Returns:
+        List of ffmpeg arguments (safe for subprocess.Popen without shell=True)
+    """
+    return [
+        '-v', 'error',
+        '-f', 'lavfi', '-i', 'color=c=black:s=64x64:r=1',
+        '-vf', FilterOptions(subtitle_path=subtitle_path, fonts_dir=fonts_dir).to_filter_string(),
+        '-frames:v', '1', '-f', 'null', '-'
+    ]
+
+
+def build_quality_metric_args(
+    distorted_path: Path,
+    reference_path: Path,
+    sample: Segment,
+    metric: str = 'ssim'
+) -> list[str]:
+    """Build FFmpeg arguments scoring an encoded sample against the raw.
+
+    The sample window of the raw is decoded alongside the encoded sample
+    and compared frame by frame with the ssim or psnr filter; the summary
+    score is printed to the log (see models.crf_search.parse_metric_score).
+
+    Pure function: same input always produces same output.
+
+    Args:
+        distorted_path: Encoded sample (see build_segment_args)
+        reference_path: Raw the sample was cut from
+        sample: Sample window of the raw
+        metric: "ssim" or "psnr"
+
+    Returns:
+        List of ffmpeg arguments (safe for subprocess.Popen without shell=True)
+    """
+    return [
+        '-nostats',
+        '-i', str(distorted_path),
+        *_segment_seek_args(sample),
+        '-t', _format_seconds(sample.duration_sec),
+        '-i', str(reference_path),
+        '-lavfi', f'[0:v:0][1:v:0]{metric}',
+        '-f', 'null', '-'
+    ]
+
+
+def build_keyframe_probe_args(path: Path) -> list[str]:
+    """Build ffprobe arguments listing video packet timestamps and flags.
+
+    Reads packets only (no decoding); keyframes carry the "K" flag.
+    Output is parsed by models.keyframe_index.parse_keyframe_lines.
+
+    Args:
+        path: Media file to probe
+
+    Returns:
+        List of ffprobe arguments (without 'ffprobe' prefix)
+    """
+    return [
+        '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags',
+        '-of', 'csv=p=0',
+        str(path)
+    ]
+
+
+def build_ffprobe_args(path: Path, count_packets: bool = False) -> list[str]:
+    """Build ffprobe arguments for a structured JSON probe.
+
+    Args:
+        path: Media file to probe
+        count_packets: Count video packets for an exact frame count
+            (reads the whole file, slower on large raws)
+
+    Returns:
+        List of ffprobe arguments (without 'ffprobe' prefix)
+    """
+    args = ['-v', 'error', '-print_format', 'json', '-show_streams', '-show_format']
+    if count_packets:
+        args.extend(['-count_packets'])
+    args.append(str(path))
     return args
 
 
-def _add_inputs(args: list[str], options: FFmpegOptions) -> None:
-    """Add input file arguments."""
+def progress_args(stats_period: float = EncodingDefaults.PROGRESS_STATS_PERIOD) -> list[str]:
+    """Build arguments requesting machine-readable progress on stdout.
+
+    Progress is written as key=value blocks to pipe:1 every `stats_period`
+    seconds; the human-readable stats line is disabled with -nostats, as
+    the runner merges stderr into the same pipe (see
+    SubprocessRunner.run_ffmpeg).
+
+    Args:
+        stats_period: Seconds between progress blocks
+
+    Returns:
+        List of ffmpeg arguments
+    """
+    return ['-progress', 'pipe:1', '-nostats', '-stats_period', f'{stats_period:g}']
+
+
+def _build_split_filter_graph(soft: FFmpegOptions, hard: FFmpegOptions, time_offset: float = 0.0) -> str:
+    """Build the -filter_complex graph feeding both encoders.
+
+    When both branches burn the same logo (through libass or as a
+    pre-rendered overlay), it is applied once before the split.
+
+    Args:
+        soft: Softsub options (logo only)
+        hard: Hardsub options (logo + subtitles)
+        time_offset: Position of the input in the episode (chunked segments);
+            burned subtitles are rendered at the shifted timestamps
+
+    Returns:
+        Filter graph with [vsoft] and [vhard] output labels
+    """
+    soft_filters, hard_filters = soft.filters, hard.filters
+    shared = FilterOptions()
+    soft_logo = (soft_filters.logo_path, soft_filters.logo_overlay)
+    if any(soft_logo) and soft_logo == (hard_filters.logo_path, hard_filters.logo_overlay):
+        shared = replace(soft_filters, subtitle_path=None)
+        soft_filters = replace(soft_filters, logo_path=None, logo_overlay=None)
+        hard_filters = replace(hard_filters, logo_path=None, logo_overlay=None)
+
+    shift = [f'setpts=PTS+{_format_seconds(time_offset)}/TB'] if time_offset else []
+    head = shared.to_filter_graph(
+        f'[{soft.streams.video_input_index}:v:0]', 'shared', before=shift, after=['split=2']
+    )
+
+    soft_chain = soft_filters.to_filter_graph('[soft_in]', 'soft') or '[soft_in]null'
+    hard_chain = hard_filters.to_filter_graph('[hard_in]', 'hard') or '[hard_in]null'
+    if time_offset:
+        # Restore segment-relative timestamps for the encoders
+        soft_chain += ',setpts=PTS-STARTPTS'
+        hard_chain += ',setpts=PTS-STARTPTS'
+
+    return ';'.join([
+        f'{head}[soft_in][hard_in]',
+        f'{soft_chain}[vsoft]',
+        f'{hard_chain}[vhard]',
+    ])
+
+
+def _add_output(args: list[str], options: FFmpegOptions, video_map: str, output_path: Path) -> None:
+    """Add mapping, encoding and file arguments for one output of a multi-output command."""
+    _add_stream_mapping(args, options, video_map)
+    _add_metadata(args, options)
+    _add_video_encoding(args, options)
+
+    if options.include_audio:
+        _add_audio_encoding(args, options)
+
+    if options.include_subtitles and options.paths.sub:
+        args.extend(['-c:s', options.codecs.subtitle_codec])
+
+    args.append(str(output_path))
+
+
+def _build_analysis_pass_args(options: FFmpegOptions) -> list[str]:
+    """Build the first pass of a two-pass encode.
+
+    Only the (filtered) video is encoded, to gather rate control stats;
+    the encoded frames are discarded with the null muxer.
+    """
+    args = ['-y']
+    args.extend(progress_args(options.stats_period))
     args.extend(['-i', str(options.paths.raw)])
+    args.extend(['-map', f'{options.streams.video_input_index}:v:0'])
+    _add_filters(args, options.filters)
+    _add_video_encoding(args, options)
+    args.extend(['-an', '-sn', '-dn'])
+    # Null muxer never opens its output, so "-" does not clash with -progress pipe:1
+    args.extend(['-f', 'null', '-'])
+    return args
+
+
+def _add_two_pass_rate_control(args: list[str], options: FFmpegOptions) -> None:
+    """Add rate control arguments for a pass of a two-pass encode."""
+    if options.use_nvenc:
+        # NVENC runs its own analysis pass inside a single encode
+        args.extend(['-rc', 'vbr', '-multipass', 'fullres'])
+    elif options.codecs.video_codec == 'libx264':
+        args.extend(['-pass', str(options.pass_number), '-passlogfile', str(options.passlog_prefix)])
+    # libx265 ignores -pass; its stats go through x265-params (see _x265_params)
+
+
+def _x265_params(options: FFmpegOptions) -> str:
+    """x265-params of a libx265 encode.
+
+    GOPs are always closed: a hardsub patch splices re-encoded parts in at
+    keyframes, and open-GOP (CRA) pictures would keep referencing frames
+    of the GOP that was replaced.
+    """
+    params = ['open-gop=0']
+    if options.pass_number:
+        stats = str(options.passlog_prefix).replace('\\', '/').replace(':', '\\:')  # ":" must be escaped
+        params = [f'pass={options.pass_number}', f'stats={stats}.x265.log', *params]
+    return ':'.join(params)
+
+
+def _shift_filter_graph(filters: FilterOptions, time_offset: float) -> Optional[str]:
+    """Run the filters at episode timestamps for a segment starting at time_offset.
+
+    Seeking resets timestamps to zero, so subtitles would otherwise be
+    rendered from the start of the episode in every segment.
+    """
+    if not time_offset:
+        return filters.to_filter_string()
+    if not filters.to_filter_string():
+        return None
+    return filters.to_filter_graph(
+        before=[f'setpts=PTS+{_format_seconds(time_offset)}/TB'], after=['setpts=PTS-STARTPTS']
+    )
+
+
+def _segment_seek_args(segment: Segment) -> list[str]:
+    """Input seek arguments for a segment (first segment reads from the start)."""
+    if not segment.start_sec:
+        return []
+    return ['-ss', _format_seconds(segment.start_sec)]
+
+
+def _add_segment_output(
+    args: list[str],
+    options: FFmpegOptions,
+    video_map: str,
+    segment: Segment,
+    output_path: Path
+) -> None:
+    """Add mapping, duration, encoding and file arguments for one segment output."""
+    args.extend(['-map', video_map])
+    if not segment.final:
+        args.extend(['-t', _format_seconds(segment.duration_sec)])
+    _add_video_encoding(args, options)
+    args.append(str(output_path))
+
+
+def _concat_file_line(path: Path) -> str:
+    """Concat list entry for a file."""
+    # Concat list quoting: close quote, escaped quote, reopen
+    escaped = str(path).replace('\\', '/').replace("'", "'\\''")
+    return f"file '{escaped}'\n"
+
+
+def _format_seconds(seconds: float) -> str:
+    """Format a timestamp for ffmpeg time options (microsecond precision)."""
+    return f'{seconds:.6f}'
+
+
+def _add_inputs(args: list[str], options: FFmpegOptions, video_input: Optional[list[str]] = None) -> None:
+    """Add input file arguments.
+
+    Args:
+        args: Argument list to extend
+        options: Encoding options
+        video_input: Arguments for input 0 instead of `-i <raw>`
+    """
+    args.extend(video_input or ['-i', str(options.paths.raw)])
 
     if options.include_audio and options.paths.audio:
         args.extend(['-i', str(options.paths.audio)])
@@ -68,9 +689,15 @@ def _add_inputs(args: list[str], options: FFmpegOptions) -> None:
         args.extend(['-i', str(options.paths.sub)])
 
 
-def _add_stream_mapping(args: list[str], options: FFmpegOptions) -> None:
-    """Add stream mapping arguments."""
-    args.extend(['-map', f'{options.streams.video_input_index}:v:0'])
+def _add_stream_mapping(args: list[str], options: FFmpegOptions, video_map: Optional[str] = None) -> None:
+    """Add stream mapping arguments.
+
+    Args:
+        args: Argument list to extend
+        options: Encoding options
+        video_map: Filter graph label to map instead of the raw video stream
+    """
+    args.extend(['-map', video_map or f'{options.streams.video_input_index}:v:0'])
 
     if options.include_audio and options.streams.audio_input_index is not None:
         args.extend(['-map', f'{options.streams.audio_input_index}:a'])
@@ -112,9 +739,13 @@ def _add_video_encoding(args: list[str], options: FFmpegOptions) -> None:
     """Add video encoding arguments."""
     # Codec
     args.extend(['-c:v', options.codecs.video_codec])
+    if options.codecs.video_codec == 'copy':
+        return  # Raw video is remuxed as is
 
     # Rate control
-    if options.use_nvenc:
+    if options.pass_number:
+        _add_two_pass_rate_control(args, options)
+    elif options.use_nvenc:
         args.extend([
             '-cq', str(options.encoding.cq),
             '-qmin', str(options.encoding.qmin),
@@ -139,9 +770,19 @@ def _add_video_encoding(args: list[str], options: FFmpegOptions) -> None:
     args.extend(['-profile:v', options.video.video_profile])
     args.extend(['-pix_fmt', options.video.pixel_format])
 
+    # Closed GOPs for the HEVC hardsub, so it can be patched later
+    if options.codecs.video_codec == 'hevc':
+        args.extend(['-x265-params', _x265_params(options)])
+    elif options.codecs.video_codec == 'hevc_nvenc':
+        args.extend(['-flags', '+cgop'])
+
+
+def _add_audio_encoding(args: list[str], options: FFmpegOptions) -> None:
+    """Add audio encoding arguments (stream copy for pre-encoded audio)."""
+    if options.codecs.audio_codec == 'copy':
+        args.extend(['-c:a', 'copy'])
+        return
 
-def _add_audio_encoding(args: list[str]) -> None:
-    """Add audio encoding arguments."""
     args.extend(['-c:a', EncodingDefaults.AUDIO_CODEC])
     args.extend(['-b:a', EncodingDefaults.AUDIO_BITRATE])
     args.extend(['-ar', str(EncodingDefaults.AUDIO_SAMPLE_RATE)])
@@ -5,13 +5,14 @@ Isolates path preparation and option assembly logic.
 """
 
 import shutil
+from dataclasses import replace
 from pathlib import Path
 from typing import Optional
 
 from configs.config import Config
-from models.encoding import EncodingParams
+from models.encoding import EncodingDefaults, EncodingParams
 from models.ffmpeg_options import (
-    CodecOptions, FFmpegOptions, FilterOptions, StreamMapping
+    CodecOptions, FFmpegOptions, FilterOptions, MultiOutputOptions, StreamMapping
 )
 from models.job import VideoSettings
 from models.render_paths import RenderPaths
@@ -20,15 +21,34 @@ from models.render_paths import RenderPaths
 class FFmpegOptionsFactory:
     """Factory for creating FFmpegOptions from render job settings."""
 
-    def __init__(self, config: Config, temp_dir: Path):
+    def __init__(
+        self,
+        config: Config,
+        temp_dir: Path,
+        stats_period: float = EncodingDefaults.PROGRESS_STATS_PERIOD,
+        audio_codec: str = EncodingDefaults.AUDIO_CODEC,
+        logo_overlay: Optional[Path] = None,
+        merged_subtitle: Optional[Path] = None,
+        fonts_dir: Optional[Path] = None
+    ):
         """Initialize factory.
 
         Args:
             config: Application configuration (for logo path)
             temp_dir: Temporary directory for subtitle preprocessing
+            stats_period: Seconds between ffmpeg progress reports
+            audio_codec: Output audio codec; "copy" when the audio input is pre-encoded
+            logo_overlay: Pre-rendered logo image composited instead of burning the logo with libass
+            merged_subtitle: Episode subtitles with the logo merged in (one libass pass for hardsub)
+            fonts_dir: Fonts directory passed to every subtitles filter
         """
         self.config = config
         self.temp_dir = temp_dir
+        self.stats_period = stats_period
+        self.audio_codec = audio_codec
+        self.logo_overlay = logo_overlay
+        self.merged_subtitle = merged_subtitle
+        self.fonts_dir = fonts_dir
 
     def create_softsub_options(
         self,
@@ -37,12 +57,15 @@ class FFmpegOptionsFactory:
         encoding_params: EncodingParams,
         use_nvenc: bool,
         include_logo: bool,
-        preset: str
+        preset: str,
+        copy_video: bool = False
     ) -> FFmpegOptions:
         """Create options for softsub encoding.
 
         Softsub keeps subtitles as a separate stream (not burned in).
-        Logo can optionally be burned into video.
+        Logo can optionally be burned into video. When the raw already
+        meets the softsub target (see models.encoding.can_copy_video), the
+        video is stream-copied and only the other tracks are muxed in.
 
         Args:
             paths: Validated input/output paths
@@ -51,25 +74,38 @@ class FFmpegOptionsFactory:
             use_nvenc: Whether to use NVENC hardware encoding
             include_logo: Whether to burn logo into video
             preset: FFmpeg preset (faster, fast, medium, etc)
+            copy_video: Stream-copy the raw video instead of encoding it
 
         Returns:
             Complete FFmpegOptions ready for build_ffmpeg_args()
+
+        Raises:
+            ValueError: If video copy is requested with a burned logo
         """
-        # Prepare logo path (only if burning)
-        logo_path = self.config.main_paths.logo if include_logo else None
+        if copy_video and include_logo:
+            raise ValueError("Cannot stream-copy video with a burned-in logo")
+
+        # Prepare logo (only if burning)
+        logo_path, logo_overlay = self._logo_filters(include_logo)
+        if copy_video:
+            video_codec = 'copy'
+        else:
+            video_codec = 'h264_nvenc' if use_nvenc else 'libx264'
 
         return FFmpegOptions(
             paths=paths,
             codecs=CodecOptions(
-                video_codec='h264_nvenc' if use_nvenc else 'libx264',
-                audio_codec='aac',
+                video_codec=video_codec,
+                audio_codec=self.audio_codec,
                 subtitle_codec='copy'
             ),
             encoding=encoding_params,
             video=video_settings,
             filters=FilterOptions(
                 logo_path=logo_path,
-                subtitle_path=None  # Softsub keeps subs as stream, not burned
+                subtitle_path=None,  # Softsub keeps subs as stream, not burned
+                logo_overlay=logo_overlay,
+                fonts_dir=self.fonts_dir
             ),
             streams=StreamMapping(
                 video_input_index=0,
@@ -77,6 +113,7 @@ class FFmpegOptionsFactory:
                 subtitle_input_index=2 if paths.sub else None
             ),
             preset=preset,
+            stats_period=self.stats_period,
             use_nvenc=use_nvenc,
             include_audio=True,
             include_subtitles=bool(paths.sub)
@@ -108,20 +145,25 @@ class FFmpegOptionsFactory:
             Complete FFmpegOptions ready for build_ffmpeg_args()
         """
         # Prepare paths for burning
-        logo_path = self.config.main_paths.logo if include_logo else None
-        sub_path = self._prepare_subtitle(paths.sub) if paths.sub else None
+        logo_path, logo_overlay = self._logo_filters(include_logo)
+        if logo_path and paths.sub and self.merged_subtitle is not None:
+            logo_path, sub_path = None, self.merged_subtitle  # Logo is part of the merged script
+        else:
+            sub_path = self._prepare_subtitle(paths.sub) if paths.sub else None
 
         return FFmpegOptions(
             paths=paths,
             codecs=CodecOptions(
                 video_codec='hevc_nvenc' if use_nvenc else 'hevc',
-                audio_codec='aac'
+                audio_codec=self.audio_codec
             ),
             encoding=encoding_params,
             video=video_settings,
             filters=FilterOptions(
                 logo_path=logo_path,
-                subtitle_path=sub_path  # Hardsub burns subs into video
+                subtitle_path=sub_path,  # Hardsub burns subs into video
+                logo_overlay=logo_overlay,
+                fonts_dir=self.fonts_dir
             ),
             streams=StreamMapping(
                 video_input_index=0,
@@ -129,11 +171,95 @@ class FFmpegOptionsFactory:
                 subtitle_input_index=None  # No subtitle stream in hardsub
             ),
             preset=preset,
+            stats_period=self.stats_period,
             use_nvenc=use_nvenc,
             include_audio=bool(paths.audio),
             include_subtitles=False  # Burned in, not as separate stream
         )
 
+    def create_combined_options(
+        self,
+        paths: RenderPaths,
+        softsub_settings: VideoSettings,
+        hardsub_settings: VideoSettings,
+        encoding_params: EncodingParams,
+        softsub_nvenc: bool,
+        hardsub_nvenc: bool,
+        softsub_logo: bool,
+        hardsub_logo: bool,
+        softsub_preset: str,
+        hardsub_preset: str
+    ) -> MultiOutputOptions:
+        """Create options for a single-decode softsub + hardsub render.
+
+        Both outputs are produced by one ffmpeg process: the raw is decoded
+        once and the frames are split between the softsub branch (logo only)
+        and the hardsub branch (logo + burned subtitles).
+
+        Args:
+            paths: Validated input/output paths
+            softsub_settings: Video settings for the softsub output
+            hardsub_settings: Video settings for the hardsub output
+            encoding_params: Rate control parameters shared by both outputs
+            softsub_nvenc: Whether softsub uses NVENC
+            hardsub_nvenc: Whether hardsub uses NVENC
+            softsub_logo: Whether to burn logo into softsub
+            hardsub_logo: Whether to burn logo into hardsub
+            softsub_preset: FFmpeg preset for softsub
+            hardsub_preset: FFmpeg preset for hardsub
+
+        Returns:
+            MultiOutputOptions ready for build_multi_output_args()
+        """
+        return MultiOutputOptions(
+            softsub=self.create_softsub_options(
+                paths=paths,
+                video_settings=softsub_settings,
+                encoding_params=encoding_params,
+                use_nvenc=softsub_nvenc,
+                include_logo=softsub_logo,
+                preset=softsub_preset
+            ),
+            hardsub=self.create_hardsub_options(
+                paths=paths,
+                video_settings=hardsub_settings,
+                encoding_params=encoding_params,
+                use_nvenc=hardsub_nvenc,
+                include_logo=hardsub_logo,
+                preset=hardsub_preset
+            ),
+        )
+
+    def create_two_pass_options(
+        self,
+        options: FFmpegOptions,
+        passlog_prefix: Path
+    ) -> tuple[FFmpegOptions, FFmpegOptions]:
+        """Create analysis and final pass options for a target-size encode.
+
+        Both passes use the average bitrate from the encoding params as the
+        target; the quality-based rate control (CRF/CQ) is dropped.
+
+        Args:
+            options: Single-pass options of the encode step
+            passlog_prefix: First-pass stats location (inside a per-job temp dir)
+
+        Returns:
+            (analysis_pass, final_pass) options for build_ffmpeg_args()
+        """
+        return (
+            replace(options, pass_number=1, passlog_prefix=passlog_prefix),
+            replace(options, pass_number=2, passlog_prefix=passlog_prefix),
+        )
+
+    def _logo_filters(self, include_logo: bool) -> tuple[Optional[Path], Optional[Path]]:
+        """Logo to burn as (libass logo file, pre-rendered overlay); at most one is set."""
+        if not include_logo:
+            return None, None
+        if self.logo_overlay is not None:
+            return None, self.logo_overlay
+        return self.config.main_paths.logo, None
+
     def _prepare_subtitle(self, sub_path: Optional[Path]) -> Optional[Path]:
         """Prepare subtitle file for burning.
 
@@ -0,0 +1,209 @@
+"""Persistent index of the fonts available to libass.
+
+Checking subtitle fonts before a render needs the names of every
+installed font. Reading thousands of font files per check would take
+longer than the check is worth, so names are indexed per directory and
+reused while the directory's mtime is unchanged (adding or removing a font
+updates it). Font attachments of raws are indexed by file identity.
+"""
+
+import os
+import struct
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional
+
+from models.ass import AssDocument, embedded_fonts, referenced_fonts
+from models.file_identity import file_key
+from models.font_names import (
+    SFNT_HEADER_SIZE,
+    TABLE_RECORD_SIZE,
+    TTC_HEADER_SIZE,
+    collection_offsets,
+    decode_embedded_font,
+    find_table,
+    font_names,
+    missing_fonts,
+    parse_name_table,
+    table_count,
+)
+from models.protocols import ProcessRunner
+from models.video_info import StreamInfo
+from modules.ffmpeg_builder import build_attachment_dump_args
+from modules.fonts import FONT_SUFFIXES
+from modules.json_cache import JsonCache
+
+
+def system_font_dirs() -> list[Path]:
+    """Directories the system and user fonts are installed in."""
+    home = Path.home()
+    if sys.platform == 'win32':
+        windir = Path(os.getenv('WINDIR') or 'C:\\Windows')
+        local = Path(os.getenv('LOCALAPPDATA') or home / 'AppData' / 'Local')
+        return [windir / 'Fonts', local / 'Microsoft' / 'Windows' / 'Fonts']
+    if sys.platform == 'darwin':
+        return [Path('/System/Library/Fonts'), Path('/Library/Fonts'), home / 'Library' / 'Fonts']
+    return [Path('/usr/share/fonts'), Path('/usr/local/share/fonts'),
+            home / '.fonts', home / '.local' / 'share' / 'fonts']
+
+
+def read_font_names(path: Path) -> set[str]:
+    """Names of the fonts in a font file, reading only its headers and name table.
+
+    Args:
+        path: .ttf, .otf, .ttc or .otc file
+
+    Returns:
+        Names, empty if the file cannot be read or is not a font
+    """
+    names = set()
+    try:
+        with open(path, 'rb') as font_file:
+            header = font_file.read(TTC_HEADER_SIZE)
+            if header[:4] == b'ttcf':
+                (count,) = struct.unpack_from('>I', header, 8)
+                header += font_file.read(4 * count)
+            for offset in collection_offsets(header):
+                font_file.seek(offset)
+                directory = font_file.read(SFNT_HEADER_SIZE)
+                directory += font_file.read(table_count(directory) * TABLE_RECORD_SIZE)
+                table = find_table(directory, b'name')
+                if table is None:
+                    continue
+                font_file.seek(table[0])
+                names |= parse_name_table(font_file.read(table[1]))
+    except (OSError, struct.error):
+        pass  # Unreadable or not a font
+    return names
+
+
+class FontIndex:
+    """On-disk LRU index of font names per directory and per raw.
+
+    All operations are thread-safe (see JsonCache).
+    """
+
+    FILE_NAME = "font_index.json"
+    VERSION = 1
+
+    def __init__(self, cache_dir: Path, max_entries: int = 4096):
+        """Initialize index.
+
+        Args:
+            cache_dir: Directory holding the index file
+            max_entries: Maximum number of directories and raws remembered (least recently used evicted)
+        """
+        self.cache_dir = Path(cache_dir)
+        self._store = JsonCache(self.cache_dir / self.FILE_NAME, max_entries, self.VERSION)
+
+    def names(self, directories: Iterable[Path]) -> set[str]:
+        """Names of the fonts in directories and their subdirectories.
+
+        Args:
+            directories: Font directories (missing ones are skipped)
+
+        Returns:
+            Font names
+        """
+        names = set()
+        pending = [Path(directory) for directory in directories]
+        visited = set()
+        while pending:
+            directory = pending.pop()
+            try:
+                resolved = directory.resolve()
+                if resolved in visited:
+                    continue  # Symlinked or listed twice
+                visited.add(resolved)
+                mtime = directory.stat().st_mtime_ns
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            pending.extend(Path(entry.path) for entry in entries if entry.is_dir())
+
+            key = f"dir:{resolved}"
+            cached = self._store.get(key)
+            if cached is not None and cached.get('mtime') == mtime:
+                names.update(cached.get('names', []))
+                continue
+            found = set()
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith(FONT_SUFFIXES):
+                    found |= read_font_names(Path(entry.path))
+            self._store.put(key, {'mtime': mtime, 'names': sorted(found)})
+            names |= found
+        return names
+
+    def attachment_names(
+        self,
+        runner: ProcessRunner,
+        raw_path: Path,
+        attachments: Iterable[StreamInfo]
+    ) -> set[str]:
+        """Names of the fonts attached to a raw, extracting them on first use.
+
+        Args:
+            runner: ProcessRunner used to start ffmpeg
+            raw_path: Raw holding the attachments
+            attachments: Its font attachment streams (see VideoInfo.font_attachments)
+
+        Returns:
+            Font names
+        """
+        attachments = list(attachments)
+        identity = file_key(raw_path)
+        if not attachments or identity is None:
+            return set()
+        key = f"raw:{identity}"
+        cached: Optional[dict] = self._store.get(key)
+        if cached is not None:
+            return set(cached.get('names', []))
+
+        names = set()
+        extracted = False
+        with tempfile.TemporaryDirectory() as temp_dir:
+            targets = [(stream.index, Path(temp_dir) / f'{stream.index}.font') for stream in attachments]
+            process = runner.run_ffmpeg(build_attachment_dump_args(raw_path, targets))
+            process.communicate()  # Exit code is an error by design (no output file)
+            for _, target in targets:
+                if target.exists():
+                    extracted = True
+                    names |= font_names(target.read_bytes())
+        if extracted:  # A failed extraction is retried next time
+            self._store.put(key, {'names': sorted(names)})
+        return names
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+def audit_fonts(
+    index: FontIndex,
+    documents: Iterable[AssDocument],
+    directories: Iterable[Path],
+    attached: Iterable[str] = ()
+) -> list[str]:
+    """Fonts used by subtitles that libass would not find.
+
+    Args:
+        index: Font index
+        documents: Subtitles to be burned
+        directories: Font directories (bundled and system)
+        attached: Names of the fonts attached to the raw
+
+    Returns:
+        Sorted names of the missing fonts (empty if all are available)
+    """
+    required = set()
+    available = set(attached)
+    for document in documents:
+        required |= referenced_fonts(document)
+        for lines in embedded_fonts(document).values():
+            available |= font_names(decode_embedded_font(lines))
+    if not required:
+        return []
+    missing = missing_fonts(required, available)
+    if not missing:
+        return []  # Everything embedded or attached; no need to scan the directories
+    return missing_fonts(missing, index.names(directories))
@@ -0,0 +1,107 @@
+"""Fonts for burning subtitles.
+
+Each subtitles filter gets a fontsdir: the project's bundled fonts, plus
+the raw's font attachments extracted into the job's temp dir. libass then
+finds the episode's fonts without them being installed system-wide. The
+system font scan itself is paid once per session (see
+FontCacheWarmupThread).
+"""
+
+import hashlib
+import shutil
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from models.protocols import ProcessRunner
+from models.video_info import StreamInfo
+from modules.ffmpeg_builder import build_attachment_dump_args
+
+FONT_SUFFIXES = ('.ttf', '.otf', '.ttc', '.otc')
+
+
+def bundled_fonts(fonts_dir: Path) -> list[Path]:
+    """Font files shipped in a directory (empty if it does not exist)."""
+    if not fonts_dir.is_dir():
+        return []
+    return sorted(path for path in fonts_dir.iterdir()
+                  if path.is_file() and path.suffix.lower() in FONT_SUFFIXES)
+
+
+def fonts_fingerprint(fonts_dir: Optional[Path]) -> str:
+    """Digest of the files in a fonts directory, by name and contents.
+
+    Keys cached renders on the fonts libass finds there: the same logo or
+    subtitles render differently once a font is added or replaced. Names
+    and contents are used rather than file identities, because the per-job
+    directories are fresh copies on every run.
+
+    Args:
+        fonts_dir: Directory passed as fontsdir, or None
+
+    Returns:
+        Hex digest, or '' if there is no such directory
+
+    Raises:
+        OSError: If a font cannot be read
+    """
+    if fonts_dir is None or not fonts_dir.is_dir():
+        return ''
+    digest = hashlib.sha1()
+    for path in sorted(fonts_dir.iterdir()):
+        if path.is_file():
+            digest.update(path.name.lower().encode('utf-8'))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def prepare_fonts_dir(
+    runner: ProcessRunner,
+    raw_path: Path,
+    attachments: Iterable[StreamInfo],
+    bundled_dir: Path,
+    job_dir: Path,
+    log: Optional[Callable[[str], None]] = None
+) -> Optional[Path]:
+    """Directory of fonts for burning a raw's subtitles.
+
+    Args:
+        runner: ProcessRunner used to start ffmpeg
+        raw_path: Raw whose font attachments are extracted
+        attachments: Font attachment streams of the raw (see VideoInfo.font_attachments)
+        bundled_dir: Project fonts directory
+        job_dir: Per-job temp dir the combined directory is created in
+        log: Optional sink for status messages
+
+    Returns:
+        The bundled directory when the raw has no fonts, a directory with
+        both otherwise, or None if there are no fonts at all
+    """
+    log = log or (lambda message: None)
+    attachments = list(attachments)
+    bundled = bundled_fonts(bundled_dir)
+    if not attachments:
+        return bundled_dir if bundled else None
+
+    fonts_dir = job_dir / 'fonts'
+    fonts_dir.mkdir(parents=True, exist_ok=True)
+    for font in bundled:
+        shutil.copyfile(font, fonts_dir / font.name)
+
+    targets = []
+    taken = {font.name.lower() for font in bundled}
+    for stream in attachments:
+        name = Path(stream.filename).name or f'attachment_{stream.index}.ttf'
+        if name.lower() in taken:
+            name = f'{stream.index}_{name}'
+        taken.add(name.lower())
+        targets.append((stream.index, fonts_dir / name))
+
+    pending = [(index, target) for index, target in targets if not target.exists()]
+    if pending:  # The queue lookahead may have extracted them already
+        process = runner.run_ffmpeg(build_attachment_dump_args(raw_path, pending))
+        process.communicate()  # Exit code is an error by design (no output file)
+    extracted = sum(1 for _, target in targets if target.exists())
+    log(f"Extracted {extracted} of {len(targets)} attached fonts")
+    if not extracted and not bundled:
+        return None
+    return fonts_dir
@@ -0,0 +1,195 @@
+"""Local staging of job inputs kept on network shares.
+
+ffmpeg reading a raw from an SMB/NFS share during the encode pays the
+share's latency on every seek and read. The queue lookahead copies the
+raw, audio and subtitles of the next job to a local scratch dir with
+large sequential reads while the current job encodes, and the job then
+reads the staged copies. Copies are named after the source's identity
+(path, size, mtime), so a retried job reuses them; a job's copies are
+evicted once its outputs are verified, and the oldest unused ones
+whenever the scratch dir would grow past its cap.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Optional
+
+from models.file_identity import file_key
+from models.render_paths import RenderPaths
+
+
+class InputStager:
+    """Size-capped scratch dir of staged input files.
+
+    All operations are thread-safe using a lock.
+    """
+
+    CHUNK_SIZE = 8 * 1024 * 1024  # Large sequential reads suit network shares
+
+    def __init__(self, root: Path, cap_bytes: int, log: Optional[Callable[[str], None]] = None):
+        """Initialize stager.
+
+        Args:
+            root: Local scratch dir for the copies
+            cap_bytes: Total size the staged copies may take
+            log: Optional sink for status messages
+        """
+        self.root = Path(root)
+        self.cap_bytes = cap_bytes
+        self._log = log or (lambda message: None)
+        self._pinned: dict[Path, int] = {}  # Staged copy → jobs using it
+        self._reserved = 0  # Bytes of copies in progress
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, log: Optional[Callable[[str], None]] = None) -> Optional['InputStager']:
+        """Stager from the input_staging, staging_dir and staging_cap_gb settings (None if off)."""
+        if not config.input_staging:
+            return None
+        root = Path(config.staging_dir) if config.staging_dir else config.main_paths.temp / 'staging'
+        return cls(root, int(config.staging_cap_gb * 1024 ** 3), log=log)
+
+    def stage(
+        self,
+        paths: RenderPaths,
+        progress: Optional[Callable[[int, int], None]] = None,
+        include_raw: bool = True
+    ) -> RenderPaths:
+        """Copy a job's inputs to the scratch dir.
+
+        An input that does not fit the cap (or fails to copy) stays where
+        it is.
+
+        Args:
+            paths: Paths of the job
+            progress: Receives (bytes copied, bytes to copy)
+            include_raw: False when the job never reads its raw (subtitle remux only)
+
+        Returns:
+            Paths with the inputs replaced by their staged copies; pass
+            them to release() when the job ends
+        """
+        progress = progress or (lambda copied, total: None)
+        inputs = (paths.raw if include_raw else None, paths.audio, paths.sub)
+        sources = [path for path in inputs if path is not None and path.is_file()]
+        total = sum(path.stat().st_size for path in sources)
+        done = 0
+        staged: dict[Path, Path] = {}
+        for source in sources:
+            staged[source] = self._stage_file(source, lambda copied: progress(done + copied, total))
+            done += source.stat().st_size
+        progress(total, total)
+
+        def staged_path(path: Optional[Path]) -> Optional[Path]:
+            return staged.get(path, path) if path is not None else None
+
+        return replace(paths, raw=staged_path(paths.raw), audio=staged_path(paths.audio), sub=staged_path(paths.sub))
+
+    def release(self, paths: RenderPaths, evict: bool) -> None:
+        """Unpin the staged copies of a finished job.
+
+        Args:
+            paths: Paths returned by stage()
+            evict: Delete the copies no other job uses (outputs verified);
+                otherwise they stay for a retry until the cap needs room
+        """
+        with self._lock:
+            for path in (paths.raw, paths.audio, paths.sub):
+                if path is None or path not in self._pinned:
+                    continue
+                self._pinned[path] -= 1
+                if self._pinned[path]:
+                    continue
+                del self._pinned[path]
+                if evict:
+                    shutil.rmtree(path.parent, ignore_errors=True)
+                    self._log(f"Evicted staged {path.name}")
+
+    def used_bytes(self) -> int:
+        """Size of the staged copies on disk."""
+        if not self.root.is_dir():
+            return 0
+        return sum(path.stat().st_size for path in self.root.rglob('*') if path.is_file())
+
+    def _stage_file(self, source: Path, progress: Callable[[int], None]) -> Path:
+        """Staged copy of one file, or the file itself if it cannot be staged."""
+        key = file_key(source)
+        if key is None:
+            return source
+        target = self.root / hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] / source.name
+        stat = source.stat()
+        size = stat.st_size
+
+        with self._lock:
+            if target.exists():
+                os.utime(target.parent)  # Most recently used
+                self._pin(target)
+                return target
+            if not self._make_room(size):
+                self._log(f"No room to stage {source.name} ({size} bytes), reading it in place")
+                return source
+            self._reserved += size
+            self._pin(target)
+
+        partial = target.with_name(f"{target.name}.part")
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            self._copy(source, partial, progress)
+            # Source mtime, so a restaged copy has the same identity for the probe and subtitle caches
+            os.utime(partial, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            os.replace(partial, target)
+            self._log(f"Staged {source.name}")
+            return target
+        except OSError as e:
+            self._log(f"Staging {source.name} failed, reading it in place: {e}")
+            partial.unlink(missing_ok=True)
+            with self._lock:
+                self._pinned.pop(target, None)
+            return source
+        finally:
+            with self._lock:
+                self._reserved -= size
+
+    def _copy(self, source: Path, target: Path, progress: Callable[[int], None]) -> None:
+        """Copy a file in large sequential chunks, reporting bytes copied."""
+        copied = 0
+        buffer = bytearray(self.CHUNK_SIZE)
+        view = memoryview(buffer)
+        with open(source, 'rb', buffering=0) as src, open(target, 'wb') as dst:
+            while True:
+                read = src.readinto(buffer)
+                if not read:
+                    break
+                dst.write(view[:read])
+                copied += read
+                progress(copied)
+
+    def _pin(self, target: Path) -> None:
+        self._pinned[target] = self._pinned.get(target, 0) + 1
+
+    def _make_room(self, size: int) -> bool:
+        """Evict the oldest unused copies until size fits the cap (call with the lock held)."""
+        if size > self.cap_bytes:
+            return False
+        entries = sorted(
+            (entry for entry in self.root.iterdir() if entry.is_dir()) if self.root.is_dir() else (),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        used = self.used_bytes() + self._reserved
+        pinned_dirs = {path.parent for path in self._pinned}
+        for entry in entries:
+            if used + size <= self.cap_bytes:
+                break
+            if entry in pinned_dirs:
+                continue
+            used -= sum(path.stat().st_size for path in entry.rglob('*') if path.is_file())
+            shutil.rmtree(entry, ignore_errors=True)
+            self._log(f"Evicted staged {entry.name} to make room")
+        if used + size > self.cap_bytes:
+            return False
+        self.root.mkdir(parents=True, exist_ok=True)
+        return shutil.disk_usage(self.root).free >= size
@@ -0,0 +1,125 @@
+"""Lookahead preparation of waiting queue jobs.
+
+Between two encodes a job probes its raw, extracts fonts, renders the
+logo and encodes its audio before the encoder gets any work; on a slow
+share that is seconds to minutes of an idle encoder. The queue runs this
+preparer on the next waiting jobs while the current one encodes. Every
+result lands where the job's RenderThread looks first (probe, keyframe,
+logo and merged subtitle caches, the job's temp dir), so the job starts
+with its encodes. A preparation that fails leaves the work to the job.
+"""
+
+import os
+from typing import Callable, Optional
+
+from models.encoding import plan_audio
+from models.enums import BuildState
+from models.job import RenderJob
+from models.protocols import ProcessRunner
+from models.render_paths import job_temp_dir, prepared_audio_path
+from models.resources import HARDSUB_STATES
+from modules.ass_cache import MergedAssCache
+from modules.ffmpeg_builder import build_audio_transcode_args
+from modules.fonts import prepare_fonts_dir
+from modules.keyframe_cache import KeyframeCache, probe_keyframes
+from modules.logo_cache import LogoCache
+from modules.probe_cache import ProbeCache, probe_video
+
+
+class JobPreparer:
+    """Does the pre-encode steps of a job ahead of time."""
+
+    def __init__(
+        self,
+        config,
+        runner: ProcessRunner,
+        probe_cache: Optional[ProbeCache] = None,
+        keyframe_cache: Optional[KeyframeCache] = None,
+        logo_cache: Optional[LogoCache] = None,
+        merged_subs: Optional[MergedAssCache] = None,
+        log: Optional[Callable[[str], None]] = None
+    ):
+        """Initialize preparer.
+
+        Args:
+            config: Application config (temp, fonts and logo paths, chunked encoding)
+            runner: ProcessRunner used to start ffmpeg/ffprobe
+            probe_cache: ProbeCache the job's RenderThread reads
+            keyframe_cache: KeyframeCache the job's RenderThread reads
+            logo_cache: LogoCache the job's RenderThread reads
+            merged_subs: MergedAssCache the job's RenderThread reads
+            log: Optional sink for status messages
+        """
+        self.config = config
+        self.runner = runner
+        self.probe_cache = probe_cache
+        self.keyframe_cache = keyframe_cache
+        self.logo_cache = logo_cache
+        self.merged_subs = merged_subs
+        self._log = log or (lambda message: None)
+
+    def prepare(self, job: RenderJob) -> list[str]:
+        """Prepare a waiting job.
+
+        Args:
+            job: Job to prepare
+
+        Returns:
+            Errors that make the job fail (missing inputs, unwritable
+            outputs); empty if it can run
+        """
+        paths = job.paths
+        errors = paths.validate() + paths.validate_outputs()
+        if errors:
+            return errors
+        if paths.previous_softsub is not None and job.build_state not in HARDSUB_STATES:
+            return []  # Subtitle remux only; the raw is never read
+        if job.build_state == BuildState.RAW_REPAIR:
+            return []
+
+        job_dir = job_temp_dir(self.config.main_paths.temp, paths)
+        try:
+            info = probe_video(self.runner, paths.raw, self.probe_cache)
+        except ValueError as e:
+            self._log(f"Raw not probed ahead: {e}")
+            info = None
+
+        if info is not None and self.config.chunked_encoding and self.keyframe_cache is not None:
+            probe_keyframes(self.runner, paths.raw, self.keyframe_cache)
+
+        fonts_dir = prepare_fonts_dir(
+            self.runner, paths.raw, info.font_attachments if info is not None else (),
+            self.config.main_paths.fonts, job_dir, log=self._log
+        )
+        if info is not None and self.logo_cache is not None:
+            self.logo_cache.overlay_for(
+                self.runner, self.config.main_paths.logo, info.width, info.height, info.duration_seconds,
+                log=self._log, fonts_dir=fonts_dir
+            )
+        if self.merged_subs is not None and paths.sub is not None and job.build_state in HARDSUB_STATES:
+            self.merged_subs.merged(paths.sub, self.config.main_paths.logo)
+
+        if paths.audio is not None:
+            self._prepare_audio(paths.audio, job_dir)
+        return []
+
+    def _prepare_audio(self, audio, job_dir) -> None:
+        """Encode the job's shared audio track (see RenderThread.prepare_audio)."""
+        try:
+            plan = plan_audio(probe_video(self.runner, audio, self.probe_cache))
+        except ValueError:
+            return  # The job decides how to handle an unreadable audio input
+        target = prepared_audio_path(job_dir, audio)
+        if not plan.transcode or target is None or target.exists():
+            return
+
+        # Written under another name, so the job never picks up a partial encode
+        partial = target.with_name(f"{target.stem}.part{target.suffix}")
+        job_dir.mkdir(parents=True, exist_ok=True)
+        process = self.runner.run_ffmpeg(build_audio_transcode_args(audio, partial, plan.resample))
+        process.communicate()
+        if process.returncode == 0 and partial.exists():
+            os.replace(partial, target)
+            self._log(f"Audio encoded ahead: {target.name}")
+        else:
+            partial.unlink(missing_ok=True)
@@ -0,0 +1,106 @@
+"""Small persistent key-value store backing the on-disk caches.
+
+Entries live in memory as an LRU-ordered dict and are written to a single
+JSON file atomically (temp file + os.replace) on every change. A missing,
+corrupt or outdated file simply starts empty: the caches built on top are
+optimizations and must never fail a render.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+
+class JsonCache:
+    """Thread-safe LRU key-value store persisted to a JSON file."""
+
+    def __init__(self, path: Path, max_entries: int = 256, version: int = 1, max_bytes: Optional[int] = None):
+        """Initialize store.
+
+        Args:
+            path: JSON file holding the entries
+            max_entries: Maximum number of entries kept (least recently used evicted)
+            version: Format version; files with another version are ignored
+            max_bytes: Optional cap on the size of the stored entries in bytes
+                (least recently used evicted; the newest entry is always kept)
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = version
+        self._entries: Optional[OrderedDict[str, Any]] = None
+        self._sizes: dict[str, int] = {}  # key → serialized size of its entry
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value for a key (marking it recently used), or None."""
+        with self._lock:
+            entries = self._load()
+            value = entries.get(key)
+            if value is not None:
+                entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value and persist the store."""
+        with self._lock:
+            entries = self._load()
+            entries[key] = value
+            entries.move_to_end(key)
+            self._sizes[key] = self._entry_size(key, value)
+            while len(entries) > self.max_entries or (
+                    self.max_bytes is not None and len(entries) > 1 and self.size_bytes > self.max_bytes):
+                evicted, _ = entries.popitem(last=False)
+                del self._sizes[evicted]
+            self._save(entries)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries = OrderedDict()
+            self._sizes = {}
+            self._save(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Serialized size of the entries (about the size of the file)."""
+        return sum(self._sizes.values())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+    @staticmethod
+    def _entry_size(key: str, value: Any) -> int:
+        """Bytes an entry takes in the file."""
+        return len(json.dumps([key, value], separators=(',', ':')).encode('utf-8')) + 1
+
+    def _load(self) -> OrderedDict[str, Any]:
+        """Load entries from disk on first use (caller holds the lock)."""
+        if self._entries is None:
+            self._entries = OrderedDict()
+            try:
+                with open(self.path, encoding='utf-8') as cache_file:
+                    stored = json.load(cache_file)
+                if stored.get('version') == self.version:
+                    self._entries.update(stored.get('entries', []))
+            except (OSError, ValueError, TypeError, AttributeError):
+                pass  # Missing or corrupt cache starts empty
+            self._sizes = {key: self._entry_size(key, value) for key, value in self._entries.items()}
+        return self._entries
+
+    def _save(self, entries: OrderedDict[str, Any]) -> None:
+        """Atomically write entries to disk (caller holds the lock)."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as cache_file:
+                # Stored as a list of pairs to keep LRU order explicit
+                json.dump({'version': self.version, 'entries': list(entries.items())},
+                          cache_file, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # Cache is an optimization; never fail a render over it
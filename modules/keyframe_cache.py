@@ -0,0 +1,127 @@
+"""Persistent keyframe index cache.
+
+Listing a raw's keyframes means reading every packet of a multi-GB file.
+The cache keeps one compact binary index per raw on disk, keyed by file
+identity (path, size, mtime), so chunked encodes and partial re-renders
+of the same raw get their split points without touching the file again.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from models.file_identity import file_key
+from models.keyframe_index import KeyframeIndex, parse_keyframe_lines
+from models.protocols import ProcessRunner
+from modules.ffmpeg_builder import build_keyframe_probe_args
+
+
+class KeyframeCache:
+    """On-disk cache of keyframe indexes, one file per raw.
+
+    Least recently used files are removed once `max_entries` is exceeded.
+    All operations are thread-safe using a lock.
+    """
+
+    SUFFIX = ".kfi"
+
+    def __init__(self, cache_dir: Path, max_entries: int = 64):
+        """Initialize cache.
+
+        Args:
+            cache_dir: Directory holding the index files
+            max_entries: Maximum number of indexes kept
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, media_path: Path) -> Optional[KeyframeIndex]:
+        """Look up the keyframe index for a file.
+
+        Args:
+            media_path: Raw file
+
+        Returns:
+            KeyframeIndex if the file was indexed in its current state, else None
+        """
+        entry = self._entry_path(media_path)
+        if entry is None:
+            return None
+
+        with self._lock:
+            try:
+                index = KeyframeIndex.from_bytes(entry.read_bytes())
+                os.utime(entry)  # Mark as recently used
+                return index
+            except (OSError, ValueError):
+                return None  # Missing or corrupt entry
+
+    def put(self, media_path: Path, index: KeyframeIndex) -> None:
+        """Store the keyframe index for a file.
+
+        Args:
+            media_path: Raw file
+            index: Its keyframe index
+        """
+        entry = self._entry_path(media_path)
+        if entry is None:
+            return
+
+        with self._lock:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = entry.with_suffix('.tmp')
+                tmp_path.write_bytes(index.to_bytes())
+                os.replace(tmp_path, entry)
+                self._evict()
+            except OSError:
+                pass  # Cache is an optimization; never fail a render over it
+
+    def _entry_path(self, media_path: Path) -> Optional[Path]:
+        """Index file for a raw, or None if the raw cannot be accessed."""
+        key = file_key(media_path)
+        if key is None:
+            return None
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{digest}{self.SUFFIX}"
+
+    def _evict(self) -> None:
+        """Remove least recently used entries past the cap (caller holds the lock)."""
+        entries = sorted(self.cache_dir.glob(f"*{self.SUFFIX}"), key=lambda p: p.stat().st_mtime_ns)
+        for entry in entries[:max(len(entries) - self.max_entries, 0)]:
+            entry.unlink(missing_ok=True)
+
+
+def probe_keyframes(
+    runner: ProcessRunner,
+    media_path: Path,
+    cache: Optional[KeyframeCache] = None
+) -> KeyframeIndex:
+    """Get the keyframe index of a raw, reusing the cache when possible.
+
+    On a miss the packet list is streamed from ffprobe in a single pass
+    (no decoding) and the result is cached.
+
+    Args:
+        runner: ProcessRunner used to run ffprobe on a cache miss
+        media_path: Raw file
+        cache: Optional shared keyframe cache
+
+    Returns:
+        KeyframeIndex with absolute packet timestamps
+    """
+    if cache is not None:
+        cached = cache.get(media_path)
+        if cached is not None:
+            return cached
+
+    process = runner.run_ffprobe(build_keyframe_probe_args(media_path))
+    index = parse_keyframe_lines(process.stdout)
+    exit_code = process.wait()
+
+    if cache is not None and len(index) and not exit_code:
+        cache.put(media_path, index)
+    return index
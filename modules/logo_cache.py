@@ -0,0 +1,93 @@
+"""Cache of pre-rendered logo overlays.
+
+The AniBaza logo used to be burned with the subtitles filter, running
+libass on every frame of every output although the logo never changes.
+A static logo is now rendered once per logo file, fonts and frame size
+into a transparent PNG, which encodes composite with the overlay filter (see
+FilterOptions.logo_overlay). Animated logos keep going through libass.
+"""
+
+import hashlib
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+from models.ass import is_static
+from models.protocols import ProcessRunner
+from modules.ass_cache import AssCache
+from modules.ffmpeg_builder import build_logo_render_args
+from modules.fonts import fonts_fingerprint
+
+
+class LogoCache:
+    """Directory of rendered logo images keyed by logo contents, fonts and frame size.
+
+    All operations are thread-safe using a lock.
+    """
+
+    DIR_NAME = "logos"
+
+    def __init__(self, cache_dir: Path, ass_cache: Optional[AssCache] = None):
+        """Initialize cache.
+
+        Args:
+            cache_dir: Cache root (images live in a logos subdirectory)
+            ass_cache: Parsed subtitle cache (a private one is used if omitted)
+        """
+        self.cache_dir = Path(cache_dir) / self.DIR_NAME
+        self.ass_cache = ass_cache or AssCache()
+        self._lock = threading.Lock()
+
+    def overlay_for(
+        self,
+        runner: ProcessRunner,
+        logo_path: Path,
+        width: int,
+        height: int,
+        duration_sec: float,
+        log: Optional[Callable[[str], None]] = None,
+        fonts_dir: Optional[Path] = None
+    ) -> Optional[Path]:
+        """Rendered image of a logo for a video, rendering it on first use.
+
+        Args:
+            runner: ProcessRunner used to start ffmpeg
+            logo_path: Logo .ass file
+            width: Frame width of the video
+            height: Frame height of the video
+            duration_sec: Duration of the video
+            log: Optional sink for status messages
+            fonts_dir: Optional directory of fonts used by the logo
+
+        Returns:
+            PNG path, or None if the logo is animated or could not be rendered
+            (callers then burn the logo with libass as before)
+        """
+        log = log or (lambda message: None)
+        if width <= 0 or height <= 0:
+            return None
+        try:
+            key = hashlib.sha1(Path(logo_path).read_bytes())
+            if not is_static(self.ass_cache.load(logo_path), duration_sec):
+                log(f"Logo {Path(logo_path).name} is animated, burning it with libass")
+                return None
+            key.update(fonts_fingerprint(fonts_dir).encode())  # A new logo font changes the image
+        except OSError:
+            return None
+
+        image_path = self.cache_dir / f"{key.hexdigest()}_{width}x{height}.png"
+        with self._lock:  # Parallel jobs render a missing image once
+            if image_path.exists():
+                return image_path
+
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = image_path.with_name(f"{image_path.stem}.tmp.png")
+            process = runner.run_ffmpeg(build_logo_render_args(logo_path, width, height, tmp_path, fonts_dir))
+            output, _ = process.communicate()
+            if process.returncode or not tmp_path.exists():
+                log(f"Logo render failed with exit code {process.returncode}: {(output or '').strip()}")
+                tmp_path.unlink(missing_ok=True)
+                return None
+            tmp_path.replace(image_path)
+            log(f"Rendered logo overlay {image_path.name}")
+            return image_path
@@ -0,0 +1,279 @@
+"""Delivery of finished outputs from local scratch to their destinations.
+
+Encoding straight into a network folder stalls the encoder on remote
+writes, and a crash leaves a partial file at the final path. With the
+mover, a job encodes into a local scratch dir and hands the finished
+outputs over: on the same filesystem they are renamed into place at
+once (atomically), otherwise a background thread copies them next to
+the destination and renames them there, while the queue goes on with
+the next encode. A failed move leaves the output in scratch.
+
+Outputs handed to the background thread are listed in a journal next
+to the scratch dirs until they land, so a copy cut short by quitting or
+a failed one is delivered (retried) before the job's scratch dir is
+reused, instead of being deleted with it.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+
+@dataclass(frozen=True)
+class MoverStatus:
+    """Backlog and throughput of the mover."""
+
+    pending_files: int = 0  # Outputs waiting or being copied
+    pending_bytes: int = 0  # Bytes still to copy
+    bytes_per_sec: float = 0.0  # Copy throughput so far (0 = nothing copied yet)
+
+
+class OutputMover:
+    """Background mover of finished outputs.
+
+    All operations are thread-safe using a lock.
+    """
+
+    CHUNK_SIZE = 8 * 1024 * 1024  # Large sequential writes suit network shares
+    JOURNAL_NAME = "pending.json"  # Outputs not delivered yet: scratch file → destination
+    STATUS_INTERVAL = 0.5  # Seconds between status reports during a copy
+
+    def __init__(
+        self,
+        scratch_root: Path,
+        log: Optional[Callable[[str], None]] = None,
+        on_status: Optional[Callable[[MoverStatus], None]] = None
+    ):
+        """Initialize mover.
+
+        Args:
+            scratch_root: Local dir the jobs encode into
+            log: Optional sink for status messages
+            on_status: Receives the status whenever the backlog changes (mover thread)
+        """
+        self.scratch_root = Path(scratch_root)
+        self._log = log or (lambda message: None)
+        self._on_status = on_status or (lambda status: None)
+        self._queue: queue.Queue = queue.Queue()
+        self._pending_files = 0
+        self._pending_bytes = 0
+        self._copied_bytes = 0
+        self._copy_seconds = 0.0
+        self._idle = threading.Event()
+        self._idle.set()
+        self._in_flight: set[Path] = set()  # Scratch files queued or being copied
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls,
+        config,
+        log: Optional[Callable[[str], None]] = None,
+        on_status: Optional[Callable[[MoverStatus], None]] = None
+    ) -> Optional['OutputMover']:
+        """Mover from the output_scratch setting (None if off)."""
+        if not config.output_scratch:
+            return None
+        return cls(config.main_paths.temp / 'outputs', log=log, on_status=on_status)
+
+    def scratch_dir(self, job_key: str) -> Path:
+        """Local dir a job encodes its outputs into."""
+        return self.scratch_root / job_key
+
+    def move(
+        self,
+        moves: list[tuple[Path, Path]],
+        on_done: Optional[Callable[[], None]] = None,
+        on_failed: Optional[Callable[[str], None]] = None
+    ) -> None:
+        """Deliver a job's outputs.
+
+        Args:
+            moves: (scratch file, destination) pairs
+            on_done: Called once every output has landed (at once if all
+                were renamed, else from the mover thread)
+            on_failed: Called with an error message instead of on_done if
+                a copy fails (mover thread); the output stays in scratch
+        """
+        on_done = on_done or (lambda: None)
+        on_failed = on_failed or (lambda message: None)
+        remaining = []
+        for source, destination in moves:
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.replace(source, destination)  # Same filesystem: atomic, instant
+                self._log(f"Moved {destination.name} into place")
+            except OSError:
+                remaining.append((source, destination))  # Another filesystem: copy in the background
+        if not remaining:
+            on_done()
+            return
+
+        with self._lock:
+            self._pending_files += len(remaining)
+            self._pending_bytes += sum(source.stat().st_size for source, _ in remaining)
+            self._in_flight.update(source for source, _ in remaining)
+            self._journal_update(add=remaining)
+            self._idle.clear()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='output-mover', daemon=True)
+                self._thread.start()
+        self._queue.put((remaining, on_done, on_failed))
+        self._report()
+
+    def deliver_leftovers(self, scratch_dir: Path) -> list[Path]:
+        """Deliver the outputs of a job's scratch dir that have not landed yet.
+
+        Waits for copies of the dir still queued in this session, then
+        retries the ones that failed or were cut short by quitting (listed
+        in the journal). Runs in the caller's thread.
+
+        Args:
+            scratch_dir: Scratch dir of the job about to reuse it
+
+        Returns:
+            Scratch files that still could not be delivered (kept in place)
+        """
+        scratch_dir = Path(scratch_dir)
+        with self._lock:
+            copying = any(scratch_dir in source.parents for source in self._in_flight)
+        if copying:
+            self.wait()
+
+        failed = []
+        with self._lock:
+            leftovers = [(source, destination) for source, destination in self._journal_load().items()
+                         if scratch_dir in source.parents]
+        for source, destination in leftovers:
+            if not source.exists():
+                with self._lock:
+                    self._journal_update(remove=[source])  # Delivered or removed by hand
+                continue
+            try:
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(source, destination)
+                self._log(f"Moved {destination.name} into place")
+                delivered = True
+            except OSError:
+                with self._lock:
+                    self._pending_files += 1
+                    self._pending_bytes += source.stat().st_size
+                delivered = self._copy_into_place(source, destination)
+            with self._lock:
+                if delivered:
+                    self._journal_update(remove=[source])
+            if not delivered:
+                failed.append(source)
+        self._report()
+        return failed
+
+    @property
+    def busy(self) -> bool:
+        """True while outputs are waiting or being copied."""
+        return not self._idle.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued output has been delivered.
+
+        Returns:
+            True if the mover is idle
+        """
+        return self._idle.wait(timeout)
+
+    @property
+    def status(self) -> MoverStatus:
+        """Current backlog and throughput."""
+        with self._lock:
+            rate = self._copied_bytes / self._copy_seconds if self._copy_seconds > 0 else 0.0
+            return MoverStatus(self._pending_files, self._pending_bytes, rate)
+
+    def _run(self) -> None:
+        """Mover thread: copy queued outputs one at a time."""
+        while True:
+            moves, on_done, on_failed = self._queue.get()
+            failed = []
+            for source, destination in moves:
+                landed = self._copy_into_place(source, destination)
+                with self._lock:
+                    self._in_flight.discard(source)
+                    if landed:
+                        self._journal_update(remove=[source])
+                if not landed:
+                    failed.append(source)
+            if failed:
+                on_failed(f"Moving {', '.join(source.name for source in failed)} failed; "
+                          f"kept in {failed[0].parent}")
+            else:
+                on_done()
+            with self._lock:
+                if self._pending_files == 0:
+                    self._idle.set()
+            self._report()
+
+    def _copy_into_place(self, source: Path, destination: Path) -> bool:
+        """Copy one output next to its destination, then rename it into place."""
+        size = source.stat().st_size
+        partial = destination.with_name(f"{destination.name}.part")
+        copied = 0
+        try:
+            last_report = time.monotonic()
+            with open(source, 'rb', buffering=0) as src, open(partial, 'wb') as dst:
+                while True:
+                    started = time.monotonic()
+                    chunk = src.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    copied += len(chunk)
+                    with self._lock:
+                        self._pending_bytes -= len(chunk)
+                        self._copied_bytes += len(chunk)
+                        self._copy_seconds += time.monotonic() - started
+                    if time.monotonic() - last_report >= self.STATUS_INTERVAL:
+                        last_report = time.monotonic()
+                        self._report()
+            os.replace(partial, destination)
+            source.unlink()
+            self._log(f"Moved {destination.name} into place")
+            return True
+        except OSError as e:
+            partial.unlink(missing_ok=True)
+            self._log(f"Moving {destination.name} failed, output kept at {source}: {e}")
+            return False
+        finally:
+            with self._lock:
+                self._pending_files -= 1
+                self._pending_bytes -= size - copied
+
+    def _report(self) -> None:
+        self._on_status(self.status)
+
+    def _journal_load(self) -> dict[Path, Path]:
+        """Undelivered outputs from the journal (caller holds the lock)."""
+        try:
+            with open(self.scratch_root / self.JOURNAL_NAME, encoding='utf-8') as journal:
+                return {Path(source): Path(destination) for source, destination in json.load(journal)}
+        except (OSError, ValueError, TypeError):
+            return {}  # No journal: nothing left undelivered
+
+    def _journal_update(self, add: list[tuple[Path, Path]] = (), remove: list[Path] = ()) -> None:
+        """Add and remove journal entries, writing the journal atomically (caller holds the lock)."""
+        pending = self._journal_load()
+        pending.update(add)
+        for source in remove:
+            pending.pop(source, None)
+        path = self.scratch_root / self.JOURNAL_NAME
+        try:
+            self.scratch_root.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as journal:
+                json.dump([[str(source), str(destination)] for source, destination in pending.items()], journal)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self._log(f"Writing the delivery journal failed: {e}")
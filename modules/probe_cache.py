@@ -0,0 +1,144 @@
+"""Persistent ffprobe cache shared by the queue and render threads.
+
+Probing a multi-GB raw on a network share costs seconds of open/seek
+latency. The cache stores each probe result on disk keyed by file
+identity (path, size, mtime), so re-queueing or retrying an episode,
+queue-time validation and the render thread all reuse a single probe.
+
+The decoded ffprobe JSON is stored rather than VideoInfo itself, so
+entries stay valid when VideoInfo gains new fields; VideoInfo is rebuilt
+from the stored data with the same pure parser used for fresh probes.
+"""
+
+from pathlib import Path
+from typing import Any, Optional
+
+from models.file_identity import file_key
+from models.protocols import ProcessRunner
+from models.video_info import VideoInfo, load_ffprobe_json, video_info_from_probe_data
+from modules.ffmpeg_builder import build_ffprobe_args
+from modules.json_cache import JsonCache
+
+
+class ProbeCache:
+    """On-disk LRU cache of ffprobe results.
+
+    All operations are thread-safe using a lock.
+    """
+
+    FILE_NAME = "probe_cache.json"
+    VERSION = 1
+
+    MAX_BYTES = 4 * 1024 * 1024  # Raws with many attachments or chapters probe to tens of KiB
+
+    def __init__(self, cache_dir: Path, max_entries: int = 256, max_bytes: int = MAX_BYTES):
+        """Initialize cache.
+
+        Args:
+            cache_dir: Directory holding the cache file
+            max_entries: Maximum number of probes kept (least recently used evicted)
+            max_bytes: Maximum size of the cache file in bytes (least recently used evicted)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._store = JsonCache(self.path, max_entries, self.VERSION, max_bytes)
+
+    @property
+    def path(self) -> Path:
+        """Location of the cache file."""
+        return self.cache_dir / self.FILE_NAME
+
+    def get(self, media_path: Path) -> Optional[VideoInfo]:
+        """Look up the probe for a file.
+
+        Args:
+            media_path: Probed media file
+
+        Returns:
+            VideoInfo if the file was probed in its current state, else None
+        """
+        data = self.get_data(media_path)
+        return video_info_from_probe_data(data) if data is not None else None
+
+    def get_data(self, media_path: Path) -> Optional[dict[str, Any]]:
+        """Look up the raw probe data for a file.
+
+        Args:
+            media_path: Probed media file
+
+        Returns:
+            Decoded ffprobe JSON, or None on miss
+        """
+        key = file_key(media_path)
+        return self._store.get(key) if key is not None else None
+
+    def put(self, media_path: Path, probe_data: dict[str, Any]) -> None:
+        """Store the probe data for a file and persist the cache.
+
+        Args:
+            media_path: Probed media file
+            probe_data: Decoded ffprobe JSON for the file
+        """
+        key = file_key(media_path)
+        if key is not None:
+            self._store.put(key, probe_data)
+
+    def clear(self) -> None:
+        """Drop all cached probes."""
+        self._store.clear()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+def probe_video(
+    runner: ProcessRunner,
+    media_path: Path,
+    cache: Optional[ProbeCache] = None,
+    count_frames: bool = False
+) -> VideoInfo:
+    """Probe a media file, reusing the cache when possible.
+
+    Args:
+        runner: ProcessRunner used to run ffprobe on a cache miss
+        media_path: File to probe
+        cache: Optional shared probe cache
+        count_frames: If the probe has no exact frame count (MKV without
+            statistics tags), probe again counting the video packets; this
+            reads the whole file, and the counted probe is what gets cached
+
+    Returns:
+        VideoInfo for the file
+
+    Raises:
+        ValueError: If ffprobe produced no JSON (unreadable or not a media file)
+    """
+    info = cache.get(media_path) if cache is not None else None
+    if info is None:
+        info = _run_probe(runner, media_path, cache)
+    if count_frames and info.codec_name and not info.nb_frames:
+        try:
+            counted = _run_probe(runner, media_path, cache, count_packets=True)
+        except ValueError:
+            return info  # The count is a refinement; the plain probe stands
+        if counted.nb_frames:
+            info = counted
+    return info
+
+
+def _run_probe(
+    runner: ProcessRunner,
+    media_path: Path,
+    cache: Optional[ProbeCache],
+    count_packets: bool = False
+) -> VideoInfo:
+    """Run ffprobe on a file and cache the result."""
+    process = runner.run_ffprobe(build_ffprobe_args(media_path, count_packets=count_packets))
+    output, _ = process.communicate()
+    data = load_ffprobe_json(output or '')
+
+    # Failed probes print an empty document; don't cache them
+    if cache is not None and data.get('streams'):
+        cache.put(media_path, data)
+    return video_info_from_probe_data(data)
@@ -8,6 +8,7 @@ This abstraction provides:
 """
 
 import subprocess
+import threading
 from pathlib import Path
 from typing import Optional
 
@@ -20,7 +21,7 @@ class SubprocessRunner(ProcessRunner):
     Key improvements over direct subprocess usage:
     - Commands are lists, not strings (no shell=True)
     - Working directory is per-process (no os.chdir())
-    - Tracks active process for safe termination
+    - Tracks active processes for safe termination (chunked encodes run several at once)
     """
 
     def __init__(self, ffmpeg_path: Path, ffprobe_path: Optional[Path] = None, cwd: Optional[Path] = None):
@@ -34,7 +35,8 @@ class SubprocessRunner(ProcessRunner):
         self._ffmpeg = ffmpeg_path
         self._ffprobe = ffprobe_path or (ffmpeg_path.parent / "ffprobe")
         self._cwd = cwd
-        self._active: Optional[subprocess.Popen] = None
+        self._active: list[subprocess.Popen] = []
+        self._lock = threading.Lock()
 
     def run_ffmpeg(self, args: list[str], cwd: Optional[Path] = None) -> ProcessHandle:
         """Run ffmpeg with given arguments.
@@ -44,13 +46,21 @@ class SubprocessRunner(ProcessRunner):
             cwd: Working directory (uses default if not specified)
 
         Returns:
-            Running process handle
+            Running process handle. Its stdout carries the `-progress pipe:1`
+            key=value stream with stderr merged in, deliberately: the
+            progress readers are the only readers, so a separate stderr pipe
+            would need its own drain thread per encode, or ffmpeg blocks on
+            a full stderr buffer while progress is read (a deadlock on
+            long, chatty encodes). Merged, warnings and errors reach the log
+            in order with the progress; ProgressParser skips every line that
+            is not a bare `key=value` pair, and -nostats turns off the only
+            stderr output in that form.
 
         Example:
             runner.run_ffmpeg(['-y', '-i', 'input.mkv', 'output.mp4'])
         """
         cmd = [str(self._ffmpeg)] + args
-        self._active = subprocess.Popen(
+        process = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
@@ -59,7 +69,11 @@ class SubprocessRunner(ProcessRunner):
             encoding='utf-8',
             errors='replace'
         )
-        return self._active
+        with self._lock:
+            # Forget processes that already exited
+            self._active = [p for p in self._active if p.poll() is None]
+            self._active.append(process)
+        return process
 
     def run_ffprobe(self, args: list[str], cwd: Optional[Path] = None) -> ProcessHandle:
         """Run ffprobe with given arguments.
@@ -87,20 +101,63 @@ class SubprocessRunner(ProcessRunner):
         return process
 
     def kill_ffmpeg(self) -> None:
-        """Terminate the currently running ffmpeg process (if any).
+        """Terminate all running ffmpeg processes started by this runner.
 
         This is safer than platform-specific process killing:
-        - Only terminates the process WE started
+        - Only terminates the processes WE started
         - Works cross-platform (no taskkill/pgrep)
         - Waits for clean shutdown
         """
-        if self._active:
-            try:
-                self._active.terminate()
-                self._active.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                # Force kill if terminate didn't work
-                self._active.kill()
-                self._active.wait()
-            finally:
-                self._active = None
+        with self._lock:
+            processes, self._active = self._active, []
+        terminate_processes(processes)
+
+
+class JobProcessRunner(ProcessRunner):
+    """ProcessRunner scoped to one queued job.
+
+    Parallel queue jobs share one SubprocessRunner, whose kill_ffmpeg stops
+    every encode. Each job gets its own wrapper so stopping it terminates
+    only the processes that job started.
+    """
+
+    def __init__(self, runner: ProcessRunner):
+        """Initialize job runner.
+
+        Args:
+            runner: Shared ProcessRunner that starts the processes
+        """
+        self._runner = runner
+        self._active: list[ProcessHandle] = []
+        self._lock = threading.Lock()
+
+    def run_ffmpeg(self, args: list[str], cwd: Optional[Path] = None) -> ProcessHandle:
+        """Run ffmpeg through the shared runner and remember the process."""
+        process = self._runner.run_ffmpeg(args, cwd)
+        with self._lock:
+            # Forget processes that already exited
+            self._active = [p for p in self._active if p.poll() is None]
+            self._active.append(process)
+        return process
+
+    def run_ffprobe(self, args: list[str], cwd: Optional[Path] = None) -> ProcessHandle:
+        """Run ffprobe through the shared runner."""
+        return self._runner.run_ffprobe(args, cwd)
+
+    def kill_ffmpeg(self) -> None:
+        """Terminate the running ffmpeg processes of this job only."""
+        with self._lock:
+            processes, self._active = self._active, []
+        terminate_processes(processes)
+
+
+def terminate_processes(processes: list[ProcessHandle]) -> None:
+    """Terminate processes, force-killing those that do not exit in 5 seconds."""
+    for process in processes:
+        try:
+            process.terminate()
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            # Force kill if terminate didn't work
+            process.kill()
+            process.wait()
@@ -0,0 +1,195 @@
+"""Content-addressed render cache: skip encodes that would reproduce an existing output.
+
+Re-queueing an episode after a crash, or by mistake, used to re-encode
+every step. Each encode step is now fingerprinted by its exact ffmpeg
+args (with input paths replaced by content digests and per-job paths by
+stable stand-ins), the contents of its inputs and fonts, and the ffmpeg
+build. The cache records, per output, the
+fingerprint that produced it and the output's size and digest. When the
+same step is requested again and the output on disk is still intact, the
+step is skipped.
+
+Outputs themselves are not copied into the cache (they are multi-GB and
+already where the user wants them); the manifest only vouches for them.
+It is bounded like the other caches (LRU, JsonCache).
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Iterable, Mapping, Optional
+
+from models.file_identity import file_key
+from models.protocols import ProcessRunner
+from modules.json_cache import JsonCache
+
+# Files up to this size are hashed in full; larger ones by samples
+FULL_HASH_LIMIT = 64 * 1024 * 1024
+SAMPLE_SIZE = 4 * 1024 * 1024  # Bytes read at the start, middle and end of large files
+
+
+def content_digest(path: Path) -> str:
+    """Digest of a file's contents.
+
+    Small files (subtitles, logos, audio) are hashed in full. Multi-GB raws
+    are identified by their size plus samples from the start, middle and
+    end, which catches re-encodes and truncated copies at a fraction of
+    the I/O of a full hash.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Hex digest
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as media_file:
+        size = media_file.seek(0, 2)
+        digest.update(str(size).encode())
+        if size <= FULL_HASH_LIMIT:
+            media_file.seek(0)
+            for block in iter(lambda: media_file.read(1024 * 1024), b''):
+                digest.update(block)
+        else:
+            for offset in (0, (size - SAMPLE_SIZE) // 2, size - SAMPLE_SIZE):
+                media_file.seek(offset)
+                digest.update(media_file.read(SAMPLE_SIZE))
+    return digest.hexdigest()
+
+
+def step_fingerprint(
+    args: list[str],
+    input_digests: Mapping[str, str],
+    tool_version: str,
+    stand_ins: Optional[Mapping[str, str]] = None
+) -> str:
+    """Fingerprint of one encode step.
+
+    Paths are replaced wherever they appear in args, also inside filter
+    strings (subtitles, fontsdir, overlay images).
+
+    Args:
+        args: Exact ffmpeg args of the step
+        input_digests: Input path as it appears in args -> content digest
+        tool_version: ffmpeg version line
+        stand_ins: Per-job path as it appears in args -> stable replacement
+            (e.g. a scratch output -> its destination)
+
+    Returns:
+        Hex digest; equal fingerprints produce equal outputs
+    """
+    # Staged and temp copies of inputs get new names; their contents are what matters
+    replacements = {**(stand_ins or {}), **input_digests}
+    ordered = sorted(replacements, key=len, reverse=True)  # Longer paths first: a dir is a prefix of its files
+    normalized = []
+    for arg in args:
+        for path in ordered:
+            arg = arg.replace(path, replacements[path])
+        normalized.append(arg)
+    payload = json.dumps([tool_version, normalized, sorted(input_digests.values())])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """On-disk LRU manifest of finished encode steps.
+
+    All operations are thread-safe using a lock.
+    """
+
+    FILE_NAME = "render_cache.json"
+    VERSION = 1
+
+    def __init__(self, cache_dir: Path, max_entries: int = 512):
+        """Initialize cache.
+
+        Args:
+            cache_dir: Directory holding the manifest
+            max_entries: Maximum number of outputs remembered (least recently used evicted)
+        """
+        self.cache_dir = Path(cache_dir)
+        self._store = JsonCache(self.cache_dir / self.FILE_NAME, max_entries, self.VERSION)
+        self._digests: dict[str, str] = {}  # File identity -> content digest
+        self._ffmpeg_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def digest(self, path: Path) -> Optional[str]:
+        """Content digest of a file, memoized by file identity.
+
+        Args:
+            path: File to hash
+
+        Returns:
+            Hex digest, or None if the file cannot be read
+        """
+        key = file_key(path)
+        if key is None:
+            return None
+        with self._lock:
+            cached = self._digests.get(key)
+        if cached is not None:
+            return cached
+        try:
+            digest = content_digest(path)
+        except OSError:
+            return None
+        with self._lock:
+            self._digests[key] = digest
+        return digest
+
+    def ffmpeg_version(self, runner: ProcessRunner) -> str:
+        """First line of `ffmpeg -version`, queried once per cache."""
+        with self._lock:
+            if self._ffmpeg_version is not None:
+                return self._ffmpeg_version
+        process = runner.run_ffmpeg(['-version'])
+        output, _ = process.communicate()
+        version = (output or '').partition('\n')[0].strip()
+        with self._lock:
+            self._ffmpeg_version = version
+        return version
+
+    def is_cached(self, fingerprint: str, outputs: Iterable[Path]) -> bool:
+        """True if every output was produced by this fingerprint and is still intact.
+
+        Args:
+            fingerprint: Step fingerprint (see step_fingerprint)
+            outputs: Files the step writes
+        """
+        for output in outputs:
+            entry = self._store.get(self._key(output))
+            if not entry or entry.get('fingerprint') != fingerprint:
+                return False
+            try:
+                if Path(output).stat().st_size != entry.get('size'):
+                    return False
+            except OSError:
+                return False
+            if self.digest(output) != entry.get('digest'):
+                return False
+        return True
+
+    def store(self, fingerprint: str, outputs: Iterable[Path]) -> None:
+        """Record the outputs a step just produced.
+
+        Args:
+            fingerprint: Step fingerprint (see step_fingerprint)
+            outputs: Files the step wrote
+        """
+        for output in outputs:
+            digest = self.digest(output)
+            if digest is None:
+                continue
+            self._store.put(self._key(output), {
+                'fingerprint': fingerprint, 'size': Path(output).stat().st_size, 'digest': digest
+            })
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    @staticmethod
+    def _key(output: Path) -> str:
+        return str(Path(output).resolve())
@@ -0,0 +1,60 @@
+"""Encoder budget shared by the jobs the queue runs in parallel.
+
+Running several jobs at once only pays off while they use different
+hardware: two software encodes compete for the same cores, the NVENC
+driver refuses sessions past its limit, and two remuxes compete for the
+same disk. The queue reserves each job's demand here before starting it.
+"""
+
+import threading
+
+from models.resources import ResourceDemand, fits_budget
+
+
+class ResourceBudget:
+    """Thread-safe pool of CPU encode slots, NVENC sessions and I/O slots."""
+
+    IO_SLOTS = 1  # Remuxes are disk-bound; a second one only slows both down
+
+    def __init__(self, cpu_encodes: int = 1, nvenc_sessions: int = 3, io: int = IO_SLOTS):
+        """Initialize budget.
+
+        Args:
+            cpu_encodes: Software encodes at once
+            nvenc_sessions: NVENC sessions at once
+            io: Remuxes at once
+        """
+        self.capacity = ResourceDemand(max(1, cpu_encodes), max(1, nvenc_sessions), max(1, io))
+        self._in_use = ResourceDemand()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'ResourceBudget':
+        """Budget from the cpu_encode_slots and nvenc_sessions settings."""
+        return cls(cpu_encodes=config.cpu_encode_slots, nvenc_sessions=config.nvenc_sessions)
+
+    def try_acquire(self, demand: ResourceDemand) -> bool:
+        """Reserve a job's demand if it fits next to the running jobs.
+
+        Args:
+            demand: Demand of the job
+
+        Returns:
+            True if reserved (release it when the job ends)
+        """
+        with self._lock:
+            if not fits_budget(demand, self._in_use, self.capacity):
+                return False
+            self._in_use = self._in_use + demand
+            return True
+
+    def release(self, demand: ResourceDemand) -> None:
+        """Return a job's reserved demand."""
+        with self._lock:
+            self._in_use = self._in_use - demand
+
+    @property
+    def in_use(self) -> ResourceDemand:
+        """Summed demand of the running jobs."""
+        with self._lock:
+            return self._in_use
@@ -0,0 +1,111 @@
+"""Runs a job's render graph.
+
+Steps whose dependencies have finished start at once as long as their
+encoder slots fit the budget, so a software hardsub can run next to an
+NVENC softsub of the same job. The executor times every step, retries
+the steps that allow it, and stops starting new steps once the job is
+cancelled or a step has failed.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional, Sequence
+
+from models.render_graph import RenderStep, StepResult, check_graph, ready_steps
+from modules.resource_budget import ResourceBudget
+
+
+class StepExecutor:
+    """Runs render steps concurrently within an encoder budget."""
+
+    WORKERS = 4  # Steps running at once; the budget limits the encodes among them
+
+    def __init__(
+        self,
+        budget: ResourceBudget,
+        cancelled: Callable[[], bool] = lambda: False,
+        log: Optional[Callable[[str], None]] = None,
+        workers: int = WORKERS
+    ):
+        """Initialize executor.
+
+        Args:
+            budget: Encoder slots the steps reserve while running
+            cancelled: Returns True once the job is cancelled
+            log: Receives step timings and retries
+            workers: Steps running at once
+        """
+        self.budget = budget
+        self._cancelled = cancelled
+        self._log = log or (lambda message: None)
+        self.workers = max(1, workers)
+
+    def run(self, steps: Sequence[RenderStep]) -> list[StepResult]:
+        """Run a render graph.
+
+        Steps are started in graph order. After a failure or cancellation
+        no new step starts; the running ones are waited for.
+
+        Args:
+            steps: Steps of the graph
+
+        Returns:
+            Timings of the finished steps, in finishing order
+
+        Raises:
+            ValueError: If the graph is invalid
+            Exception: The first exception raised by a step
+        """
+        check_graph(steps)
+        finished: set[str] = set()
+        started: set[str] = set()
+        results: list[StepResult] = []
+        running: dict[Future, RenderStep] = {}
+        error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='render-step') as pool:
+            while True:
+                if error is None and not self._cancelled():
+                    for step in ready_steps(steps, finished, started):
+                        if len(running) >= self.workers:
+                            break
+                        if not self.budget.try_acquire(step.demand):
+                            continue
+                        started.add(step.name)
+                        running[pool.submit(self._run_step, step)] = step
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    self.budget.release(step.demand)
+                    try:
+                        results.append(future.result())
+                        finished.add(step.name)
+                    except Exception as e:
+                        self._log(f"Step {step.name} failed: {e}")
+                        if error is None:
+                            error = e
+
+        if error is not None:
+            raise error
+        return results
+
+    def _run_step(self, step: RenderStep) -> StepResult:
+        """Run one step with its retries (worker thread)."""
+        start = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                step.action()
+                break
+            except Exception as e:
+                if attempt > step.retries or self._cancelled():
+                    raise
+                self._log(f"Step {step.name} failed (attempt {attempt}), retrying: {e}")
+                attempt += 1
+
+        result = StepResult(step.name, time.monotonic() - start, attempt)
+        self._log(f"Step {step.name} finished in {result.seconds:.2f}s")
+        return result
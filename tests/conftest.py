@@ -68,13 +68,15 @@ def mock_paths(tmp_path: Path) -> Paths:
     paths.config = paths.config_dir / "config.ini"
     paths.version = paths.config_dir / "current_version.ini"
     paths.logs = tmp_path / "logs"
+    paths.cache = tmp_path / "cache"
     paths.temp = tmp_path / "tmp"
     paths.softsub = Path("")
     paths.hardsub = tmp_path / "HARDSUB"
     paths.logo = tmp_path / "logo" / "AniBaza_Logo16x9.ass"
+    paths.fonts = tmp_path / "fonts"
 
     # Create directories
-    for dir_path in [paths.config_dir, paths.logs, paths.temp, paths.hardsub]:
+    for dir_path in [paths.config_dir, paths.logs, paths.cache, paths.temp, paths.hardsub]:
         dir_path.mkdir(parents=True, exist_ok=True)
 
     return paths
@@ -134,6 +136,19 @@ def mock_config(tmp_path: Path, mock_paths: Paths, mock_pc_info: PCInfo, mock_ff
     config.update_search = True
     # Phase 4.3: Runtime state moved to proper owners (RenderThread, MainWindow)
     config.potato_PC = False
+    config.chunked_encoding = False
+    config.chunk_workers = 0
+    config.crf_search = False
+    config.auto_patch_hardsub = False
+    config.font_audit = True
+    config.parallel_jobs = 1
+    config.cpu_encode_slots = 1
+    config.nvenc_sessions = 3
+    config.lookahead_jobs = 1
+    config.input_staging = False
+    config.staging_dir = ''
+    config.staging_cap_gb = 50
+    config.output_scratch = False
 
     # Build settings (Phase 4: now dataclass)
     config.build_settings = BuildSettings(
@@ -1,5 +1,6 @@
 """Mock ProcessRunner for testing without real ffmpeg/ffprobe calls."""
 
+import threading
 from pathlib import Path
 from typing import Optional
 
@@ -29,14 +30,22 @@ class MockProcess:
         """Return (stdout, stderr) as strings."""
         return (''.join(self._stdout_lines), self._stderr)
 
-    def wait(self) -> int:
+    def wait(self, timeout: Optional[float] = None) -> int:
         """Return exit code."""
         return self.returncode
 
+    def poll(self) -> Optional[int]:
+        """Return exit code (mock processes finish immediately)."""
+        return self.returncode
+
     def terminate(self) -> None:
         """Mock terminate - no-op."""
         pass
 
+    def kill(self) -> None:
+        """Mock kill - no-op."""
+        pass
+
 
 class MockProcessRunner(ProcessRunner):
     """Mock ProcessRunner for testing.
@@ -51,6 +60,7 @@ class MockProcessRunner(ProcessRunner):
         self.ffmpeg_outputs: dict[int, str] = {}  # call_index → stdout
         self.ffprobe_outputs: dict[int, str] = {}  # call_index → stdout
         self._kill_called = False
+        self._lock = threading.Lock()  # Chunked encodes call run_ffmpeg from worker threads
 
     def run_ffmpeg(self, args: list[str], cwd: Optional[Path] = None) -> ProcessHandle:
         """Record ffmpeg call and return mock process.
@@ -62,8 +72,9 @@ class MockProcessRunner(ProcessRunner):
         Returns:
             MockProcess with canned output
         """
-        self.ffmpeg_calls.append(args)
-        call_index = len(self.ffmpeg_calls) - 1
+        with self._lock:
+            self.ffmpeg_calls.append(args)
+            call_index = len(self.ffmpeg_calls) - 1
         stdout = self.ffmpeg_outputs.get(call_index, "")
         return MockProcess(stdout)
 
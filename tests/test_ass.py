@@ -0,0 +1,255 @@
+"""Tests for models/ass.py and modules/ass_cache.py - subtitle diff for hardsub patching."""
+
+import pytest
+
+from models.ass import AssDiff, diff_ass, embedded_fonts, is_static, merge_ranges, parse_ass, referenced_fonts
+from models.patching import TimeRange
+from modules.ass_cache import AssCache, BurnedSubtitleCache
+
+
+HEADER = """[Script Info]
+Title: Episode 1
+PlayResX: 1920
+PlayResY: 1080
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, Bold
+Style: Default,Arial,48,&H00FFFFFF,0
+Style: Sign,Arial,36,&H00FFFFFF,0
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+EVENTS = [
+    "Dialogue: 0,0:00:10.00,0:00:12.50,Default,,0,0,0,,Hello, world",
+    "Dialogue: 0,0:01:00.00,0:01:03.00,Default,,0,0,0,,Second line",
+    "Dialogue: 0,0:05:00.00,0:05:04.00,Sign,,0,0,0,,{\\pos(100,100)}Shop",
+    "Comment: 0,0:06:00.00,0:06:02.00,Default,,0,0,0,,Note to self",
+]
+
+
+def make_ass(events=EVENTS, header=HEADER):
+    return header + "\n".join(events) + "\n"
+
+
+class TestParseAss:
+    """Test parse_ass."""
+
+    def test_sections(self):
+        document = parse_ass(make_ass())
+
+        assert document.script_info['playresx'] == '1920'
+        assert document.styles['Sign'] == ('Arial', '36', '&H00FFFFFF', '0')
+        assert len(document.events) == 3  # Comments are never drawn
+
+    def test_event_fields(self):
+        event = parse_ass(make_ass()).events[0]
+
+        assert (event.layer, event.start_sec, event.end_sec, event.style) == (0, 10.0, 12.5, 'Default')
+        assert event.text == "Hello, world"  # Commas in the text are kept
+
+    def test_malformed_event_skipped(self):
+        document = parse_ass(make_ass(["Dialogue: 0,bad,0:00:01.00,Default,,0,0,0,,Broken", EVENTS[0]]))
+
+        assert len(document.events) == 1
+
+    def test_parses_thousands_of_events(self):
+        events = [f"Dialogue: 0,0:{i // 600:02d}:{i // 10 % 60:02d}.{i % 10}0,0:{i // 600:02d}:{i // 10 % 60:02d}.{i % 10}5,"
+                  f"Default,,0,0,0,,Line {i}" for i in range(5000)]
+
+        assert len(parse_ass(make_ass(events)).events) == 5000
+
+
+class TestDiffAss:
+    """Test diff_ass."""
+
+    def test_identical(self):
+        assert diff_ass(parse_ass(make_ass()), parse_ass(make_ass())) == AssDiff(full=False)
+
+    def test_reordered_events_unchanged(self):
+        old = parse_ass(make_ass())
+        new = parse_ass(make_ass(list(reversed(EVENTS))))
+
+        assert diff_ass(old, new).ranges == ()
+
+    def test_changed_text(self):
+        events = list(EVENTS)
+        events[1] = "Dialogue: 0,0:01:00.00,0:01:03.00,Default,,0,0,0,,Fixed line"
+
+        diff = diff_ass(parse_ass(make_ass()), parse_ass(make_ass(events)))
+
+        assert diff == AssDiff(full=False, ranges=(TimeRange(60.0, 63.0),))
+
+    def test_retimed_event_covers_both_times(self):
+        """Moving a line changes both where it was and where it is now."""
+        events = list(EVENTS)
+        events[1] = "Dialogue: 0,0:01:01.00,0:01:04.00,Default,,0,0,0,,Second line"
+
+        diff = diff_ass(parse_ass(make_ass()), parse_ass(make_ass(events)))
+
+        assert diff.ranges == (TimeRange(60.0, 64.0),)
+
+    def test_added_and_removed_events(self):
+        events = EVENTS[1:] + ["Dialogue: 0,0:20:00.00,0:20:01.00,Default,,0,0,0,,New"]
+
+        diff = diff_ass(parse_ass(make_ass()), parse_ass(make_ass(events)))
+
+        assert diff.ranges == (TimeRange(10.0, 12.5), TimeRange(1200.0, 1201.0))
+
+    def test_changed_style(self):
+        """Every event drawn with a changed style is affected."""
+        header = HEADER.replace("Style: Sign,Arial,36", "Style: Sign,Arial,40")
+
+        diff = diff_ass(parse_ass(make_ass()), parse_ass(make_ass(header=header)))
+
+        assert diff.ranges == (TimeRange(300.0, 304.0),)
+
+    def test_style_reset_override(self):
+        """Events switching to a changed style with \\r are affected."""
+        events = EVENTS + ["Dialogue: 0,0:07:00.00,0:07:02.00,Default,,0,0,0,,Hi {\\rSign}there"]
+        header = HEADER.replace("Style: Sign,Arial,36", "Style: Sign,Arial,40")
+
+        diff = diff_ass(parse_ass(make_ass(events)), parse_ass(make_ass(events, header)))
+
+        assert diff.ranges == (TimeRange(300.0, 304.0), TimeRange(420.0, 422.0))
+
+    def test_render_settings_change_is_full(self):
+        header = HEADER.replace("PlayResY: 1080", "PlayResY: 720")
+
+        assert diff_ass(parse_ass(make_ass()), parse_ass(make_ass(header=header))).full
+
+    def test_title_change_ignored(self):
+        header = HEADER.replace("Episode 1", "Episode 1 v2")
+
+        assert diff_ass(parse_ass(make_ass()), parse_ass(make_ass(header=header))) == AssDiff(full=False)
+
+
+class TestIsStatic:
+    """Test is_static."""
+
+    LOGO = "Dialogue: 0,0:00:00.00,4:00:00.00,Default,,0,0,0,,{\\alpha&H899&}LOGO"
+
+    def test_logo_covering_episode(self):
+        assert is_static(parse_ass(make_ass([self.LOGO])), 1440.0)
+
+    def test_logo_shorter_than_episode(self):
+        assert not is_static(parse_ass(make_ass([self.LOGO])), 5 * 3600.0)
+
+    def test_animation_tags(self):
+        for tags in ("{\\fad(200,200)}", "{\\t(0,500,\\frz10)}", "{\\move(0,0,10,10)}", "{\\k20}"):
+            logo = self.LOGO.replace("{", tags + "{")
+            assert not is_static(parse_ass(make_ass([logo])), 1440.0), tags
+
+    def test_effect_field(self):
+        logo = self.LOGO.replace(",,{", ",Scroll up;10;100;20,{")
+        assert not is_static(parse_ass(make_ass([logo])), 1440.0)
+
+    def test_empty(self):
+        assert not is_static(parse_ass(make_ass([])), 1440.0)
+
+
+class TestReferencedFonts:
+    """Test referenced_fonts and embedded_fonts."""
+
+    def test_style_fonts_of_drawn_events(self):
+        header = HEADER.replace("Style: Sign,Arial,", "Style: Sign,Sign Font,") + "Style: Unused,Unused Font,10,&H0,0\n"
+        header = header.replace("[Events]", "Style: Vertical,@MS Gothic,10,&H0,0\n\n[Events]")
+        events = EVENTS + ["Dialogue: 0,0:07:00.00,0:07:02.00,Vertical,,0,0,0,,Tate"]
+
+        assert referenced_fonts(parse_ass(make_ass(events, header))) == {"Arial", "Sign Font", "MS Gothic"}
+
+    def test_overrides(self):
+        header = HEADER.replace("Style: Sign,Arial,", "Style: Sign,Sign Font,")
+        events = ["Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,{\\fnComic Sans\\b1}Shout{\\rSign} sign"]
+
+        assert referenced_fonts(parse_ass(make_ass(events, header))) == {"Arial", "Comic Sans", "Sign Font"}
+
+    def test_fonts_section_grouped(self):
+        text = make_ass() + "\n[Fonts]\nfontname: a.ttf\n;AB!!\nCD\nfontname: b.ttf\nEF\n"
+
+        assert embedded_fonts(parse_ass(text)) == {'a.ttf': [';AB!!', 'CD'], 'b.ttf': ['EF']}
+
+
+class TestMergeRanges:
+    """Test merge_ranges."""
+
+    def test_overlapping(self):
+        assert merge_ranges([TimeRange(5, 8), TimeRange(1, 6)]) == (TimeRange(1, 8),)
+
+    def test_gap(self):
+        ranges = [TimeRange(0, 2), TimeRange(4, 5), TimeRange(20, 21)]
+
+        assert merge_ranges(ranges, max_gap_sec=3.0) == (TimeRange(0, 5), TimeRange(20, 21))
+
+    def test_empty_ranges_dropped(self):
+        assert merge_ranges([TimeRange(3, 3)]) == ()
+
+
+class TestAssCache:
+    """Test the parsed subtitle cache."""
+
+    def test_same_contents_parsed_once(self, tmp_path):
+        first, second = tmp_path / "a.ass", tmp_path / "b.ass"
+        first.write_text(make_ass(), encoding='utf-8')
+        second.write_text(make_ass(), encoding='utf-8')
+        cache = AssCache()
+
+        assert cache.load(first) is cache.load(second)
+        assert len(cache) == 1
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = AssCache(max_entries=2)
+        for i in range(3):
+            path = tmp_path / f"{i}.ass"
+            path.write_text(make_ass(EVENTS[:i + 1]), encoding='utf-8')
+            cache.load(path)
+
+        assert len(cache) == 2
+
+
+class TestBurnedSubtitleCache:
+    """Test the record of subtitles burned into hardsubs."""
+
+    @pytest.fixture
+    def files(self, tmp_path):
+        raw, sub, output = tmp_path / "raw.mkv", tmp_path / "sub.ass", tmp_path / "ep.mp4"
+        raw.write_bytes(b"raw")
+        sub.write_text(make_ass(), encoding='utf-8')
+        output.write_bytes(b"hardsub")
+        return raw, sub, output
+
+    def test_previous_survives_overwritten_sub(self, files, tmp_path):
+        """The burned subtitles are kept even when the .ass is edited in place."""
+        raw, sub, output = files
+        BurnedSubtitleCache(tmp_path / "cache").record(raw, sub, output)
+        sub.write_text(make_ass(EVENTS[:1]), encoding='utf-8')
+
+        previous = BurnedSubtitleCache(tmp_path / "cache").previous(raw, output)
+
+        assert previous == parse_ass(make_ass())
+
+    def test_changed_output_invalidates(self, files, tmp_path):
+        raw, sub, output = files
+        cache = BurnedSubtitleCache(tmp_path / "cache")
+        cache.record(raw, sub, output)
+        output.write_bytes(b"re-encoded elsewhere")
+
+        assert cache.previous(raw, output) is None
+
+    def test_unknown_output(self, files, tmp_path):
+        raw, _, output = files
+
+        assert BurnedSubtitleCache(tmp_path / "cache").previous(raw, output) is None
+
+    def test_closed_gop_only_for_recorded_unchanged_output(self, files, tmp_path):
+        """Only a hardsub rendered here (closed GOPs) and unchanged since may be patched."""
+        raw, sub, output = files
+        cache = BurnedSubtitleCache(tmp_path / "cache")
+        assert not cache.closed_gop(output)
+
+        cache.record(raw, sub, output)
+        assert cache.closed_gop(output)
+
+        output.write_bytes(b"re-encoded elsewhere")
+        assert not cache.closed_gop(output)
@@ -0,0 +1,130 @@
+"""Tests for models/ass_merge.py and MergedAssCache - merging the logo into episode subtitles."""
+
+from models.ass import parse_ass
+from models.ass_merge import merge_logo
+from modules.ass_cache import MergedAssCache
+
+
+EPISODE = """[Script Info]
+PlayResX: 1920
+PlayResY: 1080
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, Outline, Alignment, MarginL, MarginR, MarginV
+Style: Default,Arial,48,&H00FFFFFF,2,2,10,10,40
+Style: Anibaza,Arial,30,&H00FFFFFF,1,9,0,0,0
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 1,0:00:10.00,0:00:12.50,Default,,0,0,0,,Hello, world
+"""
+
+
+def make_logo(play_res=(1920, 1080), style="Style: Anibaza,Arial,60,&H00FFFFFF,2,9,20,30,50", text="LOGO",
+              extra=""):
+    return f"""[Script Info]
+PlayResX: {play_res[0]}
+PlayResY: {play_res[1]}
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, Outline, Alignment, MarginL, MarginR, MarginV
+{style}
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 5,0:00:00.00,0:24:00.00,Anibaza,,0,0,0,,{text}
+{extra}"""
+
+
+def logo_events(merged: str):
+    return [event for event in parse_ass(merged).events if 'LOGO' in event.text]
+
+
+class TestMergeLogo:
+    def test_logo_inserted_first_on_layer_zero(self):
+        """Logo events come before episode events, on the bottom layer."""
+        merged = merge_logo(EPISODE, make_logo())
+
+        events = parse_ass(merged).events
+        assert [event.text for event in events][-1] == "Hello, world"
+        assert events[0].layer == 0 and 'LOGO' in events[0].text
+
+    def test_logo_positioned_explicitly(self):
+        """Alignment and margins become an explicit \\pos (top right here)."""
+        (event,) = logo_events(merge_logo(EPISODE, make_logo()))
+
+        assert event.text == "{\\pos(1890,50)}LOGO"
+
+    def test_existing_position_kept(self):
+        (event,) = logo_events(merge_logo(EPISODE, make_logo(text="{\\pos(100,200)}LOGO")))
+
+        assert event.text == "{\\pos(100,200)}LOGO"
+
+    def test_clashing_style_renamed(self):
+        """A logo style named like a different episode style is renamed."""
+        merged = merge_logo(EPISODE, make_logo())
+
+        assert "Style: Anibaza_logo,Arial,60,&H00FFFFFF,2,9,20,30,50" in merged
+        assert "Style: Anibaza,Arial,30,&H00FFFFFF,1,9,0,0,0" in merged
+        assert logo_events(merged)[0].style == "Anibaza_logo"
+
+    def test_identical_style_reused(self):
+        merged = merge_logo(EPISODE, make_logo(style="Style: Anibaza,Arial,30,&H00FFFFFF,1,9,0,0,0"))
+
+        assert merged.count("Style: Anibaza") == 1
+        assert logo_events(merged)[0].style == "Anibaza"
+
+    def test_play_res_rescaled(self):
+        """A 640x360 logo is scaled to the episode's 1920x1080."""
+        merged = merge_logo(EPISODE, make_logo(play_res=(640, 360), text="{\\pos(600,20)\\fs20\\bord1}LOGO"))
+
+        assert "Style: Anibaza_logo,Arial,180,&H00FFFFFF,6,9,60,90,150" in merged
+        assert logo_events(merged)[0].text == "{\\pos(1800,60)\\fs60\\bord3}LOGO"
+
+    def test_drawing_not_rescaled(self):
+        """Drawings cannot be rescaled faithfully; the caller keeps two filters."""
+        assert merge_logo(EPISODE, make_logo(play_res=(640, 360), text="{\\p1}m 0 0 l 10 10")) is None
+
+    def test_missing_play_res_not_merged(self):
+        logo = make_logo().replace("PlayResX: 1920\n", "")
+
+        assert merge_logo(EPISODE, logo) is None
+
+    def test_embedded_fonts_not_merged(self):
+        assert merge_logo(EPISODE, make_logo(extra="\n[Fonts]\nfontname: logo.ttf\n")) is None
+
+    def test_episode_untouched(self):
+        """Every episode line is kept as is."""
+        merged = merge_logo(EPISODE, make_logo())
+
+        for line in EPISODE.splitlines():
+            assert line in merged.splitlines()
+
+
+class TestMergedAssCache:
+    """Test the cache of merged subtitles."""
+
+    def test_same_contents_merged_once(self, tmp_path):
+        logo = tmp_path / "logo.ass"
+        logo.write_text(make_logo(), encoding='utf-8')
+        first, second = tmp_path / "a.ass", tmp_path / "b.ass"
+        first.write_text(EPISODE, encoding='utf-8')
+        second.write_text(EPISODE, encoding='utf-8')
+        cache = MergedAssCache()
+
+        assert cache.merged(first, logo) == cache.merged(second, logo) == merge_logo(EPISODE, make_logo())
+        assert len(cache) == 1
+
+    def test_changed_logo_merged_again(self, tmp_path):
+        logo, episode = tmp_path / "logo.ass", tmp_path / "episode.ass"
+        episode.write_text(EPISODE, encoding='utf-8')
+        logo.write_text(make_logo(), encoding='utf-8')
+        cache = MergedAssCache()
+        cache.merged(episode, logo)
+
+        logo.write_text(make_logo(text="NEW LOGO"), encoding='utf-8')
+
+        assert "NEW LOGO" in cache.merged(episode, logo)
+        assert len(cache) == 2
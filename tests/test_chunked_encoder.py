@@ -0,0 +1,62 @@
+"""Tests for modules/chunked_encoder.py - concurrent segment encodes."""
+
+import pytest
+
+from modules.chunked_encoder import ChunkedEncoder
+from tests.mocks.mock_process_runner import MockProcessRunner
+
+
+BLOCK = "frame={frame}\nout_time_us={us}\nspeed=2.0x\nprogress=end\n"
+
+
+class TestChunkedEncoder:
+    """Test ChunkedEncoder."""
+
+    def test_runs_every_segment(self):
+        """Each job is started once."""
+        runner = MockProcessRunner()
+        encoder = ChunkedEncoder(runner, workers=2)
+
+        encoder.run([['-i', 'a'], ['-i', 'b'], ['-i', 'c']], lambda sample: None)
+
+        assert sorted(runner.ffmpeg_calls) == [['-i', 'a'], ['-i', 'b'], ['-i', 'c']]
+
+    def test_progress_aggregated(self):
+        """Final sample sums progress of all segments."""
+        runner = MockProcessRunner()
+        runner.set_ffmpeg_output(0, BLOCK.format(frame=100, us=4_000_000))
+        runner.set_ffmpeg_output(1, BLOCK.format(frame=50, us=2_000_000))
+        samples = []
+
+        ChunkedEncoder(runner, workers=1).run([['a'], ['b']], samples.append)
+
+        assert samples[-1].frame == 150
+        assert samples[-1].out_time_sec == pytest.approx(6.0)
+        assert samples[-1].speed == pytest.approx(4.0)
+        assert samples[-1].finished
+
+    def test_failed_segment_raises(self, mocker):
+        """Non-zero exit code of a segment fails the encode."""
+        runner = MockProcessRunner()
+        original = runner.run_ffmpeg
+
+        def failing(args, cwd=None):
+            process = original(args, cwd)
+            process.returncode = 1
+            return process
+
+        mocker.patch.object(runner, 'run_ffmpeg', side_effect=failing)
+
+        with pytest.raises(RuntimeError, match="exit code 1"):
+            ChunkedEncoder(runner, workers=1).run([['a']], lambda sample: None)
+
+    def test_cancel_skips_pending_segments(self):
+        """Segments not yet started are skipped after cancel."""
+        runner = MockProcessRunner()
+        encoder = ChunkedEncoder(runner, workers=1)
+        encoder.cancel()
+
+        encoder.run([['a'], ['b']], lambda sample: None)
+
+        assert runner.ffmpeg_calls == []
+        assert encoder.cancelled
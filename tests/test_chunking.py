@@ -0,0 +1,50 @@
+"""Tests for models/chunking.py - keyframe-aligned segment planning."""
+
+from array import array
+
+import pytest
+
+from models.chunking import Segment, plan_segments
+from models.keyframe_index import KeyframeIndex
+
+
+class TestPlanSegments:
+    """Test plan_segments."""
+
+    KEYFRAMES = KeyframeIndex(array('d', range(0, 1440, 10)))
+
+    def test_even_split_on_keyframes(self):
+        """Boundaries snap to the keyframes nearest the ideal split points."""
+        segments = plan_segments(self.KEYFRAMES, 1440.0, 4)
+
+        assert [s.start_sec for s in segments] == [0.0, 360.0, 720.0, 1080.0]
+        assert segments[-1].end_sec == 1440.0
+        assert all(a.end_sec == b.start_sec for a, b in zip(segments, segments[1:]))
+
+    def test_only_last_segment_is_final(self):
+        """Last segment is marked final so it is not cut at the duration."""
+        segments = plan_segments(self.KEYFRAMES, 1440.0, 3)
+
+        assert [s.final for s in segments] == [False, False, True]
+        assert segments[1] == Segment(index=1, start_sec=480.0, end_sec=960.0)
+
+    def test_snaps_to_nearest_keyframe(self):
+        """Sparse keyframes move the boundary to the closest one."""
+        segments = plan_segments(KeyframeIndex(array('d', [0.0, 100.0, 130.0, 300.0])), 400.0, 2)
+
+        assert segments[1].start_sec == pytest.approx(130.0)
+
+    def test_short_segments_dropped(self):
+        """Raws too short to split stay in one segment."""
+        segments = plan_segments(self.KEYFRAMES, 50.0, 8, min_segment_sec=30.0)
+
+        assert len(segments) == 1
+        assert segments[0].final
+
+    def test_no_keyframes_single_segment(self):
+        """Without keyframes the raw cannot be split."""
+        assert plan_segments(KeyframeIndex(), 1440.0, 4) == [Segment(0, 0.0, 1440.0, final=True)]
+
+    def test_unknown_duration(self):
+        """Unknown duration yields no segments."""
+        assert plan_segments(self.KEYFRAMES, 0.0, 4) == []
@@ -0,0 +1,171 @@
+"""Tests for models/crf_search.py and modules/crf_search.py - quality-targeted CRF."""
+
+import re
+
+import pytest
+
+from models.crf_search import CrfSearchResult, parse_metric_score, plan_samples, search_crf
+from models.encoding import EncodingParams
+from models.ffmpeg_options import CodecOptions, FFmpegOptions, FilterOptions
+from models.job import VideoPresets
+from modules.crf_search import CrfSearch, CrfSearchCache, search_settings_key
+from tests.mocks.mock_process_runner import MockProcess, MockProcessRunner
+
+
+class TestPlanSamples:
+    """Test plan_samples window placement."""
+
+    def test_windows_centred_in_equal_slices(self):
+        """Each window sits in the middle of its slice."""
+        samples = plan_samples(100.0, 5, 4.0)
+
+        assert [s.start_sec for s in samples] == [8.0, 28.0, 48.0, 68.0, 88.0]
+        assert all(s.duration_sec == pytest.approx(4.0) for s in samples)
+        assert not any(s.final for s in samples)
+
+    def test_short_raw_shrinks_windows(self):
+        """Windows never overlap when the raw is short."""
+        samples = plan_samples(10.0, 5, 4.0)
+
+        assert [s.duration_sec for s in samples] == pytest.approx([2.0] * 5)
+        assert all(a.end_sec <= b.start_sec for a, b in zip(samples, samples[1:]))
+
+    def test_too_short_raw(self):
+        """Raws shorter than one sample are not sampled."""
+        assert plan_samples(3.0, 5, 4.0) == []
+        assert plan_samples(0.0, 5, 4.0) == []
+
+
+class TestParseMetricScore:
+    """Test parsing the ssim/psnr summary lines."""
+
+    def test_ssim(self):
+        lines = [
+            "frame=  96 fps=0.0 q=-0.0 Lsize=N/A",
+            "[Parsed_ssim_0 @ 0x55d] SSIM Y:0.991 (20.4) U:0.995 (23.1) V:0.994 (22.6) All:0.9925 (21.2)",
+        ]
+        assert parse_metric_score(lines, 'ssim') == pytest.approx(0.9925)
+
+    def test_psnr(self):
+        lines = ["[Parsed_psnr_0 @ 0x55d] PSNR y:44.10 u:47.20 v:46.90 average:45.01 min:38.2 max:52.0"]
+        assert parse_metric_score(lines, 'psnr') == pytest.approx(45.01)
+
+    def test_identical_frames_psnr(self):
+        lines = ["[Parsed_psnr_0 @ 0x55d] PSNR y:inf u:inf v:inf average:inf min:inf max:inf"]
+        assert parse_metric_score(lines, 'psnr') == float('inf')
+
+    def test_missing_summary(self):
+        assert parse_metric_score(["Conversion failed!"], 'ssim') is None
+
+
+class TestSearchCrf:
+    """Test the binary search over candidate CRFs."""
+
+    def test_picks_highest_crf_meeting_target(self):
+        """Cheapest CRF whose score meets the target wins."""
+        scores = {16: 0.995, 18: 0.992, 20: 0.988, 22: 0.984, 24: 0.979, 26: 0.972}
+
+        result = search_crf(list(scores), scores.__getitem__, 0.985)
+
+        assert result == CrfSearchResult(crf=20, score=0.988, met_target=True)
+
+    def test_measures_few_candidates(self):
+        """Binary search measures about log2(n) candidates."""
+        measured = []
+
+        def measure(crf):
+            measured.append(crf)
+            return 1.0 - crf / 1000
+
+        search_crf([16, 18, 20, 22, 24, 26], measure, 0.979)
+
+        assert len(measured) <= 3
+
+    def test_no_candidate_meets_target(self):
+        """Falls back to the lowest CRF when the target is unreachable."""
+        result = search_crf([20, 16, 18], lambda crf: 0.9, 0.99)
+
+        assert result == CrfSearchResult(crf=16, score=0.9, met_target=False)
+
+
+def _score_for(crf: int) -> float:
+    """Synthetic SSIM falling with CRF."""
+    return round(1.0 - crf * 0.0007, 4)
+
+
+class ScoringRunner(MockProcessRunner):
+    """Runner answering quality measurements with a CRF-dependent SSIM."""
+
+    def run_ffmpeg(self, args, cwd=None):
+        process = super().run_ffmpeg(args, cwd)
+        if '-lavfi' in args:
+            crf = int(re.search(r'crf(\d+)', args[args.index('-i') + 1]).group(1))
+            return MockProcess(f"[Parsed_ssim_0 @ 0x1] SSIM Y:1 U:1 V:1 All:{_score_for(crf)} (20.0)\n")
+        return process
+
+
+@pytest.fixture
+def options(mock_render_paths, tmp_path):
+    """Softsub options with burned subtitles."""
+    return FFmpegOptions(
+        paths=mock_render_paths,
+        codecs=CodecOptions(video_codec='libx264'),
+        encoding=EncodingParams("6M", "9M", "18M", 18, 19, 17, 23),
+        video=VideoPresets.SOFTSUB,
+        filters=FilterOptions(subtitle_path=tmp_path / "sub.ass")
+    )
+
+
+class TestCrfSearch:
+    """Test CrfSearch with a mocked ffmpeg."""
+
+    def test_encodes_samples_and_picks_crf(self, options, tmp_path):
+        """Samples are encoded without filters and the cheapest passing CRF is returned."""
+        runner = ScoringRunner()
+
+        result = CrfSearch(runner, tmp_path / "temp").run(options, 1200.0, target=0.985)
+
+        # 1 - 20 * 0.0007 = 0.986 passes, 1 - 22 * 0.0007 = 0.9846 does not
+        assert result == CrfSearchResult(crf=20, score=0.986, met_target=True)
+        encodes = [args for args in runner.ffmpeg_calls if '-lavfi' not in args]
+        assert encodes
+        assert all('-vf' not in args for args in encodes)
+        assert any(args[args.index('-crf') + 1] == '20' for args in encodes)
+        assert not list((tmp_path / "temp").iterdir())  # Work dir removed
+
+    def test_failed_sample_raises(self, options, tmp_path):
+        """A failing sample encode aborts the search."""
+        runner = MockProcessRunner()
+        failed = MockProcess()
+        failed.returncode = 1
+        runner.run_ffmpeg = lambda args, cwd=None: failed
+
+        with pytest.raises(RuntimeError):
+            CrfSearch(runner, tmp_path / "temp").run(options, 1200.0)
+
+    def test_short_raw_not_searched(self, options, tmp_path):
+        """Nothing is encoded for raws too short to sample."""
+        runner = ScoringRunner()
+
+        assert CrfSearch(runner, tmp_path / "temp").run(options, 2.0) is None
+        assert runner.ffmpeg_calls == []
+
+    def test_result_cached_per_raw(self, options, tmp_path):
+        """A second search of the same raw reuses the cached result."""
+        cache = CrfSearchCache(tmp_path / "cache")
+        CrfSearch(ScoringRunner(), tmp_path / "temp").run(options, 1200.0, cache=cache)
+        runner = ScoringRunner()
+
+        result = CrfSearch(runner, tmp_path / "temp").run(options, 1200.0, cache=CrfSearchCache(tmp_path / "cache"))
+
+        assert result.crf == 20
+        assert runner.ffmpeg_calls == []
+
+    def test_cache_keyed_by_settings(self, options, tmp_path):
+        """Changing the target invalidates the cached result."""
+        cache = CrfSearchCache(tmp_path / "cache")
+        result = CrfSearchResult(crf=22, score=0.98, met_target=True)
+        cache.put(options.paths.raw, search_settings_key(options, 'ssim', 0.98, [20, 22]), result)
+
+        assert cache.get(options.paths.raw, search_settings_key(options, 'ssim', 0.98, [22, 20])) == result
+        assert cache.get(options.paths.raw, search_settings_key(options, 'ssim', 0.99, [20, 22])) is None
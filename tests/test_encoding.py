@@ -0,0 +1,188 @@
+"""Tests for models/encoding.py - bitrate model."""
+
+from models.encoding import (
+    AudioPlan, EncodingDefaults, EncodingParams, can_copy_video, estimate_encoding_params, plan_audio,
+    with_crf
+)
+from models.job import VideoSettings
+from models.video_info import StreamInfo, VideoInfo
+
+
+def _info(height, width=None, bit_rate=0, size_bytes=0, duration=1440.0, fps=24000 / 1001, audio=()):
+    return VideoInfo(
+        duration_seconds=duration,
+        resolution=f"{height}p",
+        width=width or height * 16 // 9,
+        height=height,
+        frame_rate=fps,
+        bit_rate=bit_rate,
+        size_bytes=size_bytes,
+        audio_streams=audio,
+    )
+
+
+def _kbps(value: str) -> int:
+    return int(value.rstrip('k'))
+
+
+class TestEstimateEncodingParams:
+    """Test estimate_encoding_params."""
+
+    def test_bits_per_pixel_budget(self):
+        """High-bitrate 1080p source gets the bits-per-pixel budget."""
+        params = estimate_encoding_params(_info(1080, 1920, bit_rate=20_000_000))
+
+        expected = int(1920 * 1080 * 24000 / 1001 * EncodingDefaults.BITS_PER_PIXEL / 1000)
+        assert _kbps(params.avg_bitrate) == expected
+        assert abs(_kbps(params.max_bitrate) - expected * EncodingDefaults.MAXRATE_RATIO) <= 1
+
+    def test_720p_smaller_than_1080p(self):
+        """720p is provisioned well below 1080p."""
+        p720 = estimate_encoding_params(_info(720, bit_rate=20_000_000))
+        p1080 = estimate_encoding_params(_info(1080, bit_rate=20_000_000))
+
+        assert _kbps(p720.avg_bitrate) < _kbps(p1080.avg_bitrate) / 2
+        assert _kbps(p720.buffer_size) < _kbps(p1080.buffer_size)
+
+    def test_4k_cap_above_1080p(self):
+        """4K sources are no longer capped at the 1080p bitrate."""
+        params = estimate_encoding_params(_info(2160, 3840, bit_rate=60_000_000))
+
+        assert _kbps(params.avg_bitrate) > 6000
+        assert _kbps(params.avg_bitrate) <= 20000
+        assert params.crf == EncodingDefaults.CRF_1080P
+
+    def test_never_above_source_video_bitrate(self):
+        """Low-bitrate sources are not inflated; audio is excluded."""
+        audio = (StreamInfo(index=1, bit_rate=192_000),)
+        params = estimate_encoding_params(_info(1080, bit_rate=2_192_000, audio=audio))
+
+        assert params.avg_bitrate == "2000k"
+
+    def test_size_used_without_container_bitrate(self):
+        """Size / duration stands in for a missing container bitrate."""
+        params = estimate_encoding_params(_info(1080, size_bytes=250_000 * 1440))
+
+        assert params.avg_bitrate == "2000k"
+
+    def test_target_size(self):
+        """Target size sets the budget (minus the audio track)."""
+        target = 300 * 1024 * 1024
+        params = estimate_encoding_params(_info(1080, bit_rate=20_000_000), target_size_bytes=target)
+
+        expected = int(target * 8 / 1440 / 1000 - 320)
+        assert _kbps(params.avg_bitrate) == expected
+
+    def test_large_target_size_above_caps(self):
+        """A large target size is not clamped by the resolution cap or the source bitrate."""
+        target = 4 * 1024 * 1024 * 1024
+        params = estimate_encoding_params(_info(720, bit_rate=3_000_000), potato=True, target_size_bytes=target)
+
+        expected = int(target * 8 / 1440 / 1000 - 320)
+        assert expected > EncodingDefaults.BITRATE_CAPS_KBPS[1][1]
+        assert _kbps(params.avg_bitrate) == expected
+
+    def test_small_target_size_below_floor(self):
+        """A small target size goes below the source floor, down to the target floor."""
+        small = 100 * 1024 * 1024
+        tiny = 10 * 1024 * 1024
+
+        params = estimate_encoding_params(_info(1080), target_size_bytes=small)
+        floored = estimate_encoding_params(_info(1080), target_size_bytes=tiny)
+
+        assert _kbps(params.avg_bitrate) == int(small * 8 / 1440 / 1000 - 320)
+        assert _kbps(params.avg_bitrate) < EncodingDefaults.MIN_BITRATE_KBPS
+        assert _kbps(floored.avg_bitrate) == EncodingDefaults.MIN_TARGET_BITRATE_KBPS
+
+    def test_potato_halves_bitrate(self):
+        """Potato mode halves the bitrate and uses potato quantizers."""
+        normal = estimate_encoding_params(_info(1080, bit_rate=20_000_000))
+        potato = estimate_encoding_params(_info(1080, bit_rate=20_000_000), potato=True)
+
+        assert abs(_kbps(potato.avg_bitrate) - _kbps(normal.avg_bitrate) / 2) <= 1
+        assert (potato.crf, potato.cq) == (EncodingDefaults.CRF_POTATO, EncodingDefaults.CQ_POTATO)
+
+    def test_unknown_source_floor(self):
+        """Unknown metadata still yields a usable bitrate."""
+        params = estimate_encoding_params(VideoInfo())
+
+        assert _kbps(params.avg_bitrate) >= EncodingDefaults.MIN_BITRATE_KBPS
+        assert (params.crf, params.cq) == (EncodingDefaults.CRF_SD, EncodingDefaults.CQ_SD)
+
+
+class TestWithCrf:
+    """Test with_crf."""
+
+    def test_updates_quantizers_together(self):
+        """CQ and its range follow the new CRF; bitrates are kept."""
+        params = with_crf(EncodingParams("6M", "9M", "18M", 18, 19, 17, 23), 22)
+
+        assert (params.crf, params.cq) == (22, 22 + EncodingDefaults.CQ_OFFSET)
+        assert params.qmin == params.cq - EncodingDefaults.QMIN_OFFSET
+        assert params.qmax == params.cq + EncodingDefaults.QMAX_OFFSET
+        assert params.max_bitrate == "9M"
+
+
+class TestPlanAudio:
+    """Test plan_audio."""
+
+    def test_flac_master_transcoded_and_resampled(self):
+        info = VideoInfo(audio_streams=(StreamInfo(0, 'flac', channels=2, sample_rate=44100),))
+
+        assert plan_audio(info) == AudioPlan(transcode=True, resample=True)
+
+    def test_wav_at_delivery_rate_not_resampled(self):
+        info = VideoInfo(audio_streams=(StreamInfo(0, 'pcm_s24le', channels=2, sample_rate=48000),))
+
+        assert plan_audio(info) == AudioPlan(transcode=True, resample=False)
+
+    def test_deliverable_aac_passed_through(self):
+        info = VideoInfo(audio_streams=(StreamInfo(0, 'aac', channels=2, sample_rate=48000, bit_rate=256_000),))
+
+        assert plan_audio(info) == AudioPlan(transcode=False, resample=False)
+
+    def test_high_bitrate_aac_transcoded(self):
+        info = VideoInfo(audio_streams=(StreamInfo(0, 'aac', channels=2, sample_rate=48000, bit_rate=640_000),))
+
+        assert plan_audio(info).transcode
+
+    def test_aac_of_unknown_bitrate_transcoded(self):
+        """ffprobe reporting no bitrate (0) does not count as within the delivery bitrate."""
+        info = VideoInfo(audio_streams=(StreamInfo(0, 'aac', channels=2, sample_rate=48000),))
+
+        assert plan_audio(info) == AudioPlan(transcode=True, resample=False)
+
+    def test_unknown_input(self):
+        """Unprobed inputs are transcoded and resampled."""
+        assert plan_audio(None) == AudioPlan(transcode=True, resample=True)
+
+
+class TestCanCopyVideo:
+    """Test can_copy_video."""
+
+    SOFTSUB_8BIT = VideoSettings(video_profile="high", pixel_format="yuv420p")
+
+    def _raw(self, codec='h264', pix_fmt='yuv420p', profile='high', bit_rate=4_000_000):
+        return VideoInfo(duration_seconds=1440.0, codec_name=codec, source_pixel_format=pix_fmt,
+                         video_profile=profile, width=1920, height=1080, bit_rate=bit_rate)
+
+    def test_compatible_h264(self):
+        assert can_copy_video(self._raw(), self.SOFTSUB_8BIT)
+
+    def test_main_profile_fits_high(self):
+        assert can_copy_video(self._raw(profile='main'), self.SOFTSUB_8BIT)
+
+    def test_other_codec(self):
+        assert not can_copy_video(self._raw(codec='hevc'), self.SOFTSUB_8BIT)
+
+    def test_pixel_format_mismatch(self):
+        assert not can_copy_video(self._raw(pix_fmt='yuv420p10le', profile='high10'), self.SOFTSUB_8BIT)
+
+    def test_over_bitrate_budget(self):
+        assert not can_copy_video(self._raw(bit_rate=40_000_000), self.SOFTSUB_8BIT)
+
+    def test_unknown_bitrate(self):
+        assert not can_copy_video(self._raw(bit_rate=0), self.SOFTSUB_8BIT)
+
+    def test_unknown_profile(self):
+        assert not can_copy_video(self._raw(profile=None), self.SOFTSUB_8BIT)
@@ -1,13 +1,21 @@
 """Tests for modules/ffmpeg_builder.py."""
 
+from dataclasses import replace
 from pathlib import Path
 
 from models.encoding import EncodingParams, EncodingDefaults
 from models.ffmpeg_options import (
-    CodecOptions, FFmpegOptions, FilterOptions, StreamMapping
+    CodecOptions, FFmpegOptions, FilterOptions, MultiOutputOptions, StreamMapping
 )
 from models.job import VideoPresets
-from modules.ffmpeg_builder import build_ffmpeg_args
+from models.chunking import Segment
+from models.patching import PatchPiece
+from modules.ffmpeg_builder import (
+    build_audio_transcode_args, build_concat_list, build_patch_concat_list, build_patch_splice_args, build_ffmpeg_args, build_ffprobe_args, build_keyframe_probe_args, build_logo_render_args,
+    build_attachment_dump_args, build_font_warmup_args,
+    build_multi_output_args, build_multi_output_segment_args, build_quality_metric_args,
+    build_segment_args, build_segment_concat_args, build_subtitle_remux_args, progress_args
+)
 
 
 class TestFFmpegBuilder:
@@ -62,6 +70,7 @@ class TestFFmpegBuilder:
         assert '-qmax' in args
         assert '-crf' not in args  # CRF not used with NVENC
         assert str(mock_render_paths.hardsub) in args
+        assert args[args.index('-flags') + 1] == '+cgop'  # Closed GOPs keep the hardsub patchable
 
     def test_build_with_logo_filter(self, mock_render_paths, tmp_path):
         """Builds command with logo burning filter."""
@@ -316,3 +325,527 @@ class TestFFmpegBuilder:
         assert 'language=jap' in args
         assert 'title=AniBaza' in args
         assert 'language=rus' in args
+
+    def test_build_requests_progress_pipe(self, mock_render_paths):
+        """Builds command with machine-readable progress and no stats line."""
+        encoding = EncodingParams("6M", "9M", "18M", 18, 19, 17, 23)
+
+        options = FFmpegOptions(
+            paths=mock_render_paths,
+            codecs=CodecOptions(video_codec='libx264'),
+            encoding=encoding,
+            video=VideoPresets.SOFTSUB,
+            filters=FilterOptions(),
+            stats_period=2.0
+        )
+
+        args = build_ffmpeg_args(options)
+
+        assert args[args.index('-progress') + 1] == 'pipe:1'
+        assert '-nostats' in args
+        assert args[args.index('-stats_period') + 1] == '2'
+        # Global options come before the first input
+        assert args.index('-progress') < args.index('-i')
+
+    def test_progress_args_default_period(self):
+        """progress_args uses the default stats period."""
+        args = progress_args()
+
+        assert args[args.index('-stats_period') + 1] == f'{EncodingDefaults.PROGRESS_STATS_PERIOD:g}'
+
+
+class TestFFprobeArgs:
+    """Test build_ffprobe_args."""
+
+    def test_json_probe_args(self, tmp_path):
+        """Probe requests JSON streams and format."""
+        args = build_ffprobe_args(tmp_path / "raw.mkv")
+
+        assert args[args.index('-print_format') + 1] == 'json'
+        assert '-show_streams' in args
+        assert '-show_format' in args
+        assert '-count_packets' not in args
+        assert args[-1] == str(tmp_path / "raw.mkv")
+
+    def test_count_packets_optional(self, tmp_path):
+        """Packet counting is only requested when asked."""
+        args = build_ffprobe_args(tmp_path / "raw.mkv", count_packets=True)
+
+        assert '-count_packets' in args
+        assert args[-1] == str(tmp_path / "raw.mkv")
+
+
+class TestMultiOutputBuilder:
+    """Test build_multi_output_args single-decode command."""
+
+    def _options(self, paths, soft_logo=None, hard_logo=None, hard_sub=None):
+        encoding = EncodingParams("6M", "9M", "18M", 18, 19, 17, 23)
+        soft = FFmpegOptions(
+            paths=paths,
+            codecs=CodecOptions(video_codec='libx264'),
+            encoding=encoding,
+            video=VideoPresets.SOFTSUB,
+            filters=FilterOptions(logo_path=soft_logo),
+            include_audio=True,
+            include_subtitles=True
+        )
+        hard = FFmpegOptions(
+            paths=paths,
+            codecs=CodecOptions(video_codec='hevc'),
+            encoding=encoding,
+            video=VideoPresets.HARDSUB,
+            filters=FilterOptions(logo_path=hard_logo, subtitle_path=hard_sub),
+            streams=StreamMapping(subtitle_input_index=None),
+            include_audio=True,
+            include_subtitles=False
+        )
+        return MultiOutputOptions(softsub=soft, hardsub=hard)
+
+    def test_raw_is_read_once(self, mock_render_paths):
+        """Raw video is a single input feeding both outputs."""
+        args = build_multi_output_args(self._options(mock_render_paths))
+
+        assert args.count(str(mock_render_paths.raw)) == 1
+        assert args.count('-progress') == 1
+        assert str(mock_render_paths.softsub) in args
+        assert str(mock_render_paths.hardsub) in args
+        assert args[-1] == str(mock_render_paths.hardsub)
+
+    def test_split_graph_labels_mapped(self, mock_render_paths):
+        """Filter graph splits video and each output maps its branch."""
+        args = build_multi_output_args(self._options(mock_render_paths))
+
+        graph = args[args.index('-filter_complex') + 1]
+        assert 'split=2' in graph
+        assert '[vsoft]' in graph and '[vhard]' in graph
+        assert '-vf' not in args
+
+        soft_end = args.index(str(mock_render_paths.softsub))
+        assert args[args.index('-map') + 1] == '[vsoft]'
+        assert '[vhard]' in args[soft_end:]
+
+    def test_per_output_codecs(self, mock_render_paths):
+        """Each output keeps its own encoder and pixel format."""
+        args = build_multi_output_args(self._options(mock_render_paths))
+
+        codecs = [args[i + 1] for i, a in enumerate(args) if a == '-c:v']
+        assert codecs == ['libx264', 'hevc']
+        pix_fmts = [args[i + 1] for i, a in enumerate(args) if a == '-pix_fmt']
+        assert pix_fmts == [VideoPresets.SOFTSUB.pixel_format, VideoPresets.HARDSUB.pixel_format]
+
+    def test_subtitle_stream_only_in_softsub(self, mock_render_paths):
+        """Softsub copies the subtitle stream, hardsub does not."""
+        args = build_multi_output_args(self._options(mock_render_paths))
+
+        soft_end = args.index(str(mock_render_paths.softsub))
+        assert '-c:s' in args[:soft_end]
+        assert '-c:s' not in args[soft_end:]
+        assert '2:s' not in args[soft_end:]
+
+    def test_shared_logo_rendered_before_split(self, mock_render_paths, tmp_path):
+        """Same logo on both outputs is burned once before the split."""
+        logo = tmp_path / "logo.ass"
+        sub = tmp_path / "sub.ass"
+        args = build_multi_output_args(self._options(
+            mock_render_paths, soft_logo=logo, hard_logo=logo, hard_sub=sub
+        ))
+
+        graph = args[args.index('-filter_complex') + 1]
+        assert graph.count('logo.ass') == 1
+        assert graph.index('logo.ass') < graph.index('split=2')
+        assert graph.split(';')[2].startswith('[hard_in]subtitles=')
+        assert graph.split(';')[1] == '[soft_in]null[vsoft]'
+
+    def test_logo_only_in_hardsub(self, mock_render_paths, tmp_path):
+        """Logo burned only into hardsub stays in the hardsub branch."""
+        logo = tmp_path / "logo.ass"
+        sub = tmp_path / "sub.ass"
+        args = build_multi_output_args(self._options(
+            mock_render_paths, hard_logo=logo, hard_sub=sub
+        ))
+
+        graph = args[args.index('-filter_complex') + 1]
+        head, soft_branch, hard_branch = graph.split(';')
+        assert head == '[0:v:0]split=2[soft_in][hard_in]'
+        assert 'logo.ass' not in soft_branch
+        assert hard_branch.count('subtitles=') == 2
+
+
+    def test_shared_logo_overlay_before_split(self, mock_render_paths, tmp_path):
+        """A pre-rendered logo shared by both outputs is composited once before the split."""
+        options = self._options(mock_render_paths, hard_sub=tmp_path / "sub.ass")
+        overlay = FilterOptions(logo_overlay=tmp_path / "logo.png")
+        options = MultiOutputOptions(
+            softsub=replace(options.softsub, filters=overlay),
+            hardsub=replace(options.hardsub, filters=replace(options.hardsub.filters, logo_overlay=tmp_path / "logo.png"))
+        )
+
+        graph = build_multi_output_args(options)[build_multi_output_args(options).index('-filter_complex') + 1]
+
+        assert graph.count('logo.png') == 1
+        assert '[0:v:0][sharedlogo]overlay=format=auto,split=2[soft_in][hard_in]' in graph
+        assert graph.endswith("[hard_in]subtitles='" + str(tmp_path / "sub.ass") + "'[vhard]")
+
+    def test_shared_logo_keeps_fonts_dir(self, mock_render_paths, tmp_path):
+        """Splitting the logo off keeps the fonts directory on both sides of the split."""
+        logo, fonts = tmp_path / "logo.ass", tmp_path / "fonts"
+        options = self._options(mock_render_paths, soft_logo=logo, hard_logo=logo, hard_sub=tmp_path / "sub.ass")
+        options = MultiOutputOptions(
+            softsub=replace(options.softsub, filters=replace(options.softsub.filters, fonts_dir=fonts)),
+            hardsub=replace(options.hardsub, filters=replace(options.hardsub.filters, fonts_dir=fonts))
+        )
+
+        args = build_multi_output_args(options)
+
+        graph = args[args.index('-filter_complex') + 1]
+        assert graph.count(f":fontsdir='{fonts}'") == 2
+
+
+class TestChunkedBuilder:
+    """Test segment, concat and keyframe probe builders."""
+
+    def _options(self, paths, logo=None, sub=None, include_subtitles=True):
+        return FFmpegOptions(
+            paths=paths,
+            codecs=CodecOptions(video_codec='libx264'),
+            encoding=EncodingParams("6M", "9M", "18M", 18, 19, 17, 23),
+            video=VideoPresets.SOFTSUB,
+            filters=FilterOptions(logo_path=logo, subtitle_path=sub),
+            include_audio=True,
+            include_subtitles=include_subtitles
+        )
+
+    def test_segment_encodes_video_only(self, mock_render_paths, tmp_path):
+        """Segment command seeks, cuts and maps only the video stream."""
+        out = tmp_path / "seg.mkv"
+        args = build_segment_args(self._options(mock_render_paths), Segment(1, 360.0, 720.0), out)
+
+        assert args[args.index('-ss') + 1] == '360.000000'
+        assert args.index('-ss') < args.index('-i')
+        assert args[args.index('-t') + 1] == '360.000000'
+        assert args[args.index('-map') + 1] == '0:v:0'
+        assert str(mock_render_paths.audio) not in args
+        assert '-c:a' not in args
+        assert args[-1] == str(out)
+
+    def test_first_and_final_segments(self, mock_render_paths, tmp_path):
+        """First segment does not seek; final segment runs to the end."""
+        options = self._options(mock_render_paths)
+
+        first = build_segment_args(options, Segment(0, 0.0, 360.0), tmp_path / "0.mkv")
+        last = build_segment_args(options, Segment(3, 1080.0, 1440.0, final=True), tmp_path / "3.mkv")
+
+        assert '-ss' not in first
+        assert '-t' not in last
+
+    def test_segment_shifts_burned_subtitles(self, mock_render_paths, tmp_path):
+        """Burned subtitles are rendered at the segment's episode time."""
+        options = self._options(mock_render_paths, sub=tmp_path / "sub.ass", include_subtitles=False)
+
+        args = build_segment_args(options, Segment(2, 720.5, 1080.0), tmp_path / "2.mkv")
+
+        vf = args[args.index('-vf') + 1]
+        assert vf.startswith('setpts=PTS+720.500000/TB,subtitles=')
+        assert vf.endswith(',setpts=PTS-STARTPTS')
+
+    def test_segment_shifts_before_logo_overlay(self, mock_render_paths, tmp_path):
+        """The shifted video is labeled so it can feed the logo overlay."""
+        options = replace(self._options(mock_render_paths),
+                          filters=FilterOptions(logo_overlay=tmp_path / "logo.png"))
+
+        args = build_segment_args(options, Segment(2, 720.5, 1080.0), tmp_path / "2.mkv")
+
+        vf = args[args.index('-vf') + 1]
+        assert '[in]setpts=PTS+720.500000/TB[main];[main][logo]overlay=format=auto,setpts=PTS-STARTPTS' in vf
+
+    def test_first_segment_filters_unshifted(self, mock_render_paths, tmp_path):
+        """Segment at zero uses the plain filter chain."""
+        options = self._options(mock_render_paths, logo=tmp_path / "logo.ass")
+
+        args = build_segment_args(options, Segment(0, 0.0, 360.0), tmp_path / "0.mkv")
+
+        assert args[args.index('-vf') + 1] == options.filters.to_filter_string()
+
+    def test_multi_output_segment(self, mock_render_paths, tmp_path):
+        """Combined segment writes both branches with shifted timestamps."""
+        soft = self._options(mock_render_paths)
+        hard = FFmpegOptions(
+            paths=mock_render_paths,
+            codecs=CodecOptions(video_codec='hevc'),
+            encoding=soft.encoding,
+            video=VideoPresets.HARDSUB,
+            filters=FilterOptions(subtitle_path=tmp_path / "sub.ass"),
+            include_subtitles=False
+        )
+        args = build_multi_output_segment_args(
+            MultiOutputOptions(softsub=soft, hardsub=hard),
+            Segment(1, 300.0, 600.0), tmp_path / "s.mkv", tmp_path / "h.mkv"
+        )
+
+        graph = args[args.index('-filter_complex') + 1]
+        assert graph.startswith('[0:v:0]setpts=PTS+300.000000/TB,split=2')
+        assert graph.split(';')[1] == '[soft_in]null,setpts=PTS-STARTPTS[vsoft]'
+        assert args.count('-t') == 2
+        assert args[-1] == str(tmp_path / "h.mkv")
+
+    def test_concat_list_escapes_quotes(self, tmp_path):
+        """List file quotes each path for the concat demuxer."""
+        content = build_concat_list([Path("/tmp/a.mkv"), Path("/tmp/it's.mkv")])
+
+        assert content == "file '/tmp/a.mkv'\nfile '/tmp/it'\\''s.mkv'\n"
+
+    def test_concat_muxes_audio_once(self, mock_render_paths, tmp_path):
+        """Concat copies video and adds audio/subtitles to the final file."""
+        list_path = tmp_path / "segments.txt"
+        args = build_segment_concat_args(self._options(mock_render_paths), list_path, mock_render_paths.softsub)
+
+        assert args[args.index('-f') + 1] == 'concat'
+        assert args[args.index('-i') + 1] == str(list_path)
+        assert str(mock_render_paths.raw) not in args
+        assert str(mock_render_paths.audio) in args
+        assert args[args.index('-c:v') + 1] == 'copy'
+        assert args[args.index('-c:a') + 1] == EncodingDefaults.AUDIO_CODEC
+        assert '-c:s' in args
+        assert args[-1] == str(mock_render_paths.softsub)
+
+    def test_keyframe_probe_args(self, tmp_path):
+        """Keyframe probe lists packet flags of the first video stream."""
+        args = build_keyframe_probe_args(tmp_path / "raw.mkv")
+
+        assert args[args.index('-show_entries') + 1] == 'packet=pts_time,flags'
+        assert args[args.index('-select_streams') + 1] == 'v:0'
+        assert args[-1] == str(tmp_path / "raw.mkv")
+
+
+class TestSharedAudioBuilder:
+    """Test the one-time audio encode and stream-copying it into outputs."""
+
+    def test_transcode_resamples(self, tmp_path):
+        """Audio is encoded to the delivery AAC and resampled when asked."""
+        args = build_audio_transcode_args(tmp_path / "master.flac", tmp_path / "audio.mka")
+
+        assert args[args.index('-i') + 1] == str(tmp_path / "master.flac")
+        assert args[args.index('-c:a') + 1] == EncodingDefaults.AUDIO_CODEC
+        assert args[args.index('-b:a') + 1] == EncodingDefaults.AUDIO_BITRATE
+        assert args[args.index('-ar') + 1] == str(EncodingDefaults.AUDIO_SAMPLE_RATE)
+        assert '-vn' in args
+        assert args[-1] == str(tmp_path / "audio.mka")
+
+    def test_transcode_without_resample(self, tmp_path):
+        """Inputs already at the delivery rate are not resampled."""
+        args = build_audio_transcode_args(tmp_path / "master.wav", tmp_path / "audio.mka", resample=False)
+
+        assert '-ar' not in args
+
+    def test_outputs_copy_preencoded_audio(self, mock_render_paths):
+        """Outputs stream-copy audio instead of encoding it."""
+        options = FFmpegOptions(
+            paths=mock_render_paths,
+            codecs=CodecOptions(video_codec='libx264', audio_codec='copy'),
+            encoding=EncodingParams("6M", "9M", "18M", 18, 19, 17, 23),
+            video=VideoPresets.SOFTSUB,
+            filters=FilterOptions()
+        )
+
+        args = build_ffmpeg_args(options)
+
+        assert args[args.index('-c:a') + 1] == 'copy'
+        assert '-b:a' not in args
+        assert '-ar' not in args
+
+
+class TestVideoCopyBuilder:
+    """Test the softsub remux fast path."""
+
+    def test_copy_skips_rate_control(self, mock_render_paths):
+        """Copied video gets no encoder options; other tracks are still muxed."""
+        options = FFmpegOptions(
+            paths=mock_render_paths,
+            codecs=CodecOptions(video_codec='copy'),
+            encoding=EncodingParams("6M", "9M", "18M", 18, 19, 17, 23),
+            video=VideoPresets.SOFTSUB,
+            filters=FilterOptions()
+        )
+
+        args = build_ffmpeg_args(options)
+
+        assert args[args.index('-c:v') + 1] == 'copy'
+        for flag in ('-crf', '-b:v', '-preset', '-profile:v', '-pix_fmt', '-vf'):
+            assert flag not in args
+        assert str(mock_render_paths.audio) in args
+        assert str(mock_render_paths.sub) in args
+        assert args[-1] == str(mock_render_paths.softsub)
+
+
+class TestSubtitleRemuxBuilder:
+    """Test the subtitle-only re-release remux."""
+
+    def test_replaces_subtitles_and_copies_the_rest(self, tmp_path):
+        """Old subtitle streams are dropped, everything is stream-copied."""
+        previous = tmp_path / "ep01.mkv"
+        sub = tmp_path / "v2.ass"
+        out = tmp_path / "ep01.remux.mkv"
+
+        args = build_subtitle_remux_args(previous, sub, out)
+
+        assert args[args.index('-i') + 1] == str(previous)
+        assert str(sub) in args
+        maps = [args[i + 1] for i, arg in enumerate(args) if arg == '-map']
+        assert maps == ['0', '-0:s', '1:s']
+        assert args[args.index('-c') + 1] == 'copy'
+        assert '-c:v' not in args and '-vf' not in args
+        assert 'language=rus' in args
+        assert args[-1] == str(out)
+
+
+class TestPatchBuilder:
+    """Test splicing re-encoded pieces into an existing output."""
+
+    def test_concat_list_cuts_existing_output(self, tmp_path):
+        """Kept pieces reference the output with in/out points; patches their segment."""
+        existing = tmp_path / "ep01.mp4"
+        pieces = [
+            PatchPiece(0.0, 750.0, reencode=False),
+            PatchPiece(750.0, 760.0, reencode=True),
+            PatchPiece(760.0, 1440.0, reencode=False),
+        ]
+
+        content = build_patch_concat_list(pieces, existing, [tmp_path / "0000.mp4"])
+
+        assert content.splitlines() == [
+            f"file '{existing.as_posix()}'",
+            "outpoint 750.000000",
+            f"file '{(tmp_path / '0000.mp4').as_posix()}'",
+            f"file '{existing.as_posix()}'",
+            "inpoint 760.000000",
+            "outpoint 1440.000000",
+        ]
+
+    def test_splice_copies_audio_from_existing(self, tmp_path):
+        """Video comes from the spliced list, other streams from the existing output."""
+        args = build_patch_splice_args(tmp_path / "patch.txt", tmp_path / "ep01.mp4", tmp_path / "ep01.patch.mp4")
+
+        maps = [args[i + 1] for i, arg in enumerate(args) if arg == '-map']
+        assert maps == ['0:v:0', '1', '-1:v']
+        assert args[args.index('-c') + 1] == 'copy'
+        assert args[args.index('-f') + 1] == 'concat'
+        assert args[-1] == str(tmp_path / "ep01.patch.mp4")
+
+
+class TestQualityMetricBuilder:
+    """Test build_quality_metric_args for CRF search samples."""
+
+    def test_compares_sample_with_raw_window(self, tmp_path):
+        """The raw is seeked and cut to the sample window and scored into the null muxer."""
+        sample = tmp_path / "sample.mkv"
+        raw = tmp_path / "raw.mkv"
+
+        args = build_quality_metric_args(sample, raw, Segment(2, 600.0, 604.0), 'ssim')
+
+        assert args[args.index('-i') + 1] == str(sample)
+        raw_input = args.index(str(raw))
+        assert args.index('-ss') < raw_input
+        assert args[args.index('-ss') + 1] == '600.000000'
+        assert args[args.index('-t') + 1] == '4.000000'
+        assert args[args.index('-lavfi') + 1] == '[0:v:0][1:v:0]ssim'
+        assert args[-3:] == ['-f', 'null', '-']
+
+    def test_psnr_metric(self, tmp_path):
+        """PSNR uses the psnr filter."""
+        args = build_quality_metric_args(tmp_path / "s.mkv", tmp_path / "r.mkv", Segment(0, 0.0, 4.0), 'psnr')
+
+        assert '-ss' not in args
+        assert args[args.index('-lavfi') + 1] == '[0:v:0][1:v:0]psnr'
+
+
+class TestLogoRenderBuilder:
+    """Test build_logo_render_args."""
+
+    def test_renders_one_transparent_frame(self, tmp_path):
+        """The logo is drawn once onto a transparent frame of the video's size."""
+        out = tmp_path / "logo.png"
+
+        args = build_logo_render_args(tmp_path / "logo.ass", 1920, 1080, out)
+
+        assert args[args.index('-i') + 1] == 'color=c=black@0.0:s=1920x1080:r=1,format=rgba'
+        assert args[args.index('-vf') + 1] == f"subtitles='{tmp_path / 'logo.ass'}':alpha=1"
+        assert args[args.index('-frames:v') + 1] == '1'
+        assert args[-1] == str(out)
+
+    def test_logo_fonts_dir(self, tmp_path):
+        args = build_logo_render_args(tmp_path / "logo.ass", 1920, 1080, tmp_path / "logo.png", tmp_path / "fonts")
+
+        assert args[args.index('-vf') + 1] == (
+            f"subtitles='{tmp_path / 'logo.ass'}':fontsdir='{tmp_path / 'fonts'}':alpha=1"
+        )
+
+
+class TestFontBuilders:
+    """Test build_attachment_dump_args and build_font_warmup_args."""
+
+    def test_dumps_each_attachment_to_its_file(self, tmp_path):
+        raw = tmp_path / "raw.mkv"
+
+        args = build_attachment_dump_args(raw, [(3, tmp_path / "a.ttf"), (5, tmp_path / "b.otf")])
+
+        assert args[args.index('-dump_attachment:3') + 1] == str(tmp_path / "a.ttf")
+        assert args[args.index('-dump_attachment:5') + 1] == str(tmp_path / "b.otf")
+        assert args[-2:] == ['-i', str(raw)]  # Dump options apply to the input that follows
+
+    def test_warmup_renders_one_discarded_frame(self, tmp_path):
+        args = build_font_warmup_args(tmp_path / "logo.ass", tmp_path / "fonts")
+
+        assert args[args.index('-vf') + 1] == f"subtitles='{tmp_path / 'logo.ass'}':fontsdir='{tmp_path / 'fonts'}'"
+        assert args[args.index('-frames:v') + 1] == '1'
+        assert args[-3:] == ['-f', 'null', '-']
+
+
+class TestTwoPassBuilder:
+    """Test two-pass (target size) encode arguments."""
+
+    def _options(self, paths, codec='libx264', use_nvenc=False, pass_number=1, prefix=Path("/tmp/job/pass")):
+        return FFmpegOptions(
+            paths=paths,
+            codecs=CodecOptions(video_codec=codec),
+            encoding=EncodingParams("5000k", "7500k", "15000k", 18, 19, 17, 23),
+            video=VideoPresets.SOFTSUB,
+            filters=FilterOptions(logo_path=Path("/tmp/logo.ass")),
+            use_nvenc=use_nvenc,
+            pass_number=pass_number,
+            passlog_prefix=prefix
+        )
+
+    def test_analysis_pass_discards_output(self, mock_render_paths):
+        """First pass encodes filtered video only into the null muxer."""
+        args = build_ffmpeg_args(self._options(mock_render_paths))
+
+        assert args[-3:] == ['-f', 'null', '-']
+        assert str(mock_render_paths.audio) not in args
+        assert '-vf' in args
+        assert args[args.index('-pass') + 1] == '1'
+        assert args[args.index('-passlogfile') + 1] == str(Path("/tmp/job/pass"))
+        assert '-crf' not in args
+        assert args[args.index('-b:v') + 1] == '5000k'
+
+    def test_final_pass_writes_output(self, mock_render_paths):
+        """Second pass is the full encode reading the first-pass stats."""
+        args = build_ffmpeg_args(self._options(mock_render_paths, pass_number=2))
+
+        assert args[args.index('-pass') + 1] == '2'
+        assert str(mock_render_paths.audio) in args
+        assert args[-1] == str(mock_render_paths.softsub)
+
+    def test_x265_stats_via_params(self, mock_render_paths):
+        """libx265 passes go through x265-params with escaped colons."""
+        args = build_ffmpeg_args(self._options(mock_render_paths, codec='hevc', prefix=Path("C:/tmp/pass")))
+
+        assert '-pass' not in args
+        assert args[args.index('-x265-params') + 1] == 'pass=1:stats=C\\:/tmp/pass.x265.log:open-gop=0'
+
+    def test_nvenc_uses_internal_multipass(self, mock_render_paths):
+        """NVENC targets the bitrate with its own multipass mode."""
+        args = build_ffmpeg_args(self._options(mock_render_paths, codec='h264_nvenc', use_nvenc=True, pass_number=2))
+
+        assert args[args.index('-multipass') + 1] == 'fullres'
+        assert '-cq' not in args
+        assert '-pass' not in args
@@ -2,6 +2,8 @@
 
 from pathlib import Path
 
+import pytest
+
 from models.encoding import EncodingParams
 from models.job import VideoPresets
 from modules.ffmpeg_factory import FFmpegOptionsFactory
@@ -117,6 +119,42 @@ class TestFFmpegOptionsFactory:
         assert options.include_audio is False
         assert options.streams.audio_input_index is None
 
+    def test_logo_overlay_replaces_libass_logo(self, mock_config, mock_render_paths, tmp_path):
+        """With a pre-rendered logo, outputs composite it instead of burning the .ass."""
+        overlay = tmp_path / "logo.png"
+        factory = FFmpegOptionsFactory(mock_config, tmp_path, logo_overlay=overlay)
+        encoding = EncodingParams("6M", "9M", "18M", 18, 19, 17, 23)
+
+        with_logo = factory.create_hardsub_options(
+            paths=mock_render_paths, video_settings=VideoPresets.HARDSUB, encoding_params=encoding,
+            use_nvenc=False, include_logo=True, preset='faster'
+        )
+        without_logo = factory.create_softsub_options(
+            paths=mock_render_paths, video_settings=VideoPresets.SOFTSUB, encoding_params=encoding,
+            use_nvenc=False, include_logo=False, preset='faster'
+        )
+
+        assert (with_logo.filters.logo_path, with_logo.filters.logo_overlay) == (None, overlay)
+        assert without_logo.filters.logo_overlay is None
+
+    def test_merged_subtitle_replaces_both_filters(self, mock_config, mock_render_paths, tmp_path):
+        """With a logo-merged script, hardsub burns only that script; softsub is unchanged."""
+        merged = tmp_path / "job" / "merged.ass"
+        factory = FFmpegOptionsFactory(mock_config, tmp_path, merged_subtitle=merged)
+        encoding = EncodingParams("6M", "9M", "18M", 18, 19, 17, 23)
+
+        hardsub = factory.create_hardsub_options(
+            paths=mock_render_paths, video_settings=VideoPresets.HARDSUB, encoding_params=encoding,
+            use_nvenc=False, include_logo=True, preset='faster'
+        )
+        without_logo = factory.create_hardsub_options(
+            paths=mock_render_paths, video_settings=VideoPresets.HARDSUB, encoding_params=encoding,
+            use_nvenc=False, include_logo=False, preset='faster'
+        )
+
+        assert (hardsub.filters.logo_path, hardsub.filters.subtitle_path) == (None, merged)
+        assert without_logo.filters.subtitle_path != merged
+
     def test_prepare_subtitle_no_brackets(self, mock_config, tmp_path):
         """Subtitle without brackets returns original path."""
         factory = FFmpegOptionsFactory(mock_config, tmp_path)
@@ -227,3 +265,103 @@ class TestFFmpegOptionsFactory:
         assert options.streams.video_input_index == 0
         assert options.streams.audio_input_index == 1
         assert options.streams.subtitle_input_index is None
+
+    def test_create_combined_options(self, mock_config, mock_render_paths, tmp_path):
+        """Combined options carry softsub and hardsub branches for one decode."""
+        factory = FFmpegOptionsFactory(mock_config, tmp_path)
+        encoding = EncodingParams("6M", "9M", "18M", 18, 19, 17, 23)
+
+        options = factory.create_combined_options(
+            paths=mock_render_paths,
+            softsub_settings=VideoPresets.SOFTSUB,
+            hardsub_settings=VideoPresets.HARDSUB,
+            encoding_params=encoding,
+            softsub_nvenc=True,
+            hardsub_nvenc=False,
+            softsub_logo=False,
+            hardsub_logo=True,
+            softsub_preset='p4',
+            hardsub_preset='faster'
+        )
+
+        assert options.softsub.codecs.video_codec == 'h264_nvenc'
+        assert options.softsub.include_subtitles is True
+        assert options.softsub.filters.logo_path is None
+        assert options.softsub.preset == 'p4'
+        assert options.hardsub.codecs.video_codec == 'hevc'
+        assert options.hardsub.filters.logo_path is not None
+        assert options.hardsub.filters.subtitle_path is not None
+        assert options.hardsub.preset == 'faster'
+
+    def test_create_two_pass_options(self, mock_config, mock_render_paths, tmp_path):
+        """Two-pass options share settings and the per-job passlog prefix."""
+        factory = FFmpegOptionsFactory(mock_config, tmp_path)
+        options = factory.create_softsub_options(
+            paths=mock_render_paths,
+            video_settings=VideoPresets.SOFTSUB,
+            encoding_params=EncodingParams("5000k", "7500k", "15000k", 18, 19, 17, 23),
+            use_nvenc=False,
+            include_logo=False,
+            preset='faster'
+        )
+
+        analysis, final = factory.create_two_pass_options(options, tmp_path / "job" / "pass")
+
+        assert (analysis.pass_number, final.pass_number) == (1, 2)
+        assert analysis.passlog_prefix == final.passlog_prefix == tmp_path / "job" / "pass"
+        assert final.codecs == options.codecs
+        assert options.pass_number == 0
+
+    def test_preencoded_audio_copied(self, mock_config, mock_render_paths, tmp_path):
+        """A factory for pre-encoded audio stream-copies it into every output."""
+        factory = FFmpegOptionsFactory(mock_config, tmp_path, audio_codec='copy')
+        encoding = EncodingParams("6M", "9M", "18M", 18, 19, 17, 23)
+
+        options = factory.create_combined_options(
+            paths=mock_render_paths,
+            softsub_settings=VideoPresets.SOFTSUB,
+            hardsub_settings=VideoPresets.HARDSUB,
+            encoding_params=encoding,
+            softsub_nvenc=False,
+            hardsub_nvenc=False,
+            softsub_logo=False,
+            hardsub_logo=False,
+            softsub_preset='faster',
+            hardsub_preset='faster'
+        )
+
+        assert options.softsub.codecs.audio_codec == 'copy'
+        assert options.hardsub.codecs.audio_codec == 'copy'
+
+    def test_softsub_video_copy(self, mock_config, mock_render_paths, tmp_path):
+        """Copied softsub video has no filters and still muxes audio and subtitles."""
+        factory = FFmpegOptionsFactory(mock_config, tmp_path)
+
+        options = factory.create_softsub_options(
+            paths=mock_render_paths,
+            video_settings=VideoPresets.SOFTSUB,
+            encoding_params=EncodingParams("6M", "9M", "18M", 18, 19, 17, 23),
+            use_nvenc=False,
+            include_logo=False,
+            preset='faster',
+            copy_video=True
+        )
+
+        assert options.codecs.video_codec == 'copy'
+        assert options.filters.to_filter_string() is None
+        assert options.include_audio and options.include_subtitles
+
+    def test_softsub_video_copy_with_logo_rejected(self, mock_config, mock_render_paths, tmp_path):
+        """A burned logo needs an encode."""
+        factory = FFmpegOptionsFactory(mock_config, tmp_path)
+
+        with pytest.raises(ValueError):
+            factory.create_softsub_options(
+                paths=mock_render_paths,
+                video_settings=VideoPresets.SOFTSUB,
+                encoding_params=EncodingParams("6M", "9M", "18M", 18, 19, 17, 23),
+                use_nvenc=False,
+                include_logo=True,
+                preset='faster',
+                copy_video=True
+            )
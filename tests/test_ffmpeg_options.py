@@ -6,7 +6,7 @@ import pytest
 from models.encoding import EncodingParams
 from models.ffmpeg_options import (
     CodecOptions, FFmpegOptions, FilterOptions, StreamMapping,
-    _escape_path_for_filter
+    escape_path_for_filter
 )
 from models.job import VideoSettings, VideoPresets
 from models.render_paths import RenderPaths
@@ -110,6 +110,37 @@ class TestFilterOptions:
         assert filter_str.count("subtitles=") == 2
         assert ", " in filter_str  # Comma-separated
 
+    def test_filter_options_logo_overlay(self, tmp_path):
+        """A pre-rendered logo is composited before the burned subtitles."""
+        filters = FilterOptions(subtitle_path=tmp_path / "sub.ass", logo_overlay=tmp_path / "logo.png")
+
+        filter_str = filters.to_filter_string()
+
+        assert filter_str.startswith(f"movie='{tmp_path / 'logo.png'}'[logo];[in][logo]overlay=format=auto,")
+        assert filter_str.count("subtitles=") == 1
+
+    def test_filter_graph_overlay_after_labeled_filters(self, tmp_path):
+        """Filters before the overlay feed its main input through a label."""
+        filters = FilterOptions(logo_overlay=tmp_path / "logo.png")
+
+        graph = filters.to_filter_graph('[0:v:0]', 'shared', before=['setpts=PTS+5/TB'], after=['split=2'])
+
+        assert graph == (f"movie='{tmp_path / 'logo.png'}'[sharedlogo];[0:v:0]setpts=PTS+5/TB[sharedmain];"
+                         "[sharedmain][sharedlogo]overlay=format=auto,split=2")
+
+    def test_fonts_dir_passed_to_every_subtitles_filter(self, tmp_path):
+        """Both the logo and the episode subtitles look up the extra fonts."""
+        filters = FilterOptions(logo_path=tmp_path / "logo.ass", subtitle_path=tmp_path / "sub.ass",
+                                fonts_dir=tmp_path / "fonts")
+
+        filter_str = filters.to_filter_string()
+
+        assert filter_str.count(f":fontsdir='{tmp_path / 'fonts'}'") == 2
+        assert filter_str.startswith(f"subtitles='{tmp_path / 'logo.ass'}':fontsdir=")
+
+    def test_fonts_dir_alone_adds_no_filter(self, tmp_path):
+        assert FilterOptions(fonts_dir=tmp_path / "fonts").to_filter_string() is None
+
     def test_filter_options_immutable(self, tmp_path):
         """FilterOptions is immutable."""
         logo = tmp_path / "logo.ass"
@@ -120,12 +151,12 @@ class TestFilterOptions:
 
 
 class TestPathEscaping:
-    """Test _escape_path_for_filter function."""
+    """Test escape_path_for_filter function."""
 
     def test_escape_unix_path(self):
         """Unix paths convert backslashes to forward slashes."""
         path = Path("/home/user/video.mkv")
-        escaped = _escape_path_for_filter(path)
+        escaped = escape_path_for_filter(path)
 
         assert escaped == "/home/user/video.mkv"
 
@@ -133,7 +164,7 @@ class TestPathEscaping:
         """Relative Windows paths work correctly."""
         # Use actual relative path (not tmp_path which is absolute on Windows)
         path = Path("subdir") / "file.ass"
-        escaped = _escape_path_for_filter(path)
+        escaped = escape_path_for_filter(path)
 
         # Should have forward slashes and no drive letter escaping
         assert "\\" not in escaped
@@ -144,7 +175,7 @@ class TestPathEscaping:
         """Windows absolute paths escape drive letter correctly."""
         # Simulate Windows absolute path
         path = Path("C:/Users/test/video.mkv")
-        escaped = _escape_path_for_filter(path)
+        escaped = escape_path_for_filter(path)
 
         # Drive letter should be escaped for FFmpeg filter syntax
         assert escaped == r"C\:\\Users/test/video.mkv"
@@ -0,0 +1,112 @@
+"""Tests for modules/font_index.py - persistent index of available fonts."""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from models.ass import parse_ass
+from models.video_info import StreamInfo
+from modules.font_index import FontIndex, audit_fonts, read_font_names
+from tests.mocks.mock_process_runner import MockProcessRunner
+from tests.test_font_names import encode_embedded_font, make_collection, make_font
+
+SUBS = """[V4+ Styles]
+Format: Name, Fontname, Fontsize
+Style: Default,Arial,48
+Style: Sign,Sign Font,36
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,Hello
+Dialogue: 0,0:00:03.00,0:00:04.00,Sign,,0,0,0,,Shop
+"""
+
+
+@pytest.fixture
+def fonts_dir(tmp_path):
+    fonts = tmp_path / "fonts"
+    (fonts / "sub").mkdir(parents=True)
+    (fonts / "arial.ttf").write_bytes(make_font("Arial"))
+    (fonts / "sub" / "cjk.ttc").write_bytes(make_collection(make_font("Gothic"), make_font("Mincho")))
+    (fonts / "notes.txt").write_text("Sign Font")
+    return fonts
+
+
+def counting_reads():
+    return patch('modules.font_index.read_font_names', side_effect=read_font_names)
+
+
+class TestFontIndex:
+    """Test FontIndex."""
+
+    def test_names_include_subdirectories(self, fonts_dir, tmp_path):
+        assert FontIndex(tmp_path / "cache").names([fonts_dir, tmp_path / "missing"]) == {"Arial", "Gothic", "Mincho"}
+
+    def test_unchanged_directories_not_reread(self, fonts_dir, tmp_path):
+        """A second index (next session) reuses the names while directory mtimes match."""
+        FontIndex(tmp_path / "cache").names([fonts_dir])
+
+        with counting_reads() as reads:
+            names = FontIndex(tmp_path / "cache").names([fonts_dir])
+
+        assert names == {"Arial", "Gothic", "Mincho"}
+        reads.assert_not_called()
+
+    def test_added_font_reindexes_its_directory(self, fonts_dir, tmp_path):
+        index = FontIndex(tmp_path / "cache")
+        index.names([fonts_dir])
+
+        (fonts_dir / "sign.otf").write_bytes(make_font("Sign Font"))
+        stat = fonts_dir.stat()
+        os.utime(fonts_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))  # Coarse mtime filesystems
+        with counting_reads() as reads:
+            names = index.names([fonts_dir])
+
+        assert "Sign Font" in names
+        assert reads.call_count == 2  # Only the changed directory
+
+    def test_attachment_names_extracted_once(self, tmp_path):
+        raw = tmp_path / "raw.mkv"
+        raw.write_bytes(b"mkv")
+
+        class DumpingRunner(MockProcessRunner):
+            def run_ffmpeg(self, args, cwd=None):
+                Path(args[args.index('-dump_attachment:3') + 1]).write_bytes(make_font("Sign Font"))
+                return super().run_ffmpeg(args, cwd)
+
+        runner = DumpingRunner()
+        index = FontIndex(tmp_path / "cache")
+
+        first = index.attachment_names(runner, raw, [StreamInfo(index=3, filename="sign.ttf")])
+        again = index.attachment_names(runner, raw, [StreamInfo(index=3, filename="sign.ttf")])
+
+        assert first == again == {"Sign Font"}
+        assert len(runner.ffmpeg_calls) == 1
+
+
+class TestAuditFonts:
+    """Test audit_fonts."""
+
+    def test_missing_fonts_reported(self, fonts_dir, tmp_path):
+        missing = audit_fonts(FontIndex(tmp_path / "cache"), [parse_ass(SUBS)], [fonts_dir])
+
+        assert missing == ["Sign Font"]
+
+    def test_attached_fonts_count(self, fonts_dir, tmp_path):
+        assert audit_fonts(FontIndex(tmp_path / "cache"), [parse_ass(SUBS)], [fonts_dir], ["sign font"]) == []
+
+    def test_embedded_fonts_count(self, fonts_dir, tmp_path):
+        lines = encode_embedded_font(make_font("Sign Font"))
+        subs = SUBS + "\n[Fonts]\nfontname: sign_0.ttf\n" + "\n".join(lines) + "\n"
+
+        assert audit_fonts(FontIndex(tmp_path / "cache"), [parse_ass(subs)], [fonts_dir]) == []
+
+    def test_no_scan_when_nothing_missing(self, tmp_path):
+        index = FontIndex(tmp_path / "cache")
+
+        with patch.object(index, 'names') as names:
+            assert audit_fonts(index, [parse_ass(SUBS)], [tmp_path], ["Arial", "Sign Font"]) == []
+
+        names.assert_not_called()
@@ -0,0 +1,83 @@
+"""Tests for models/font_names.py - font names from TrueType/OpenType data."""
+
+import struct
+
+from models.font_names import decode_embedded_font, font_names, missing_fonts
+
+
+def make_font(*names: str, name_ids=(1, 4)) -> bytes:
+    """Minimal sfnt with a name table holding Windows-platform names."""
+    records, strings = b'', b''
+    count = len(names) * len(name_ids)
+    for name in names:
+        for name_id in name_ids:
+            encoded = name.encode('utf-16-be')
+            records += struct.pack('>6H', 3, 1, 0x409, name_id, len(encoded), len(strings))
+            strings += encoded
+    table = struct.pack('>HHH', 0, count, 6 + len(records)) + records + strings
+    header = struct.pack('>IHHHH', 0x00010000, 1, 0, 0, 0)
+    record = b'name' + struct.pack('>III', 0, 12 + 16, len(table))
+    return header + record + table
+
+
+def make_collection(*fonts: bytes) -> bytes:
+    """TrueType collection of fonts (their table offsets are rebased)."""
+    header_size = 12 + 4 * len(fonts)
+    offsets, body = [], b''
+    for font in fonts:
+        offset = header_size + len(body)
+        offsets.append(offset)
+        # Table offsets are relative to the file start
+        font = font[:20] + struct.pack('>I', offset + 28) + font[24:]
+        body += font
+    return b'ttcf' + struct.pack('>HHI', 1, 0, len(fonts)) + struct.pack(f'>{len(fonts)}I', *offsets) + body
+
+
+def encode_embedded_font(data: bytes) -> list[str]:
+    """Encode a font like Aegisub does for the [Fonts] section."""
+    text = ''
+    for start in range(0, len(data), 3):
+        chunk = data[start:start + 3]
+        value = int.from_bytes(chunk.ljust(3, b'\0'), 'big')
+        chars = [chr(((value >> shift) & 0x3F) + 33) for shift in (18, 12, 6, 0)]
+        text += ''.join(chars[:len(chunk) + 1])
+    return [text[i:i + 80] for i in range(0, len(text), 80)]
+
+
+class TestFontNames:
+    """Test font_names."""
+
+    def test_family_and_full_name(self):
+        assert font_names(make_font("Sign Font", name_ids=(1, 2, 4))) == {"Sign Font"}
+
+    def test_collection(self):
+        data = make_collection(make_font("First"), make_font("Second"))
+
+        assert font_names(data) == {"First", "Second"}
+
+    def test_not_a_font(self):
+        assert font_names(b"not a font at all") == set()
+        assert font_names(make_font("Cut")[:30]) == set()
+
+
+class TestEmbeddedFonts:
+    """Test decode_embedded_font."""
+
+    def test_round_trip(self):
+        for size in range(10, 14):  # Every trailing group length
+            data = bytes(range(size))
+
+            assert decode_embedded_font(encode_embedded_font(data)) == data
+
+    def test_embedded_font_names(self):
+        assert font_names(decode_embedded_font(encode_embedded_font(make_font("Embedded")))) == {"Embedded"}
+
+
+class TestMissingFonts:
+    """Test missing_fonts."""
+
+    def test_case_insensitive(self):
+        assert missing_fonts(["arial", "Sign Font", "Other"], ["Arial", "SIGN FONT"]) == ["Other"]
+
+    def test_nothing_missing(self):
+        assert missing_fonts([], ["Arial"]) == []
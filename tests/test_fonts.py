@@ -0,0 +1,133 @@
+"""Tests for modules/fonts.py and FontCacheWarmupThread - fonts for burning subtitles."""
+
+from pathlib import Path
+
+import pytest
+
+from models.video_info import StreamInfo
+from modules.fonts import bundled_fonts, fonts_fingerprint, prepare_fonts_dir
+from tests.mocks.mock_process_runner import MockProcessRunner
+from threads.FontCacheWarmupThread import FontCacheWarmupThread
+
+
+class DumpingRunner(MockProcessRunner):
+    """Runner simulating ffmpeg writing the requested attachments."""
+
+    def run_ffmpeg(self, args, cwd=None):
+        for i, arg in enumerate(args):
+            if arg.startswith('-dump_attachment:'):
+                Path(args[i + 1]).write_bytes(b"font")
+        return super().run_ffmpeg(args, cwd)
+
+
+@pytest.fixture
+def bundled_dir(tmp_path):
+    fonts = tmp_path / "fonts"
+    fonts.mkdir()
+    (fonts / "AniBaza-Regular.otf").write_bytes(b"otf")
+    (fonts / "readme.txt").write_text("not a font")
+    return fonts
+
+
+class TestPrepareFontsDir:
+    """Test prepare_fonts_dir."""
+
+    def test_bundled_fonts_only(self, bundled_dir):
+        assert bundled_fonts(bundled_dir) == [bundled_dir / "AniBaza-Regular.otf"]
+
+    def test_no_attachments_uses_bundled_dir(self, bundled_dir, tmp_path):
+        """Without attached fonts nothing is copied or extracted."""
+        runner = MockProcessRunner()
+
+        fonts_dir = prepare_fonts_dir(runner, tmp_path / "raw.mkv", (), bundled_dir, tmp_path / "job")
+
+        assert fonts_dir == bundled_dir
+        assert runner.ffmpeg_calls == []
+
+    def test_no_fonts_at_all(self, tmp_path):
+        fonts_dir = prepare_fonts_dir(MockProcessRunner(), tmp_path / "raw.mkv", (), tmp_path / "none", tmp_path / "job")
+
+        assert fonts_dir is None
+
+    def test_attachments_extracted_next_to_bundled_fonts(self, bundled_dir, tmp_path):
+        """Attached fonts join the bundled ones; clashing names keep both files."""
+        runner = DumpingRunner()
+        attachments = [StreamInfo(index=3, filename="Sign.ttf"),
+                       StreamInfo(index=4, filename="AniBaza-Regular.otf"),
+                       StreamInfo(index=5)]
+
+        fonts_dir = prepare_fonts_dir(runner, tmp_path / "raw.mkv", attachments, bundled_dir, tmp_path / "job")
+
+        assert fonts_dir == tmp_path / "job" / "fonts"
+        assert sorted(path.name for path in fonts_dir.iterdir()) == [
+            "4_AniBaza-Regular.otf", "AniBaza-Regular.otf", "Sign.ttf", "attachment_5.ttf"
+        ]
+        assert (fonts_dir / "AniBaza-Regular.otf").read_bytes() == b"otf"
+        (call,) = runner.ffmpeg_calls
+        assert call[-2:] == ['-i', str(tmp_path / "raw.mkv")]
+
+    def test_extracted_fonts_reused(self, bundled_dir, tmp_path):
+        """Fonts already extracted into the job dir (by the queue lookahead) are not dumped again."""
+        attachments = [StreamInfo(index=3, filename="Sign.ttf")]
+        prepare_fonts_dir(DumpingRunner(), tmp_path / "raw.mkv", attachments, bundled_dir, tmp_path / "job")
+        runner = DumpingRunner()
+
+        fonts_dir = prepare_fonts_dir(runner, tmp_path / "raw.mkv", attachments, bundled_dir, tmp_path / "job")
+
+        assert (fonts_dir / "Sign.ttf").exists()
+        assert runner.ffmpeg_calls == []
+
+    def test_failed_extraction_without_bundled_fonts(self, tmp_path):
+        fonts_dir = prepare_fonts_dir(MockProcessRunner(), tmp_path / "raw.mkv", [StreamInfo(index=3)],
+                                      tmp_path / "none", tmp_path / "job")
+
+        assert fonts_dir is None
+
+
+class TestFontsFingerprint:
+    """Test fonts_fingerprint."""
+
+    def test_copies_share_fingerprint(self, bundled_dir, tmp_path):
+        """A per-job copy of the same fonts keys the same cached renders."""
+        import shutil
+
+        copy = shutil.copytree(bundled_dir, tmp_path / "job" / "fonts")
+
+        assert fonts_fingerprint(copy) == fonts_fingerprint(bundled_dir)
+
+    def test_changed_font_changes_fingerprint(self, bundled_dir):
+        before = fonts_fingerprint(bundled_dir)
+        (bundled_dir / "AniBaza-Regular.otf").write_bytes(b"new otf")
+
+        assert fonts_fingerprint(bundled_dir) != before
+
+    def test_no_fonts_dir(self, tmp_path):
+        assert fonts_fingerprint(None) == ''
+        assert fonts_fingerprint(tmp_path / "missing") == ''
+
+
+class TestFontCacheWarmupThread:
+    """Test FontCacheWarmupThread."""
+
+    def test_burns_logo_with_bundled_fonts(self, mock_config, bundled_dir):
+        mock_config.main_paths.fonts = bundled_dir
+        mock_config.main_paths.logo.parent.mkdir(parents=True, exist_ok=True)
+        mock_config.main_paths.logo.write_text("[Events]\n", encoding='utf-8')
+        runner = MockProcessRunner()
+        thread = FontCacheWarmupThread(mock_config, runner)
+        results = []
+        thread.finished_signal.connect(results.append)
+
+        thread.run()
+
+        (call,) = runner.ffmpeg_calls
+        assert f"fontsdir='{bundled_dir}'" in call[call.index('-vf') + 1]
+        assert results == [True]
+
+    def test_missing_logo_skipped(self, mock_config):
+        runner = MockProcessRunner()
+        thread = FontCacheWarmupThread(mock_config, runner)
+
+        thread.run()
+
+        assert runner.ffmpeg_calls == []
@@ -0,0 +1,130 @@
+"""Tests for modules/input_stager.py - local staging of job inputs."""
+
+from unittest.mock import patch
+
+import pytest
+
+from models.render_paths import RenderPaths
+from modules.input_stager import InputStager
+
+
+@pytest.fixture
+def share(tmp_path):
+    share = tmp_path / "share"
+    share.mkdir()
+    (share / "raw.mkv").write_bytes(b"r" * 100)
+    (share / "audio.flac").write_bytes(b"a" * 30)
+    (share / "sub.ass").write_bytes(b"s" * 10)
+    return share
+
+
+def job_paths(share, name="ep01"):
+    return RenderPaths(raw=share / "raw.mkv", audio=share / "audio.flac", sub=share / "sub.ass",
+                       softsub=share / f"{name}.mkv", hardsub=share / f"{name}.mp4")
+
+
+class TestInputStager:
+    """Test InputStager."""
+
+    def test_inputs_copied_to_scratch(self, share, tmp_path):
+        stager = InputStager(tmp_path / "scratch", cap_bytes=1000)
+        progress = []
+
+        staged = stager.stage(job_paths(share), lambda copied, total: progress.append((copied, total)))
+
+        for source, copy in [(share / "raw.mkv", staged.raw), (share / "audio.flac", staged.audio),
+                             (share / "sub.ass", staged.sub)]:
+            assert copy.is_relative_to(tmp_path / "scratch")
+            assert copy.name == source.name
+            assert copy.read_bytes() == source.read_bytes()
+            assert copy.stat().st_mtime_ns == source.stat().st_mtime_ns
+        assert staged.hardsub == share / "ep01.mp4"  # Outputs are not staged
+        assert progress[-1] == (140, 140)
+        assert stager.used_bytes() == 140
+
+    def test_staged_copy_reused(self, share, tmp_path):
+        """A retried job reads the copies made for its first run."""
+        stager = InputStager(tmp_path / "scratch", cap_bytes=1000)
+        first = stager.stage(job_paths(share))
+        stager.release(first, evict=False)
+
+        with patch.object(stager, '_copy') as copy:
+            again = stager.stage(job_paths(share))
+
+        assert again == first
+        copy.assert_not_called()
+
+    def test_changed_source_staged_again(self, share, tmp_path):
+        stager = InputStager(tmp_path / "scratch", cap_bytes=1000)
+        first = stager.stage(job_paths(share))
+
+        (share / "raw.mkv").write_bytes(b"v2")
+
+        assert stager.stage(job_paths(share)).raw != first.raw
+
+    def test_release_evicts_after_verified_outputs(self, share, tmp_path):
+        stager = InputStager(tmp_path / "scratch", cap_bytes=1000)
+        kept = stager.stage(job_paths(share))
+        stager.release(kept, evict=False)
+        assert kept.raw.exists()
+
+        staged = stager.stage(job_paths(share))
+        stager.release(staged, evict=True)
+
+        assert not staged.raw.exists()
+        assert stager.used_bytes() == 0
+
+    def test_copy_shared_by_another_job_kept(self, share, tmp_path):
+        stager = InputStager(tmp_path / "scratch", cap_bytes=1000)
+        first = stager.stage(job_paths(share, "ep01"))
+        second = stager.stage(job_paths(share, "ep02"))
+
+        stager.release(first, evict=True)
+
+        assert second.raw.exists()
+
+    def test_too_large_input_read_in_place(self, share, tmp_path):
+        stager = InputStager(tmp_path / "scratch", cap_bytes=50)
+
+        staged = stager.stage(job_paths(share))
+
+        assert staged.raw == share / "raw.mkv"
+        assert staged.audio.is_relative_to(tmp_path / "scratch")
+
+    def test_oldest_unused_copy_evicted_for_room(self, share, tmp_path):
+        stager = InputStager(tmp_path / "scratch", cap_bytes=150)
+        old = stager.stage(job_paths(share))
+        stager.release(old, evict=False)
+        (share / "raw.mkv").write_bytes(b"n" * 120)
+
+        staged = stager.stage(job_paths(share))
+
+        assert staged.raw.read_bytes() == b"n" * 120
+        assert not old.raw.exists()
+        assert stager.used_bytes() <= 150
+
+    def test_pinned_copy_not_evicted(self, share, tmp_path):
+        """Copies of a job still waiting or running stay; the new input is read in place."""
+        stager = InputStager(tmp_path / "scratch", cap_bytes=150)
+        pinned = stager.stage(job_paths(share))
+        (share / "raw.mkv").write_bytes(b"n" * 120)
+
+        staged = stager.stage(job_paths(share))
+
+        assert staged.raw == share / "raw.mkv"
+        assert pinned.raw.exists()
+
+    def test_raw_of_remux_not_staged(self, share, tmp_path):
+        staged = InputStager(tmp_path / "scratch", cap_bytes=1000).stage(job_paths(share), include_raw=False)
+
+        assert staged.raw == share / "raw.mkv"
+        assert staged.sub.is_relative_to(tmp_path / "scratch")
+
+    def test_from_config(self, mock_config, tmp_path):
+        assert InputStager.from_config(mock_config) is None
+
+        mock_config.input_staging = True
+        stager = InputStager.from_config(mock_config)
+
+        assert stager.root == mock_config.main_paths.temp / "staging"
+        assert stager.cap_bytes == 50 * 1024 ** 3
@@ -0,0 +1,102 @@
+"""Tests for modules/job_preparer.py - lookahead preparation of waiting jobs."""
+
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from models.encoding import EncodingParams
+from models.enums import BuildState, LogoState, NvencState
+from models.job import RenderJob, VideoPresets
+from models.render_paths import RenderPaths, job_temp_dir, prepared_audio_path
+from modules.job_preparer import JobPreparer
+from modules.probe_cache import ProbeCache
+from tests.mocks.mock_process_runner import MockProcessRunner
+from threads.RenderThread import ThreadClassRender
+
+RAW_PROBE = ('{"streams": [{"index": 0, "codec_type": "video", "codec_name": "h264", "width": 1920, '
+             '"height": 1080, "pix_fmt": "yuv420p"}], "format": {"duration": "1440.0"}}')
+AUDIO_PROBE = ('{"streams": [{"index": 0, "codec_type": "audio", "codec_name": "flac", '
+               '"sample_rate": "48000"}], "format": {}}')
+
+
+class WritingRunner(MockProcessRunner):
+    """Runner simulating ffmpeg writing its output file."""
+
+    def run_ffmpeg(self, args, cwd=None):
+        Path(args[-1]).write_bytes(b"aac")
+        return super().run_ffmpeg(args, cwd)
+
+
+@pytest.fixture
+def job(tmp_path):
+    for name in ("raw.mkv", "audio.flac", "sub.ass"):
+        (tmp_path / name).write_bytes(b"data")
+    paths = RenderPaths(raw=tmp_path / "raw.mkv", audio=tmp_path / "audio.flac", sub=tmp_path / "sub.ass",
+                        softsub=tmp_path / "out" / "ep01.mkv", hardsub=tmp_path / "out" / "ep01.mp4")
+    return RenderJob(paths=paths, episode_name="ep01", build_state=BuildState.SOFT_AND_HARD,
+                     nvenc_state=NvencState.NVENC_NONE, logo_state=LogoState.LOGO_BOTH,
+                     encoding_params=EncodingParams("6M", "9M", "18M", 18, 19, 17, 23),
+                     video_settings=VideoPresets.SOFTSUB)
+
+
+def probing_runner(runner_class=MockProcessRunner):
+    runner = runner_class()
+    runner.set_ffprobe_output(0, RAW_PROBE)
+    runner.set_ffprobe_output(1, AUDIO_PROBE)
+    return runner
+
+
+class TestJobPreparer:
+    """Test JobPreparer."""
+
+    def test_missing_input_fails_job(self, mock_config, job):
+        job.paths.raw.unlink()
+        runner = MockProcessRunner()
+
+        errors = JobPreparer(mock_config, runner).prepare(job)
+
+        assert errors == [f"Raw video not found: {job.paths.raw}"]
+        assert runner.ffprobe_calls == []
+
+    def test_raw_probe_cached(self, mock_config, job, tmp_path):
+        probe_cache = ProbeCache(tmp_path / "cache")
+
+        assert JobPreparer(mock_config, probing_runner(), probe_cache=probe_cache).prepare(job) == []
+
+        assert probe_cache.get(job.paths.raw).width == 1920
+
+    def test_audio_encoded_ahead_reused_by_job(self, mock_config, job, tmp_path):
+        """The job's RenderThread copies the audio encoded ahead instead of encoding it."""
+        probe_cache = ProbeCache(tmp_path / "cache")
+        JobPreparer(mock_config, probing_runner(WritingRunner), probe_cache=probe_cache).prepare(job)
+        prepared = prepared_audio_path(job_temp_dir(mock_config.main_paths.temp, job.paths), job.paths.audio)
+        runner = MockProcessRunner()
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=job.paths, probe_cache=probe_cache, job=job)
+
+        thread.prepare_audio()
+
+        assert prepared.read_bytes() == b"aac"
+        assert thread.paths.audio == prepared
+        assert thread.ffmpeg_factory.audio_codec == 'copy'
+        assert runner.ffmpeg_calls == []
+
+    def test_failed_audio_encode_leaves_nothing(self, mock_config, job):
+        """A failed encode leaves the audio to the job, with no partial file to pick up."""
+        JobPreparer(mock_config, probing_runner()).prepare(job)
+
+        job_dir = job_temp_dir(mock_config.main_paths.temp, job.paths)
+        assert not list(job_dir.glob('audio_*'))
+
+    def test_subtitle_remux_does_not_read_raw(self, mock_config, job):
+        previous = job.paths.softsub
+        previous.parent.mkdir()
+        previous.write_bytes(b"v1")
+        job = replace(job, build_state=BuildState.SOFT_ONLY,
+                      paths=replace(job.paths, audio=None, previous_softsub=previous))
+        runner = MockProcessRunner()
+
+        assert JobPreparer(mock_config, runner).prepare(job) == []
+        assert runner.ffprobe_calls == runner.ffmpeg_calls == []
@@ -277,6 +277,83 @@ class TestJobQueueWidget:
         # Should display 2 items in list
         assert widget.job_list_widget.count() == 2
 
+    def test_progress_shown_per_running_job(self, qapp):
+        """Each running job shows its own progress, kept across refreshes."""
+        from widgets.job_queue_widget import JobQueueWidget
+
+        jobs = []
+        for job_id in ("job-1", "job-2"):
+            mock_job = Mock()
+            mock_job.job.episode_name = job_id
+            mock_job.id = job_id
+            mock_job.status = JobStatus.RUNNING
+            jobs.append(mock_job)
+
+        widget = JobQueueWidget()
+        widget.update_jobs(jobs)
+        widget.set_job_progress("job-1", "Собираю хардсаб... 40%")
+        widget.set_job_progress("job-2", "Собираю софтсаб... 10%")
+        widget.update_jobs(jobs)
+
+        items = [widget.job_list_widget.itemWidget(widget.job_list_widget.item(i)) for i in range(2)]
+        assert items[0].progress_label.text() == "Собираю хардсаб... 40%"
+        assert items[1].progress_label.text() == "Собираю софтсаб... 10%"
+
+    def test_staging_progress_shown_for_waiting_job(self, qapp):
+        from widgets.job_queue_widget import JobQueueWidget
+
+        mock_job = Mock()
+        mock_job.job.episode_name = "job-1"
+        mock_job.id = "job-1"
+        mock_job.status = JobStatus.WAITING
+
+        widget = JobQueueWidget()
+        widget.update_jobs([mock_job])
+        widget.set_job_progress("job-1", "Копирую исходники... 30%")
+        widget.update_jobs([mock_job])
+
+        item = widget.job_list_widget.itemWidget(widget.job_list_widget.item(0))
+        assert item.progress_label.text() == "Копирую исходники... 30%"
+
+    def test_mover_status_hidden_when_idle(self, qapp):
+        from widgets.job_queue_widget import JobQueueWidget
+
+        widget = JobQueueWidget()
+        assert widget.mover_label.isHidden()
+
+        widget.set_mover_status("Перенос: 1 файл(ов), 2.0 ГБ, 90 МБ/с")
+        assert not widget.mover_label.isHidden()
+        assert widget.mover_label.text() == "Перенос: 1 файл(ов), 2.0 ГБ, 90 МБ/с"
+
+        widget.set_mover_status("")
+        assert widget.mover_label.isHidden()
+
+    def test_job_options_reset_after_use(self, qapp):
+        """Options of the next job are read from the panel and cleared once used."""
+        from models.job import JobOptions
+        from models.patching import TimeRange
+        from widgets.job_queue_widget import JobQueueWidget
+
+        widget = JobQueueWidget()
+        widget.subtitle_remux_checkbox.setChecked(True)
+        widget.target_size_spinbox.setValue(700)
+        widget.patch_ranges_editline.setText("12:30-12:45")
+
+        assert widget.job_options() == JobOptions(True, 700, (TimeRange(750.0, 765.0),))
+
+        widget.reset_job_options()
+        assert widget.job_options() == JobOptions()
+
+    def test_job_options_invalid_patch_ranges(self, qapp):
+        """Malformed patch ranges are rejected."""
+        from widgets.job_queue_widget import JobQueueWidget
+
+        widget = JobQueueWidget()
+        widget.patch_ranges_editline.setText("12:45-12:30")
+
+        with pytest.raises(ValueError):
+            widget.job_options()
+
     def test_clear_button_emits_signal(self, qapp):
         """Clear completed button emits clear_completed signal."""
         from widgets.job_queue_widget import JobQueueWidget
@@ -0,0 +1,92 @@
+"""Tests for modules/keyframe_cache.py - persistent keyframe indexes."""
+
+import os
+from array import array
+
+import pytest
+
+from models.keyframe_index import KeyframeIndex
+from modules.keyframe_cache import KeyframeCache, probe_keyframes
+from tests.mocks.mock_process_runner import MockProcessRunner
+
+
+INDEX = KeyframeIndex(array('d', [0.0, 10.0, 20.0]))
+
+
+@pytest.fixture
+def raw(tmp_path):
+    """Raw file to index."""
+    path = tmp_path / "raw.mkv"
+    path.write_bytes(b"raw")
+    return path
+
+
+class TestKeyframeCache:
+    """Test KeyframeCache storage."""
+
+    def test_roundtrip_across_instances(self, tmp_path, raw):
+        """Stored index is found by a new cache instance."""
+        KeyframeCache(tmp_path / "kf").put(raw, INDEX)
+
+        assert KeyframeCache(tmp_path / "kf").get(raw) == INDEX
+
+    def test_invalidated_when_file_changes(self, tmp_path, raw):
+        """Rewritten raws miss."""
+        cache = KeyframeCache(tmp_path / "kf")
+        cache.put(raw, INDEX)
+
+        raw.write_bytes(b"new raw")
+
+        assert cache.get(raw) is None
+
+    def test_corrupt_entry_misses(self, tmp_path, raw):
+        """Corrupt index files are treated as misses."""
+        cache = KeyframeCache(tmp_path / "kf")
+        cache.put(raw, INDEX)
+        for entry in (tmp_path / "kf").glob("*.kfi"):
+            entry.write_bytes(b"junk")
+
+        assert cache.get(raw) is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Oldest entries are removed past the cap."""
+        cache = KeyframeCache(tmp_path / "kf", max_entries=2)
+        raws = []
+        for i in range(3):
+            path = tmp_path / f"ep{i}.mkv"
+            path.write_bytes(b"x")
+            raws.append(path)
+            cache.put(path, INDEX)
+            # Distinct mtimes regardless of filesystem timestamp resolution
+            for entry in (tmp_path / "kf").glob("*.kfi"):
+                stat = entry.stat()
+                os.utime(entry, ns=(stat.st_atime_ns, stat.st_mtime_ns - 1_000_000_000))
+
+        assert len(list((tmp_path / "kf").glob("*.kfi"))) == 2
+        assert cache.get(raws[0]) is None
+
+
+class TestProbeKeyframes:
+    """Test probe_keyframes helper."""
+
+    def test_probes_once(self, tmp_path, raw):
+        """Second lookup is served from the cache."""
+        runner = MockProcessRunner()
+        runner.set_ffprobe_output(0, "0.000000,K__\n0.041000,___\n10.000000,K__\n")
+        cache = KeyframeCache(tmp_path / "kf")
+
+        first = probe_keyframes(runner, raw, cache)
+        second = probe_keyframes(runner, raw, cache)
+
+        assert list(first.times) == [0.0, 10.0]
+        assert second == first
+        assert len(runner.ffprobe_calls) == 1
+        assert runner.ffprobe_calls[0][-1] == str(raw)
+
+    def test_empty_index_not_cached(self, tmp_path, raw):
+        """Failed probes are not cached."""
+        runner = MockProcessRunner()
+        cache = KeyframeCache(tmp_path / "kf")
+
+        assert len(probe_keyframes(runner, raw, cache)) == 0
+        assert cache.get(raw) is None
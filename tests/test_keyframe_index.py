@@ -0,0 +1,66 @@
+"""Tests for models/keyframe_index.py."""
+
+from array import array
+
+import pytest
+
+from models.keyframe_index import KeyframeIndex, parse_keyframe_lines
+
+
+INDEX = KeyframeIndex(array('d', [0.0, 5.005, 10.01, 15.015]))
+
+
+class TestParseKeyframeLines:
+    """Test parse_keyframe_lines."""
+
+    def test_keeps_only_keyframes(self):
+        """Only packets flagged K are indexed."""
+        lines = ["0.000000,K__\n", "0.042000,___\n", "5.005000,K_\n", "10.010000,K__\n"]
+
+        assert list(parse_keyframe_lines(lines).times) == [0.0, 5.005, 10.01]
+
+    def test_skips_na_and_garbage(self):
+        """N/A timestamps and log lines are ignored."""
+        lines = ["N/A,K__\n", "[matroska] warning\n", "", "2.5,K__\n"]
+
+        assert list(parse_keyframe_lines(lines).times) == [2.5]
+
+    def test_sorts_out_of_order_packets(self):
+        """Out-of-order and duplicate keyframes are normalized."""
+        lines = ["10.0,K__\n", "5.0,K__\n", "5.0,K__\n"]
+
+        assert list(parse_keyframe_lines(lines).times) == [5.0, 10.0]
+
+
+class TestKeyframeIndex:
+    """Test KeyframeIndex lookups and serialization."""
+
+    def test_lookups(self):
+        """Neighbouring keyframes are found by binary search."""
+        assert INDEX.at_or_before(7.0) == 5.005
+        assert INDEX.at_or_before(5.005) == 5.005
+        assert INDEX.at_or_after(7.0) == 10.01
+        assert INDEX.nearest(9.0) == 10.01
+        assert INDEX.at_or_after(20.0) is None
+        assert KeyframeIndex().nearest(1.0) is None
+
+    def test_relative_to_start_time(self):
+        """Timestamps shift by the start time; keyframes before it are dropped."""
+        shifted = INDEX.relative_to(5.005)
+
+        assert list(shifted.times) == pytest.approx([5.005, 10.01])
+        assert INDEX.relative_to(0.0) is INDEX
+
+    def test_bytes_roundtrip(self):
+        """Index survives serialization; 8 bytes per keyframe."""
+        data = INDEX.to_bytes()
+
+        assert len(data) == 8 + 8 * len(INDEX)
+        assert KeyframeIndex.from_bytes(data) == INDEX
+
+    def test_from_bytes_rejects_garbage(self):
+        """Corrupt or truncated blobs raise ValueError."""
+        with pytest.raises(ValueError):
+            KeyframeIndex.from_bytes(b"garbage")
+        with pytest.raises(ValueError):
+            KeyframeIndex.from_bytes(INDEX.to_bytes()[:-1])
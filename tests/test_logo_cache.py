@@ -0,0 +1,83 @@
+"""Tests for modules/logo_cache.py - pre-rendered logo overlays."""
+
+from pathlib import Path
+
+import pytest
+
+from modules.logo_cache import LogoCache
+from tests.mocks.mock_process_runner import MockProcess, MockProcessRunner
+
+LOGO = """[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:00.00,4:00:00.00,Anibaza,,0,0,0,,{\\alpha&H899&}LOGO
+"""
+
+
+class RenderingRunner(MockProcessRunner):
+    """Runner simulating ffmpeg writing the rendered image."""
+
+    def run_ffmpeg(self, args, cwd=None):
+        Path(args[-1]).write_bytes(b"png")
+        return super().run_ffmpeg(args, cwd)
+
+
+@pytest.fixture
+def logo(tmp_path):
+    path = tmp_path / "logo.ass"
+    path.write_text(LOGO, encoding='utf-8')
+    return path
+
+
+class TestLogoCache:
+    """Test LogoCache."""
+
+    def test_rendered_once_per_frame_size(self, logo, tmp_path):
+        runner = RenderingRunner()
+        cache = LogoCache(tmp_path / "cache")
+
+        first = cache.overlay_for(runner, logo, 1920, 1080, 1440.0)
+        again = LogoCache(tmp_path / "cache").overlay_for(runner, logo, 1920, 1080, 1440.0)
+        other = cache.overlay_for(runner, logo, 1280, 720, 1440.0)
+
+        assert first == again and first.read_bytes() == b"png"
+        assert other != first
+        assert len(runner.ffmpeg_calls) == 2
+
+    def test_changed_logo_rendered_again(self, logo, tmp_path):
+        runner = RenderingRunner()
+        cache = LogoCache(tmp_path / "cache")
+        first = cache.overlay_for(runner, logo, 1920, 1080, 1440.0)
+        logo.write_text(LOGO.replace("LOGO", "NEW LOGO"), encoding='utf-8')
+
+        assert cache.overlay_for(runner, logo, 1920, 1080, 1440.0) != first
+
+    def test_changed_fonts_rendered_again(self, logo, tmp_path):
+        """Adding or replacing a logo font renders a new image instead of reusing the old one."""
+        runner = RenderingRunner()
+        cache = LogoCache(tmp_path / "cache")
+        fonts = tmp_path / "fonts"
+        fonts.mkdir()
+        (fonts / "AniBaza.otf").write_bytes(b"v1")
+        first = cache.overlay_for(runner, logo, 1920, 1080, 1440.0, fonts_dir=fonts)
+
+        assert cache.overlay_for(runner, logo, 1920, 1080, 1440.0, fonts_dir=fonts) == first
+        (fonts / "AniBaza.otf").write_bytes(b"v2")
+        assert cache.overlay_for(runner, logo, 1920, 1080, 1440.0, fonts_dir=fonts) != first
+        assert len(runner.ffmpeg_calls) == 2
+
+    def test_animated_logo_not_rendered(self, logo, tmp_path):
+        logo.write_text(LOGO.replace("{", "{\\fad(500,500)}{"), encoding='utf-8')
+        runner = RenderingRunner()
+
+        assert LogoCache(tmp_path / "cache").overlay_for(runner, logo, 1920, 1080, 1440.0) is None
+        assert runner.ffmpeg_calls == []
+
+    def test_failed_render(self, logo, tmp_path):
+        runner = MockProcessRunner()
+        failed = MockProcess()
+        failed.returncode = 1
+        runner.run_ffmpeg = lambda args, cwd=None: failed
+        cache = LogoCache(tmp_path / "cache")
+
+        assert cache.overlay_for(runner, logo, 1920, 1080, 1440.0) is None
+        assert not list(cache.cache_dir.iterdir())
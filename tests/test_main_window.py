@@ -122,3 +122,23 @@ class TestMainWindowQueueIntegration:
         assert callable(window.on_remove_requested)
         assert callable(window.on_stop_requested)
         assert callable(window.on_clear_completed_requested)
+
+    def test_close_waits_for_output_mover(self, qapp, mock_config):
+        """Closing while outputs are being moved asks first, and waits for them on Yes."""
+        from PyQt5.QtGui import QCloseEvent
+        from windows.mainWindow import MainWindow, QMessageBox
+
+        window = MainWindow(mock_config)
+        window.output_mover = MagicMock(busy=True)
+
+        with patch.object(QMessageBox, 'question', return_value=QMessageBox.Cancel):
+            event = QCloseEvent()
+            window.closeEvent(event)
+        assert not event.isAccepted()
+        window.output_mover.wait.assert_not_called()
+
+        with patch.object(QMessageBox, 'question', return_value=QMessageBox.Yes):
+            event = QCloseEvent()
+            window.closeEvent(event)
+        assert event.isAccepted()
+        window.output_mover.wait.assert_called_once()
@@ -0,0 +1,114 @@
+"""Tests for modules/output_mover.py - delivery of outputs from local scratch."""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from modules.output_mover import MoverStatus, OutputMover
+
+
+@pytest.fixture
+def scratch_output(tmp_path):
+    scratch = tmp_path / "scratch" / "job_1"
+    scratch.mkdir(parents=True)
+    output = scratch / "ep01.mkv"
+    output.write_bytes(b"v" * 100)
+    return output
+
+
+def other_filesystem(scratch_root: Path):
+    """Patch os.replace to fail with EXDEV for renames out of scratch, like a move to a network share."""
+    real_replace = os.replace
+
+    def replace(source, destination):
+        if Path(source).is_relative_to(scratch_root) and not Path(destination).is_relative_to(scratch_root):
+            raise OSError(18, "Invalid cross-device link")
+        return real_replace(source, destination)
+    return patch('modules.output_mover.os.replace', side_effect=replace)
+
+
+class TestOutputMover:
+    """Test OutputMover."""
+
+    def test_same_filesystem_renamed_at_once(self, scratch_output, tmp_path):
+        mover = OutputMover(tmp_path / "scratch")
+        destination = tmp_path / "share" / "ep01.mkv"
+        landed = []
+
+        mover.move([(scratch_output, destination)], on_done=lambda: landed.append(True))
+
+        assert landed == [True]
+        assert destination.read_bytes() == b"v" * 100
+        assert not scratch_output.exists()
+        assert mover.status == MoverStatus()
+
+    def test_other_filesystem_copied_in_background(self, scratch_output, tmp_path):
+        statuses = []
+        mover = OutputMover(tmp_path / "scratch", on_status=statuses.append)
+        destination = tmp_path / "share" / "ep01.mkv"
+        landed = []
+
+        with other_filesystem(tmp_path / "scratch"):
+            mover.move([(scratch_output, destination)], on_done=lambda: landed.append(True))
+            assert mover.wait(timeout=5)
+
+        assert landed == [True]
+        assert destination.read_bytes() == b"v" * 100
+        assert not scratch_output.exists()
+        assert not destination.with_name("ep01.mkv.part").exists()
+        assert statuses[0].pending_files == 1 and statuses[0].pending_bytes == 100
+        assert statuses[-1].pending_files == 0 and statuses[-1].pending_bytes == 0
+
+    def test_failed_copy_keeps_scratch_output(self, scratch_output, tmp_path):
+        mover = OutputMover(tmp_path / "scratch")
+        destination = tmp_path / "share" / "ep01.mkv"
+        destination.mkdir(parents=True)  # Cannot be replaced by a file
+        landed = []
+
+        failed = []
+
+        mover.move([(scratch_output, destination)], on_done=lambda: landed.append(True), on_failed=failed.append)
+        assert mover.wait(timeout=5)
+
+        assert landed == []
+        assert failed == [f"Moving ep01.mkv failed; kept in {scratch_output.parent}"]
+        assert scratch_output.read_bytes() == b"v" * 100
+        assert not destination.with_name("ep01.mkv.part").exists()
+        assert mover.status.pending_files == 0
+
+    def test_undelivered_output_delivered_before_reuse(self, scratch_output, tmp_path):
+        """An output whose copy failed (or was cut short by quitting) is delivered by the next run of its job."""
+        destination = tmp_path / "share" / "ep01.mkv"
+        destination.mkdir(parents=True)
+        with other_filesystem(tmp_path / "scratch"):
+            mover = OutputMover(tmp_path / "scratch")
+            mover.move([(scratch_output, destination)])
+            assert mover.wait(timeout=5)
+            assert mover.deliver_leftovers(scratch_output.parent) == [scratch_output]  # Still blocked
+
+            destination.rmdir()
+            restarted = OutputMover(tmp_path / "scratch")
+            assert restarted.deliver_leftovers(tmp_path / "scratch" / "job_2") == []  # Other jobs' outputs untouched
+            assert scratch_output.exists()
+            assert restarted.deliver_leftovers(scratch_output.parent) == []
+
+        assert destination.read_bytes() == b"v" * 100
+        assert not scratch_output.exists()
+        assert restarted.deliver_leftovers(scratch_output.parent) == []  # Journal entry dropped
+
+    def test_delivered_outputs_leave_journal(self, scratch_output, tmp_path):
+        mover = OutputMover(tmp_path / "scratch")
+        with other_filesystem(tmp_path / "scratch"):
+            mover.move([(scratch_output, tmp_path / "share" / "ep01.mkv")])
+            assert mover.wait(timeout=5)
+
+        assert mover._journal_load() == {}
+
+    def test_from_config(self, mock_config):
+        assert OutputMover.from_config(mock_config) is None
+
+        mock_config.output_scratch = True
+        mover = OutputMover.from_config(mock_config)
+        assert mover.scratch_dir("job_1") == mock_config.main_paths.temp / "outputs" / "job_1"
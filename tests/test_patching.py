@@ -0,0 +1,76 @@
+"""Tests for models/patching.py - partial re-render planning."""
+
+from array import array
+
+import pytest
+
+from models.keyframe_index import KeyframeIndex
+from models.patching import PatchPiece, TimeRange, parse_time_ranges, plan_patch
+
+
+KEYFRAMES = KeyframeIndex(array('d', [float(t) for t in range(0, 1440, 10)]))
+
+
+class TestParseTimeRanges:
+    """Test parse_time_ranges."""
+
+    def test_minutes_and_seconds(self):
+        assert parse_time_ranges("12:30-12:45") == (TimeRange(750.0, 765.0),)
+
+    def test_multiple_formats(self):
+        assert parse_time_ranges("1:02:03.5-1:02:10, 90 - 95") == (
+            TimeRange(3723.5, 3730.0), TimeRange(90.0, 95.0)
+        )
+
+    def test_blank(self):
+        assert parse_time_ranges("") == ()
+        assert parse_time_ranges(" , ") == ()
+
+    def test_malformed(self):
+        with pytest.raises(ValueError):
+            parse_time_ranges("12:30")
+
+    def test_reversed(self):
+        with pytest.raises(ValueError):
+            parse_time_ranges("12:45-12:30")
+
+
+class TestPlanPatch:
+    """Test plan_patch."""
+
+    def test_range_widened_to_keyframes(self):
+        """The fix is re-encoded between the surrounding keyframes."""
+        pieces = plan_patch([TimeRange(752.0, 758.0)], KEYFRAMES, 1440.0)
+
+        assert pieces == [
+            PatchPiece(0.0, 750.0, reencode=False),
+            PatchPiece(750.0, 760.0, reencode=True),
+            PatchPiece(760.0, 1440.0, reencode=False),
+        ]
+
+    def test_close_ranges_merged(self):
+        """Ranges sharing a GOP are re-encoded as one piece."""
+        pieces = plan_patch([TimeRange(765.0, 770.0), TimeRange(752.0, 761.0)], KEYFRAMES, 1440.0)
+
+        assert [p for p in pieces if p.reencode] == [PatchPiece(750.0, 770.0, reencode=True)]
+
+    def test_range_at_start_and_end(self):
+        """Ranges touching the file edges leave no empty kept pieces."""
+        pieces = plan_patch([TimeRange(0.0, 5.0), TimeRange(1435.0, 1500.0)], KEYFRAMES, 1440.0)
+
+        assert pieces == [
+            PatchPiece(0.0, 10.0, reencode=True),
+            PatchPiece(10.0, 1430.0, reencode=False),
+            PatchPiece(1430.0, 1440.0, reencode=True),
+        ]
+
+    def test_nothing_to_patch(self):
+        """Ranges outside the output yield no plan."""
+        assert plan_patch([], KEYFRAMES, 1440.0) == []
+        assert plan_patch([TimeRange(2000.0, 2010.0)], KEYFRAMES, 1440.0) == []
+
+    def test_piece_segment(self):
+        """Re-encoded pieces map to raw segments."""
+        segment = PatchPiece(750.0, 760.0, reencode=True).segment(0, final=False)
+
+        assert (segment.start_sec, segment.duration_sec, segment.final) == (750.0, 10.0, False)
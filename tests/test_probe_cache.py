@@ -0,0 +1,189 @@
+"""Tests for modules/probe_cache.py - persistent ffprobe cache."""
+
+import json
+import os
+
+import pytest
+
+from models.file_identity import FileIdentity
+from modules.probe_cache import ProbeCache, probe_video
+from tests.mocks.mock_process_runner import MockProcessRunner
+
+
+PROBE = {
+    'streams': [{'index': 0, 'codec_type': 'video', 'codec_name': 'h264', 'height': 1080,
+                 'pix_fmt': 'yuv420p', 'r_frame_rate': '24000/1001', 'avg_frame_rate': '24000/1001'}],
+    'format': {'duration': '1442.05'},
+}
+
+
+@pytest.fixture
+def raw(tmp_path):
+    """Raw file to probe."""
+    path = tmp_path / "raw.mkv"
+    path.write_bytes(b"raw")
+    return path
+
+
+class TestFileIdentity:
+    """Test FileIdentity."""
+
+    def test_identity_changes_with_content(self, raw):
+        """Rewriting a file changes its identity."""
+        before = FileIdentity.of(raw)
+        raw.write_bytes(b"longer raw")
+
+        assert FileIdentity.of(raw) != before
+        assert FileIdentity.of(raw).size == 10
+
+    def test_missing_file_raises(self, tmp_path):
+        """Missing files raise OSError."""
+        with pytest.raises(OSError):
+            FileIdentity.of(tmp_path / "missing.mkv")
+
+
+class TestProbeCache:
+    """Test ProbeCache storage and eviction."""
+
+    def test_roundtrip(self, tmp_path, raw):
+        """Stored probe is returned as VideoInfo."""
+        cache = ProbeCache(tmp_path / "cache")
+        cache.put(raw, PROBE)
+
+        info = cache.get(raw)
+
+        assert info.resolution == "1080p"
+        assert info.duration_seconds == pytest.approx(1442.05)
+
+    def test_miss_for_unknown_file(self, tmp_path, raw):
+        """Unknown and missing files miss."""
+        cache = ProbeCache(tmp_path / "cache")
+
+        assert cache.get(raw) is None
+        assert cache.get(tmp_path / "missing.mkv") is None
+
+    def test_invalidated_when_file_changes(self, tmp_path, raw):
+        """Changing size or mtime invalidates the entry."""
+        cache = ProbeCache(tmp_path / "cache")
+        cache.put(raw, PROBE)
+
+        stat = raw.stat()
+        os.utime(raw, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert cache.get(raw) is None
+
+    def test_persists_across_instances(self, tmp_path, raw):
+        """Cache survives restarts."""
+        ProbeCache(tmp_path / "cache").put(raw, PROBE)
+
+        assert ProbeCache(tmp_path / "cache").get(raw) is not None
+
+    def test_lru_eviction(self, tmp_path):
+        """Least recently used entries are evicted past the cap."""
+        files = []
+        for i in range(3):
+            path = tmp_path / f"ep{i}.mkv"
+            path.write_bytes(b"x")
+            files.append(path)
+
+        cache = ProbeCache(tmp_path / "cache", max_entries=2)
+        cache.put(files[0], PROBE)
+        cache.put(files[1], PROBE)
+        cache.get(files[0])  # Touch ep0 so ep1 becomes least recent
+        cache.put(files[2], PROBE)
+
+        assert len(cache) == 2
+        assert cache.get(files[1]) is None
+        assert cache.get(files[0]) is not None
+        assert cache.get(files[2]) is not None
+
+    def test_size_cap_evicts_by_bytes(self, tmp_path):
+        """Least recently used entries are evicted once the file would exceed the size cap."""
+        files = []
+        for i in range(3):
+            path = tmp_path / f"ep{i}.mkv"
+            path.write_bytes(b"x")
+            files.append(path)
+        single = ProbeCache(tmp_path / "single")
+        single.put(files[0], PROBE)
+        file_size = os.path.getsize(single.path)  # One entry
+
+        cache = ProbeCache(tmp_path / "cache", max_bytes=file_size * 5 // 2)
+        for path in files:
+            cache.put(path, PROBE)
+
+        assert len(cache) == 2
+        assert cache.get(files[0]) is None
+        assert os.path.getsize(cache.path) <= cache.max_bytes
+
+    def test_corrupt_cache_starts_empty(self, tmp_path, raw):
+        """A corrupt cache file is ignored."""
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        (cache_dir / ProbeCache.FILE_NAME).write_text("{not json")
+
+        cache = ProbeCache(cache_dir)
+
+        assert cache.get(raw) is None
+        cache.put(raw, PROBE)
+        assert json.loads((cache_dir / ProbeCache.FILE_NAME).read_text())['version'] == ProbeCache.VERSION
+
+
+class TestProbeVideo:
+    """Test probe_video helper."""
+
+    def test_probes_once(self, tmp_path, raw):
+        """Second probe of the same file is served from cache."""
+        runner = MockProcessRunner()
+        runner.set_ffprobe_output(0, json.dumps(PROBE))
+        cache = ProbeCache(tmp_path / "cache")
+
+        first = probe_video(runner, raw, cache)
+        second = probe_video(runner, raw, cache)
+
+        assert len(runner.ffprobe_calls) == 1
+        assert first == second
+
+    def test_frames_counted_once_when_unknown(self, tmp_path, raw):
+        """Without an exact frame count the video packets are counted, and the count is cached."""
+        counted = {**PROBE, 'streams': [{**PROBE['streams'][0], 'nb_read_packets': '34574'}]}
+        runner = MockProcessRunner()
+        runner.set_ffprobe_output(0, json.dumps(PROBE))
+        runner.set_ffprobe_output(1, json.dumps(counted))
+        cache = ProbeCache(tmp_path / "cache")
+
+        assert probe_video(runner, raw, cache).nb_frames == 0
+        info = probe_video(runner, raw, cache, count_frames=True)
+        again = probe_video(runner, raw, cache, count_frames=True)
+
+        assert info.nb_frames == again.nb_frames == 34574
+        assert info.total_frames == 34574
+        assert len(runner.ffprobe_calls) == 2
+        assert '-count_packets' in runner.ffprobe_calls[1]
+
+    def test_known_frame_count_not_counted(self, tmp_path, raw):
+        probe = {**PROBE, 'streams': [{**PROBE['streams'][0], 'nb_frames': '34574'}]}
+        runner = MockProcessRunner()
+        runner.set_ffprobe_output(0, json.dumps(probe))
+
+        assert probe_video(runner, raw, count_frames=True).nb_frames == 34574
+        assert len(runner.ffprobe_calls) == 1
+
+    def test_failed_probe_not_cached(self, tmp_path, raw):
+        """Empty probe documents are not cached."""
+        runner = MockProcessRunner()
+        runner.set_ffprobe_output(0, "raw.mkv: Invalid data found\n{\n\n}\n")
+        cache = ProbeCache(tmp_path / "cache")
+
+        info = probe_video(runner, raw, cache)
+
+        assert info.duration_seconds == 0.0
+        assert cache.get(raw) is None
+
+    def test_no_json_raises(self, tmp_path, raw):
+        """Output without JSON raises ValueError."""
+        runner = MockProcessRunner()
+        runner.set_ffprobe_output(0, "ffprobe: not found")
+
+        with pytest.raises(ValueError):
+            probe_video(runner, raw)
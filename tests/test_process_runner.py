@@ -5,7 +5,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from modules.process_runner import SubprocessRunner
+from modules.process_runner import JobProcessRunner, SubprocessRunner
 from tests.mocks.mock_process_runner import MockProcess, MockProcessRunner
 
 
@@ -112,6 +112,19 @@ class TestSubprocessRunner:
             call_kwargs = mock_popen.call_args[1]
             assert 'shell' not in call_kwargs or call_kwargs.get('shell') is False
 
+    def test_run_ffmpeg_merges_stderr_into_progress_pipe(self):
+        """One reader gets progress and log output, so a full stderr pipe cannot stall ffmpeg."""
+        import subprocess
+
+        runner = SubprocessRunner(Path("/usr/bin/ffmpeg"))
+
+        with patch('subprocess.Popen') as mock_popen:
+            runner.run_ffmpeg(['-version'])
+
+        call_kwargs = mock_popen.call_args[1]
+        assert call_kwargs['stdout'] == subprocess.PIPE
+        assert call_kwargs['stderr'] == subprocess.STDOUT
+
     def test_run_ffmpeg_uses_cwd(self):
         """SubprocessRunner uses provided cwd parameter."""
         runner = SubprocessRunner(Path("/usr/bin/ffmpeg"), cwd=Path("/default"))
@@ -184,3 +197,56 @@ class TestSubprocessRunner:
             # Verify kill was called after timeout
             mock_proc.terminate.assert_called_once()
             mock_proc.kill.assert_called_once()
+
+    def test_kill_ffmpeg_terminates_all_processes(self):
+        """kill_ffmpeg terminates every process started (chunked encodes)."""
+        runner = SubprocessRunner(Path("/usr/bin/ffmpeg"))
+
+        with patch('subprocess.Popen') as mock_popen:
+            procs = [MagicMock(), MagicMock()]
+            for proc in procs:
+                proc.poll.return_value = None
+                proc.wait.return_value = 0
+            mock_popen.side_effect = procs
+
+            runner.run_ffmpeg(['-i', 'a.mkv'])
+            runner.run_ffmpeg(['-i', 'b.mkv'])
+            runner.kill_ffmpeg()
+
+            for proc in procs:
+                proc.terminate.assert_called_once()
+
+
+class TestJobProcessRunner:
+    """Test JobProcessRunner."""
+
+    def test_kill_ffmpeg_stops_only_own_processes(self):
+        """Stopping one parallel job leaves the encodes of the others running."""
+        shared = SubprocessRunner(Path("/usr/bin/ffmpeg"))
+        first, second = JobProcessRunner(shared), JobProcessRunner(shared)
+
+        with patch('subprocess.Popen') as mock_popen:
+            procs = [MagicMock(), MagicMock()]
+            for proc in procs:
+                proc.poll.return_value = None
+                proc.wait.return_value = 0
+            mock_popen.side_effect = procs
+
+            first.run_ffmpeg(['-i', 'a.mkv'])
+            second.run_ffmpeg(['-i', 'b.mkv'])
+            first.kill_ffmpeg()
+
+            procs[0].terminate.assert_called_once()
+            procs[1].terminate.assert_not_called()
+
+    def test_delegates_to_shared_runner(self):
+        shared = MockProcessRunner()
+        runner = JobProcessRunner(shared)
+
+        runner.run_ffmpeg(['-version'])
+        runner.run_ffprobe(['-i', 'video.mkv'])
+        runner.kill_ffmpeg()
+
+        assert shared.ffmpeg_calls == [['-version']]
+        assert shared.ffprobe_calls == [['-i', 'video.mkv']]
+        assert shared._kill_called is False
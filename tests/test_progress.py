@@ -0,0 +1,145 @@
+"""Tests for models/progress.py - ffmpeg -progress parsing."""
+
+import pytest
+
+from models.progress import (
+    ProgressParser, ProgressSample, aggregate_progress, parse_progress_lines, scale_to_pass,
+    split_progress_line
+)
+
+
+BLOCK = [
+    "frame=240\n",
+    "fps=23.98\n",
+    "stream_0_0_q=28.0\n",
+    "bitrate=1536.4kbits/s\n",
+    "total_size=1966080\n",
+    "out_time_us=10010000\n",
+    "out_time_ms=10010000\n",
+    "out_time=00:00:10.010000\n",
+    "dup_frames=0\n",
+    "drop_frames=0\n",
+    "speed=2.5x\n",
+    "progress=continue\n",
+]
+
+
+class TestSplitProgressLine:
+    """Test key=value line splitting."""
+
+    def test_split_progress_key(self):
+        """Progress lines split into key and value."""
+        assert split_progress_line("out_time_us=1500000\n") == ("out_time_us", "1500000")
+
+    def test_split_ignores_log_lines(self):
+        """Log lines are not treated as progress keys."""
+        assert split_progress_line("Input #0, matroska,webm, from 'a.mkv':")[0] is None
+        assert split_progress_line("[libx264 @ 0x1] 264 - core 164 - options: cabac=1 ref=3")[0] is None
+        assert split_progress_line("\n")[0] is None
+
+
+class TestProgressParser:
+    """Test block parsing into ProgressSample."""
+
+    def test_parses_full_block(self):
+        """A complete block yields a typed sample."""
+        samples = list(parse_progress_lines(BLOCK))
+
+        assert len(samples) == 1
+        sample = samples[0]
+        assert sample.frame == 240
+        assert sample.fps == pytest.approx(23.98)  # Fractional fps preserved
+        assert sample.out_time_sec == pytest.approx(10.01)
+        assert sample.speed == pytest.approx(2.5)
+        assert sample.bitrate_kbps == pytest.approx(1536.4)
+        assert sample.total_size == 1966080
+        assert sample.finished is False
+
+    def test_incomplete_block_not_emitted(self):
+        """No sample until the progress= line closes the block."""
+        parser = ProgressParser()
+
+        assert all(parser.feed(line) is None for line in BLOCK[:-1])
+        assert parser.feed(BLOCK[-1]) is not None
+
+    def test_end_block_marks_finished(self):
+        """progress=end marks the final sample."""
+        samples = list(parse_progress_lines(BLOCK[:-1] + ["progress=end\n"]))
+
+        assert samples[0].finished is True
+
+    def test_na_values_default(self):
+        """N/A values fall back to defaults."""
+        lines = ["frame=0\n", "fps=0.00\n", "bitrate=N/A\n", "out_time_us=N/A\n",
+                 "speed=N/A\n", "progress=continue\n"]
+
+        sample = next(parse_progress_lines(lines))
+
+        assert sample == ProgressSample()
+
+    def test_out_time_ms_fallback(self):
+        """Older builds only report out_time_ms (in microseconds)."""
+        sample = next(parse_progress_lines(["out_time_ms=2000000\n", "progress=continue\n"]))
+
+        assert sample.out_time_sec == pytest.approx(2.0)
+
+    def test_log_lines_interleaved(self):
+        """Log lines merged into the pipe do not break parsing."""
+        lines = ["[hevc @ 0x1] Warning: something=odd happened\n"] + BLOCK + BLOCK
+
+        samples = list(parse_progress_lines(lines))
+
+        assert len(samples) == 2
+        assert samples[1].frame == 240
+
+
+class TestAggregateProgress:
+    """Test aggregate_progress for concurrent encodes."""
+
+    def test_sums_concurrent_samples(self):
+        """Frames, time, size and speed add up across encodes."""
+        total = aggregate_progress([
+            ProgressSample(frame=100, fps=20.0, out_time_sec=4.0, speed=1.5, total_size=1000),
+            ProgressSample(frame=50, fps=10.0, out_time_sec=1.0, speed=0.5, total_size=250, finished=True),
+        ])
+
+        assert total.frame == 150
+        assert total.fps == pytest.approx(30.0)
+        assert total.out_time_sec == pytest.approx(5.0)
+        assert total.speed == pytest.approx(2.0)
+        assert total.bitrate_kbps == pytest.approx(1250 * 8 / 5.0 / 1000)
+        assert not total.finished
+
+    def test_empty(self):
+        """No samples yields an empty, unfinished sample."""
+        assert aggregate_progress([]) == ProgressSample()
+
+
+class TestScaleToPass:
+    """Test scale_to_pass for two-pass encodes."""
+
+    def test_second_pass_fills_upper_half(self):
+        """Second pass maps onto the second half of the scale."""
+        sample = ProgressSample(frame=500, fps=40.0, out_time_sec=30.0, speed=2.0, finished=True)
+
+        scaled = scale_to_pass(sample, 1, 2, total_frames=1000, total_duration_sec=60.0)
+
+        assert scaled.frame == 750
+        assert scaled.out_time_sec == pytest.approx(45.0)
+        assert scaled.speed == pytest.approx(1.0)
+        assert scaled.finished
+
+    def test_first_pass_never_finished(self):
+        """Only the last pass finishes the encode."""
+        sample = ProgressSample(frame=1000, out_time_sec=60.0, finished=True)
+
+        scaled = scale_to_pass(sample, 0, 2, total_frames=1000, total_duration_sec=60.0)
+
+        assert scaled.frame == 500
+        assert not scaled.finished
+
+    def test_single_pass_unchanged(self):
+        """Single-pass samples pass through."""
+        sample = ProgressSample(frame=10)
+
+        assert scale_to_pass(sample, 0, 1, 1000, 60.0) is sample
@@ -10,6 +10,20 @@ from models.enums import BuildState, JobStatus, LogoState, NvencState
 from models.job import VideoPresets
 
 
+def _wait_for_queue_checks(qapp, window) -> None:
+    """Wait until the jobs being checked for the queue are queued or rejected."""
+    for check in list(window._queue_checks):
+        check.wait()
+    qapp.processEvents()
+
+
+def _add_to_queue(qapp, window) -> bool:
+    """Add the job set in the UI and wait until its queue checks finished."""
+    added = window.on_add_to_queue_clicked()
+    _wait_for_queue_checks(qapp, window)
+    return added
+
+
 class TestAddToQueueIntegration:
     """Test on_add_to_queue_clicked integration with UI and queue."""
 
@@ -46,7 +60,7 @@ class TestAddToQueueIntegration:
         assert len(window.job_queue.get_all_jobs()) == 0
 
         # Call add to queue
-        window.on_add_to_queue_clicked()
+        _add_to_queue(qapp, window)
 
         # Job should be added to queue
         jobs = window.job_queue.get_all_jobs()
@@ -70,6 +84,49 @@ class TestAddToQueueIntegration:
         assert queued_job.job.video_settings.profile_level == VideoPresets.SOFTSUB.profile_level
         assert queued_job.job.video_settings.pixel_format == VideoPresets.SOFTSUB.pixel_format
 
+    def test_add_to_queue_uses_and_resets_job_options(self, qapp, mock_config, tmp_path):
+        """Target size and patch ranges go on the queued job only, then the panel is reset."""
+        from models.patching import TimeRange
+        from windows.mainWindow import MainWindow
+
+        window = MainWindow(mock_config)
+        raw_path = tmp_path / "raw.mkv"
+        raw_path.touch()
+        window._ui_paths['raw'] = str(raw_path)
+        window.config.build_settings.episode_name = "Episode_01"
+        window.config.build_settings.build_state = BuildState.HARD_ONLY
+        window.queue_widget.target_size_spinbox.setValue(700)
+        window.queue_widget.patch_ranges_editline.setText("12:30-12:45")
+
+        _add_to_queue(qapp, window)
+        window._ui_paths['raw'] = str(raw_path)
+        _add_to_queue(qapp, window)
+
+        first, second = (queued_job.job for queued_job in window.job_queue.get_all_jobs())
+        assert (first.target_size_mb, first.patch_ranges) == (700, (TimeRange(750.0, 765.0),))
+        assert (second.target_size_mb, second.patch_ranges) == (0, ())
+
+    def test_add_to_queue_locks_inputs_during_check(self, qapp, mock_config, tmp_path):
+        """The inputs stay locked until the job is checked, so it cannot be added twice."""
+        from windows.mainWindow import MainWindow
+
+        window = MainWindow(mock_config)
+        raw_path = tmp_path / "raw.mkv"
+        raw_path.touch()
+        window._ui_paths['raw'] = str(raw_path)
+        window.config.build_settings.episode_name = "Episode_01"
+        window.config.build_settings.build_state = BuildState.HARD_ONLY
+
+        assert window.on_add_to_queue_clicked()
+        assert not window.ui.render_start_button.isEnabled()
+        assert not window.ui.raw_path_editline.isEnabled()
+        assert not window.queue_widget.target_size_spinbox.isEnabled()
+        _wait_for_queue_checks(qapp, window)
+
+        assert window.ui.render_start_button.isEnabled()
+        assert window.ui.raw_path_editline.isEnabled()
+        assert len(window.job_queue.get_all_jobs()) == 1
+
     def test_add_to_queue_clears_ui_after_success(self, qapp, mock_config, tmp_path):
         """on_add_to_queue_clicked clears UI fields after successful add."""
         from windows.mainWindow import MainWindow
@@ -96,7 +153,7 @@ class TestAddToQueueIntegration:
         window.ui.subtitle_path_editline = MagicMock()
 
         # Call add to queue
-        window.on_add_to_queue_clicked()
+        _add_to_queue(qapp, window)
 
         # UI should be cleared
         window.ui.raw_path_editline.clear.assert_called_once()
@@ -127,7 +184,7 @@ class TestAddToQueueValidation:
         window.config.build_settings.episode_name = "Episode_01"
 
         # Call add to queue
-        window.on_add_to_queue_clicked()
+        _add_to_queue(qapp, window)
 
         # Should show error via display_error
         window.display_error.assert_called_once()
@@ -159,7 +216,7 @@ class TestAddToQueueValidation:
         # Mock display_error to verify error is shown (coding_error now uses display_error)
         window.display_error = Mock()
 
-        window.on_add_to_queue_clicked()
+        _add_to_queue(qapp, window)
 
         # Should show error message via display_error
         window.display_error.assert_called_once()
@@ -169,6 +226,64 @@ class TestAddToQueueValidation:
         # Job should NOT be added
         assert len(window.job_queue.get_all_jobs()) == 0
 
+    @pytest.mark.parametrize("font_audit", [True, False])
+    def test_add_to_queue_checks_subtitle_fonts(self, qapp, mock_config, tmp_path, font_audit):
+        """Subtitles using a font that is not available are rejected before queueing."""
+        from windows.mainWindow import MainWindow
+        from unittest.mock import Mock
+
+        window = MainWindow(mock_config)
+        window.display_error = Mock()
+        raw_path, audio_path, sub_path = tmp_path / "raw.mkv", tmp_path / "audio.mka", tmp_path / "sub.ass"
+        raw_path.touch()
+        audio_path.touch()
+        sub_path.write_text(
+            "[V4+ Styles]\nFormat: Name, Fontname, Fontsize\nStyle: Default,AniBaza Missing Font,48\n\n"
+            "[Events]\nFormat: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+            "Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,Hello\n", encoding='utf-8'
+        )
+        window._ui_paths.update(raw=str(raw_path), audio=str(audio_path), sub=str(sub_path))
+        window.config.build_settings.episode_name = "Episode_01"
+        window.config.build_settings.build_state = BuildState.HARD_ONLY
+        window.config.font_audit = font_audit
+
+        added = _add_to_queue(qapp, window)
+
+        assert added
+        assert len(window.job_queue.get_all_jobs()) == (0 if font_audit else 1)
+        if font_audit:
+            assert "AniBaza Missing Font" in window.display_error.call_args[0][0]
+
+    def test_add_to_queue_probes_off_gui_thread(self, qapp, mock_config, tmp_path):
+        """The raw is probed in a worker thread, and the job is queued with the probe once it finishes."""
+        import threading
+        from windows.mainWindow import MainWindow
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        runner.set_ffprobe_output(0, '{"streams": [{"index": 0, "codec_type": "video", "codec_name": "h264", '
+                                     '"height": 1080}], "format": {"duration": "1440.0"}}')
+        probe_threads = []
+        original_probe = runner.run_ffprobe
+
+        def run_ffprobe(args, cwd=None):
+            probe_threads.append(threading.current_thread())
+            return original_probe(args, cwd)
+        runner.run_ffprobe = run_ffprobe
+        window = MainWindow(mock_config, runner=runner)
+        raw_path = tmp_path / "raw.mkv"
+        raw_path.touch()
+        window._ui_paths['raw'] = str(raw_path)
+        window.config.build_settings.episode_name = "Episode_01"
+        window.config.build_settings.build_state = BuildState.HARD_ONLY
+
+        added = _add_to_queue(qapp, window)
+
+        assert added
+        assert probe_threads and threading.main_thread() not in probe_threads
+        (queued_job,) = window.job_queue.get_all_jobs()
+        assert queued_job.job.total_duration_sec == 1440.0
+
     def test_add_to_queue_with_optional_paths(self, qapp, mock_config, tmp_path):
         """on_add_to_queue_clicked works with only raw path (no audio/sub)."""
         from windows.mainWindow import MainWindow
@@ -191,7 +306,7 @@ class TestAddToQueueValidation:
         window.ui.subtitle_path_editline = MagicMock()
 
         # Call add to queue
-        window.on_add_to_queue_clicked()
+        _add_to_queue(qapp, window)
 
         # Job should be added
         jobs = window.job_queue.get_all_jobs()
@@ -228,7 +343,7 @@ class TestAddToQueueValidation:
         window.ui.subtitle_path_editline = MagicMock()
 
         # Call add to queue
-        window.on_add_to_queue_clicked()
+        _add_to_queue(qapp, window)
 
         # Should refresh display
         window.refresh_queue_display.assert_called_once()
@@ -295,6 +410,7 @@ class TestStartButtonSmartBehavior:
 
         # Call on_add_to_queue_and_start (new unified button)
         window.on_add_to_queue_and_start()
+        _wait_for_queue_checks(qapp, window)
 
         # Queue processor should be started
         window.queue_processor.start.assert_called_once()
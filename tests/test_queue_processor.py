@@ -1,9 +1,10 @@
 """Tests for threads/QueueProcessor.py - queue processing thread."""
 
+from concurrent.futures import Future
 from unittest.mock import Mock, MagicMock, patch
 import pytest
 
-from models.enums import JobStatus
+from models.enums import BuildState, JobStatus, NvencState
 from models.job_queue import JobQueue, QueuedJob
 from threads.QueueProcessor import QueueProcessor
 
@@ -167,7 +168,11 @@ class TestQueueProcessorRun:
             mock_thread2.run = Mock()
             # Set _cancelled to False to indicate successful completion
             mock_thread1._cancelled = False
+            mock_thread1.delivery = delivered()
             mock_thread2._cancelled = False
+            mock_thread2.delivery = delivered()
+            mock_thread1.error = None
+            mock_thread2.error = None
             MockRenderThread.side_effect = [mock_thread1, mock_thread2]
 
             # Track signal emissions
@@ -224,6 +229,35 @@ class TestQueueProcessorRun:
             assert jobs[0].status == JobStatus.FAILED
             assert jobs[0].error_message is not None
 
+    def test_failed_render_step_fails_job(self, qapp, mock_config, mock_render_paths):
+        """An error raised by a render step ends the job FAILED, not COMPLETED."""
+        from models.encoding import EncodingParams
+        from models.enums import LogoState
+        from models.job import RenderJob, VideoPresets
+        from models.render_graph import RenderStep
+        from tests.mocks.mock_process_runner import MockProcessRunner
+        from threads.RenderThread import ThreadClassRender
+
+        job = RenderJob(paths=mock_render_paths, episode_name="ep01", build_state=BuildState.HARD_ONLY,
+                        nvenc_state=NvencState.NVENC_NONE, logo_state=LogoState.LOGO_BOTH,
+                        encoding_params=EncodingParams("6M", "9M", "18M", 18, 19, 17, 23),
+                        video_settings=VideoPresets.SOFTSUB)
+        mock_config.lookahead_jobs = 0
+        processor = QueueProcessor(JobQueue(), config=mock_config, runner=MockProcessRunner())
+        job_id = processor.queue.add(job)
+
+        def fail():
+            raise RuntimeError("Concat failed with exit code 1")
+        failed = []
+        processor.job_failed.connect(lambda failed_id, message: failed.append((failed_id, message)))
+
+        with patch.object(ThreadClassRender, 'render_steps', lambda thread: [RenderStep('encode', fail)]), \
+             patch('sys.excepthook'):
+            processor.run()
+
+        assert failed == [(job_id, "Concat failed with exit code 1")]
+        assert processor.queue.get_all_jobs()[0].status == JobStatus.FAILED
+
     def test_run_handles_cancellation(self, qapp):
         """run() handles cancellation and emits job_cancelled signal."""
         from unittest.mock import patch
@@ -264,6 +298,333 @@ class TestQueueProcessorRun:
             assert jobs[0].status == JobStatus.CANCELLED
 
 
+def delivered(error=None) -> Future:
+    """Finished output delivery of a mock RenderThread (failed with error, if given)."""
+    delivery = Future()
+    if error is None:
+        delivery.set_result(None)
+    else:
+        delivery.set_exception(error)
+    return delivery
+
+
+def make_job(build_state, nvenc_state):
+    """Mock queued RenderJob with the states its resource demand is derived from."""
+    job = Mock()
+    job.build_state = build_state
+    job.nvenc_state = nvenc_state
+    job.paths.previous_softsub = None
+    return job
+
+
+class TestQueueProcessorParallel:
+    """Test running several jobs at once within the resource budget."""
+
+    def run_jobs(self, mock_config, jobs, run, processor=None):
+        """Run jobs through a processor whose RenderThreads call run(thread, job)."""
+        if processor is None:
+            processor = QueueProcessor(JobQueue(), config=mock_config)
+        for job in jobs:
+            processor.queue.add(job)
+
+        def make_thread(**kwargs):
+            thread = Mock()
+            thread._cancelled = False
+            thread.delivery = delivered()
+            thread.error = None
+            thread.run.side_effect = lambda: run(thread, kwargs['job'])
+            return thread
+
+        with patch('threads.RenderThread.ThreadClassRender', side_effect=make_thread):
+            processor.run()
+        return processor.queue
+
+    def test_jobs_on_different_hardware_run_together(self, qapp, mock_config):
+        """An NVENC job and a software job overlap."""
+        import threading
+        mock_config.parallel_jobs = 2
+        barrier = threading.Barrier(2, timeout=5)
+        jobs = [make_job(BuildState.HARD_ONLY, NvencState.NVENC_BOTH),
+                make_job(BuildState.HARD_ONLY, NvencState.NVENC_NONE)]
+
+        queue = self.run_jobs(mock_config, jobs, lambda thread, job: barrier.wait())
+
+        assert [job.status for job in queue.get_all_jobs()] == [JobStatus.COMPLETED] * 2
+
+    def test_budget_limits_concurrent_encodes(self, qapp, mock_config):
+        """Two software encodes never share the single CPU encode slot."""
+        import threading
+        import time
+        mock_config.parallel_jobs = 3
+        lock = threading.Lock()
+        active, peak = [0], [0]
+
+        def run(thread, job):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+        jobs = [make_job(BuildState.HARD_ONLY, NvencState.NVENC_NONE) for _ in range(3)]
+        queue = self.run_jobs(mock_config, jobs, run)
+
+        assert peak[0] == 1
+        assert [job.status for job in queue.get_all_jobs()] == [JobStatus.COMPLETED] * 3
+
+    def test_blocked_job_lets_later_jobs_start(self, qapp, mock_config):
+        """A job waiting for the CPU slot does not hold back an NVENC job behind it."""
+        import threading
+        mock_config.parallel_jobs = 2
+        barrier = threading.Barrier(2, timeout=5)
+        first, second, third = (make_job(BuildState.HARD_ONLY, NvencState.NVENC_NONE),
+                                make_job(BuildState.HARD_ONLY, NvencState.NVENC_NONE),
+                                make_job(BuildState.HARD_ONLY, NvencState.NVENC_BOTH))
+        order = []
+
+        def run(thread, job):
+            order.append(job)
+            if job is not second:
+                barrier.wait()  # first and third must overlap
+
+        self.run_jobs(mock_config, [first, second, third], run)
+
+        assert order.index(third) < order.index(second)
+
+    def test_progress_carries_job_id(self, qapp, mock_config):
+        from PyQt5.QtCore import Qt
+
+        processor = QueueProcessor(JobQueue(), config=mock_config)
+        progress = []
+        processor.frame_upd.connect(lambda *args: progress.append(args), Qt.DirectConnection)
+
+        def run(thread, job):
+            thread.frame_upd.connect.call_args[0][0]("42")
+
+        queue = self.run_jobs(mock_config, [make_job(BuildState.HARD_ONLY, NvencState.NVENC_NONE)], run, processor)
+
+        assert progress == [(queue.get_all_jobs()[0].id, "42")]
+
+    def test_cancel_job_stops_only_that_job(self, qapp, mock_config):
+        """Stopping one running job leaves the other running and the queue going."""
+        import threading
+        mock_config.parallel_jobs = 2
+        processor = QueueProcessor(JobQueue(), config=mock_config)
+        started = threading.Barrier(2, timeout=5)
+        stopped = threading.Event()
+        first = make_job(BuildState.HARD_ONLY, NvencState.NVENC_NONE)
+        second = make_job(BuildState.HARD_ONLY, NvencState.NVENC_BOTH)
+
+        def run(thread, job):
+            started.wait()
+            if job is first:
+                thread.stop.side_effect = lambda: setattr(thread, '_cancelled', True) or stopped.set()
+                processor.cancel_job(processor.queue.get_all_jobs()[0].id)
+            else:
+                assert stopped.wait(5)
+
+        queue = self.run_jobs(mock_config, [first, second], run, processor)
+
+        assert [job.status for job in queue.get_all_jobs()] == [JobStatus.CANCELLED, JobStatus.COMPLETED]
+        assert processor.cancelled is False
+
+    def test_job_completes_once_outputs_delivered(self, qapp, mock_config):
+        """A finished job frees its worker at once but fails if its outputs cannot be moved into place."""
+        first = make_job(BuildState.HARD_ONLY, NvencState.NVENC_NONE)
+        second = make_job(BuildState.HARD_ONLY, NvencState.NVENC_NONE)
+        processor = QueueProcessor(JobQueue(), config=mock_config)
+        first_id, second_id = processor.queue.add(first), processor.queue.add(second)
+        first_delivery = Future()
+        events = []
+        processor.job_completed.connect(lambda job_id: events.append(('completed', job_id)))
+        processor.job_failed.connect(lambda job_id, message: events.append(('failed', job_id, message)))
+
+        def make_thread(**kwargs):
+            thread = Mock()
+            thread._cancelled = False
+            thread.error = None
+            thread.outputs_verified = True
+            if kwargs['job'] is first:
+                thread.delivery = first_delivery
+            else:
+                thread.delivery = delivered()
+                # Runs on the only worker while the first job's outputs are still being copied
+                thread.run.side_effect = lambda: first_delivery.set_exception(RuntimeError("Moving ep01.mp4 failed"))
+            return thread
+
+        with patch('threads.RenderThread.ThreadClassRender', side_effect=make_thread):
+            processor.run()
+
+        assert sorted(events) == [('completed', second_id), ('failed', first_id, "Moving ep01.mp4 failed")]
+        assert [job.status for job in processor.queue.get_all_jobs()] == [JobStatus.FAILED, JobStatus.COMPLETED]
+
+    def test_each_job_gets_own_process_runner(self, qapp, mock_config):
+        """RenderThreads get a JobProcessRunner, so stop() kills only their processes."""
+        from modules.process_runner import JobProcessRunner
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        queue = JobQueue()
+        queue.add(make_job(BuildState.HARD_ONLY, NvencState.NVENC_NONE))
+        processor = QueueProcessor(queue, config=mock_config, runner=MockProcessRunner())
+
+        with patch('threads.RenderThread.ThreadClassRender') as MockRenderThread:
+            MockRenderThread.return_value._cancelled = False
+            MockRenderThread.return_value.delivery = delivered()
+            MockRenderThread.return_value.error = None
+            processor.run()
+
+        assert isinstance(MockRenderThread.call_args.kwargs['runner'], JobProcessRunner)
+
+
+class TestQueueProcessorLookahead:
+    """Test preparing waiting jobs while others encode."""
+
+    def make_processor(self, mock_config, jobs):
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        processor = QueueProcessor(JobQueue(), config=mock_config, runner=MockProcessRunner())
+        for job in jobs:
+            processor.queue.add(job)
+        return processor
+
+    def test_next_job_prepared_while_current_encodes(self, qapp, mock_config):
+        import threading
+        first = make_job(BuildState.HARD_ONLY, NvencState.NVENC_NONE)
+        second = make_job(BuildState.HARD_ONLY, NvencState.NVENC_NONE)
+        processor = self.make_processor(mock_config, [first, second])
+        prepared = threading.Event()
+        processor.preparer.prepare = Mock(side_effect=lambda job: prepared.set() or [])
+
+        def make_thread(**kwargs):
+            thread = Mock()
+            thread._cancelled = False
+            thread.delivery = delivered()
+            thread.error = None
+            if kwargs['job'] is first:
+                thread.run.side_effect = lambda: prepared.wait(5) or pytest.fail("next job not prepared")
+            return thread
+
+        with patch('threads.RenderThread.ThreadClassRender', side_effect=make_thread):
+            processor.run()
+
+        processor.preparer.prepare.assert_called_once_with(second)
+        assert [job.status for job in processor.queue.get_all_jobs()] == [JobStatus.COMPLETED] * 2
+
+    def test_slow_preparation_not_overtaken(self, qapp, mock_config):
+        """A free worker waits for the next job's preparation instead of starting the job behind it."""
+        import threading
+        import time
+
+        jobs = [make_job(BuildState.HARD_ONLY, NvencState.NVENC_NONE) for _ in range(3)]
+        processor = self.make_processor(mock_config, jobs)
+        first_done = threading.Event()
+        prepared = []
+
+        def prepare(job):
+            if job is jobs[1]:
+                assert first_done.wait(5)
+                time.sleep(0.3)  # The worker is free well before the preparation is done
+            prepared.append(job)
+            return []
+        processor.preparer.prepare = Mock(side_effect=prepare)
+        started = []
+
+        def make_thread(**kwargs):
+            started.append(kwargs['job'])
+            if kwargs['job'] is not jobs[0]:
+                assert kwargs['job'] in prepared  # Never started unprepared
+            thread = Mock()
+            thread._cancelled = False
+            thread.delivery = delivered()
+            thread.error = None
+            thread.run.side_effect = first_done.set
+            return thread
+
+        with patch('threads.RenderThread.ThreadClassRender', side_effect=make_thread):
+            processor.run()
+
+        assert started == jobs
+        assert [job.status for job in processor.queue.get_all_jobs()] == [JobStatus.COMPLETED] * 3
+
+    def test_unrunnable_job_fails_without_starting(self, qapp, mock_config):
+        jobs = [make_job(BuildState.HARD_ONLY, NvencState.NVENC_NONE) for _ in range(2)]
+        processor = self.make_processor(mock_config, jobs)
+        processor.preparer.prepare = Mock(return_value=["Raw video not found: raw.mkv"])
+        failed = []
+        processor.job_failed.connect(lambda job_id, message: failed.append(message))
+
+        with patch('threads.RenderThread.ThreadClassRender') as MockRenderThread:
+            MockRenderThread.return_value._cancelled = False
+            MockRenderThread.return_value.delivery = delivered()
+            MockRenderThread.return_value.error = None
+            processor.run()
+
+        first, second = processor.queue.get_all_jobs()
+        assert first.status == JobStatus.COMPLETED
+        assert second.status == JobStatus.FAILED
+        assert failed == ["Raw video not found: raw.mkv"]
+        assert MockRenderThread.call_count == 1
+
+    def test_staged_inputs_used_and_evicted(self, qapp, mock_config, tmp_path):
+        """The next job reads local copies of its inputs, deleted once its outputs are verified."""
+        from PyQt5.QtCore import Qt
+
+        from models.encoding import EncodingParams
+        from models.enums import LogoState
+        from models.job import RenderJob, VideoPresets
+        from models.render_paths import RenderPaths
+
+        def real_job(name):
+            raw = tmp_path / f"{name}.mkv"
+            raw.write_bytes(b"raw")
+            paths = RenderPaths(raw=raw, audio=None, sub=None,
+                                softsub=tmp_path / "out" / f"{name}.mkv", hardsub=tmp_path / "out" / f"{name}.mp4")
+            return RenderJob(paths=paths, episode_name=name, build_state=BuildState.HARD_ONLY,
+                             nvenc_state=NvencState.NVENC_NONE, logo_state=LogoState.LOGO_BOTH,
+                             encoding_params=EncodingParams("6M", "9M", "18M", 18, 19, 17, 23),
+                             video_settings=VideoPresets.SOFTSUB)
+
+        mock_config.input_staging = True
+        first, second = real_job("ep01"), real_job("ep02")
+        processor = self.make_processor(mock_config, [first, second])
+        processor.preparer.prepare = Mock(return_value=[])
+        staging = []
+        processor.staging_upd.connect(lambda job_id, text: staging.append(text), Qt.DirectConnection)
+        read_from = {}
+
+        def make_thread(**kwargs):
+            read_from[kwargs['job'].episode_name] = kwargs['paths'].raw
+            assert kwargs['paths'].raw.exists()
+            thread = Mock()
+            thread._cancelled = False
+            thread.delivery = delivered()
+            thread.error = None
+            thread.outputs_verified = True
+            return thread
+
+        with patch('threads.RenderThread.ThreadClassRender', side_effect=make_thread):
+            processor.run()
+
+        assert read_from['ep01'] == first.paths.raw  # Started at once, nothing to overlap with
+        assert read_from['ep02'].is_relative_to(processor.stager.root)
+        assert not read_from['ep02'].exists()
+        assert staging[-1] == "Копирую исходники... 100%"
+
+    def test_lookahead_off(self, qapp, mock_config):
+        mock_config.lookahead_jobs = 0
+        processor = self.make_processor(mock_config, [make_job(BuildState.HARD_ONLY, NvencState.NVENC_NONE)] * 2)
+        processor.preparer.prepare = Mock(return_value=[])
+
+        with patch('threads.RenderThread.ThreadClassRender') as MockRenderThread:
+            MockRenderThread.return_value._cancelled = False
+            MockRenderThread.return_value.delivery = delivered()
+            MockRenderThread.return_value.error = None
+            processor.run()
+
+        processor.preparer.prepare.assert_not_called()
+
+
 class TestQueueProcessorThreadSafety:
     """Test thread-safe access to job queue."""
 
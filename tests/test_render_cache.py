@@ -0,0 +1,114 @@
+"""Tests for modules/render_cache.py - skipping encodes whose output is up to date."""
+
+import pytest
+
+from modules import render_cache as render_cache_module
+from modules.render_cache import RenderCache, content_digest, step_fingerprint
+from tests.mocks.mock_process_runner import MockProcessRunner
+
+
+class TestContentDigest:
+    """Test content_digest."""
+
+    def test_same_contents_same_digest(self, tmp_path):
+        first, second = tmp_path / "a.ass", tmp_path / "b.ass"
+        first.write_bytes(b"subtitles")
+        second.write_bytes(b"subtitles")
+
+        assert content_digest(first) == content_digest(second)
+
+    def test_changed_contents(self, tmp_path):
+        path = tmp_path / "a.ass"
+        path.write_bytes(b"subtitles")
+        before = content_digest(path)
+        path.write_bytes(b"Subtitles")
+
+        assert content_digest(path) != before
+
+    def test_large_file_sampled(self, tmp_path, monkeypatch):
+        """Large files are hashed by samples: the start, middle and end are covered."""
+        monkeypatch.setattr(render_cache_module, 'FULL_HASH_LIMIT', 16)
+        monkeypatch.setattr(render_cache_module, 'SAMPLE_SIZE', 4)
+        path = tmp_path / "raw.mkv"
+        path.write_bytes(b"0123456789abcdefghijklmnopqrstuv")
+        before = content_digest(path)
+
+        path.write_bytes(b"0123456789abcdefghijklmnopqrstuV")
+
+        assert content_digest(path) != before
+
+
+class TestStepFingerprint:
+    """Test step_fingerprint."""
+
+    def test_temp_input_names_ignored(self):
+        """Inputs are identified by contents, not by their temp file names."""
+        first = step_fingerprint(['-i', '/tmp/audio_1.mka', 'out.mkv'], {'/tmp/audio_1.mka': 'abc'}, 'ffmpeg 6.1')
+        second = step_fingerprint(['-i', '/tmp/audio_2.mka', 'out.mkv'], {'/tmp/audio_2.mka': 'abc'}, 'ffmpeg 6.1')
+
+        assert first == second
+
+    def test_paths_in_filters_replaced(self):
+        """Per-job paths inside filter strings do not change the fingerprint."""
+        def fingerprint(job):
+            args = ['-vf', f"subtitles='/tmp/{job}/sub.ass':fontsdir='/tmp/{job}/fonts'", f'/tmp/{job}/out.mp4']
+            return step_fingerprint(args, {f'/tmp/{job}/sub.ass': 'abc', f'/tmp/{job}/fonts': 'fff'}, 'ffmpeg 6.1',
+                                    {f'/tmp/{job}/out.mp4': 'out.mp4'})
+
+        assert fingerprint('job_1') == fingerprint('job_2')
+
+    def test_args_inputs_and_version_matter(self):
+        base = step_fingerprint(['-crf', '18', 'out.mkv'], {'raw.mkv': 'abc'}, 'ffmpeg 6.1')
+
+        assert step_fingerprint(['-crf', '20', 'out.mkv'], {'raw.mkv': 'abc'}, 'ffmpeg 6.1') != base
+        assert step_fingerprint(['-crf', '18', 'out.mkv'], {'raw.mkv': 'abd'}, 'ffmpeg 6.1') != base
+        assert step_fingerprint(['-crf', '18', 'out.mkv'], {'raw.mkv': 'abc'}, 'ffmpeg 7.0') != base
+
+
+class TestRenderCache:
+    """Test the render manifest."""
+
+    @pytest.fixture
+    def output(self, tmp_path):
+        path = tmp_path / "ep01.mkv"
+        path.write_bytes(b"encoded")
+        return path
+
+    def test_stored_output_is_cached(self, output, tmp_path):
+        RenderCache(tmp_path / "cache").store('fp', [output])
+
+        cache = RenderCache(tmp_path / "cache")
+
+        assert cache.is_cached('fp', [output])
+        assert not cache.is_cached('other', [output])
+
+    def test_damaged_output_not_cached(self, output, tmp_path):
+        cache = RenderCache(tmp_path / "cache")
+        cache.store('fp', [output])
+        output.write_bytes(b"encodeX")
+
+        assert not RenderCache(tmp_path / "cache").is_cached('fp', [output])
+
+    def test_missing_output_not_cached(self, output, tmp_path):
+        cache = RenderCache(tmp_path / "cache")
+        cache.store('fp', [output])
+        output.unlink()
+
+        assert not cache.is_cached('fp', [output])
+
+    def test_all_outputs_required(self, output, tmp_path):
+        other = tmp_path / "ep01.mp4"
+        other.write_bytes(b"hardsub")
+        cache = RenderCache(tmp_path / "cache")
+        cache.store('fp', [output])
+
+        assert not cache.is_cached('fp', [output, other])
+
+    def test_ffmpeg_version_queried_once(self, tmp_path):
+        runner = MockProcessRunner()
+        runner.ffmpeg_outputs[0] = "ffmpeg version 6.1.1 Copyright (c) 2000-2023\nbuilt with gcc\n"
+        cache = RenderCache(tmp_path / "cache")
+
+        assert cache.ffmpeg_version(runner) == "ffmpeg version 6.1.1 Copyright (c) 2000-2023"
+        cache.ffmpeg_version(runner)
+        assert runner.ffmpeg_calls == [['-version']]
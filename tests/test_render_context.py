@@ -0,0 +1,90 @@
+"""Tests for models/render_context.py - job-scoped render settings."""
+
+from dataclasses import FrozenInstanceError
+from pathlib import Path
+
+import pytest
+
+from configs.config import VideoSettings as ConfigVideoSettings
+from models.encoding import EncodingParams
+from models.enums import BuildState, LogoState, NvencState
+from models.job import RenderJob, VideoPresets
+from models.render_context import RenderContext, map_pixel_formats, map_profiles
+from models.render_paths import RenderPaths
+from models.video_info import VideoInfo
+
+
+def make_job(**overrides) -> RenderJob:
+    fields = dict(
+        paths=RenderPaths(raw=Path("raw.mkv"), audio=None, sub=None,
+                          softsub=Path("soft.mkv"), hardsub=Path("hard.mp4")),
+        episode_name="Episode_01",
+        build_state=BuildState.SOFT_AND_HARD,
+        nvenc_state=NvencState.NVENC_HARD_ONLY,
+        logo_state=LogoState.LOGO_SOFT_ONLY,
+        encoding_params=EncodingParams("6M", "9M", "18M", 18, 19, 17, 23),
+        video_settings=VideoPresets.SOFTSUB,
+    )
+    fields.update(overrides)
+    return RenderJob(**fields)
+
+
+class TestRenderContext:
+    """Test RenderContext."""
+
+    def test_from_job(self):
+        context = RenderContext.from_job(make_job(target_size_mb=700, potato_mode=True))
+
+        assert context.build_state == BuildState.SOFT_AND_HARD
+        assert (context.softsub_nvenc, context.hardsub_nvenc) == (False, True)
+        assert (context.softsub_logo, context.hardsub_logo) == (True, False)
+        assert context.target_size_mb == 700 and context.potato_mode
+
+    def test_settings_copied_from_config(self):
+        """The config's mutable settings are copied, so later UI changes do not reach the job."""
+        settings = ConfigVideoSettings(pixel_format="yuv420p")
+        context = RenderContext.from_job(make_job(video_settings=settings))
+
+        settings.pixel_format = "yuv444p"
+
+        assert context.softsub_settings.pixel_format == "yuv420p"
+        with pytest.raises(FrozenInstanceError):
+            context.softsub_settings.pixel_format = "yuv444p"
+
+    def test_with_video_info_returns_new_context(self):
+        context = RenderContext.from_job(make_job())
+
+        probed = context.with_video_info(VideoInfo(pixel_format="yuv420p10le", video_profile="main10"))
+
+        assert probed.softsub_settings.pixel_format == "yuv420p"
+        assert probed.hardsub_settings.pixel_format == "p010le"
+        assert probed.softsub_settings.video_profile == "high10"
+        assert context.softsub_settings == VideoPresets.SOFTSUB
+
+    def test_potato_forces_main_profile(self):
+        context = RenderContext.from_job(make_job(potato_mode=True))
+
+        probed = context.with_video_info(VideoInfo(pixel_format="yuv420p10le", video_profile="main10"))
+
+        assert probed.hardsub_settings.pixel_format == "yuv420p"
+        assert probed.hardsub_settings.video_profile == "main"
+
+
+class TestMapping:
+    """Test map_pixel_formats and map_profiles."""
+
+    def test_10bit_software_hardsub_keeps_yuv420p10le(self):
+        assert map_pixel_formats("p010le", NvencState.NVENC_SOFT_ONLY) == ("yuv420p", "yuv420p10le")
+
+    def test_8bit_unchanged(self):
+        assert map_pixel_formats("yuv420p", NvencState.NVENC_BOTH) == ("yuv420p", "yuv420p")
+
+    def test_nvenc_softsub_has_no_high10(self):
+        assert map_profiles("high10", NvencState.NVENC_BOTH) == ("high", "main10")
+        assert map_profiles("high10", NvencState.NVENC_NONE) == ("high10", "main10")
+        assert map_profiles("baseline", NvencState.NVENC_NONE) == ("baseline", "baseline")
+
+    def test_unknown_profile_encodes_as_high(self):
+        """An unknown raw profile never yields main, which cannot encode 10-bit."""
+        assert map_profiles(None, NvencState.NVENC_NONE) == ("high", "main10")
+        assert map_profiles(None, NvencState.NVENC_NONE, "yuv420p10le") == ("high10", "main10")
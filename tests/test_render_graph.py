@@ -0,0 +1,48 @@
+"""Tests for models/render_graph.py - render steps as a dependency graph."""
+
+import pytest
+
+from models.render_graph import RenderStep, check_graph, ready_steps
+
+
+def step(name, *after):
+    return RenderStep(name, lambda: None, after=after)
+
+
+class TestCheckGraph:
+    """Test check_graph."""
+
+    def test_valid_graph(self):
+        check_graph([step('probe'), step('audio'), step('encode', 'probe', 'audio')])
+
+    def test_duplicate_names(self):
+        with pytest.raises(ValueError, match='probe'):
+            check_graph([step('probe'), step('probe')])
+
+    def test_unknown_dependency(self):
+        with pytest.raises(ValueError, match='fonts'):
+            check_graph([step('encode', 'fonts')])
+
+    def test_cycle(self):
+        with pytest.raises(ValueError, match='a, b'):
+            check_graph([step('probe'), step('a', 'b'), step('b', 'a')])
+
+
+class TestReadySteps:
+    """Test ready_steps."""
+
+    def test_roots_ready_in_graph_order(self):
+        steps = [step('probe'), step('encode', 'probe'), step('audio')]
+
+        assert [s.name for s in ready_steps(steps, set(), set())] == ['probe', 'audio']
+
+    def test_waits_for_every_dependency(self):
+        steps = [step('probe'), step('audio'), step('encode', 'probe', 'audio')]
+
+        assert ready_steps(steps, {'probe'}, {'probe', 'audio'}) == []
+        assert [s.name for s in ready_steps(steps, {'probe', 'audio'}, {'probe', 'audio'})] == ['encode']
+
+    def test_started_steps_not_ready_again(self):
+        steps = [step('probe'), step('audio')]
+
+        assert [s.name for s in ready_steps(steps, set(), {'probe'})] == ['audio']
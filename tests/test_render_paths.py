@@ -1,10 +1,11 @@
 """Tests for models/render_paths.py."""
 
+from dataclasses import replace
 from pathlib import Path
 
 import pytest
 
-from models.render_paths import RenderPaths
+from models.render_paths import RenderPaths, job_temp_dir, prepared_audio_path
 
 
 class TestRenderPaths:
@@ -218,3 +219,78 @@ class TestRenderPaths:
 
         with pytest.raises(Exception):  # FrozenInstanceError or AttributeError
             paths.raw = tmp_path / "different.mkv"
+
+    def test_subtitle_remux_references_previous_softsub(self, tmp_path):
+        """Re-release paths remux into the episode's existing softsub."""
+        paths = RenderPaths.from_ui_state(
+            raw_path="",
+            audio_path="",
+            sub_path=str(tmp_path / "v2.ass"),
+            episode_name="Episode 01",
+            softsub_dir=tmp_path,
+            hardsub_dir=tmp_path,
+            subtitle_remux=True,
+        )
+
+        assert paths.previous_softsub == paths.softsub == tmp_path / "Episode 01.mkv"
+
+    def test_subtitle_remux_validation(self, tmp_path):
+        """Re-release needs the previous softsub and new subtitles, not the raw."""
+        sub = tmp_path / "v2.ass"
+        sub.touch()
+        previous = tmp_path / "ep01.mkv"
+        paths = RenderPaths(
+            raw=tmp_path / "missing_raw.mkv",
+            audio=None,
+            sub=sub,
+            softsub=previous,
+            hardsub=tmp_path / "ep01.mp4",
+            previous_softsub=previous,
+        )
+
+        assert any("Previous softsub not found" in e for e in paths.validate())
+
+        previous.touch()
+        assert paths.validate() == []
+
+        no_sub = RenderPaths(raw=paths.raw, audio=None, sub=None, softsub=previous,
+                             hardsub=paths.hardsub, previous_softsub=previous)
+        assert any("Subtitle file is required" in e for e in no_sub.validate())
+
+    def test_validate_outputs_missing_directory(self, tmp_path):
+        """An output directory that does not exist yet is fine under a writable parent."""
+        paths = RenderPaths(raw=tmp_path / "raw.mkv", audio=None, sub=None,
+                            softsub=tmp_path / "new" / "ep01.mkv", hardsub=tmp_path / "ep01.mp4")
+
+        assert paths.validate_outputs() == []
+
+    def test_validate_outputs_file_in_the_way(self, tmp_path):
+        blocker = tmp_path / "HARDSUB"
+        blocker.write_text("not a directory")
+        paths = RenderPaths(raw=tmp_path / "raw.mkv", audio=None, sub=None,
+                            softsub=tmp_path / "ep01.mkv", hardsub=blocker / "ep01.mp4")
+
+        assert paths.validate_outputs() == [f"Output directory is not writable: {blocker}"]
+
+
+class TestJobTempFiles:
+    """Test job_temp_dir and prepared_audio_path."""
+
+    def test_job_dir_follows_hardsub(self, tmp_path):
+        paths = RenderPaths(raw=tmp_path / "raw.mkv", audio=None, sub=None,
+                            softsub=tmp_path / "ep01.mkv", hardsub=tmp_path / "ep01.mp4")
+        other = RenderPaths(raw=tmp_path / "raw2.mkv", audio=None, sub=None,
+                            softsub=tmp_path / "ep01.mkv", hardsub=tmp_path / "ep02.mp4")
+
+        assert job_temp_dir(tmp_path, paths) == job_temp_dir(tmp_path, replace(paths, raw=other.raw))
+        assert job_temp_dir(tmp_path, paths) != job_temp_dir(tmp_path, other)
+
+    def test_prepared_audio_follows_audio_contents(self, tmp_path):
+        audio = tmp_path / "audio.flac"
+        audio.write_bytes(b"v1")
+        first = prepared_audio_path(tmp_path, audio)
+
+        audio.write_bytes(b"v2 longer")
+
+        assert prepared_audio_path(tmp_path, audio) != first
+        assert prepared_audio_path(tmp_path, tmp_path / "missing.flac") is None
@@ -1,10 +1,15 @@
 """Tests for threads/RenderThread.py - testing CURRENT codebase."""
 
+from dataclasses import replace
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from models.enums import BuildState, NvencState
+from models.job import JobOptions
+from models.patching import parse_time_ranges
+from models.video_info import VideoInfo
 from threads.RenderThread import ThreadClassRender
 
 
@@ -48,6 +53,57 @@ class TestRenderThread:
         # Check resolution
         assert render_thread.video_res == "1080p"
 
+    def test_ffmpeg_analysis_decoding_json(self, render_thread):
+        """JSON probe output drives frame count from the real frame rate."""
+        ffprobe_output = [
+            '{\n', '    "streams": [{"index": 0, "codec_type": "video", "codec_name": "h264",\n',
+            '        "profile": "High", "width": 1280, "height": 720, "pix_fmt": "yuv420p",\n',
+            '        "r_frame_rate": "30000/1001", "avg_frame_rate": "30000/1001"}],\n',
+            '    "format": {"duration": "600.0"}\n', '}\n',
+        ]
+
+        render_thread.ffmpeg_analysis_decoding(MockProcess(ffprobe_output))
+
+        assert render_thread.video_res == "720p"
+        assert render_thread.total_duration_sec == pytest.approx(600.0)
+        assert render_thread.total_frames == pytest.approx(600.0 * 30000 / 1001)
+        assert render_thread.video_info.codec_name == "h264"
+
+    def test_ffmpeg_analysis_uses_json_probe(self, mock_config, mock_render_paths):
+        """ffmpeg_analysis runs ffprobe with JSON output."""
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths)
+
+        thread.ffmpeg_analysis()
+
+        args = runner.ffprobe_calls[0]
+        assert args[args.index('-print_format') + 1] == 'json'
+        assert '-show_streams' in args and '-show_format' in args
+        assert args[-1] == str(mock_render_paths.raw)
+
+    def test_ffmpeg_analysis_uses_probe_cache(self, mock_config, mock_render_paths):
+        """Cached probes skip ffprobe; fresh probes are stored."""
+        from modules.probe_cache import ProbeCache
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        runner.set_ffprobe_output(0, '{"streams": [{"index": 0, "codec_type": "video", "height": 1080}],'
+                                     ' "format": {"duration": "60.0"}}')
+        cache = ProbeCache(mock_config.main_paths.cache)
+        with patch('sys.excepthook'):
+            first = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths, probe_cache=cache)
+            second = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths, probe_cache=cache)
+
+        first.ffmpeg_analysis()
+        second.ffmpeg_analysis()
+
+        assert len(runner.ffprobe_calls) == 1
+        assert second.video_res == "1080p"
+        assert second.total_duration_sec == pytest.approx(60.0)
+
     def test_ffmpeg_analysis_decoding_720p(self, render_thread):
         """FFprobe output for 720p is parsed correctly."""
         ffprobe_output = [
@@ -70,18 +126,17 @@ class TestRenderThread:
         ]
         mock_proc = MockProcess(ffprobe_output)
         render_thread.ffmpeg_analysis_decoding(mock_proc)
-        assert render_thread.config.build_settings.softsub_settings.pixel_format == 'yuv420p'
+        assert render_thread.context.softsub_settings.pixel_format == 'yuv420p'
 
         # Test yuv420p10le
-        render_thread.config.build_settings.softsub_settings.pixel_format = 'yuv420p10le'
-        render_thread.config.build_settings.hardsub_settings.pixel_format = 'yuv420p10le'
         ffprobe_output2 = [
             "Duration: 00:01:00.00\n",
             "Stream #0:0: Video: hevc (Main 10), yuv420p10le(tv), 1920x1080\n",
         ]
         mock_proc2 = MockProcess(ffprobe_output2)
         render_thread.ffmpeg_analysis_decoding(mock_proc2)
-        assert render_thread.config.build_settings.softsub_settings.pixel_format == 'yuv420p'
+        assert render_thread.context.softsub_settings.pixel_format == 'yuv420p'
+        assert render_thread.context.hardsub_settings.pixel_format == 'p010le'  # NVENC hardsub
 
     def test_ffmpeg_analysis_decoding_profiles(self, render_thread):
         """Video profiles are parsed and set correctly."""
@@ -91,6 +146,7 @@ class TestRenderThread:
             ("(High)", "high", "main10"),
             ("(High 10)", "high10", "main10"),
         ]
+        render_thread.context = replace(render_thread.context, nvenc_state=NvencState.NVENC_HARD_ONLY)
 
         for profile_str, expected_soft, expected_hard in test_cases:
             ffprobe_output = [
@@ -99,17 +155,14 @@ class TestRenderThread:
             ]
             mock_proc = MockProcess(ffprobe_output)
 
-            # Reset nvenc state for test
-            render_thread.config.build_settings.nvenc_state = NvencState.NVENC_HARD_ONLY
-
             render_thread.ffmpeg_analysis_decoding(mock_proc)
 
-            assert render_thread.config.build_settings.softsub_settings.video_profile == expected_soft
-            assert render_thread.config.build_settings.hardsub_settings.video_profile == expected_hard
+            assert render_thread.context.softsub_settings.video_profile == expected_soft
+            assert render_thread.context.hardsub_settings.video_profile == expected_hard
 
     def test_ffmpeg_analysis_decoding_potato_overrides(self, render_thread):
         """Potato mode forces yuv420p and main profile."""
-        render_thread.config.potato_PC = True
+        render_thread.context = replace(render_thread.context, potato_mode=True)
 
         ffprobe_output = [
             "Duration: 00:01:00.00\n",
@@ -118,15 +171,48 @@ class TestRenderThread:
         mock_proc = MockProcess(ffprobe_output)
         render_thread.ffmpeg_analysis_decoding(mock_proc)
 
-        assert render_thread.config.build_settings.softsub_settings.pixel_format == 'yuv420p'
-        assert render_thread.config.build_settings.hardsub_settings.pixel_format == 'yuv420p'
-        assert render_thread.config.build_settings.softsub_settings.video_profile == 'main'
-        assert render_thread.config.build_settings.hardsub_settings.video_profile == 'main'
+        assert render_thread.context.softsub_settings.pixel_format == 'yuv420p'
+        assert render_thread.context.hardsub_settings.pixel_format == 'yuv420p'
+        assert render_thread.context.softsub_settings.video_profile == 'main'
+        assert render_thread.context.hardsub_settings.video_profile == 'main'
+
+    def test_probe_does_not_mutate_config(self, render_thread, mock_config):
+        """The probe refines the job's context only; the shared config keeps its settings."""
+        before = (replace(mock_config.build_settings.softsub_settings),
+                  replace(mock_config.build_settings.hardsub_settings))
+
+        render_thread.ffmpeg_analysis_decoding(MockProcess([
+            "Duration: 00:01:00.00\n",
+            "Stream #0:0: Video: h264 (Main), yuv420p, 1920x1080\n",
+        ]))
+
+        assert render_thread.context.softsub_settings.video_profile == 'main'
+        assert (mock_config.build_settings.softsub_settings, mock_config.build_settings.hardsub_settings) == before
+
+    def test_queued_job_settings_used(self, mock_config, mock_render_paths):
+        """A queued job renders with its own states, not whatever the UI shows at run time."""
+        from models.encoding import EncodingParams
+        from models.enums import LogoState
+        from models.job import RenderJob, VideoPresets
+
+        job = RenderJob(
+            paths=mock_render_paths, episode_name="Episode_01",
+            build_state=BuildState.HARD_ONLY, nvenc_state=NvencState.NVENC_NONE, logo_state=LogoState.LOGO_BOTH,
+            encoding_params=EncodingParams("6M", "9M", "18M", 18, 19, 17, 23), video_settings=VideoPresets.SOFTSUB,
+        )
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, paths=mock_render_paths, job=job)
+        mock_config.build_settings.build_state = BuildState.SOFT_ONLY
+        mock_config.build_settings.nvenc_state = NvencState.NVENC_BOTH
+
+        assert thread.context.build_state == BuildState.HARD_ONLY
+        assert thread._hardsub_flags()['use_nvenc'] is False
 
     def test_calculate_encoding_params_1080p(self, render_thread):
         """Encoding params for 1080p use CRF 18."""
-        render_thread.total_duration_sec = 1442  # Set duration to avoid division by zero
-        params = render_thread.calculate_encoding_params(2.0, "1080p")
+        info = VideoInfo(duration_seconds=1442, resolution="1080p", width=1920, height=1080,
+                         frame_rate=23.976, size_bytes=2 * 1024 ** 3)
+        params = render_thread.calculate_encoding_params(info)
 
         assert params.crf == 18
         assert params.cq == 19
@@ -134,37 +220,57 @@ class TestRenderThread:
         assert params.qmax == 23
 
     def test_calculate_encoding_params_720p(self, render_thread):
-        """Encoding params for 720p use CRF 20."""
-        render_thread.total_duration_sec = 1442  # Set duration
-        params = render_thread.calculate_encoding_params(2.0, "720p")
+        """Encoding params for 720p use CRF 20 and a 720p-sized bitrate."""
+        info = VideoInfo(duration_seconds=1442, resolution="720p", width=1280, height=720,
+                         frame_rate=23.976, size_bytes=2 * 1024 ** 3)
+        params = render_thread.calculate_encoding_params(info)
 
         assert params.crf == 20
         assert params.cq == 21
+        assert int(params.max_bitrate.rstrip('k')) < 9000  # No longer 1080p-sized
 
     def test_calculate_encoding_params_potato(self, render_thread):
         """Potato mode halves bitrate and sets CRF 23."""
-        render_thread.config.potato_PC = True
-        render_thread.total_duration_sec = 1000  # Set duration
+        render_thread.context = replace(render_thread.context, potato_mode=True)
+        info = VideoInfo(duration_seconds=1000, resolution="1080p", width=1920, height=1080,
+                         frame_rate=23.976, size_bytes=2 * 1024 ** 3)
 
-        params = render_thread.calculate_encoding_params(2.0, "1080p")
+        params = render_thread.calculate_encoding_params(info)
 
         # Check potato CRF
         assert params.crf == 23
         assert params.cq == 21
 
-        # Check bitrate is halved (roughly)
-        avg_bitrate = int(params.avg_bitrate.rstrip('M'))
-        assert avg_bitrate <= 3  # Should be less than or equal to 3M due to halving and capping
+        # Check bitrate is halved
+        assert int(params.avg_bitrate.rstrip('k')) <= 3000
 
     def test_calculate_encoding_params_cap(self, render_thread):
-        """Average bitrate is capped at 6M."""
-        # Set very short duration to get high bitrate
-        render_thread.total_duration_sec = 100
+        """Average bitrate is capped at 6M for 1080p."""
+        info = VideoInfo(duration_seconds=100, resolution="1080p", width=1920, height=1080,
+                         frame_rate=60.0, size_bytes=10 * 1024 ** 3)
+
+        params = render_thread.calculate_encoding_params(info)
+
+        assert params.avg_bitrate == "6000k"
+
+    def test_calculate_encoding_params_uses_raw_size(self, render_thread, mock_render_paths):
+        """Without a probed size the raw's size on disk bounds the bitrate."""
+        mock_render_paths.raw.write_bytes(b"x" * 125_000 * 60)  # 1000 kbit/s over 60 s
+        info = VideoInfo(duration_seconds=60, resolution="1080p")
 
-        params = render_thread.calculate_encoding_params(10.0, "1080p")
+        params = render_thread.calculate_encoding_params(info)
 
-        avg_bitrate = int(params.avg_bitrate.rstrip('M'))
-        assert avg_bitrate == 6  # Capped at 6M
+        assert params.avg_bitrate == "1000k"
+
+    def test_calculate_encoding_params_logs_clamped_target(self, render_thread, mock_config):
+        """A target size too small for the video is raised to the floor, and the log says so."""
+        info = VideoInfo(duration_seconds=1440, resolution="1080p", width=1920, height=1080)
+        mock_config.log = MagicMock()
+
+        params = render_thread.calculate_encoding_params(info, target_size_bytes=10 * 1024 * 1024)
+
+        assert params.avg_bitrate == "100k"
+        assert any("raised to 100k" in c.args[2] for c in mock_config.log.call_args_list)
 
     def test_softsub_runs_for_state_0_and_1(self, render_thread, mock_config):
         """Softsub encoding runs for SOFT_AND_HARD and SOFT_ONLY states."""
@@ -172,16 +278,17 @@ class TestRenderThread:
              patch('os.chdir'):
             mock_proc = MagicMock()
             mock_proc.stdout = []
+            mock_proc.wait.return_value = 0
             mock_popen.return_value = mock_proc
 
             # Test SOFT_AND_HARD
-            mock_config.build_settings.build_state = BuildState.SOFT_AND_HARD
+            render_thread.context = replace(render_thread.context, build_state=BuildState.SOFT_AND_HARD)
             render_thread.softsub()
             assert mock_popen.called
 
             # Reset and test SOFT_ONLY
             mock_popen.reset_mock()
-            mock_config.build_settings.build_state = BuildState.SOFT_ONLY
+            render_thread.context = replace(render_thread.context, build_state=BuildState.SOFT_ONLY)
             render_thread.softsub()
             assert mock_popen.called
 
@@ -191,16 +298,17 @@ class TestRenderThread:
              patch('os.chdir'):
             mock_proc = MagicMock()
             mock_proc.stdout = []
+            mock_proc.wait.return_value = 0
             mock_popen.return_value = mock_proc
 
             # Test SOFT_AND_HARD
-            mock_config.build_settings.build_state = BuildState.SOFT_AND_HARD
+            render_thread.context = replace(render_thread.context, build_state=BuildState.SOFT_AND_HARD)
             render_thread.hardsub()
             assert mock_popen.called
 
             # Reset and test HARD_ONLY
             mock_popen.reset_mock()
-            mock_config.build_settings.build_state = BuildState.HARD_ONLY
+            render_thread.context = replace(render_thread.context, build_state=BuildState.HARD_ONLY)
             render_thread.hardsub()
             assert mock_popen.called
 
@@ -210,16 +318,17 @@ class TestRenderThread:
              patch('os.chdir'):
             mock_proc = MagicMock()
             mock_proc.stdout = []
+            mock_proc.wait.return_value = 0
             mock_popen.return_value = mock_proc
 
             # Test FOR_HARDSUBBERS
-            mock_config.build_settings.build_state = BuildState.FOR_HARDSUBBERS
+            render_thread.context = replace(render_thread.context, build_state=BuildState.FOR_HARDSUBBERS)
             render_thread.hardsubbering()
             assert mock_popen.called
 
             # Test HARD_ONLY (should not run)
             mock_popen.reset_mock()
-            mock_config.build_settings.build_state = BuildState.HARD_ONLY
+            render_thread.context = replace(render_thread.context, build_state=BuildState.HARD_ONLY)
             render_thread.hardsubbering()
             assert not mock_popen.called
 
@@ -228,27 +337,32 @@ class TestRenderThread:
         with patch('subprocess.Popen') as mock_popen:
             mock_proc = MagicMock()
             mock_proc.stdout = []
+            mock_proc.wait.return_value = 0
             mock_popen.return_value = mock_proc
 
             # Test RAW_REPAIR
-            mock_config.build_settings.build_state = BuildState.RAW_REPAIR
+            render_thread.context = replace(render_thread.context, build_state=BuildState.RAW_REPAIR)
             render_thread.raw_repairing()
             assert mock_popen.called
 
             # Test SOFT_AND_HARD (should not run)
             mock_popen.reset_mock()
-            mock_config.build_settings.build_state = BuildState.SOFT_AND_HARD
+            render_thread.context = replace(render_thread.context, build_state=BuildState.SOFT_AND_HARD)
             render_thread.raw_repairing()
             assert not mock_popen.called
 
     def test_frame_update_parses_progress(self, render_thread, mock_config):
-        """frame_update parses frame and fps from ffmpeg output."""
+        """frame_update parses -progress key=value blocks from ffmpeg output."""
         # Phase 4.3: total_frames moved to RenderThread
         render_thread.total_frames = 1000
+        render_thread.total_duration_sec = 40.0
 
         ffmpeg_output = [
-            "frame=  100 fps= 25 q=-1.0 size=    1024kB time=00:00:04.00 bitrate=2097.2kbits/s speed=1.0x\n",
-            "frame=  200 fps= 26 q=-1.0 size=    2048kB time=00:00:08.00 bitrate=2097.2kbits/s speed=1.04x\n",
+            "Input #0, matroska,webm, from 'raw.mkv':\n",
+            "frame=100\n", "fps=25.00\n", "bitrate=2097.2kbits/s\n",
+            "out_time_us=4000000\n", "speed=1.0x\n", "progress=continue\n",
+            "frame=200\n", "fps=26.50\n", "bitrate=2097.2kbits/s\n",
+            "out_time_us=8000000\n", "speed=1.04x\n", "progress=continue\n",
         ]
 
         mock_proc = MockProcess(ffmpeg_output)
@@ -257,10 +371,901 @@ class TestRenderThread:
              patch.object(render_thread, 'elapsed_time_upd') as mock_time_signal:
             render_thread.frame_update(mock_proc)
 
-            # Check signals were emitted
+            # One emission per progress block, log lines ignored
             assert mock_frame_signal.emit.call_count == 2
             assert mock_time_signal.emit.call_count == 2
 
             # Check first frame emission
             first_call = mock_frame_signal.emit.call_args_list[0]
             assert first_call[0][0] == '100'
+
+            # ETA is time-based: 36s of content left at 1.0x
+            assert '0м 36.00с' in mock_time_signal.emit.call_args_list[0][0][0]
+
+    def test_frame_update_eta_without_duration(self, render_thread):
+        """ETA falls back to frames and fractional fps when time is unknown."""
+        render_thread.total_frames = 1000
+        render_thread.total_duration_sec = 0
+
+        mock_proc = MockProcess(["frame=500\n", "fps=12.5\n", "speed=N/A\n", "progress=continue\n"])
+
+        with patch.object(render_thread, 'elapsed_time_upd') as mock_time_signal:
+            render_thread.frame_update(mock_proc)
+
+            assert '0м 40.00с' in mock_time_signal.emit.call_args_list[0][0][0]
+
+    def test_softsub_and_hardsub_single_process(self, render_thread, mock_config):
+        """SOFT_AND_HARD renders both outputs from one ffmpeg process."""
+        with patch('subprocess.Popen') as mock_popen:
+            mock_proc = MagicMock()
+            mock_proc.stdout = []
+            mock_proc.wait.return_value = 0
+            mock_popen.return_value = mock_proc
+
+            render_thread.context = replace(render_thread.context, build_state=BuildState.SOFT_AND_HARD)
+            render_thread.softsub_and_hardsub()
+
+            assert mock_popen.call_count == 1
+            cmd = mock_popen.call_args[0][0]
+            assert '-filter_complex' in cmd
+            assert str(render_thread.paths.softsub) in cmd
+            assert str(render_thread.paths.hardsub) in cmd
+
+    def test_softsub_and_hardsub_skipped_for_single_output(self, render_thread, mock_config):
+        """Single-decode step only runs for SOFT_AND_HARD."""
+        with patch('subprocess.Popen') as mock_popen:
+            render_thread.context = replace(render_thread.context, build_state=BuildState.SOFT_ONLY)
+            render_thread.softsub_and_hardsub()
+
+            assert not mock_popen.called
+
+    def test_chunked_softsub(self, mock_config, mock_render_paths):
+        """Chunked mode encodes segments in parallel, then joins them."""
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        runner.set_ffprobe_output(0, ''.join(f"{t}.000000,K__\n" for t in range(0, 1440, 10)))
+        mock_config.chunked_encoding = True
+        mock_config.chunk_workers = 2
+        mock_config.build_settings.build_state = BuildState.SOFT_ONLY
+        mock_config.build_settings.nvenc_state = NvencState.NVENC_NONE
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths)
+        thread.total_duration_sec = 1440.0
+
+        thread.softsub()
+
+        segment_calls, concat_call = runner.ffmpeg_calls[:-1], runner.ffmpeg_calls[-1]
+        assert len(segment_calls) == 4
+        assert all('-an' not in call and call[-1].endswith('.mkv') for call in segment_calls)
+        assert 'concat' in concat_call
+        assert concat_call[-1] == str(mock_render_paths.softsub)
+        assert not list(mock_config.main_paths.temp.glob('chunks_*'))
+
+    def test_chunked_failed_join_keeps_segments(self, mock_config, mock_render_paths):
+        """A failed concat fails the step and leaves the encoded segments in place."""
+        from tests.mocks.mock_process_runner import MockProcess, MockProcessRunner
+
+        runner = MockProcessRunner()
+        runner.set_ffprobe_output(0, ''.join(f"{t}.000000,K__\n" for t in range(0, 1440, 10)))
+        original_run = runner.run_ffmpeg
+
+        def run_ffmpeg(args, cwd=None):
+            if 'concat' not in args:
+                return original_run(args, cwd)
+            failed = MockProcess()
+            failed.returncode = 1
+            return failed
+        runner.run_ffmpeg = run_ffmpeg
+        mock_config.chunked_encoding = True
+        mock_config.chunk_workers = 2
+        mock_config.build_settings.build_state = BuildState.SOFT_ONLY
+        mock_config.build_settings.nvenc_state = NvencState.NVENC_NONE
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths)
+        thread.total_duration_sec = 1440.0
+
+        with pytest.raises(RuntimeError, match="Joining soft.mkv failed"):
+            thread.softsub()
+
+        assert list(mock_config.main_paths.temp.glob('chunks_*/0_segments.txt'))
+
+    def test_chunked_skipped_for_nvenc(self, mock_config, mock_render_paths):
+        """NVENC encodes stay in a single process."""
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        mock_config.chunked_encoding = True
+        mock_config.chunk_workers = 2
+        mock_config.build_settings.build_state = BuildState.SOFT_ONLY
+        mock_config.build_settings.nvenc_state = NvencState.NVENC_BOTH
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths)
+        thread.total_duration_sec = 1440.0
+
+        thread.softsub()
+
+        assert len(runner.ffmpeg_calls) == 1
+        assert runner.ffprobe_calls == []
+
+    def test_two_pass_target_size(self, mock_config, mock_render_paths):
+        """Target size runs an analysis pass and a final pass per output."""
+        from models.encoding import EncodingParams
+        from models.enums import LogoState
+        from models.job import RenderJob, VideoPresets
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        mock_config.build_settings.build_state = BuildState.SOFT_ONLY
+        mock_config.build_settings.nvenc_state = NvencState.NVENC_NONE
+        job = RenderJob(
+            paths=mock_render_paths, episode_name='ep', build_state=BuildState.SOFT_ONLY,
+            nvenc_state=NvencState.NVENC_NONE, logo_state=LogoState.LOGO_BOTH,
+            encoding_params=EncodingParams("6M", "9M", "18M", 18, 19, 17, 23),
+            video_settings=VideoPresets.SOFTSUB, target_size_mb=1400
+        )
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths, job=job)
+
+        thread.softsub()
+
+        analysis, final = runner.ffmpeg_calls
+        assert analysis[-3:] == ['-f', 'null', '-']
+        assert final[-1] == str(mock_render_paths.softsub)
+        passlog = analysis[analysis.index('-passlogfile') + 1]
+        assert passlog == final[final.index('-passlogfile') + 1]
+        assert 'passlog_' in passlog
+        assert not list(mock_config.main_paths.temp.glob('passlog_*'))
+        assert thread._pass_progress == (0, 1)
+
+    def test_two_pass_failed_analysis_stops(self, mock_config, mock_render_paths):
+        """A failed analysis pass fails the step without starting the final pass."""
+        from models.encoding import EncodingParams
+        from models.enums import LogoState
+        from models.job import RenderJob, VideoPresets
+        from tests.mocks.mock_process_runner import MockProcess, MockProcessRunner
+
+        runner = MockProcessRunner()
+        failed = MockProcess()
+        failed.returncode = 1
+        runner.run_ffmpeg = lambda args, cwd=None: runner.ffmpeg_calls.append(args) or failed
+        job = RenderJob(
+            paths=mock_render_paths, episode_name='ep', build_state=BuildState.SOFT_ONLY,
+            nvenc_state=NvencState.NVENC_NONE, logo_state=LogoState.LOGO_BOTH,
+            encoding_params=EncodingParams("6M", "9M", "18M", 18, 19, 17, 23),
+            video_settings=VideoPresets.SOFTSUB, target_size_mb=1400
+        )
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths, job=job)
+
+        with pytest.raises(RuntimeError, match="Pass 1"):
+            thread.softsub()
+
+        assert len(runner.ffmpeg_calls) == 1
+
+    def test_crf_search_replaces_ladder_crf(self, mock_config, mock_render_paths):
+        """Enabled CRF search swaps in the searched CRF and matching CQ."""
+        from models.crf_search import CrfSearchResult
+        from models.encoding import EncodingParams
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        mock_config.crf_search = True
+        mock_config.build_settings.build_state = BuildState.SOFT_ONLY
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=MockProcessRunner(), paths=mock_render_paths)
+        thread.total_duration_sec = 1440.0
+        params = EncodingParams("6M", "9M", "18M", 18, 19, 17, 23)
+
+        with patch('threads.RenderThread.CrfSearch.run',
+                   return_value=CrfSearchResult(crf=22, score=0.986, met_target=True)):
+            searched = thread.search_crf(params)
+
+        assert (searched.crf, searched.cq) == (22, 23)
+        assert searched.max_bitrate == params.max_bitrate
+
+    def test_crf_search_failure_keeps_ladder(self, mock_config, mock_render_paths):
+        """A failed search never fails the render."""
+        from models.encoding import EncodingParams
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        mock_config.crf_search = True
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=MockProcessRunner(), paths=mock_render_paths)
+        params = EncodingParams("6M", "9M", "18M", 18, 19, 17, 23)
+
+        with patch('threads.RenderThread.CrfSearch.run', side_effect=RuntimeError("boom")):
+            assert thread.search_crf(params) == params
+
+    def test_crf_search_disabled(self, mock_config, mock_render_paths):
+        """Nothing is encoded when the option is off."""
+        from models.encoding import EncodingParams
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths)
+        thread.total_duration_sec = 1440.0
+        params = EncodingParams("6M", "9M", "18M", 18, 19, 17, 23)
+
+        assert thread.search_crf(params) == params
+        assert runner.ffmpeg_calls == []
+
+    def test_prepare_audio_encodes_once(self, mock_config, mock_render_paths):
+        """The audio input is encoded once and copied into the outputs."""
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        runner.set_ffprobe_output(0, '{"streams": [{"index": 0, "codec_type": "audio", '
+                                     '"codec_name": "flac", "sample_rate": "48000"}], "format": {}}')
+        mock_config.build_settings.build_state = BuildState.SOFT_ONLY
+        mock_config.build_settings.nvenc_state = NvencState.NVENC_NONE
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths)
+
+        thread.prepare_audio()
+        thread.softsub()
+
+        audio_call, softsub_call = runner.ffmpeg_calls
+        assert audio_call[audio_call.index('-i') + 1] == str(mock_render_paths.audio)
+        assert '-ar' not in audio_call  # Already 48 kHz
+        assert softsub_call[softsub_call.index('-c:a') + 1] == 'copy'
+        assert audio_call[-1] in softsub_call
+
+    def test_prepare_audio_passthrough(self, mock_config, mock_render_paths):
+        """Deliverable AAC is copied without an audio encode."""
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        runner.set_ffprobe_output(0, '{"streams": [{"index": 0, "codec_type": "audio", "codec_name": "aac", '
+                                     '"sample_rate": "48000", "bit_rate": "256000"}], "format": {}}')
+        mock_config.build_settings.build_state = BuildState.SOFT_ONLY
+        mock_config.build_settings.nvenc_state = NvencState.NVENC_NONE
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths)
+
+        thread.prepare_audio()
+        thread.softsub()
+
+        (softsub_call,) = runner.ffmpeg_calls
+        assert str(mock_render_paths.audio) in softsub_call
+        assert softsub_call[softsub_call.index('-c:a') + 1] == 'copy'
+
+    def test_prepare_audio_failure_encodes_per_output(self, mock_config, mock_render_paths):
+        """A failed shared encode falls back to encoding audio in each output."""
+        from tests.mocks.mock_process_runner import MockProcess, MockProcessRunner
+
+        runner = MockProcessRunner()
+        failed = MockProcess()
+        failed.returncode = 1
+        runner.run_ffmpeg = lambda args, cwd=None: failed
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths)
+
+        thread.prepare_audio()
+
+        assert thread.paths.audio == mock_render_paths.audio
+        assert thread.ffmpeg_factory.audio_codec == 'aac'
+        assert not list(thread._job_dir().glob('audio_*'))
+
+    def test_softsub_remuxes_compatible_raw(self, mock_config, mock_render_paths):
+        """Compatible H.264 raws without a softsub logo are remuxed, not encoded."""
+        from models.enums import LogoState
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        mock_config.build_settings.build_state = BuildState.SOFT_ONLY
+        mock_config.build_settings.logo_state = LogoState.LOGO_HARD_ONLY
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths)
+        thread._apply_video_info(VideoInfo(
+            duration_seconds=1440.0, codec_name='h264', pixel_format='yuv420p',
+            source_pixel_format='yuv420p', video_profile='high', width=1920, height=1080,
+            bit_rate=4_000_000
+        ))
+
+        thread.softsub()
+
+        (call,) = runner.ffmpeg_calls
+        assert call[call.index('-c:v') + 1] == 'copy'
+        assert '-crf' not in call
+
+    def test_softsub_with_logo_encodes(self, mock_config, mock_render_paths):
+        """A burned logo forces an encode even for compatible raws."""
+        from models.enums import LogoState
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        mock_config.build_settings.build_state = BuildState.SOFT_ONLY
+        mock_config.build_settings.logo_state = LogoState.LOGO_BOTH
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths)
+        thread._apply_video_info(VideoInfo(
+            duration_seconds=1440.0, codec_name='h264', pixel_format='yuv420p',
+            source_pixel_format='yuv420p', video_profile='high', width=1920, height=1080,
+            bit_rate=4_000_000
+        ))
+
+        thread.softsub()
+
+        (call,) = runner.ffmpeg_calls
+        assert call[call.index('-c:v') + 1] != 'copy'
+
+    def _remux_thread(self, mock_config, tmp_path, runner):
+        from models.render_paths import RenderPaths
+
+        previous = tmp_path / "ep01.mkv"
+        previous.write_bytes(b"v1")
+        sub = tmp_path / "v2.ass"
+        sub.touch()
+        paths = RenderPaths(raw=tmp_path / "raw.mkv", audio=None, sub=sub, softsub=previous,
+                            hardsub=tmp_path / "ep01.mp4", previous_softsub=previous)
+        with patch('sys.excepthook'):
+            return ThreadClassRender(mock_config, runner=runner, paths=paths)
+
+    def test_subtitle_remux_only(self, mock_config, tmp_path):
+        """Softsub-only re-release remuxes without probing or encoding the raw."""
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        mock_config.build_settings.build_state = BuildState.SOFT_ONLY
+        thread = self._remux_thread(mock_config, tmp_path, runner)
+        # Simulate ffmpeg writing the remuxed file
+        original_run = runner.run_ffmpeg
+
+        def run_ffmpeg(args, cwd=None):
+            Path(args[-1]).write_bytes(b"v2")
+            return original_run(args, cwd)
+        runner.run_ffmpeg = run_ffmpeg
+
+        thread.run()
+
+        (call,) = runner.ffmpeg_calls
+        assert '-0:s' in call
+        assert runner.ffprobe_calls == []
+        assert (tmp_path / "ep01.mkv").read_bytes() == b"v2"
+        assert not (tmp_path / "ep01.remux.mkv").exists()
+
+    def test_subtitle_remux_failure_keeps_previous(self, mock_config, tmp_path):
+        """A failed remux leaves the previous release untouched."""
+        from tests.mocks.mock_process_runner import MockProcess, MockProcessRunner
+
+        runner = MockProcessRunner()
+        failed = MockProcess()
+        failed.returncode = 1
+        runner.run_ffmpeg = lambda args, cwd=None: failed
+        thread = self._remux_thread(mock_config, tmp_path, runner)
+
+        with pytest.raises(RuntimeError):
+            thread.remux_subtitles()
+
+        assert (tmp_path / "ep01.mkv").read_bytes() == b"v1"
+
+    def test_subtitle_remux_skips_softsub_encode(self, mock_config, tmp_path):
+        """With a previous softsub, the softsub step never encodes."""
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        mock_config.build_settings.build_state = BuildState.SOFT_AND_HARD
+        thread = self._remux_thread(mock_config, tmp_path, runner)
+
+        thread.softsub()
+
+        assert runner.ffmpeg_calls == []
+
+    def test_patch_range_hardsub(self, mock_config, mock_render_paths, tmp_path):
+        """Patch ranges re-encode only the affected GOPs and splice them into the hardsub."""
+        from modules.ass_cache import BurnedSubtitleCache
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        mock_render_paths.hardsub.write_bytes(b"v1")
+        burned_subs = BurnedSubtitleCache(tmp_path / "cache")
+        burned_subs.record(mock_render_paths.raw, mock_render_paths.sub, mock_render_paths.hardsub)
+        runner = MockProcessRunner()
+        runner.set_ffprobe_output(0, '{"streams": [{"index": 0, "codec_type": "video", "codec_name": "hevc"}], '
+                                     '"format": {"duration": "1440.0"}}')
+        runner.set_ffprobe_output(1, ''.join(f"{t}.000000,K__\n" for t in range(0, 1440, 10)))
+        mock_config.build_settings.build_state = BuildState.HARD_ONLY
+        mock_config.build_settings.nvenc_state = NvencState.NVENC_NONE
+        options = JobOptions(patch_ranges=parse_time_ranges("12:32-12:38"))
+        original_run = runner.run_ffmpeg
+
+        def run_ffmpeg(args, cwd=None):
+            Path(args[-1]).write_bytes(b"v2")  # Simulate ffmpeg writing its output
+            return original_run(args, cwd)
+        runner.run_ffmpeg = run_ffmpeg
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths,
+                                       burned_subs=burned_subs, options=options)
+
+        thread.hardsub()
+
+        assert mock_render_paths.hardsub.read_bytes() == b"v2"
+        segment_call, splice_call = runner.ffmpeg_calls
+        assert segment_call[segment_call.index('-ss') + 1] == '750.000000'
+        assert segment_call[segment_call.index('-t') + 1] == '10.000000'
+        assert 'concat' in splice_call
+        assert splice_call[-1].endswith('.patch.mp4')
+        assert not list(mock_config.main_paths.temp.glob('patch_*'))
+
+    def test_patch_range_open_gop_hardsub_encodes_fully(self, mock_config, mock_render_paths, tmp_path):
+        """A hardsub not known to have closed GOPs is never spliced."""
+        from modules.ass_cache import BurnedSubtitleCache
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        mock_render_paths.hardsub.write_bytes(b"rendered elsewhere")
+        runner = MockProcessRunner()
+        mock_config.build_settings.build_state = BuildState.HARD_ONLY
+        mock_config.build_settings.nvenc_state = NvencState.NVENC_NONE
+        options = JobOptions(patch_ranges=parse_time_ranges("12:32-12:38"))
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths,
+                                       burned_subs=BurnedSubtitleCache(tmp_path / "cache"),
+                                       options=options)
+
+        thread.hardsub()
+
+        (call,) = runner.ffmpeg_calls
+        assert call[-1] == str(mock_render_paths.hardsub)
+        assert call[call.index('-x265-params') + 1] == 'open-gop=0'
+
+    def test_subtitle_changes_patch_hardsub(self, mock_config, mock_render_paths, tmp_path):
+        """With automatic patching, only the ranges whose subtitles changed are re-encoded."""
+        from modules.ass_cache import BurnedSubtitleCache
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        header = "[Events]\nFormat: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+        mock_render_paths.sub.write_text(header + "Dialogue: 0,0:12:32.00,0:12:38.00,Default,,0,0,0,,Old\n")
+        mock_render_paths.hardsub.write_bytes(b"v1")
+        burned_subs = BurnedSubtitleCache(tmp_path / "cache")
+        burned_subs.record(mock_render_paths.raw, mock_render_paths.sub, mock_render_paths.hardsub)
+        mock_render_paths.sub.write_text(header + "Dialogue: 0,0:12:32.00,0:12:38.00,Default,,0,0,0,,New\n")
+
+        runner = MockProcessRunner()
+        runner.set_ffprobe_output(0, '{"streams": [{"index": 0, "codec_type": "video", "codec_name": "hevc"}], '
+                                     '"format": {"duration": "1440.0"}}')
+        runner.set_ffprobe_output(1, ''.join(f"{t}.000000,K__\n" for t in range(0, 1440, 10)))
+        mock_config.build_settings.build_state = BuildState.HARD_ONLY
+        mock_config.build_settings.nvenc_state = NvencState.NVENC_NONE
+        mock_config.auto_patch_hardsub = True
+        original_run = runner.run_ffmpeg
+
+        def run_ffmpeg(args, cwd=None):
+            Path(args[-1]).write_bytes(b"v2")  # Simulate ffmpeg writing its output
+            return original_run(args, cwd)
+        runner.run_ffmpeg = run_ffmpeg
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths,
+                                       burned_subs=burned_subs)
+
+        thread.hardsub()
+
+        segment_call, splice_call = runner.ffmpeg_calls
+        assert segment_call[segment_call.index('-ss') + 1] == '750.000000'
+        assert 'concat' in splice_call
+
+    def test_unknown_hardsub_encodes_fully(self, mock_config, mock_render_paths, tmp_path):
+        """Without a record of the burned subtitles, automatic patching encodes in full."""
+        from modules.ass_cache import BurnedSubtitleCache
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        mock_render_paths.hardsub.write_bytes(b"v1")
+        runner = MockProcessRunner()
+        mock_config.build_settings.build_state = BuildState.HARD_ONLY
+        mock_config.auto_patch_hardsub = True
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths,
+                                       burned_subs=BurnedSubtitleCache(tmp_path / "cache"))
+
+        thread.hardsub()
+
+        (call,) = runner.ffmpeg_calls
+        assert call[-1] == str(mock_render_paths.hardsub)
+
+    def test_render_cache_skips_repeated_step(self, mock_config, mock_render_paths, tmp_path):
+        """Re-running an unchanged step leaves the intact output alone."""
+        from modules.render_cache import RenderCache
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        original_run = runner.run_ffmpeg
+
+        def run_ffmpeg(args, cwd=None):
+            if args != ['-version']:
+                Path(args[-1]).write_bytes(b"hardsub")  # Simulate ffmpeg writing its output
+            return original_run(args, cwd)
+        runner.run_ffmpeg = run_ffmpeg
+        mock_config.build_settings.build_state = BuildState.HARD_ONLY
+        mock_config.main_paths.logo.parent.mkdir(parents=True, exist_ok=True)
+        mock_config.main_paths.logo.write_text("logo")
+        render_cache = RenderCache(tmp_path / "cache")
+
+        def encodes():
+            with patch('sys.excepthook'):
+                thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths,
+                                           render_cache=render_cache)
+            thread.hardsub()
+            return [call for call in runner.ffmpeg_calls if call != ['-version']]
+
+        assert len(encodes()) == 1
+        assert len(encodes()) == 1  # Second run skipped
+
+        mock_render_paths.sub.write_text("changed")
+        assert len(encodes()) == 2  # Changed input encodes again
+
+    def test_render_cache_keyed_on_fonts_not_job_paths(self, mock_config, mock_render_paths, tmp_path):
+        """Changed fonts encode again; encoding through scratch instead of in place does not."""
+        from modules.output_mover import OutputMover
+        from modules.render_cache import RenderCache
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        original_run = runner.run_ffmpeg
+
+        def run_ffmpeg(args, cwd=None):
+            if args != ['-version']:
+                Path(args[-1]).write_bytes(b"hardsub")  # Simulate ffmpeg writing its output
+            return original_run(args, cwd)
+        runner.run_ffmpeg = run_ffmpeg
+        mock_config.build_settings.build_state = BuildState.HARD_ONLY
+        mock_config.main_paths.logo.parent.mkdir(parents=True, exist_ok=True)
+        mock_config.main_paths.logo.write_text("logo")
+        fonts = tmp_path / "fonts"
+        fonts.mkdir()
+        (fonts / "AniBaza.otf").write_bytes(b"v1")
+        render_cache = RenderCache(tmp_path / "cache")
+
+        def encodes(mover=None):
+            with patch('sys.excepthook'):
+                thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths,
+                                           render_cache=render_cache, output_mover=mover)
+            thread.ffmpeg_factory.fonts_dir = fonts
+            thread._prepare_scratch()
+            thread.hardsub()
+            thread._deliver_outputs()
+            return len([call for call in runner.ffmpeg_calls if call != ['-version']])
+
+        assert encodes() == 1
+        assert encodes(OutputMover(tmp_path / "scratch")) == 1  # Same step, only written elsewhere
+
+        (fonts / "AniBaza.otf").write_bytes(b"v2")
+        assert encodes() == 2  # Changed font encodes again
+
+    def test_failed_encode_not_cached(self, mock_config, mock_render_paths, tmp_path):
+        """A crashed encode fails the step and its truncated output is encoded again next run."""
+        from modules.render_cache import RenderCache
+        from tests.mocks.mock_process_runner import MockProcess, MockProcessRunner
+
+        runner = MockProcessRunner()
+        exit_codes = [1, 0]
+
+        def run_ffmpeg(args, cwd=None):
+            runner.ffmpeg_calls.append(args)
+            process = MockProcess()
+            if args != ['-version']:
+                Path(args[-1]).write_bytes(b"trunc")  # Simulate a partial output
+                process.returncode = exit_codes.pop(0)
+            return process
+        runner.run_ffmpeg = run_ffmpeg
+        mock_config.build_settings.build_state = BuildState.HARD_ONLY
+        mock_config.main_paths.logo.parent.mkdir(parents=True, exist_ok=True)
+        mock_config.main_paths.logo.write_text("logo")
+        render_cache = RenderCache(tmp_path / "cache")
+
+        def hardsub():
+            with patch('sys.excepthook'):
+                thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths,
+                                           render_cache=render_cache)
+            thread.hardsub()
+
+        with pytest.raises(RuntimeError, match="exit code 1"):
+            hardsub()
+        hardsub()
+
+        assert exit_codes == []  # The second run encoded again
+
+    def test_static_logo_composited(self, mock_config, mock_render_paths, tmp_path):
+        """A static logo is rendered once and overlaid instead of burned with libass."""
+        from modules.logo_cache import LogoCache
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        mock_config.main_paths.logo.parent.mkdir(parents=True, exist_ok=True)
+        mock_config.main_paths.logo.write_text(
+            "[Events]\nDialogue: 0,0:00:00.00,4:00:00.00,Anibaza,,0,0,0,,LOGO\n", encoding='utf-8'
+        )
+        runner = MockProcessRunner()
+        original_run = runner.run_ffmpeg
+
+        def run_ffmpeg(args, cwd=None):
+            Path(args[-1]).write_bytes(b"png")  # Simulate ffmpeg writing its output
+            return original_run(args, cwd)
+        runner.run_ffmpeg = run_ffmpeg
+        mock_config.build_settings.build_state = BuildState.HARD_ONLY
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths,
+                                       logo_cache=LogoCache(tmp_path / "cache"))
+        thread.video_info = VideoInfo(width=1920, height=1080)
+        thread.total_duration_sec = 1440.0
+
+        thread.prepare_logo()
+        thread.hardsub()
+
+        vf = runner.ffmpeg_calls[-1][runner.ffmpeg_calls[-1].index('-vf') + 1]
+        assert vf.startswith("movie='") and '1920x1080.png' in vf
+        assert 'AniBaza_Logo16x9.ass' not in vf
+
+    def test_logo_merged_into_subtitles(self, mock_config, mock_render_paths, tmp_path):
+        """An animated logo is merged into the episode subtitles: one subtitles filter."""
+        from modules.ass_cache import MergedAssCache
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        header = ("[Script Info]\nPlayResX: 1920\nPlayResY: 1080\n\n[V4+ Styles]\n"
+                  "Format: Name, Fontname, Fontsize, Alignment\n{}\n\n[Events]\n"
+                  "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n{}\n")
+        mock_config.main_paths.logo.parent.mkdir(parents=True, exist_ok=True)
+        mock_config.main_paths.logo.write_text(header.format(
+            "Style: Anibaza,Arial,30,9", "Dialogue: 0,0:00:00.00,0:24:00.00,Anibaza,,0,0,0,,{\\fad(500,0)}LOGO"
+        ), encoding='utf-8')
+        mock_render_paths.sub.write_text(header.format(
+            "Style: Default,Arial,48,2", "Dialogue: 0,0:00:10.00,0:00:12.00,Default,,0,0,0,,Hello"
+        ), encoding='utf-8')
+        runner = MockProcessRunner()
+        mock_config.build_settings.build_state = BuildState.HARD_ONLY
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths,
+                                       merged_subs=MergedAssCache())
+
+        thread.merge_logo_subtitles()
+        thread.hardsub()
+
+        vf = runner.ffmpeg_calls[-1][runner.ffmpeg_calls[-1].index('-vf') + 1]
+        assert vf.count('subtitles=') == 1 and 'merged.ass' in vf
+        merged = thread.ffmpeg_factory.merged_subtitle
+        assert 'LOGO' in merged.read_text(encoding='utf-8')
+
+        thread._cleanup_temp_files()
+        assert not merged.parent.exists()
+
+    def test_attached_fonts_passed_to_libass(self, mock_config, mock_render_paths):
+        """Fonts attached to the raw are extracted and burned with the subtitles."""
+        from models.video_info import StreamInfo
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        original_run = runner.run_ffmpeg
+
+        def run_ffmpeg(args, cwd=None):
+            if '-dump_attachment:3' in args:
+                Path(args[args.index('-dump_attachment:3') + 1]).write_bytes(b"font")
+            return original_run(args, cwd)
+        runner.run_ffmpeg = run_ffmpeg
+        mock_config.build_settings.build_state = BuildState.HARD_ONLY
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths)
+        thread.video_info = VideoInfo(font_attachments=(StreamInfo(index=3, filename="Sign.ttf"),))
+
+        thread.prepare_fonts()
+        thread.hardsub()
+
+        fonts_dir = thread.ffmpeg_factory.fonts_dir
+        assert (fonts_dir / "Sign.ttf").exists()
+        vf = runner.ffmpeg_calls[-1][runner.ffmpeg_calls[-1].index('-vf') + 1]
+        assert f"fontsdir='{fonts_dir}'" in vf
+
+        thread._cleanup_temp_files()
+        assert not fonts_dir.exists()
+
+    def test_patch_range_without_output_encodes_fully(self, mock_config, mock_render_paths):
+        """Without an existing output the hardsub is encoded in full."""
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        mock_config.build_settings.build_state = BuildState.HARD_ONLY
+        options = JobOptions(patch_ranges=parse_time_ranges("12:32-12:38"))
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths, options=options)
+
+        thread.hardsub()
+
+        (call,) = runner.ffmpeg_calls
+        assert call[-1] == str(mock_render_paths.hardsub)
+
+    def test_two_pass_progress_spans_passes(self, render_thread):
+        """Progress of the second pass continues from the first."""
+        from models.progress import ProgressSample
+
+        render_thread.total_frames = 1000
+        render_thread._pass_progress = (1, 2)
+
+        with patch.object(render_thread, 'frame_upd') as mock_frame_signal:
+            render_thread.progress_update(ProgressSample(frame=200))
+
+        mock_frame_signal.emit.assert_called_once_with('600')
+
+    def test_concurrent_steps_share_progress(self, render_thread):
+        """Softsub and hardsub running at once fill one progress bar on a single scale."""
+        from models.progress import ProgressSample
+
+        render_thread.total_frames = 1000
+        render_thread.context = replace(render_thread.context, build_state=BuildState.SOFT_AND_HARD)
+
+        with patch.object(render_thread, '_single_decode', return_value=False), \
+                patch.object(render_thread, 'frame_upd') as mock_frame_signal:
+            render_thread.progress_update(ProgressSample(frame=600), 'softsub')
+            render_thread.progress_update(ProgressSample(frame=200), 'hardsub')
+            render_thread.progress_update(ProgressSample(frame=700), 'softsub')
+
+        assert [c.args[0] for c in mock_frame_signal.emit.call_args_list] == ['300', '400', '450']
+
+    def test_no_target_size_single_pass(self, render_thread, mock_config):
+        """Without a target size the step is a single quality-based encode."""
+        with patch('subprocess.Popen') as mock_popen:
+            mock_popen.return_value.stdout = []
+            mock_popen.return_value.wait.return_value = 0
+            mock_config.build_settings.build_state = BuildState.SOFT_ONLY
+            render_thread.softsub()
+
+            cmd = mock_popen.call_args[0][0]
+            assert mock_popen.call_count == 1
+            assert '-pass' not in cmd
+
+    def test_render_steps_form_valid_graph(self, render_thread):
+        """Every step of the default job waits only for steps of the graph."""
+        from models.render_graph import check_graph
+
+        steps = {step.name: step for step in render_thread.render_steps()}
+
+        check_graph(list(steps.values()))
+        assert steps['softsub'].after == steps['hardsub'].after  # Encodes may overlap
+        assert steps['deliver'].after == ('verify',)
+
+    def test_render_steps_encoders_hold_their_slot(self, mock_config, mock_render_paths):
+        """A libx264 hardsub holds a CPU slot, an NVENC softsub an NVENC session."""
+        mock_config.build_settings.nvenc_state = NvencState.NVENC_SOFT_ONLY
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, paths=mock_render_paths)
+
+        steps = {step.name: step for step in thread.render_steps()}
+
+        assert steps['softsub'].demand.nvenc_sessions == 1
+        assert steps['hardsub'].demand.cpu_encodes == 1
+        assert steps['softsub_and_hardsub'].demand == steps['softsub'].demand + steps['hardsub'].demand
+
+    def test_render_steps_remux_only(self, mock_config, tmp_path):
+        """A softsub-only re-release is the remux alone."""
+        mock_config.build_settings.build_state = BuildState.SOFT_ONLY
+        thread = self._remux_thread(mock_config, tmp_path, None)
+
+        assert [step.name for step in thread.render_steps()] == ['remux', 'verify', 'deliver']
+
+    def test_verify_outputs_missing(self, render_thread, mock_render_paths):
+        """A step that left no output fails the job."""
+        mock_render_paths.softsub.write_bytes(b"soft")
+
+        with pytest.raises(RuntimeError, match=mock_render_paths.hardsub.name):
+            render_thread.verify_outputs()
+
+    def test_verify_outputs_rejects_stale_release(self, render_thread, mock_render_paths):
+        """An output left by an earlier release does not count as produced by this run."""
+        mock_render_paths.softsub.write_bytes(b"old")
+        mock_render_paths.hardsub.write_bytes(b"old")
+        render_thread.context = replace(render_thread.context, build_state=BuildState.SOFT_AND_HARD)
+        render_thread._outputs_finished(None, [mock_render_paths.softsub])
+
+        with pytest.raises(RuntimeError, match=mock_render_paths.hardsub.name):
+            render_thread.verify_outputs()
+
+    def test_failed_run_cleans_temp_files(self, render_thread):
+        """The job's temp dir is removed even when a step fails."""
+        from models.render_graph import RenderStep
+
+        def fail():
+            render_thread._job_dir().mkdir(parents=True)
+            raise RuntimeError("encode failed")
+        render_thread.render_steps = lambda: [RenderStep('encode', fail)]
+
+        render_thread.run()
+
+        assert str(render_thread.error) == "encode failed"
+        assert not render_thread._job_dir().exists()
+
+    def test_stop_cancels_every_chunked_encode(self, render_thread):
+        """Stopping the job cancels the chunked encodes of all running steps."""
+        encoders = [MagicMock(), MagicMock()]
+        render_thread._chunked_encoders.update(encoders)
+
+        render_thread.stop()
+
+        for encoder in encoders:
+            encoder.cancel.assert_called_once()
+
+    def test_pass_progress_per_step_thread(self, render_thread):
+        """Two-pass progress of one step does not leak into a step running at once."""
+        import threading
+
+        render_thread._pass_progress = (1, 2)
+        seen = []
+        other = threading.Thread(target=lambda: seen.append(render_thread._pass_progress))
+        other.start()
+        other.join()
+
+        assert seen == [(0, 1)]
+
+    def test_output_scratch_moved_into_place(self, mock_config, mock_render_paths, tmp_path):
+        """With an output mover the encode writes to scratch and the finished output is moved into place."""
+        from modules.output_mover import OutputMover
+        from modules.render_cache import RenderCache
+        from tests.mocks.mock_process_runner import MockProcessRunner
+
+        runner = MockProcessRunner()
+        original_run = runner.run_ffmpeg
+
+        def run_ffmpeg(args, cwd=None):
+            if args != ['-version']:
+                Path(args[-1]).write_bytes(b"hardsub")  # Simulate ffmpeg writing its output
+            return original_run(args, cwd)
+        runner.run_ffmpeg = run_ffmpeg
+        mock_config.build_settings.build_state = BuildState.HARD_ONLY
+        mock_config.main_paths.logo.parent.mkdir(parents=True, exist_ok=True)
+        mock_config.main_paths.logo.write_text("logo")
+        render_cache = RenderCache(tmp_path / "cache")
+        mover = OutputMover(tmp_path / "scratch")
+
+        def render():
+            with patch('sys.excepthook'):
+                thread = ThreadClassRender(mock_config, runner=runner, paths=mock_render_paths,
+                                           render_cache=render_cache, output_mover=mover)
+            thread._prepare_scratch()
+            thread.hardsub()
+            return thread
+
+        thread = render()
+        written = Path(runner.ffmpeg_calls[-1][-1])
+        assert written.is_relative_to(tmp_path / "scratch")
+        assert not mock_render_paths.hardsub.exists()
+
+        thread.verify_outputs()
+        thread._deliver_outputs()
+        assert mock_render_paths.hardsub.read_bytes() == b"hardsub"
+        assert not written.exists()
+
+        encodes = len(runner.ffmpeg_calls)
+        thread = render()
+        assert len(runner.ffmpeg_calls) == encodes  # The landed output is cached
+        thread.verify_outputs()  # Skipped output found at its destination
+
+    def test_output_scratch_keeps_undelivered_outputs(self, mock_config, mock_render_paths, tmp_path):
+        """A failed delivery fails the job's delivery, and the next run keeps the output it could not deliver."""
+        from modules.output_mover import OutputMover
+
+        mover = OutputMover(tmp_path / "scratch")
+        with patch('sys.excepthook'):
+            thread = ThreadClassRender(mock_config, runner=None, paths=mock_render_paths, output_mover=mover)
+        thread._prepare_scratch()
+        written = thread.output_paths.hardsub
+        written.write_bytes(b"hardsub")
+        mock_render_paths.hardsub.mkdir(parents=True)  # Cannot be replaced by a file
+
+        thread._deliver_outputs()
+        assert mover.wait(timeout=5)
+        with pytest.raises(RuntimeError, match="failed"):
+            thread.delivery.result()
+
+        with pytest.raises(RuntimeError, match="could not be moved into place"):
+            thread._prepare_scratch()
+        assert written.read_bytes() == b"hardsub"
+
+        mock_render_paths.hardsub.rmdir()
+        thread._prepare_scratch()
+        assert mock_render_paths.hardsub.read_bytes() == b"hardsub"
+        assert not written.exists()
+
+    def test_output_scratch_keeps_remux_in_place(self, mock_config, tmp_path):
+        """A subtitle remux rewrites the previous softsub where it is."""
+        from modules.output_mover import OutputMover
+
+        mock_config.build_settings.build_state = BuildState.SOFT_AND_HARD
+        thread = self._remux_thread(mock_config, tmp_path, None)
+        thread.output_mover = OutputMover(tmp_path / "scratch")
+
+        assert thread.output_paths.softsub == thread.paths.softsub
+        assert thread.output_paths.hardsub.is_relative_to(tmp_path / "scratch")
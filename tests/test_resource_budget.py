@@ -0,0 +1,32 @@
+"""Tests for modules/resource_budget.py - encoder budget of parallel jobs."""
+
+from models.resources import ResourceDemand
+from modules.resource_budget import ResourceBudget
+
+
+class TestResourceBudget:
+    """Test ResourceBudget."""
+
+    def test_acquire_until_full(self):
+        budget = ResourceBudget(cpu_encodes=1, nvenc_sessions=2)
+
+        assert budget.try_acquire(ResourceDemand(nvenc_sessions=1))
+        assert budget.try_acquire(ResourceDemand(cpu_encodes=1, nvenc_sessions=1))
+        assert not budget.try_acquire(ResourceDemand(nvenc_sessions=1))
+        assert budget.in_use == ResourceDemand(cpu_encodes=1, nvenc_sessions=2)
+
+    def test_release_frees_slots(self):
+        budget = ResourceBudget()
+        demand = ResourceDemand(io=1)
+        budget.try_acquire(demand)
+
+        budget.release(demand)
+
+        assert budget.in_use == ResourceDemand()
+        assert budget.try_acquire(demand)
+
+    def test_from_config(self, mock_config):
+        mock_config.cpu_encode_slots = 2
+        mock_config.nvenc_sessions = 5
+
+        assert ResourceBudget.from_config(mock_config).capacity == ResourceDemand(2, 5, ResourceBudget.IO_SLOTS)
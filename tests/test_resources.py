@@ -0,0 +1,71 @@
+"""Tests for models/resources.py - resources a queued job needs."""
+
+from pathlib import Path
+
+import pytest
+
+from models.encoding import EncodingParams
+from models.enums import BuildState, LogoState, NvencState
+from models.job import RenderJob, VideoPresets
+from models.render_paths import RenderPaths
+from models.resources import ResourceDemand, fits_budget, job_demand
+
+
+def make_job(build_state, nvenc_state, previous_softsub=None) -> RenderJob:
+    return RenderJob(
+        paths=RenderPaths(
+            raw=Path("raw.mkv"), audio=None, sub=Path("sub.ass"),
+            softsub=Path("soft.mkv"), hardsub=Path("hard.mp4"), previous_softsub=previous_softsub
+        ),
+        episode_name="Episode_01",
+        build_state=build_state,
+        nvenc_state=nvenc_state,
+        logo_state=LogoState.LOGO_BOTH,
+        encoding_params=EncodingParams("6M", "9M", "18M", 18, 19, 17, 23),
+        video_settings=VideoPresets.SOFTSUB,
+    )
+
+
+class TestJobDemand:
+    """Test job_demand."""
+
+    @pytest.mark.parametrize("build_state,nvenc_state,expected", [
+        (BuildState.SOFT_AND_HARD, NvencState.NVENC_BOTH, ResourceDemand(nvenc_sessions=2)),
+        (BuildState.SOFT_AND_HARD, NvencState.NVENC_SOFT_ONLY, ResourceDemand(cpu_encodes=1, nvenc_sessions=1)),
+        (BuildState.SOFT_AND_HARD, NvencState.NVENC_NONE, ResourceDemand(cpu_encodes=1)),
+        (BuildState.HARD_ONLY, NvencState.NVENC_SOFT_ONLY, ResourceDemand(cpu_encodes=1)),
+        (BuildState.FOR_HARDSUBBERS, NvencState.NVENC_HARD_ONLY, ResourceDemand(nvenc_sessions=1)),
+        (BuildState.RAW_REPAIR, NvencState.NVENC_BOTH, ResourceDemand(cpu_encodes=1)),
+    ])
+    def test_encodes(self, build_state, nvenc_state, expected):
+        assert job_demand(make_job(build_state, nvenc_state)) == expected
+
+    def test_subtitle_remux_is_io(self):
+        job = make_job(BuildState.SOFT_ONLY, NvencState.NVENC_NONE, previous_softsub=Path("old.mkv"))
+
+        assert job_demand(job) == ResourceDemand(io=1)
+
+    def test_subtitle_remux_with_hardsub(self):
+        job = make_job(BuildState.SOFT_AND_HARD, NvencState.NVENC_BOTH, previous_softsub=Path("old.mkv"))
+
+        assert job_demand(job) == ResourceDemand(nvenc_sessions=1, io=1)
+
+
+class TestFitsBudget:
+    """Test fits_budget."""
+
+    CAPACITY = ResourceDemand(cpu_encodes=1, nvenc_sessions=3, io=1)
+
+    def test_different_hardware_runs_together(self):
+        assert fits_budget(ResourceDemand(nvenc_sessions=2), ResourceDemand(cpu_encodes=1, io=1), self.CAPACITY)
+
+    def test_full_resource_waits(self):
+        assert not fits_budget(ResourceDemand(cpu_encodes=1), ResourceDemand(cpu_encodes=1), self.CAPACITY)
+        assert not fits_budget(ResourceDemand(nvenc_sessions=2), ResourceDemand(nvenc_sessions=2), self.CAPACITY)
+
+    def test_oversized_demand_runs_alone(self):
+        """A job needing more than the whole budget still starts on idle hardware."""
+        capacity = ResourceDemand(cpu_encodes=1, nvenc_sessions=1, io=1)
+
+        assert fits_budget(ResourceDemand(nvenc_sessions=2), ResourceDemand(cpu_encodes=1), capacity)
+        assert not fits_budget(ResourceDemand(nvenc_sessions=2), ResourceDemand(nvenc_sessions=1), capacity)
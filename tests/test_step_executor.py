@@ -0,0 +1,105 @@
+"""Tests for modules/step_executor.py - running a job's render graph."""
+
+import threading
+
+import pytest
+
+from models.render_graph import RenderStep
+from models.resources import ResourceDemand
+from modules.resource_budget import ResourceBudget
+from modules.step_executor import StepExecutor
+
+CPU = ResourceDemand(cpu_encodes=1)
+NVENC = ResourceDemand(nvenc_sessions=1)
+
+
+def overlapping_steps(first_demand, second_demand, timeout=2.0):
+    """Two steps that record whether each saw the other running."""
+    barrier = threading.Barrier(2, timeout=timeout)
+    overlapped = []
+
+    def action():
+        try:
+            barrier.wait()
+            overlapped.append(True)
+        except threading.BrokenBarrierError:
+            overlapped.append(False)
+
+    return [RenderStep('softsub', action, demand=first_demand),
+            RenderStep('hardsub', action, demand=second_demand)], overlapped
+
+
+class TestStepExecutor:
+    """Test StepExecutor."""
+
+    def test_dependencies_run_first(self):
+        order = []
+        steps = [
+            RenderStep('encode', lambda: order.append('encode'), after=('probe', 'audio')),
+            RenderStep('probe', lambda: order.append('probe')),
+            RenderStep('audio', lambda: order.append('audio'), after=('probe',)),
+        ]
+
+        results = StepExecutor(ResourceBudget()).run(steps)
+
+        assert order == ['probe', 'audio', 'encode']
+        assert [result.name for result in results] == order
+
+    def test_cpu_and_nvenc_encodes_overlap(self):
+        """A software encode runs next to an NVENC encode."""
+        steps, overlapped = overlapping_steps(CPU, NVENC)
+
+        StepExecutor(ResourceBudget(cpu_encodes=1)).run(steps)
+
+        assert overlapped == [True, True]
+
+    def test_cpu_encodes_wait_for_slot(self):
+        """Two software encodes do not share one CPU slot."""
+        steps, overlapped = overlapping_steps(CPU, CPU, timeout=0.2)
+
+        StepExecutor(ResourceBudget(cpu_encodes=1)).run(steps)
+
+        assert overlapped == [False, False]
+
+    def test_retries(self):
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("probe failed")
+
+        (result,) = StepExecutor(ResourceBudget()).run([RenderStep('probe', flaky, retries=1)])
+
+        assert result.attempts == 2
+
+    def test_failure_stops_later_steps(self):
+        ran = []
+
+        def fail():
+            raise RuntimeError("encode failed")
+
+        steps = [RenderStep('encode', fail), RenderStep('verify', lambda: ran.append('verify'), after=('encode',))]
+
+        with pytest.raises(RuntimeError, match="encode failed"):
+            StepExecutor(ResourceBudget()).run(steps)
+        assert ran == []
+
+    def test_cancel_stops_later_steps(self):
+        cancelled = []
+        steps = [
+            RenderStep('probe', lambda: cancelled.append(True)),
+            RenderStep('encode', lambda: cancelled.append('encode'), after=('probe',)),
+        ]
+
+        results = StepExecutor(ResourceBudget(), cancelled=lambda: bool(cancelled)).run(steps)
+
+        assert cancelled == [True]
+        assert [result.name for result in results] == ['probe']
+
+    def test_budget_released(self):
+        budget = ResourceBudget()
+
+        StepExecutor(budget).run([RenderStep('hardsub', lambda: None, demand=CPU + NVENC)])
+
+        assert budget.in_use == ResourceDemand()
@@ -1,9 +1,11 @@
 """Tests for models/video_info.py - video metadata parsing."""
 
+import json
+
 import pytest
 
 from models.video_info import (
-    VideoInfo, parse_ffprobe_output,
+    VideoInfo, parse_ffprobe_json, parse_ffprobe_output,
     _parse_duration, _parse_resolution, _parse_pixel_format, _parse_video_profile
 )
 
@@ -221,7 +223,7 @@ class TestParseFfprobeOutput:
         assert info.total_frames == 0.0
         assert info.resolution == "unknown"
         assert info.pixel_format == "yuv420p"
-        assert info.video_profile == "main"
+        assert info.video_profile is None  # Unknown, never assumed to be main
 
     def test_parse_partial_output(self):
         """Handle missing fields gracefully."""
@@ -235,7 +237,7 @@ class TestParseFfprobeOutput:
         assert info.duration_seconds == pytest.approx(600.0)
         assert info.resolution == "unknown"  # Default
         assert info.pixel_format == "yuv420p"  # Default
-        assert info.video_profile == "main"  # Default
+        assert info.video_profile is None  # Unknown
 
     def test_videoinfo_immutable(self):
         """VideoInfo is immutable (frozen dataclass)."""
@@ -256,7 +258,7 @@ class TestVideoInfoDefaults:
         assert info.total_frames == 0.0
         assert info.resolution == "unknown"
         assert info.pixel_format == "yuv420p"
-        assert info.video_profile == "main"
+        assert info.video_profile is None
 
     def test_videoinfo_partial_init(self):
         """VideoInfo can be partially initialized."""
@@ -265,3 +267,149 @@ class TestVideoInfoDefaults:
         assert info.duration_seconds == 100.0
         assert info.resolution == "720p"
         assert info.pixel_format == "yuv420p"  # Default
+
+
+def _probe_json(video: dict, fmt: dict | None = None, extra_streams: list | None = None) -> str:
+    """Build ffprobe -print_format json output for tests."""
+    streams = [dict({'index': 0, 'codec_type': 'video'}, **video)] + (extra_streams or [])
+    return json.dumps({
+        'streams': streams,
+        'format': fmt if fmt is not None else {'duration': '1442.050000', 'size': '1500000000', 'bit_rate': '8321456'},
+    }, indent=4)
+
+
+class TestParseFfprobeJson:
+    """Test structured JSON probe parsing."""
+
+    def test_parse_1080p_10bit_hevc(self):
+        """Full video stream metadata is parsed."""
+        output = _probe_json({
+            'codec_name': 'hevc', 'profile': 'Main 10', 'width': 1920, 'height': 1080,
+            'pix_fmt': 'yuv420p10le', 'color_space': 'bt709', 'color_transfer': 'bt709',
+            'color_primaries': 'bt709', 'color_range': 'tv',
+            'r_frame_rate': '24000/1001', 'avg_frame_rate': '24000/1001',
+        })
+
+        info = parse_ffprobe_json(output)
+
+        assert info.codec_name == 'hevc'
+        assert info.resolution == "1080p"
+        assert (info.width, info.height) == (1920, 1080)
+        assert info.pixel_format == 'yuv420p10le'
+        assert info.source_pixel_format == 'yuv420p10le'
+        assert info.bit_depth == 10
+        assert info.video_profile == 'main10'
+        assert info.color_space == 'bt709'
+        assert info.color_range == 'tv'
+        assert info.duration_seconds == pytest.approx(1442.05)
+        assert info.bit_rate == 8321456
+        assert info.size_bytes == 1500000000
+
+    def test_unknown_profile_is_none(self):
+        """Profiles the encoders are not mapped for are reported as unknown, not as main."""
+        output = _probe_json({'codec_name': 'h264', 'profile': 'High 4:4:4 Predictive', 'height': 1080,
+                              'pix_fmt': 'yuv420p'})
+
+        assert parse_ffprobe_json(output).video_profile is None
+
+    def test_real_frame_rate_used_for_frames(self):
+        """Frame estimate uses the stream's frame rate, not a hardcoded 23.976."""
+        output = _probe_json({'height': 1080, 'r_frame_rate': '25/1', 'avg_frame_rate': '25/1'},
+                             fmt={'duration': '100.0'})
+
+        info = parse_ffprobe_json(output)
+
+        assert info.frame_rate == pytest.approx(25.0)
+        assert info.total_frames == pytest.approx(2500)
+
+    def test_vfr_prefers_avg_frame_rate(self):
+        """VFR raws use avg_frame_rate over r_frame_rate."""
+        output = _probe_json({'r_frame_rate': '60/1', 'avg_frame_rate': '30000/1001'},
+                             fmt={'duration': '10.0'})
+
+        info = parse_ffprobe_json(output)
+
+        assert info.frame_rate == pytest.approx(29.97, abs=0.01)
+
+    def test_invalid_avg_rate_falls_back(self):
+        """0/0 avg_frame_rate falls back to r_frame_rate."""
+        output = _probe_json({'r_frame_rate': '24000/1001', 'avg_frame_rate': '0/0'},
+                             fmt={'duration': '10.0'})
+
+        assert parse_ffprobe_json(output).frame_rate == pytest.approx(23.976, abs=0.001)
+
+    def test_exact_frame_count_preferred(self):
+        """nb_frames, counted packets and MKV statistics tags beat the estimate."""
+        for video, expected in [
+            ({'nb_frames': '34567', 'r_frame_rate': '24/1'}, 34567),
+            ({'nb_read_packets': '34560', 'r_frame_rate': '24/1'}, 34560),
+            ({'tags': {'NUMBER_OF_FRAMES-eng': '34500'}, 'r_frame_rate': '24/1'}, 34500),
+        ]:
+            info = parse_ffprobe_json(_probe_json(video))
+            assert info.nb_frames == expected
+            assert info.total_frames == expected
+
+    def test_audio_and_subtitle_streams(self):
+        """Audio and subtitle streams are listed."""
+        output = _probe_json({'height': 720}, extra_streams=[
+            {'index': 1, 'codec_type': 'audio', 'codec_name': 'flac', 'channels': 2,
+             'sample_rate': '48000', 'tags': {'language': 'jpn'}},
+            {'index': 2, 'codec_type': 'subtitle', 'codec_name': 'ass',
+             'tags': {'language': 'rus', 'title': 'Caption'}},
+            {'index': 3, 'codec_type': 'attachment', 'codec_name': 'ttf'},
+        ])
+
+        info = parse_ffprobe_json(output)
+
+        assert len(info.audio_streams) == 1
+        assert info.audio_streams[0].codec_name == 'flac'
+        assert info.audio_streams[0].sample_rate == 48000
+        assert info.audio_streams[0].language == 'jpn'
+        assert len(info.subtitle_streams) == 1
+        assert info.subtitle_streams[0].title == 'Caption'
+
+    def test_font_attachments(self):
+        """Font attachments are listed with their file names; other attachments are not."""
+        output = _probe_json({'height': 1080}, extra_streams=[
+            {'index': 3, 'codec_type': 'attachment', 'codec_name': 'ttf',
+             'tags': {'filename': 'Sign.ttf', 'mimetype': 'application/x-truetype-font'}},
+            {'index': 4, 'codec_type': 'attachment',
+             'tags': {'filename': 'Title.OTF', 'mimetype': 'application/octet-stream'}},
+            {'index': 5, 'codec_type': 'attachment', 'tags': {'filename': 'cover.jpg', 'mimetype': 'image/jpeg'}},
+        ])
+
+        info = parse_ffprobe_json(output)
+
+        assert [(font.index, font.filename) for font in info.font_attachments] == [(3, 'Sign.ttf'), (4, 'Title.OTF')]
+
+    def test_bit_depth_from_pixel_format(self):
+        """Bit depth falls back to the pixel format name."""
+        assert parse_ffprobe_json(_probe_json({'pix_fmt': 'p010le'})).bit_depth == 10
+        assert parse_ffprobe_json(_probe_json({'pix_fmt': 'yuv420p'})).bit_depth == 8
+        assert parse_ffprobe_json(_probe_json({'pix_fmt': 'yuv420p', 'bits_per_raw_sample': '8'})).bit_depth == 8
+
+    def test_unsupported_pixel_format_normalized(self):
+        """Exotic pixel formats map onto supported encode formats."""
+        info = parse_ffprobe_json(_probe_json({'pix_fmt': 'yuv444p12le'}))
+
+        assert info.pixel_format == 'yuv420p10le'
+        assert info.source_pixel_format == 'yuv444p12le'
+
+    def test_log_lines_before_json(self):
+        """Error lines merged before the JSON document are skipped."""
+        output = "[matroska @ 0x1] Unknown entry 0x1234\n" + _probe_json({'height': 1080})
+
+        assert parse_ffprobe_json(output).resolution == "1080p"
+
+    def test_no_json_raises(self):
+        """Text output without JSON raises ValueError."""
+        with pytest.raises(ValueError):
+            parse_ffprobe_json("Duration: 00:01:00.00")
+
+    def test_no_video_stream_defaults(self):
+        """Missing video stream yields defaults."""
+        info = parse_ffprobe_json(json.dumps({'streams': [], 'format': {}}))
+
+        assert info.resolution == "unknown"
+        assert info.total_frames == 0.0
+        assert info.pixel_format == "yuv420p"
@@ -0,0 +1,67 @@
+"""Background font cache warm-up at startup.
+
+On a fresh machine the first libass run scans every system font before
+drawing anything, which delayed the first frame of the first encode by
+seconds to tens of seconds. The scan is now triggered once at startup,
+while the user is still picking files, and fontconfig's cache makes it
+cheap for every encode of the session. The font index used by the
+queue's font audit is refreshed at the same time.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from models.protocols import ProcessRunner
+from modules.ffmpeg_builder import build_font_warmup_args
+from modules.font_index import FontIndex, system_font_dirs
+from modules.fonts import bundled_fonts
+
+
+class FontCacheWarmupThread(QThread):
+    """Burns a subtitle file into one tiny frame so fontconfig builds its cache."""
+
+    finished_signal = pyqtSignal(bool)  # True if the warm-up render succeeded
+
+    def __init__(self, config, runner: ProcessRunner, font_index: Optional[FontIndex] = None):
+        """Initialize thread.
+
+        Args:
+            config: Application config (logo and fonts paths, logging)
+            runner: ProcessRunner used to start ffmpeg
+            font_index: Optional font index to bring up to date
+        """
+        super().__init__()
+        self.config = config
+        self.runner = runner
+        self.font_index = font_index
+
+    def run(self):
+        if self.font_index is not None:
+            names = self.font_index.names([self.config.main_paths.fonts, *system_font_dirs()])
+            self.config.log('FontCacheWarmupThread', 'run', f"Font index: {len(names)} font names")
+
+        subtitle_path: Path = self.config.main_paths.logo
+        if not subtitle_path.exists():
+            self.config.log('FontCacheWarmupThread', 'run', "No subtitle file to warm up the font cache with")
+            self.finished_signal.emit(False)
+            return
+
+        fonts_dir: Optional[Path] = self.config.main_paths.fonts
+        if not bundled_fonts(fonts_dir):
+            fonts_dir = None
+        try:
+            process = self.runner.run_ffmpeg(build_font_warmup_args(subtitle_path, fonts_dir))
+            output, _ = process.communicate()
+        except OSError as e:
+            self.config.log('FontCacheWarmupThread', 'run', f"Font cache warm-up failed: {e}")
+            self.finished_signal.emit(False)
+            return
+
+        if process.returncode:
+            self.config.log('FontCacheWarmupThread', 'run',
+                            f"Font cache warm-up failed with exit code {process.returncode}: {(output or '').strip()}")
+        else:
+            self.config.log('FontCacheWarmupThread', 'run', "Font cache warmed up")
+        self.finished_signal.emit(not process.returncode)
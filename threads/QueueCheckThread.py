@@ -0,0 +1,117 @@
+"""Background checks of a job before it is queued.
+
+Adding a job probes its raw (seconds on a network share when the probe
+is not cached) and audits the fonts of the subtitles to be burned, which
+may scan the font folders and the raw's attachments. Both ran in the GUI
+thread and froze the window; they now run here, and the main window
+queues the job once the checks pass.
+"""
+
+from typing import Optional
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from models.enums import BuildState, LogoState
+from models.job import RenderJob
+from models.protocols import ProcessRunner
+from models.video_info import VideoInfo
+from modules.ass_cache import AssCache
+from modules.font_index import FontIndex, audit_fonts, system_font_dirs
+from modules.probe_cache import ProbeCache, probe_video
+
+
+class QueueCheckThread(QThread):
+    """Probes a job's raw and checks its subtitle fonts before it is queued."""
+
+    checked = pyqtSignal(object, object, str)  # Job, VideoInfo or None, error ('' if the job can be queued)
+
+    def __init__(
+        self,
+        config,
+        runner: Optional[ProcessRunner],
+        job: RenderJob,
+        probe_cache: Optional[ProbeCache],
+        font_index: FontIndex,
+        ass_cache: AssCache
+    ):
+        """Initialize thread.
+
+        Args:
+            config: Application config (font audit setting, logo and fonts paths, logging)
+            runner: ProcessRunner for ffprobe (None skips the probe)
+            job: Job to be queued
+            probe_cache: Shared probe cache (the render thread reuses the probe)
+            font_index: Font index used by the audit
+            ass_cache: Parsed subtitle cache
+        """
+        super().__init__()
+        self.config = config
+        self.runner = runner
+        self.job = job
+        self.probe_cache = probe_cache
+        self.font_index = font_index
+        self.ass_cache = ass_cache
+
+    def run(self):
+        paths = self.job.paths
+        video_info = None
+        # A softsub-only re-release never reads the raw
+        if paths.previous_softsub is None or self.job.build_state != BuildState.SOFT_ONLY:
+            video_info = self._probe()
+            if self.runner and video_info is None:
+                self.checked.emit(self.job, None, f"Не удалось прочитать равку: {paths.raw}")
+                return
+
+        # Missing fonts would only be noticed in the finished hardsub
+        missing = self._missing_fonts(video_info)
+        if missing:
+            self.checked.emit(self.job, video_info, "Не найдены шрифты субтитров:\n" + "\n".join(missing)
+                              + "\nУстановите их или положите в папку fonts.")
+            return
+        self.checked.emit(self.job, video_info, '')
+
+    def _probe(self) -> Optional[VideoInfo]:
+        """Probe the raw through the shared probe cache (None if unavailable or unreadable)."""
+        if not self.runner:
+            return None
+
+        try:
+            # An exact frame count makes the queue's progress and ETA exact; counted once, then cached
+            info = probe_video(self.runner, self.job.paths.raw, self.probe_cache, count_frames=True)
+        except ValueError as e:
+            self.config.log('QueueCheckThread', '_probe', f"Probe failed: {e}")
+            return None
+
+        if info is None or info.duration_seconds <= 0:
+            return None
+        self.config.log('QueueCheckThread', '_probe',
+                        f"Probed raw: {info.resolution}, {info.frame_rate:.3f} fps, {info.duration_seconds:.1f}s")
+        return info
+
+    def _missing_fonts(self, video_info: Optional[VideoInfo]) -> list[str]:
+        """Fonts of the subtitles and logo to be burned that libass would not find."""
+        if not self.config.font_audit:
+            return []
+
+        paths, build_state, logo_state = self.job.paths, self.job.build_state, self.job.logo_state
+        hardsub = build_state in [BuildState.SOFT_AND_HARD, BuildState.HARD_ONLY, BuildState.FOR_HARDSUBBERS]
+        softsub = build_state in [BuildState.SOFT_AND_HARD, BuildState.SOFT_ONLY] and paths.previous_softsub is None
+        burned = [paths.sub] if hardsub and paths.sub else []
+        if ((hardsub and logo_state in [LogoState.LOGO_BOTH, LogoState.LOGO_HARD_ONLY])
+                or (softsub and logo_state in [LogoState.LOGO_BOTH, LogoState.LOGO_SOFT_ONLY])):
+            burned.append(self.config.main_paths.logo)
+
+        documents = []
+        for script in burned:
+            try:
+                documents.append(self.ass_cache.load(script))
+            except OSError:
+                continue  # Missing files are reported by path validation
+        attached = set()
+        if documents and self.runner and video_info is not None:
+            attached = self.font_index.attachment_names(self.runner, paths.raw, video_info.font_attachments)
+        missing = audit_fonts(self.font_index, documents, [self.config.main_paths.fonts, *system_font_dirs()],
+                              attached)
+        if missing:
+            self.config.log('QueueCheckThread', '_missing_fonts', f"Missing fonts: {', '.join(missing)}")
+        return missing
@@ -1,22 +1,45 @@
-"""Queue processor thread - sequential job execution.
+"""Queue processor thread - parallel job execution.
 
-This thread processes jobs from the JobQueue sequentially.
-Run loop implementation will be added in Task 10.
+This thread takes jobs from the JobQueue in order and runs up to
+config.parallel_jobs of them at once, each in its own worker thread.
+A job starts only when its encoder demand fits the ResourceBudget next
+to the running jobs (see models.resources). Meanwhile the next
+config.lookahead_jobs waiting jobs are prepared in the background (see
+JobPreparer), so a freed encoder goes straight to a ready job; with
+input staging on, their inputs are first copied to local disk (see
+InputStager). A job counts as completed only once its outputs are at
+their destinations; with an output mover that may be after its worker
+has moved on to the next job.
 """
 
-from typing import Optional
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import replace
+from typing import TYPE_CHECKING, AbstractSet, Optional
+
 from PyQt5.QtCore import QThread, pyqtSignal
 
-from models.job_queue import JobQueue
+from models.enums import JobStatus
+from models.job_queue import JobQueue, QueuedJob
+from models.render_paths import RenderPaths
+from models.resources import HARDSUB_STATES, ResourceDemand, job_demand
+from modules.input_stager import InputStager
+from modules.job_preparer import JobPreparer
+from modules.process_runner import JobProcessRunner
+from modules.resource_budget import ResourceBudget
+
+if TYPE_CHECKING:
+    from threads.RenderThread import ThreadClassRender  # Imported lazily in _run_job
 
 
 class QueueProcessor(QThread):
-    """QThread that processes jobs from queue sequentially.
+    """QThread that processes jobs from queue, several at once.
 
     Responsibilities:
-    - Process jobs one at a time from JobQueue
-    - Emit signals for job lifecycle events
-    - Support cancellation of current job
+    - Start waiting jobs in queue order while workers and resources are free
+    - Prepare the next waiting jobs (and stage their inputs) while others encode
+    - Emit signals for job lifecycle events and per-job progress
+    - Support cancellation of a single job or of the whole queue
     - Support pause/resume functionality
 
     Signals:
@@ -25,8 +48,13 @@ class QueueProcessor(QThread):
         job_failed(str, str): Emitted when job fails (job_id, error_message)
         job_cancelled(str): Emitted when job is cancelled (job_id)
         queue_finished(): Emitted when all jobs are processed
+        frame_upd, time_upd, state_upd, elapsed_time_upd (str, object):
+            Progress of a running job (job_id, value)
+        staging_upd(str, object): Input staging progress of a waiting job (job_id, text)
     """
 
+    POLL_INTERVAL = 0.5  # Seconds between looks for newly added jobs while jobs run
+
     # Signals for job lifecycle events
     job_started = pyqtSignal(str)  # job_id
     job_completed = pyqtSignal(str)  # job_id
@@ -34,36 +62,125 @@ class QueueProcessor(QThread):
     job_cancelled = pyqtSignal(str)  # job_id
     queue_finished = pyqtSignal()  # no arguments
 
-    # Forward signals from RenderThread for progress updates
-    frame_upd = pyqtSignal(object)  # Frame progress
-    time_upd = pyqtSignal(object)  # Time progress
-    state_upd = pyqtSignal(object)  # State updates
-    elapsed_time_upd = pyqtSignal(object)  # Elapsed time
+    # Forward signals from RenderThread for progress updates, tagged with the job ID
+    frame_upd = pyqtSignal(str, object)  # job_id, frame progress
+    time_upd = pyqtSignal(str, object)  # job_id, time progress
+    state_upd = pyqtSignal(str, object)  # job_id, state updates
+    elapsed_time_upd = pyqtSignal(str, object)  # job_id, elapsed time
+    staging_upd = pyqtSignal(str, object)  # job_id, input staging progress
 
-    def __init__(self, queue: JobQueue, config=None, runner=None):
+    def __init__(self, queue: JobQueue, config=None, runner=None, probe_cache=None, keyframe_cache=None,
+                 crf_cache=None, burned_subs=None, render_cache=None,
+                 logo_cache=None, merged_subs=None, budget: Optional[ResourceBudget] = None,
+                 output_mover=None):
         """Initialize QueueProcessor.
 
         Args:
             queue: JobQueue instance to process jobs from
             config: Application config (required for RenderThread)
-            runner: ProcessRunner for ffmpeg execution
+            runner: ProcessRunner for ffmpeg execution (each job gets a JobProcessRunner over it)
+            probe_cache: Shared ProbeCache reused by every job's RenderThread
+            keyframe_cache: Shared KeyframeCache reused by every job's RenderThread
+            crf_cache: Shared CrfSearchCache reused by every job's RenderThread
+            burned_subs: Shared BurnedSubtitleCache reused by every job's RenderThread
+            render_cache: Shared RenderCache reused by every job's RenderThread
+            logo_cache: Shared LogoCache reused by every job's RenderThread
+            merged_subs: Shared MergedAssCache reused by every job's RenderThread
+            budget: Encoder budget of parallel jobs (defaults to the config's)
+            output_mover: Shared OutputMover delivering every job's outputs (None = encode in place)
         """
         super().__init__()
         self.queue = queue
         self.config = config
         self.runner = runner
-        self.current_job_id: Optional[str] = None
-        self.current_render_thread: Optional['ThreadClassRender'] = None
+        self.probe_cache = probe_cache
+        self.keyframe_cache = keyframe_cache
+        self.crf_cache = crf_cache
+        self.burned_subs = burned_subs
+        self.render_cache = render_cache
+        self.logo_cache = logo_cache
+        self.merged_subs = merged_subs
+        self.output_mover = output_mover
+        if budget is None:
+            budget = ResourceBudget.from_config(config) if config is not None else ResourceBudget()
+        self.budget = budget
+        self.current_job_id: Optional[str] = None  # Most recently started running job
+        self.render_threads: dict[str, 'ThreadClassRender'] = {}  # job_id → running RenderThread
         self.cancelled: bool = False
+        self._cancelled_jobs: set[str] = set()  # Stopped before their RenderThread existed
+        self._prepared_jobs: set[str] = set()  # Waiting jobs the lookahead has prepared
+        self._staged_paths: dict[str, RenderPaths] = {}  # job_id → paths with staged inputs
+        self._lock = threading.Lock()
+
+        # Lookahead preparation has its own runner, so stopping the queue kills its ffmpeg too
+        self._prepare_runner = JobProcessRunner(runner) if runner is not None else None
+        self.preparer: Optional[JobPreparer] = None
+        if config is not None and runner is not None:
+            self.preparer = JobPreparer(
+                config, self._prepare_runner,
+                probe_cache=probe_cache,
+                keyframe_cache=keyframe_cache,
+                logo_cache=logo_cache,
+                merged_subs=merged_subs,
+                log=lambda message: config.log('QueueProcessor', 'prepare', message)
+            )
+        self.stager: Optional[InputStager] = None
+        if self.preparer is not None:
+            self.stager = InputStager.from_config(
+                config, log=lambda message: config.log('QueueProcessor', 'stage', message)
+            )
+
+    @property
+    def parallel_jobs(self) -> int:
+        """Jobs run at once (config.parallel_jobs, at least 1)."""
+        if self.config is None:
+            return 1
+        return max(1, self.config.parallel_jobs)
+
+    @property
+    def lookahead_jobs(self) -> int:
+        """Waiting jobs prepared ahead (config.lookahead_jobs, 0 without a preparer)."""
+        if self.preparer is None:
+            return 0
+        return max(0, self.config.lookahead_jobs)
+
+    @property
+    def current_render_thread(self) -> Optional['ThreadClassRender']:
+        """RenderThread of current_job_id, if it is still running."""
+        with self._lock:
+            return self.render_threads.get(self.current_job_id)
+
+    @property
+    def running_job_ids(self) -> list[str]:
+        """IDs of the jobs running now."""
+        with self._lock:
+            return list(self.render_threads)
 
     def cancel_current_job(self) -> None:
-        """Cancel the currently running job.
+        """Cancel every running job and pause the queue.
 
-        Stops the current RenderThread and sets the cancelled flag.
+        Stops the running RenderThreads and sets the cancelled flag.
         """
         self.cancelled = True
-        if self.current_render_thread:
-            self.current_render_thread.stop()  # Stop the actual ffmpeg process
+        with self._lock:
+            threads = list(self.render_threads.values())
+        for thread in threads:
+            thread.stop()  # Stop the actual ffmpeg processes
+        if self._prepare_runner is not None:
+            self._prepare_runner.kill_ffmpeg()
+
+    def cancel_job(self, job_id: str) -> None:
+        """Cancel one running job; the other jobs and the queue keep going.
+
+        Args:
+            job_id: ID of the job to stop
+        """
+        with self._lock:
+            thread = self.render_threads.get(job_id)
+            if thread is None:
+                self._cancelled_jobs.add(job_id)
+        if thread is not None:
+            thread.stop()  # Stops only this job's ffmpeg processes
 
     def resume(self) -> None:
         """Resume processing after cancellation.
@@ -75,85 +192,263 @@ class QueueProcessor(QThread):
     def run(self) -> None:
         """Main thread loop for processing jobs.
 
-        Processes jobs sequentially from the queue:
-        1. Get next waiting job
-        2. Create RenderThread for the job
-        3. Execute and wait for completion
-        4. Update job status based on result
-        5. Emit appropriate signals
-        6. Handle cancellation between jobs
-        7. Emit queue_finished when all jobs are done
+        1. Start waiting jobs, in queue order, while a worker is free and
+           the job's demand fits the budget (a job that does not fit lets
+           the ones behind it start first)
+        2. Each job runs its RenderThread in a worker thread
+        3. Prepare the next waiting jobs in a lookahead thread; a job being
+           prepared starts once its preparation is done (the jobs behind it
+           wait, so the queue order holds and no job starts unstaged), a job
+           that cannot run (missing input, unwritable output) fails without
+           starting
+        4. Wait for a job or preparation to finish (or for new jobs to be
+           added), update its status and emit its signal from this thread,
+           repeat; a finished job frees its worker at once but completes
+           (or fails) only when the output mover has delivered its outputs
+        5. On cancellation start nothing more and let the running jobs stop
+        6. Emit queue_finished when all jobs are done
         """
-        from threads.RenderThread import ThreadClassRender
-        from models.enums import JobStatus
-
         # Reset cancelled flag at start (important when restarting after stop)
         self.cancelled = False
+        self._prepared_jobs = set()
+        workers = self.parallel_jobs
+        running: dict[Future, ResourceDemand] = {}
+        preparing: dict[Future, str] = {}  # Lookahead preparation → job_id
+        delivering: dict[Future, str] = {}  # Output delivery of a finished job → job_id
 
-        while True:
-            # Check if cancelled before processing next job
-            if self.cancelled:
-                break
-
-            # Get next waiting job
-            queued_job = self.queue.get_next_waiting()
-            if queued_job is None:
-                # No more waiting jobs
-                break
-
-            # Set current job and update status to RUNNING
-            self.current_job_id = queued_job.id
-            self.queue.update_status(queued_job.id, JobStatus.RUNNING)
-            self.job_started.emit(queued_job.id)
-
-            try:
-                # Check if cancelled after starting job
-                if self.cancelled:
-                    # Mark job as cancelled
-                    self.queue.update_status(queued_job.id, JobStatus.CANCELLED)
-                    self.job_cancelled.emit(queued_job.id)
-                    self.current_job_id = None
-                    break
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='queue-job') as pool, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix='queue-lookahead') as lookahead:
+            while True:
+                while not self.cancelled and len(running) < workers:
+                    picked = self._reserve_next_job(preparing=set(preparing.values()))
+                    if picked is None:
+                        break
+                    queued_job, demand = picked
+                    if not self._start_job(queued_job):
+                        self.budget.release(demand)
+                        break
+                    running[pool.submit(self._run_job, queued_job)] = demand
 
-                # Create and run RenderThread for this job
-                self.current_render_thread = ThreadClassRender(
-                    config=self.config,
-                    runner=self.runner,
-                    paths=queued_job.job.paths
-                )
+                if not self.cancelled:
+                    for queued_job in self._jobs_to_prepare(set(preparing.values())):
+                        preparing[lookahead.submit(self._prepare_job, queued_job)] = queued_job.id
 
-                # Connect RenderThread signals to forward progress updates
-                self.current_render_thread.frame_upd.connect(self.frame_upd.emit)
-                self.current_render_thread.time_upd.connect(self.time_upd.emit)
-                self.current_render_thread.state_upd.connect(self.state_upd.emit)
-                self.current_render_thread.elapsed_time_upd.connect(self.elapsed_time_upd.emit)
+                if not running and not preparing and not delivering:
+                    break
+                done, _ = wait([*running, *preparing, *delivering], timeout=self.POLL_INTERVAL,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in preparing:
+                        preparing.pop(future)
+                        self._finish_preparation(*future.result())
+                    elif future in delivering:
+                        self._finish_delivery(delivering.pop(future), future)
+                    else:
+                        self.budget.release(running.pop(future))
+                        job_id, status, error_message, delivery = future.result()
+                        if delivery is None:
+                            self._finish_job(job_id, status, error_message)
+                        else:
+                            delivering[delivery] = job_id
 
-                # Run the render thread synchronously
-                self.current_render_thread.run()
-
-                # Check if job was cancelled during execution
-                if self.current_render_thread._cancelled:
-                    self.queue.update_status(queued_job.id, JobStatus.CANCELLED)
-                    self.job_cancelled.emit(queued_job.id)
-                else:
-                    # Job completed successfully
-                    self.queue.update_status(queued_job.id, JobStatus.COMPLETED)
-                    self.job_completed.emit(queued_job.id)
-
-            except Exception as e:
-                # Job failed
-                error_message = str(e)
-                self.queue.update_status(
-                    queued_job.id,
-                    JobStatus.FAILED,
-                    error_message=error_message
-                )
-                self.job_failed.emit(queued_job.id, error_message)
-
-            finally:
-                # Clear current job and thread reference
-                self.current_job_id = None
-                self.current_render_thread = None
+        # Prepared jobs left waiting (queue stopped) keep their copies for the next run
+        for job_id in list(self._staged_paths):
+            self._release_inputs(job_id, evict=False)
 
+        self.current_job_id = None
         # All jobs processed
         self.queue_finished.emit()
+
+    def _reserve_next_job(
+        self, preparing: AbstractSet[str] = frozenset()
+    ) -> Optional[tuple[QueuedJob, ResourceDemand]]:
+        """First waiting job whose demand fits the budget, with the demand reserved.
+
+        A job being prepared that would fit is waited for rather than
+        overtaken; one that does not fit lets the jobs behind it start, as
+        any blocked job does.
+
+        Args:
+            preparing: IDs of waiting jobs whose preparation is still running
+
+        Returns:
+            (job, reserved demand), or None if no waiting job can start now
+        """
+        for queued_job in self.queue.get_all_jobs():
+            if queued_job.status != JobStatus.WAITING:
+                continue
+            demand = job_demand(queued_job.job)
+            if not self.budget.try_acquire(demand):
+                continue
+            if queued_job.id in preparing:
+                self.budget.release(demand)
+                return None  # Next in line: it starts once its inputs are ready
+            return queued_job, demand
+        return None
+
+    def _jobs_to_prepare(self, preparing: set[str]) -> list[QueuedJob]:
+        """Jobs among the next lookahead_jobs waiting ones not prepared yet."""
+        waiting = [queued_job for queued_job in self.queue.get_all_jobs()
+                   if queued_job.status == JobStatus.WAITING][:self.lookahead_jobs]
+        return [queued_job for queued_job in waiting
+                if queued_job.id not in self._prepared_jobs and queued_job.id not in preparing]
+
+    def _prepare_job(self, queued_job: QueuedJob) -> tuple[str, list[str], Optional[RenderPaths]]:
+        """Prepare one waiting job (in the lookahead thread).
+
+        Returns:
+            (job_id, errors that make the job fail, paths with staged inputs or None)
+        """
+        job = queued_job.job
+        try:
+            if self.stager is not None and not (job.paths.validate() or job.paths.validate_outputs()):
+                job = replace(job, paths=self._stage_inputs(queued_job.id, job))
+            return queued_job.id, self.preparer.prepare(job), job.paths if job is not queued_job.job else None
+        except Exception as e:
+            # Preparation is an optimization; the job redoes whatever failed here
+            self.config.log('QueueProcessor', '_prepare_job', f"Job {queued_job.id} not prepared: {e}")
+            return queued_job.id, [], None
+
+    def _stage_inputs(self, job_id: str, job) -> RenderPaths:
+        """Copy a job's inputs to local disk, reporting progress in percent."""
+        shown = []
+
+        def progress(copied: int, total: int):
+            percent = copied * 100 // total if total else 100
+            if shown[-1:] != [percent]:
+                shown.append(percent)
+                self.staging_upd.emit(job_id, f"Копирую исходники... {percent}%")
+
+        # A subtitle remux without hardsub never reads the raw
+        include_raw = job.paths.previous_softsub is None or job.build_state in HARDSUB_STATES
+        return self.stager.stage(job.paths, progress, include_raw=include_raw)
+
+    def _finish_preparation(self, job_id: str, errors: list[str], staged: Optional[RenderPaths]) -> None:
+        """Record a prepared job; fail it if it cannot run."""
+        self._prepared_jobs.add(job_id)
+        if staged is not None:
+            with self._lock:
+                self._staged_paths[job_id] = staged
+        waiting = any(queued_job.id == job_id and queued_job.status == JobStatus.WAITING
+                      for queued_job in self.queue.get_all_jobs())
+        if errors and waiting:
+            self._finish_job(job_id, JobStatus.FAILED, "\n".join(errors))
+        if errors or not waiting:
+            self._release_inputs(job_id, evict=False)  # Removed from the queue meanwhile, or failed
+
+    def _release_inputs(self, job_id: str, evict: bool) -> None:
+        """Release the staged inputs of a job (delete them once its outputs are verified)."""
+        with self._lock:
+            staged = self._staged_paths.pop(job_id, None)
+        if staged is not None:
+            self.stager.release(staged, evict=evict)
+
+    def _start_job(self, queued_job: QueuedJob) -> bool:
+        """Mark a job RUNNING; cancel it instead if the queue was stopped meanwhile.
+
+        Returns:
+            True if the job should run
+        """
+        self.current_job_id = queued_job.id
+        self.queue.update_status(queued_job.id, JobStatus.RUNNING)
+        self.job_started.emit(queued_job.id)
+
+        # Check if cancelled after starting job
+        if self.cancelled:
+            self.queue.update_status(queued_job.id, JobStatus.CANCELLED)
+            self.job_cancelled.emit(queued_job.id)
+            return False
+        return True
+
+    def _run_job(self, queued_job: QueuedJob) -> tuple[str, JobStatus, Optional[str], Optional[Future]]:
+        """Run one job's RenderThread synchronously (in a worker thread).
+
+        Returns:
+            (job_id, final status, error message of a failed job,
+            delivery of the outputs of a finished job - see _finish_delivery)
+        """
+        from threads.RenderThread import ThreadClassRender
+
+        job_id = queued_job.id
+        delivery = None
+        with self._lock:
+            paths = self._staged_paths.get(job_id, queued_job.job.paths)
+        try:
+            # Created in the worker, so its progress signals reach the forwards below directly
+            render_thread = ThreadClassRender(
+                config=self.config,
+                runner=JobProcessRunner(self.runner) if self.runner is not None else None,
+                paths=paths,
+                probe_cache=self.probe_cache,
+                keyframe_cache=self.keyframe_cache,
+                crf_cache=self.crf_cache,
+                burned_subs=self.burned_subs,
+                render_cache=self.render_cache,
+                logo_cache=self.logo_cache,
+                merged_subs=self.merged_subs,
+                output_mover=self.output_mover,
+                job=queued_job.job
+            )
+
+            # Connect RenderThread signals to forward progress updates with the job ID
+            render_thread.frame_upd.connect(lambda value: self.frame_upd.emit(job_id, value))
+            render_thread.time_upd.connect(lambda value: self.time_upd.emit(job_id, value))
+            render_thread.state_upd.connect(lambda value: self.state_upd.emit(job_id, value))
+            render_thread.elapsed_time_upd.connect(lambda value: self.elapsed_time_upd.emit(job_id, value))
+
+            with self._lock:
+                self.render_threads[job_id] = render_thread
+                stopped = job_id in self._cancelled_jobs
+                self._cancelled_jobs.discard(job_id)
+            if stopped or self.cancelled:
+                render_thread.stop()  # Stopped while it was being set up
+            else:
+                # Run the render thread synchronously
+                render_thread.run()
+
+            # Check if job was cancelled during execution
+            if render_thread._cancelled:
+                return job_id, JobStatus.CANCELLED, None, None
+            if render_thread.error is not None:
+                raise render_thread.error
+            if render_thread.outputs_verified:
+                delivery = render_thread.delivery
+                if not delivery.done():
+                    self.state_upd.emit(job_id, "Переношу результат...")
+            return job_id, JobStatus.COMPLETED, None, delivery
+
+        except Exception as e:
+            # Job failed
+            return job_id, JobStatus.FAILED, str(e), None
+
+        finally:
+            # Clear the job's thread reference
+            with self._lock:
+                self.render_threads.pop(job_id, None)
+            if delivery is None:
+                self._release_inputs(job_id, evict=False)
+
+    def _finish_delivery(self, job_id: str, delivery: Future) -> None:
+        """Complete a finished job once its outputs landed, or fail it if they could not be moved.
+
+        The staged inputs are deleted only after a successful delivery, so a
+        job failed here can be rerun without copying its inputs again.
+        """
+        error = delivery.exception()
+        self._release_inputs(job_id, evict=error is None)
+        if error is None:
+            self._finish_job(job_id, JobStatus.COMPLETED, None)
+        else:
+            self._finish_job(job_id, JobStatus.FAILED, str(error))
+
+    def _finish_job(self, job_id: str, status: JobStatus, error_message: Optional[str]) -> None:
+        """Record a finished job's status and emit its lifecycle signal."""
+        if status == JobStatus.FAILED:
+            self.queue.update_status(job_id, JobStatus.FAILED, error_message=error_message)
+            self.job_failed.emit(job_id, error_message)
+        else:
+            self.queue.update_status(job_id, status)
+            if status == JobStatus.CANCELLED:
+                self.job_cancelled.emit(job_id)
+            else:
+                self.job_completed.emit(job_id)
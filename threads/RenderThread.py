@@ -1,19 +1,57 @@
 # Lib import
-import math
-import re
+import os
+import shutil
 import subprocess
 import sys
+import tempfile
+import threading
 import traceback
-from typing import Optional
+from concurrent.futures import Future
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Optional, Union
 
 from modules.GlobalExceptionHandler import get_global_handler
+from modules.ass_cache import BurnedSubtitleCache, MergedAssCache
+from modules.chunked_encoder import ChunkedEncoder
+from modules.crf_search import CrfSearch, CrfSearchCache
 from modules.ffmpeg_factory import FFmpegOptionsFactory
-from modules.ffmpeg_builder import build_ffmpeg_args
-from models.encoding import EncodingParams
-from models.enums import BuildState, NvencState, LogoState
+from modules.fonts import fonts_fingerprint, prepare_fonts_dir
+from modules.keyframe_cache import KeyframeCache, probe_keyframes
+from modules.logo_cache import LogoCache
+from modules.output_mover import OutputMover
+from modules.probe_cache import ProbeCache, probe_video
+from modules.render_cache import RenderCache, step_fingerprint
+from modules.resource_budget import ResourceBudget
+from modules.step_executor import StepExecutor
+from modules.ffmpeg_builder import (
+    build_audio_transcode_args, build_concat_list, build_patch_concat_list, build_patch_splice_args,
+    build_subtitle_remux_args, build_ffmpeg_args, build_ffprobe_args,
+    build_multi_output_args, build_multi_output_segment_args, build_segment_args,
+    build_segment_concat_args, output_path_for, progress_args
+)
+from models.ass import diff_ass, merge_ranges
+from models.chunking import Segment, plan_segments
+from models.encoding import (
+    EncodingDefaults, EncodingParams, can_copy_video, estimate_encoding_params, plan_audio,
+    target_bitrate_kbps, with_crf
+)
+from models.enums import BuildState
+from models.ffmpeg_options import FFmpegOptions, MultiOutputOptions, escape_path_for_filter
+from models.keyframe_index import KeyframeIndex
+from models.patching import TimeRange, plan_patch
+from models.job import JobOptions, RenderJob
+from models.progress import (
+    ProgressParser, ProgressSample, aggregate_progress, scale_to_pass, split_progress_line
+)
 from models.protocols import ProcessRunner
-from models.render_paths import RenderPaths
-from models.video_info import VideoInfo, parse_ffprobe_output
+from models.render_context import RenderContext, frozen_video_settings
+from models.render_graph import RenderStep, StepResult
+from models.render_paths import RenderPaths, job_temp_dir, prepared_audio_path
+from models.resources import HARDSUB_STATES, SOFTSUB_STATES, ResourceDemand
+from models.video_info import (
+    VideoInfo, load_ffprobe_json, parse_ffprobe_output, video_info_from_probe_data
+)
 from PyQt5 import QtCore
 from PyQt5.QtCore import QThread
 
@@ -24,29 +62,84 @@ class ThreadClassRender(QThread):
     time_upd         = QtCore.pyqtSignal(object)
     state_upd        = QtCore.pyqtSignal(object)
     elapsed_time_upd = QtCore.pyqtSignal(object)
+    delivery_failed  = QtCore.pyqtSignal(str)  # Outputs copied by the mover did not land (error message)
 
     # Thread init
-    def __init__(self, config, runner: Optional[ProcessRunner] = None, paths: RenderPaths = None):
+    def __init__(
+        self,
+        config,
+        runner: Optional[ProcessRunner] = None,
+        paths: RenderPaths = None,
+        probe_cache: Optional[ProbeCache] = None,
+        keyframe_cache: Optional[KeyframeCache] = None,
+        job: Optional[RenderJob] = None,
+        crf_cache: Optional[CrfSearchCache] = None,
+        burned_subs: Optional[BurnedSubtitleCache] = None,
+        render_cache: Optional[RenderCache] = None,
+        logo_cache: Optional[LogoCache] = None,
+        merged_subs: Optional[MergedAssCache] = None,
+        output_mover: Optional[OutputMover] = None,
+        options: JobOptions = JobOptions()
+    ):
         """Initialize render thread.
 
         Args:
             config: Application configuration
             runner: Optional ProcessRunner for safe subprocess execution.
             paths: RenderPaths with validated file paths (required).
+            probe_cache: Optional shared ffprobe cache (skips re-probing known raws).
+            keyframe_cache: Optional shared keyframe index cache (for chunked encodes).
+            job: Optional queued RenderJob; its settings are rendered instead of the UI's.
+            crf_cache: Optional shared CRF search cache (skips re-searching known raws).
+            burned_subs: Optional record of the subtitles burned into hardsubs (automatic patching).
+            render_cache: Optional manifest of finished encodes (skips steps whose output is up to date).
+            logo_cache: Optional cache of pre-rendered logo overlays (replaces libass for static logos).
+            merged_subs: Optional cache of logo-merged subtitles (one libass pass for hardsub).
+            output_mover: Optional mover; outputs are encoded to local scratch and moved into place.
+            options: Options of an immediate (not queued) render, set in the queue panel.
         """
         super(ThreadClassRender, self).__init__()
         self.config = config
         self.runner = runner
         self.paths = paths
+        self.probe_cache = probe_cache
+        self.keyframe_cache = keyframe_cache
+        self.job = job
+        self.crf_cache = crf_cache
+        self.burned_subs = burned_subs
+        self.render_cache = render_cache
+        self.logo_cache = logo_cache
+        self.merged_subs = merged_subs
+        self.output_mover = output_mover
+        self._source_paths = paths  # Inputs as given, before shared audio replaces paths.audio
+        # Settings of this job; the steps read only these (the shared config is never written)
+        self.context = RenderContext.from_job(job) if job is not None else self._context_from_config(config, options)
         get_global_handler().register_callback(self.handle_exception)
 
-        # Factory for creating FFmpegOptions
-        self.ffmpeg_factory = FFmpegOptionsFactory(config, config.main_paths.temp)
+        # Factory for creating FFmpegOptions (subtitle copies go to the job's own temp dir,
+        # so parallel queue jobs never share or clean up each other's files)
+        self.ffmpeg_factory = FFmpegOptionsFactory(config, self._job_dir())
 
-        self.render_speed = -1 if self.config.potato_PC else 1
+        self.render_speed = -1 if self.context.potato_mode else 1
         self.total_duration_sec = 0
         self.total_frames = 0
         self.video_res = ''
+        self.video_info: Optional[VideoInfo] = None
+        self._keyframe_index: Optional[KeyframeIndex] = None  # Loaded lazily for chunked encodes
+        self._subtitle_patch: Optional[tuple[TimeRange, ...]] = None  # Diffed lazily for automatic patching
+        self._hardsub_patchable: Optional[bool] = None  # Checked lazily: existing hardsub has closed GOPs
+        self._keyframe_lock = threading.Lock()
+        self._chunked_encoders: set[ChunkedEncoder] = set()  # Running chunked encodes (steps may overlap)
+        self._step_local = threading.local()  # Per-step state of the steps running at once
+        self._step_progress: dict[str, ProgressSample] = {}  # Latest progress of each encode step
+        self._progress_steps: Optional[frozenset[str]] = None  # Encode steps sharing the progress bar
+        self._progress_lock = threading.Lock()
+        self.step_results: list[StepResult] = []  # Timings of the steps of the last run
+        self.outputs_verified = False  # Set once every output of the job was found written
+        self.error: Optional[Exception] = None  # Error that failed the last run
+        self._landed_records: list[tuple[str, list[Path]]] = []  # Render cache entries stored once outputs land
+        self.delivery: Future = Future()  # Done once the outputs are at their destinations (error if a move failed)
+        self._produced: dict[Path, Path] = {}  # Destination → file this run wrote (or found up to date) for it
         self._cancelled = False  # Flag to stop entire job
 
         # Convert to EncodingParams dataclass
@@ -70,22 +163,115 @@ class ThreadClassRender(QThread):
 
     # Frame updater
     def frame_update(self, proc):
+        """Read ffmpeg `-progress` output and emit progress/ETA updates.
+
+        Only key=value progress lines are parsed; other output (warnings,
+        errors merged into the same pipe) is logged as-is.
+        """
+        parser = ProgressParser()
         for line in proc.stdout:
-            self.config.log('RenderThread', 'frame_update', line)
-            frame_match = re.search(r'frame=\s*(\d+)\s+fps=\s*(\d+)', line)
-
-            if frame_match:
-                remaining_frames = self.total_frames - int(frame_match.group(1))
-                fps = float(frame_match.group(2))
-                remaining_time = remaining_frames / (fps if math.ceil(fps) != 0 else 1)
-                rem_hrs = int(remaining_time // 3600)
-                rem_minutes = int((remaining_time % 3600) // 60)
-                rem_sec = remaining_time % 60
-                
-                self.frame_upd.emit(frame_match.group(1))
-                self.elapsed_time_update(f"Оставшееся время: {rem_hrs}ч {rem_minutes}м {rem_sec:.2f}с")
-                
+            key, value = split_progress_line(line)
+            if key is None:
+                self.config.log('RenderThread', 'frame_update', line)
+                continue
+
+            sample = parser.feed_pair(key, value)
+            if sample is not None:
+                self.progress_update(sample)
+
+    def progress_update(self, sample: ProgressSample, step: Optional[str] = None):
+        """Emit frame and ETA updates for one progress sample.
+
+        Args:
+            sample: Sample reported by an encode
+            step: Step the encode belongs to (defaults to the step running in this thread)
+        """
+        pass_index, pass_count = self._pass_progress
+        sample = scale_to_pass(sample, pass_index, pass_count, self.total_frames, self.total_duration_sec)
+        sample = self._job_progress(step or getattr(self._step_local, 'step', None), sample)
+        self.config.log('RenderThread', 'progress_update', f"Progress: {sample}")
+        remaining_time = self._remaining_seconds(sample)
+        rem_hrs = int(remaining_time // 3600)
+        rem_minutes = int((remaining_time % 3600) // 60)
+        rem_sec = remaining_time % 60
+
+        self.frame_upd.emit(str(sample.frame))
+        self.elapsed_time_update(f"Оставшееся время: {rem_hrs}ч {rem_minutes}м {rem_sec:.2f}с")
+
+    def _remaining_seconds(self, sample: ProgressSample) -> float:
+        """Estimate remaining encode time for a progress sample.
+
+        Prefers time-based progress (exact even when the frame count is
+        unknown); falls back to frames and fps.
+        """
+        if sample.speed > 0 and self.total_duration_sec:
+            return max(self.total_duration_sec - sample.out_time_sec, 0.0) / sample.speed
+        if sample.fps > 0 and self.total_frames:
+            return max(self.total_frames - sample.frame, 0.0) / sample.fps
+        return 0.0
+
+    def _job_progress(self, step: Optional[str], sample: ProgressSample) -> ProgressSample:
+        """Progress of the whole job when several encode steps share the progress bar.
+
+        Each encode step reports on the episode scale; the steps are
+        combined so the bar fills once, from the work done by all of them
+        (steps not started count as zero, finished ones as complete).
+        """
+        with self._progress_lock:
+            if self._progress_steps is None:
+                self._progress_steps = self._encode_steps()
+            steps = self._progress_steps
+            if step not in steps or len(steps) < 2:
+                return sample
+            self._step_progress[step] = sample
+            samples = [self._step_progress.get(name, ProgressSample()) for name in steps]
+
+        total = aggregate_progress(samples)
+        count = len(steps)
+        return replace(total, frame=total.frame // count, out_time_sec=total.out_time_sec / count,
+                       speed=total.speed / count, fps=total.fps / count)
+
+    def _encode_steps(self) -> frozenset[str]:
+        """Steps of this job that report encode progress."""
+        build_state = self.context.build_state
+        steps = {'remux'} if self.paths.previous_softsub is not None else set()
+        if build_state == BuildState.RAW_REPAIR:
+            steps.add('raw_repair')
+        elif build_state == BuildState.FOR_HARDSUBBERS:
+            steps.add('hardsubbering')
+        elif self._single_decode():
+            steps.add('softsub_and_hardsub')
+        else:
+            if build_state in SOFTSUB_STATES and self.paths.previous_softsub is None:
+                steps.add('softsub')
+            if build_state in HARDSUB_STATES:
+                steps.add('hardsub')
+        return frozenset(steps)
+
+    def _progress_step(self, name: str, action: Callable[[], None]) -> Callable[[], None]:
+        """Step action whose encodes report progress as the named step."""
+        def run():
+            self._step_local.step = name
+            try:
+                action()
+            finally:
+                self._step_local.step = None
+            with self._progress_lock:
+                self._step_progress[name] = ProgressSample(
+                    frame=int(self.total_frames), out_time_sec=self.total_duration_sec, finished=True
+                )
+        return run
+
     # State updater
+    @property
+    def _pass_progress(self) -> tuple[int, int]:
+        """(running pass index, pass count) of the step running in this thread."""
+        return getattr(self._step_local, 'pass_progress', (0, 1))
+
+    @_pass_progress.setter
+    def _pass_progress(self, value: tuple[int, int]):
+        self._step_local.pass_progress = value
+
     def state_update(self, state):
         self.state_upd.emit(state)
         
@@ -103,256 +289,885 @@ class ThreadClassRender(QThread):
     def softsub(self):
         self.config.log('RenderThread', 'softsub', "Starting softsubbing...")
         # Only run if build_state includes softsub
-        if self.config.build_settings.build_state in [BuildState.SOFT_AND_HARD, BuildState.SOFT_ONLY]:
-            # Create options using factory
-            use_nvenc = self.config.build_settings.nvenc_state in [NvencState.NVENC_BOTH, NvencState.NVENC_SOFT_ONLY]
-            include_logo = self.config.build_settings.logo_state in [LogoState.LOGO_BOTH, LogoState.LOGO_SOFT_ONLY]
-            preset = (self.config.render_speed[self.render_speed][0]
-                     if self.config.build_settings.nvenc_state in [NvencState.NVENC_HARD_ONLY, NvencState.NVENC_NONE]
-                     else self.config.render_speed[self.render_speed][1])
-
+        if (self.context.build_state in [BuildState.SOFT_AND_HARD, BuildState.SOFT_ONLY]
+                and self.paths.previous_softsub is None):
+            copy_video = self._softsub_copies_video()
             options = self.ffmpeg_factory.create_softsub_options(
-                paths=self.paths,
-                video_settings=self.config.build_settings.softsub_settings,
+                paths=self.output_paths,
+                video_settings=self.context.softsub_settings,
                 encoding_params=self.encoding_params,
-                use_nvenc=use_nvenc,
-                include_logo=include_logo,
-                preset=preset
+                copy_video=copy_video,
+                **self._softsub_flags()
             )
-
-            # Build args from options
             args = build_ffmpeg_args(options)
-            self.config.log('RenderThread', 'softsub', f"Generated args: {' '.join(args)}")
-            self._run_encode(args, "Собираю софтсаб...")
+            fingerprint = self._step_fingerprint(args, [options])
+            if self._render_cache_hit(fingerprint, [self.paths.softsub]):
+                return
+
+            if copy_video:
+                self.config.log('RenderThread', 'softsub', f"Raw video meets the softsub target, remuxing: {' '.join(args)}")
+                self._run_checked_encode(args, "Собираю софтсаб без перекодирования...", "Softsub remux")
+            elif not (self._encode_two_pass(options, "Собираю софтсаб...")
+                      or self._encode_chunked(options, "Собираю софтсаб...")):
+                self.config.log('RenderThread', 'softsub', f"Generated args: {' '.join(args)}")
+                self._run_checked_encode(args, "Собираю софтсаб...", "Softsub encode")
+            self._outputs_finished(fingerprint, [self.paths.softsub])
+
+    # Subtitle-only re-release
+    def remux_subtitles(self):
+        """Replace the subtitle track of the previous softsub release.
+
+        Video, audio and attachments are stream-copied. The remux is written
+        next to the softsub and then moved over it, since the previous
+        release is usually the softsub itself.
+
+        Raises:
+            RuntimeError: If the remux fails
+        """
+        self.config.log('RenderThread', 'remux_subtitles', "Starting subtitle remux...")
+        output = self.paths.softsub
+        remux_path = output.with_name(f"{output.stem}.remux{output.suffix}")
+
+        args = build_subtitle_remux_args(self.paths.previous_softsub, self.paths.sub, remux_path)
+        self.config.log('RenderThread', 'remux_subtitles', f"Generated args: {' '.join(args)}")
+        exit_code = self._run_encode(args, "Заменяю субтитры в софтсабе...")
+        if self._cancelled or exit_code:
+            remux_path.unlink(missing_ok=True)
+            if exit_code and not self._cancelled:
+                raise RuntimeError(f"Subtitle remux failed with exit code {exit_code}")
+            return
+
+        os.replace(remux_path, output)
+        self._outputs_finished(None, [output])
 
     # Hardsubbing
     def hardsub(self):
         self.config.log('RenderThread', 'hardsub', "Starting hardsubbing...")
         # Only run if build_state includes hardsub
-        if self.config.build_settings.build_state in [BuildState.SOFT_AND_HARD, BuildState.HARD_ONLY]:
-            # Create options using factory
-            use_nvenc = self.config.build_settings.nvenc_state in [NvencState.NVENC_BOTH, NvencState.NVENC_HARD_ONLY]
-            include_logo = self.config.build_settings.logo_state in [LogoState.LOGO_BOTH, LogoState.LOGO_HARD_ONLY]
-            preset = (self.config.render_speed[self.render_speed][0]
-                     if self.config.build_settings.nvenc_state in [NvencState.NVENC_SOFT_ONLY, NvencState.NVENC_NONE]
-                     else self.config.render_speed[self.render_speed][1])
-
+        if self.context.build_state in [BuildState.SOFT_AND_HARD, BuildState.HARD_ONLY]:
             options = self.ffmpeg_factory.create_hardsub_options(
-                paths=self.paths,
-                video_settings=self.config.build_settings.hardsub_settings,
+                paths=self.output_paths,
+                video_settings=self.context.hardsub_settings,
                 encoding_params=self.encoding_params,
-                use_nvenc=use_nvenc,
-                include_logo=include_logo,
-                preset=preset
+                **self._hardsub_flags()
             )
-
-            # Build args from options
             args = build_ffmpeg_args(options)
-            self.config.log('RenderThread', 'hardsub', f"Generated args: {' '.join(args)}")
-            self._run_encode(args, "Собираю хардсаб...")
+            fingerprint = self._step_fingerprint(args, [options])
+            if self._render_cache_hit(fingerprint, [self.paths.hardsub]):
+                return
+
+            if not (self._encode_patch(options, "Собираю хардсаб...")
+                    or self._encode_two_pass(options, "Собираю хардсаб...")
+                    or self._encode_chunked(options, "Собираю хардсаб...")):
+                self.config.log('RenderThread', 'hardsub', f"Generated args: {' '.join(args)}")
+                self._run_checked_encode(args, "Собираю хардсаб...", "Hardsub encode")
+            self._outputs_finished(fingerprint, [self.paths.hardsub])
+
+    # Softsub and hardsub from a single decode
+    def softsub_and_hardsub(self):
+        self.config.log('RenderThread', 'softsub_and_hardsub', "Starting single-decode softsubbing and hardsubbing...")
+        if self.context.build_state == BuildState.SOFT_AND_HARD:
+            soft_flags = self._softsub_flags()
+            hard_flags = self._hardsub_flags()
+            options = self.ffmpeg_factory.create_combined_options(
+                paths=self.output_paths,
+                softsub_settings=self.context.softsub_settings,
+                hardsub_settings=self.context.hardsub_settings,
+                encoding_params=self.encoding_params,
+                softsub_nvenc=soft_flags['use_nvenc'],
+                hardsub_nvenc=hard_flags['use_nvenc'],
+                softsub_logo=soft_flags['include_logo'],
+                hardsub_logo=hard_flags['include_logo'],
+                softsub_preset=soft_flags['preset'],
+                hardsub_preset=hard_flags['preset']
+            )
+
+            args = build_multi_output_args(options)
+            outputs = [self.paths.softsub, self.paths.hardsub]
+            fingerprint = self._step_fingerprint(args, [options.softsub, options.hardsub])
+            if self._render_cache_hit(fingerprint, outputs):
+                return
+
+            if not self._encode_chunked(options, "Собираю софтсаб и хардсаб..."):
+                self.config.log('RenderThread', 'softsub_and_hardsub', f"Generated args: {' '.join(args)}")
+                self._run_checked_encode(args, "Собираю софтсаб и хардсаб...", "Softsub and hardsub encode")
+            self._outputs_finished(fingerprint, outputs)
+
+    def _softsub_copies_video(self) -> bool:
+        """True if the softsub can remux the raw's video instead of encoding it."""
+        if self.paths.previous_softsub is not None:
+            return False  # Softsub is re-released from the previous one
+        if self.video_info is None or self._target_size_bytes() or self._softsub_flags()['include_logo']:
+            return False
+        return can_copy_video(self.video_info, self.context.softsub_settings)
+
+    def _softsub_flags(self) -> dict:
+        """Resolve NVENC, logo and preset choices for the softsub encode."""
+        use_nvenc = self.context.softsub_nvenc
+        return {
+            'use_nvenc': use_nvenc,
+            'include_logo': self.context.softsub_logo,
+            'preset': self.config.render_speed[self.render_speed][1 if use_nvenc else 0],
+        }
+
+    def _hardsub_flags(self) -> dict:
+        """Resolve NVENC, logo and preset choices for the hardsub encode."""
+        use_nvenc = self.context.hardsub_nvenc
+        return {
+            'use_nvenc': use_nvenc,
+            'include_logo': self.context.hardsub_logo,
+            'preset': self.config.render_speed[self.render_speed][1 if use_nvenc else 0],
+        }
+
+    # Render cache
+    def _step_fingerprint(self, args: list[str], step_options: list[FFmpegOptions]) -> Optional[str]:
+        """Fingerprint of an encode step, or None if the render cache is off or an input is unreadable.
+
+        Args:
+            args: Single-pass ffmpeg args of the step
+            step_options: Options of every output the step writes
+        """
+        if self.render_cache is None or self.runner is None:
+            return None
+
+        # Shared audio is a temp file; it is identified by the audio it was made from
+        sources = {self.paths.audio: self._source_paths.audio}
+        digests = {}
+        for options in step_options:
+            for path in (options.paths.raw, options.paths.audio, options.paths.sub,
+                         options.filters.logo_path, options.filters.subtitle_path, options.filters.logo_overlay):
+                if path is None:
+                    continue
+                digest = self.render_cache.digest(sources.get(path, path))
+                if digest is None:
+                    return None
+                digests.update(dict.fromkeys(self._arg_forms(path), digest))
+            fonts_dir = options.filters.fonts_dir
+            if fonts_dir is not None:
+                try:
+                    # libass picks the fonts from here: adding or replacing one changes the output
+                    digests.update(dict.fromkeys(self._arg_forms(fonts_dir), fonts_fingerprint(fonts_dir)))
+                except OSError:
+                    return None
+
+        # Scratch outputs are encoded the same as if they were written in place
+        written = self.output_paths
+        stand_ins = {}
+        for scratch, destination in ((written.softsub, self.paths.softsub), (written.hardsub, self.paths.hardsub)):
+            stand_ins.update(dict.fromkeys(self._arg_forms(scratch), str(destination)))
+        return step_fingerprint(args, digests, self.render_cache.ffmpeg_version(self.runner), stand_ins)
+
+    @staticmethod
+    def _arg_forms(path: Path) -> set[str]:
+        """A path as it appears in ffmpeg args: plain, and escaped inside filter strings."""
+        return {str(path), escape_path_for_filter(path)}
+
+    def _render_cache_hit(self, fingerprint: Optional[str], outputs: list[Path]) -> bool:
+        """True if the outputs were already produced by an identical step and are intact.
+
+        Outputs found up to date count as produced by this run.
+        """
+        if fingerprint is None or not self.render_cache.is_cached(fingerprint, outputs):
+            return False
+        names = ', '.join(output.name for output in outputs)
+        self.config.log('RenderThread', '_render_cache_hit', f"Up to date, skipping encode: {names}")
+        self.state_update(f"{names} уже собран, пропускаю...")
+        self._produced.update({output: output for output in outputs})
+        return True
+
+    def _outputs_finished(self, fingerprint: Optional[str], outputs: list[Path]):
+        """Record the outputs of a finished step for verify_outputs and in the render cache.
+
+        Called only after the step's encodes exited cleanly (they raise
+        otherwise); a cancelled step is never recorded. With an output
+        mover the render cache entry is stored once the outputs are in place.
+
+        Args:
+            fingerprint: Fingerprint of the step (None = not cached)
+            outputs: Destinations of the step's outputs
+        """
+        if self._cancelled:
+            return
+        written = self.output_paths
+        files = {self.paths.softsub: written.softsub, self.paths.hardsub: written.hardsub}
+        self._produced.update({output: files[output] for output in outputs})
+        if fingerprint is None:
+            return
+        if written != self.paths:
+            self._landed_records.append((fingerprint, outputs))
+        else:
+            self.render_cache.store(fingerprint, outputs)
+
+    # Target-size two-pass encoding
+    def _encode_two_pass(self, options: FFmpegOptions, state_label: str) -> bool:
+        """Encode a step in two passes to hit the job's target size.
+
+        The first pass only gathers rate control stats; its log lives in a
+        per-job temp dir so concurrent jobs never share stats files. NVENC
+        does its analysis inside a single bitrate-targeted encode.
+
+        Args:
+            options: Single-pass options of the encode step
+            state_label: Status message for the step
+
+        Returns:
+            True if the step was encoded to a target size, False for a quality-based encode
+
+        Raises:
+            RuntimeError: If a pass fails (the second pass needs the first's stats)
+        """
+        if not self._target_size_bytes():
+            return False
+
+        self.config.main_paths.temp.mkdir(parents=True, exist_ok=True)
+        passlog_dir = Path(tempfile.mkdtemp(prefix='passlog_', dir=self.config.main_paths.temp))
+        try:
+            analysis, final = self.ffmpeg_factory.create_two_pass_options(options, passlog_dir / 'pass')
+            passes = [final] if options.use_nvenc else [analysis, final]
+            for index, pass_options in enumerate(passes):
+                self._pass_progress = (index, len(passes))
+                args = build_ffmpeg_args(pass_options)
+                self.config.log('RenderThread', '_encode_two_pass', f"Generated args: {' '.join(args)}")
+                if not self._run_checked_encode(args, f"{state_label} (проход {index + 1}/{len(passes)})",
+                                                f"Pass {index + 1} of {output_path_for(options).name}"):
+                    break
+            return True
+        finally:
+            self._pass_progress = (0, 1)
+            shutil.rmtree(passlog_dir, ignore_errors=True)
+
+    # Partial re-render
+    def _encode_patch(self, options: FFmpegOptions, state_label: str) -> bool:
+        """Re-encode only the job's patch ranges and splice them into the existing output.
+
+        The ranges are widened to keyframes of the existing output, encoded
+        from the raw with the step's settings, and joined with the untouched
+        parts of the output by the concat demuxer. The patched file replaces
+        the output only once it is complete.
+
+        Args:
+            options: Options of the encode step
+            state_label: Status message for the step
+
+        Returns:
+            True if the output was patched, False for a full encode
+
+        Raises:
+            RuntimeError: If a segment encode or the splice fails
+        """
+        ranges = self._patch_ranges()
+        output_path = output_path_for(options)
+        if not ranges or self.runner is None or not output_path.exists():
+            return False
+
+        try:
+            existing = probe_video(self.runner, output_path)
+        except ValueError:
+            return False  # Unreadable output; encode it again in full
+        keyframes = probe_keyframes(self.runner, output_path, self.keyframe_cache).relative_to(existing.start_time)
+        pieces = plan_patch(ranges, keyframes, existing.duration_seconds)
+        if not pieces:
+            return False
+
+        self.config.log('RenderThread', '_encode_patch', f"Patching {output_path.name}: {pieces}")
+        self.config.main_paths.temp.mkdir(parents=True, exist_ok=True)
+        work_dir = Path(tempfile.mkdtemp(prefix='patch_', dir=self.config.main_paths.temp))
+        encoder: Optional[ChunkedEncoder] = None
+        try:
+            reencoded = [piece for piece in pieces if piece.reencode]
+            segment_paths = [work_dir / f'{i:04d}{output_path.suffix}' for i in range(len(reencoded))]
+            jobs = [
+                build_segment_args(options, piece.segment(i, final=piece.end_sec >= existing.duration_seconds),
+                                   segment_paths[i])
+                for i, piece in enumerate(reencoded)
+            ]
+
+            self.state_update(state_label)
+            encoder = ChunkedEncoder(
+                self.runner,
+                workers=max(1, self._chunk_workers()),
+                log=lambda message: self.config.log('RenderThread', '_encode_patch', message)
+            )
+            self._chunked_encoders.add(encoder)
+            step = getattr(self._step_local, 'step', None)  # Segments report from the encoder's threads
+            encoder.run(jobs, lambda sample: self.progress_update(sample, step))
+            if self._cancelled:
+                return True
+
+            list_path = work_dir / 'patch.txt'
+            list_path.write_text(build_patch_concat_list(pieces, output_path, segment_paths), encoding='utf-8')
+            patched_path = output_path.with_name(f"{output_path.stem}.patch{output_path.suffix}")
+            args = build_patch_splice_args(list_path, output_path, patched_path)
+            self.config.log('RenderThread', '_encode_patch', f"Generated args: {' '.join(args)}")
+            exit_code = self._run_encode(args, f"Вклеиваю исправления в {output_path.name}...")
+            if self._cancelled or exit_code:
+                patched_path.unlink(missing_ok=True)
+                if exit_code and not self._cancelled:
+                    raise RuntimeError(f"Patch splice failed with exit code {exit_code}")
+                return True
+
+            os.replace(patched_path, output_path)
+            return True
+        finally:
+            self._chunked_encoders.discard(encoder)
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _patch_ranges(self) -> tuple[TimeRange, ...]:
+        """Time ranges of the job to re-encode into the existing output (empty = full encode).
+
+        A hardsub not known to have closed GOPs (rendered elsewhere, or
+        before GOPs were closed) is encoded in full: the pictures after a
+        splice point could reference frames of the replaced GOP.
+        """
+        ranges = self.context.patch_ranges
+        if not ranges and self.config.auto_patch_hardsub:
+            if self._subtitle_patch is None:
+                self._subtitle_patch = self._subtitle_patch_ranges()
+            ranges = self._subtitle_patch
+        if not ranges:
+            return ()
+        if self._hardsub_patchable is None:
+            self._hardsub_patchable = (self.burned_subs is not None
+                                       and self.burned_subs.closed_gop(self.paths.hardsub))
+            if not self._hardsub_patchable:
+                self.config.log('RenderThread', '_patch_ranges',
+                                f"{self.paths.hardsub.name} may have open GOPs, encoding it in full")
+        return ranges if self._hardsub_patchable else ()
+
+    def _subtitle_patch_ranges(self) -> tuple[TimeRange, ...]:
+        """Time ranges where the new subtitles differ from those burned into the existing hardsub.
+
+        Empty (full encode) when nothing is known about the existing
+        hardsub, or when the change affects the whole episode.
+        """
+        if self.burned_subs is None or self.paths.sub is None or not self.paths.hardsub.exists():
+            return ()
+        previous = self.burned_subs.previous(self.paths.raw, self.paths.hardsub)
+        if previous is None:
+            return ()
+        try:
+            diff = diff_ass(previous, self.burned_subs.ass_cache.load(self.paths.sub))
+        except OSError:
+            return ()
+        if diff.full or not diff.ranges:
+            reason = "rendering-wide change" if diff.full else "subtitles unchanged"
+            self.config.log('RenderThread', '_subtitle_patch_ranges', f"Full hardsub encode: {reason}")
+            return ()
+
+        ranges = merge_ranges(diff.ranges, EncodingDefaults.PATCH_COALESCE_SEC)
+        self.config.log('RenderThread', '_subtitle_patch_ranges', f"Changed subtitle ranges: {ranges}")
+        return ranges
+
+    def _record_burned_subtitles(self):
+        """Remember the subtitles burned into the finished hardsub for the next render."""
+        if (self.burned_subs is not None and self.paths.sub is not None
+                and self.context.build_state in [
+                    BuildState.SOFT_AND_HARD, BuildState.HARD_ONLY, BuildState.FOR_HARDSUBBERS
+                ]
+                and self.paths.hardsub.exists()):
+            self.burned_subs.record(self.paths.raw, self.paths.sub, self.paths.hardsub)
+
+    def _target_size_bytes(self) -> int:
+        """Target output size of the job in bytes (0 = no target)."""
+        return self.context.target_size_mb * 1024 * 1024
+
+    # Chunked parallel encoding
+    def _encode_chunked(self, options: Union[FFmpegOptions, MultiOutputOptions], state_label: str) -> bool:
+        """Encode keyframe-aligned segments in parallel and join them.
+
+        Used for software encoders when chunked encoding is enabled: each
+        segment is encoded by its own ffmpeg process, the segments are
+        joined with the concat demuxer, and audio/subtitles are muxed once
+        per output.
+
+        Args:
+            options: Options of the encode step (single or softsub + hardsub)
+            state_label: Status message for the step
+
+        Returns:
+            True if the step was encoded in chunks, False to use a single process
+
+        Raises:
+            RuntimeError: If a segment encode or a join fails (a failed join
+                keeps the segments for inspection)
+        """
+        multi = isinstance(options, MultiOutputOptions)
+        outputs = ([(options.softsub, output_path_for(options.softsub)),
+                    (options.hardsub, output_path_for(options.hardsub))]
+                   if multi else [(options, output_path_for(options))])
+        if any(step_options.use_nvenc for step_options, _ in outputs):
+            return False  # NVENC already runs at full speed in one process
+
+        segments = self._plan_chunks()
+        if len(segments) < 2:
+            return False
+
+        self.config.log('RenderThread', '_encode_chunked',
+                        f"Encoding {len(segments)} segments: {segments}")
+        self.config.main_paths.temp.mkdir(parents=True, exist_ok=True)
+        work_dir = Path(tempfile.mkdtemp(prefix='chunks_', dir=self.config.main_paths.temp))
+        encoder: Optional[ChunkedEncoder] = None
+        keep_segments = False
+        try:
+            segment_paths = [[work_dir / f'{n}_{segment.index:04d}.mkv' for segment in segments]
+                             for n in range(len(outputs))]
+            if multi:
+                jobs = [build_multi_output_segment_args(options, segment, segment_paths[0][i], segment_paths[1][i])
+                        for i, segment in enumerate(segments)]
+            else:
+                jobs = [build_segment_args(options, segment, segment_paths[0][i])
+                        for i, segment in enumerate(segments)]
+
+            self.state_update(state_label)
+            encoder = ChunkedEncoder(
+                self.runner,
+                workers=self._chunk_workers(),
+                log=lambda message: self.config.log('RenderThread', '_encode_chunked', message)
+            )
+            self._chunked_encoders.add(encoder)
+            step = getattr(self._step_local, 'step', None)  # Segments report from the encoder's threads
+            encoder.run(jobs, lambda sample: self.progress_update(sample, step))
+            if self._cancelled:
+                return True
+
+            for n, (step_options, output_path) in enumerate(outputs):
+                list_path = work_dir / f'{n}_segments.txt'
+                list_path.write_text(build_concat_list(segment_paths[n]), encoding='utf-8')
+                args = build_segment_concat_args(step_options, list_path, output_path)
+                self.config.log('RenderThread', '_encode_chunked', f"Generated args: {' '.join(args)}")
+                exit_code = self._run_encode(args, f"Склеиваю {output_path.name}...")
+                if self._cancelled:
+                    break
+                if exit_code:
+                    keep_segments = True
+                    raise RuntimeError(f"Joining {output_path.name} failed with exit code {exit_code} "
+                                       f"(segments kept in {work_dir})")
+            return True
+        finally:
+            self._chunked_encoders.discard(encoder)
+            if not keep_segments:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _chunk_workers(self) -> int:
+        """Number of segment encodes to run at once (0/1 = chunking off)."""
+        if not self.config.chunked_encoding or self.runner is None:
+            return 0
+        if self.config.chunk_workers > 0:
+            return self.config.chunk_workers
+        return (os.cpu_count() or 1) // EncodingDefaults.CHUNK_THREADS_PER_WORKER
+
+    def _plan_chunks(self) -> list[Segment]:
+        """Plan keyframe-aligned segments for the raw (empty if chunking is off)."""
+        workers = self._chunk_workers()
+        if workers < 2 or self.total_duration_sec <= 0:
+            return []
+        return plan_segments(
+            self._keyframes(),
+            self.total_duration_sec,
+            workers * EncodingDefaults.CHUNKS_PER_WORKER,
+            EncodingDefaults.CHUNK_MIN_SECONDS
+        )
+
+    def _keyframes(self) -> KeyframeIndex:
+        """Keyframe index of the raw, relative to its start time."""
+        with self._keyframe_lock:  # Softsub and hardsub steps may plan chunks at once
+            if self._keyframe_index is None:
+                index = probe_keyframes(self.runner, self.paths.raw, self.keyframe_cache)
+                start_time = self.video_info.start_time if self.video_info else 0.0
+                self._keyframe_index = index.relative_to(start_time)
+                self.config.log('RenderThread', '_keyframes', f"Found {len(self._keyframe_index)} keyframes")
+            return self._keyframe_index
+
+    # Shared audio track
+    def prepare_audio(self):
+        """Encode the audio input once; every output then stream-copies it.
+
+        Audio that is already AAC at the delivery rate and bitrate is
+        copied as is. If the shared encode fails, each output encodes the
+        audio itself as before. An encode done by the queue lookahead (see
+        JobPreparer) is reused.
+        """
+        if not self.paths.audio or self.context.build_state == BuildState.RAW_REPAIR:
+            return
+
+        plan = plan_audio(self._probe_audio())
+        audio_path = self.paths.audio
+        prepared = prepared_audio_path(self._job_dir(), self.paths.audio) if plan.transcode else None
+        if prepared is not None and prepared.exists():
+            self.config.log('RenderThread', 'prepare_audio', f"Using audio encoded ahead: {prepared.name}")
+            audio_path = prepared
+        elif plan.transcode:
+            self._job_dir().mkdir(parents=True, exist_ok=True)
+            fd, name = tempfile.mkstemp(prefix='audio_', suffix='.mka', dir=self._job_dir())
+            os.close(fd)
+            audio_path = Path(name)
+
+            args = build_audio_transcode_args(self.paths.audio, audio_path, plan.resample)
+            self.config.log('RenderThread', 'prepare_audio', f"Generated args: {' '.join(args)}")
+            exit_code = self._run_encode(args, "Кодирую звук...")
+            if self._cancelled:
+                return
+            if exit_code:
+                self.config.log('RenderThread', 'prepare_audio',
+                                f"Shared audio encode failed with exit code {exit_code}, encoding per output")
+                audio_path.unlink(missing_ok=True)
+                return
+        else:
+            self.config.log('RenderThread', 'prepare_audio', "Audio is already deliverable, copying it")
+
+        self.paths = replace(self.paths, audio=audio_path)
+        self.ffmpeg_factory.audio_codec = 'copy'
+
+    # Fonts
+    def prepare_fonts(self):
+        """Give libass the bundled fonts and the fonts attached to the raw."""
+        if self.runner is None or self.context.build_state == BuildState.RAW_REPAIR:
+            return
+
+        attachments = self.video_info.font_attachments if self.video_info is not None else ()
+        try:
+            fonts_dir = prepare_fonts_dir(
+                self.runner, self.paths.raw, attachments, self.config.main_paths.fonts, self._job_dir(),
+                log=lambda message: self.config.log('RenderThread', 'prepare_fonts', message)
+            )
+        except OSError as e:
+            self.config.log('RenderThread', 'prepare_fonts', f"Fonts not prepared: {e}")
+            return
+        self.ffmpeg_factory.fonts_dir = fonts_dir
+
+    # Pre-rendered logo
+    def prepare_logo(self):
+        """Render a static logo once; every output then composites the image.
+
+        Animated logos, or a failed render, keep burning the logo with
+        libass on every frame.
+        """
+        if (self.logo_cache is None or self.runner is None or self.video_info is None
+                or self.context.build_state == BuildState.RAW_REPAIR):
+            return
+
+        overlay = self.logo_cache.overlay_for(
+            self.runner, self.config.main_paths.logo,
+            self.video_info.width, self.video_info.height, self.total_duration_sec,
+            log=lambda message: self.config.log('RenderThread', 'prepare_logo', message),
+            fonts_dir=self.ffmpeg_factory.fonts_dir
+        )
+        if overlay is not None:
+            self.ffmpeg_factory.logo_overlay = overlay
+
+    def merge_logo_subtitles(self):
+        """Merge the logo into the episode subtitles so hardsub burns both in one libass pass.
+
+        The merged script is written to the job's temp dir. Subtitles that
+        cannot be merged faithfully keep two subtitles filters.
+        """
+        build_state = self.context.build_state
+        if (self.merged_subs is None or self.paths.sub is None or self.ffmpeg_factory.logo_overlay is not None
+                or build_state not in [BuildState.SOFT_AND_HARD, BuildState.HARD_ONLY, BuildState.FOR_HARDSUBBERS]
+                or not self._hardsub_flags()['include_logo']):
+            return
+
+        try:
+            merged = self.merged_subs.merged(self.paths.sub, self.config.main_paths.logo)
+        except OSError:
+            merged = None
+        if merged is None:
+            self.config.log('RenderThread', 'merge_logo_subtitles', "Subtitles not mergeable, burning the logo separately")
+            return
+
+        merged_path = self._job_dir() / 'merged.ass'
+        merged_path.parent.mkdir(parents=True, exist_ok=True)
+        merged_path.write_text(merged, encoding='utf-8')
+        self.ffmpeg_factory.merged_subtitle = merged_path
+        self.config.log('RenderThread', 'merge_logo_subtitles', f"Merged logo into subtitles: {merged_path}")
+
+    def _job_dir(self) -> Path:
+        """Temp dir of this job (named after its output, so reruns reuse the same paths)."""
+        return job_temp_dir(self.config.main_paths.temp, self.paths)
+
+    # Output delivery
+    @property
+    def output_paths(self) -> RenderPaths:
+        """Paths the encodes write to.
+
+        With an output mover the outputs are encoded into the job's local
+        scratch dir and moved into place when the job finishes. A subtitle
+        remux and a patched hardsub rewrite the existing release, so they
+        stay in place.
+        """
+        if self.output_mover is None:
+            return self.paths
+        scratch = self.output_mover.scratch_dir(self._job_dir().name)
+        softsub, hardsub = self.paths.softsub, self.paths.hardsub
+        if self.paths.previous_softsub is None:
+            softsub = scratch / 'softsub' / softsub.name
+        if not self._patch_ranges():
+            hardsub = scratch / 'hardsub' / hardsub.name
+        return replace(self.paths, softsub=softsub, hardsub=hardsub)
+
+    def _prepare_scratch(self):
+        """Start the job with an empty scratch dir.
+
+        Outputs of an earlier run that never landed (failed copy, app
+        closed mid-copy) are delivered first, so they are not deleted.
+
+        Raises:
+            RuntimeError: If an earlier output still cannot be delivered (the scratch dir is kept)
+        """
+        if self.output_mover is None:
+            return
+        scratch = self.output_mover.scratch_dir(self._job_dir().name)
+        undelivered = self.output_mover.deliver_leftovers(scratch)
+        if undelivered:
+            raise RuntimeError(f"Outputs of an earlier run could not be moved into place, kept in {scratch}: "
+                               f"{', '.join(path.name for path in undelivered)}")
+        shutil.rmtree(scratch, ignore_errors=True)
+        (scratch / 'softsub').mkdir(parents=True, exist_ok=True)
+        (scratch / 'hardsub').mkdir(parents=True, exist_ok=True)
+
+    def _deliver_outputs(self):
+        """Hand the scratch outputs to the mover; the queue goes on while they are copied."""
+        written = self.output_paths
+        pairs = ((written.softsub, self.paths.softsub), (written.hardsub, self.paths.hardsub))
+        moves = [(source, destination) for source, destination in pairs
+                 if source != destination and source.exists()]
+        if not moves:
+            self._outputs_landed()
+            return
+        self.config.log('RenderThread', '_deliver_outputs',
+                        f"Moving outputs into place: {', '.join(destination.name for _, destination in moves)}")
+        self.output_mover.move(moves, on_done=self._outputs_landed, on_failed=self._outputs_not_landed)
+
+    def _outputs_landed(self):
+        """Record the finished outputs once they are at their destinations (mover thread with a copy)."""
+        for fingerprint, outputs in self._landed_records:
+            self.render_cache.store(fingerprint, outputs)
+        self._landed_records = []
+        self._record_burned_subtitles()
+        self.delivery.set_result(None)
+
+    def _outputs_not_landed(self, message: str):
+        """Fail the delivery of a job whose outputs could not be moved into place (mover thread)."""
+        self.config.log('RenderThread', '_outputs_not_landed', message)
+        self.delivery.set_exception(RuntimeError(message))
+        self.delivery_failed.emit(message)
+
+    def _probe_audio(self) -> Optional[VideoInfo]:
+        """Probe the audio input, or None if it cannot be probed."""
+        if self.runner is None:
+            return None
+        try:
+            return probe_video(self.runner, self.paths.audio, self.probe_cache)
+        except ValueError:
+            return None
 
     # Hardsubbing special
     def hardsubbering(self):
         self.config.log('RenderThread', 'hardsubbering', "Starting special hardsubbing...")
         # Special mode for hardsubbers (no audio/softsub)
-        if self.config.build_settings.build_state == BuildState.FOR_HARDSUBBERS:
+        if self.context.build_state == BuildState.FOR_HARDSUBBERS:
             # Create options using factory (no audio for hardsubbers)
-            use_nvenc = self.config.build_settings.nvenc_state in [NvencState.NVENC_BOTH, NvencState.NVENC_HARD_ONLY]
-            include_logo = self.config.build_settings.logo_state in [LogoState.LOGO_BOTH, LogoState.LOGO_HARD_ONLY]
-            preset = 'faster' if self.config.build_settings.nvenc_state in [NvencState.NVENC_SOFT_ONLY, NvencState.NVENC_NONE] else 'p4'
+            use_nvenc = self.context.hardsub_nvenc
+            include_logo = self.context.hardsub_logo
+            preset = 'p4' if use_nvenc else 'faster'
 
             options = self.ffmpeg_factory.create_hardsub_options(
-                paths=self.paths,
-                video_settings=self.config.build_settings.hardsub_settings,
+                paths=self.output_paths,
+                video_settings=self.context.hardsub_settings,
                 encoding_params=self.encoding_params,
                 use_nvenc=use_nvenc,
                 include_logo=include_logo,
                 preset=preset
             )
-
-            # Build args from options
             args = build_ffmpeg_args(options)
-            self.config.log('RenderThread', 'hardsubbering', f"Generated args: {' '.join(args)}")
-            self._run_encode(args, "Собираю хардсаб для хардсабберов...")
+            fingerprint = self._step_fingerprint(args, [options])
+            if self._render_cache_hit(fingerprint, [self.paths.hardsub]):
+                return
+
+            if not (self._encode_patch(options, "Собираю хардсаб для хардсабберов...")
+                    or self._encode_two_pass(options, "Собираю хардсаб для хардсабберов...")
+                    or self._encode_chunked(options, "Собираю хардсаб для хардсабберов...")):
+                self.config.log('RenderThread', 'hardsubbering', f"Generated args: {' '.join(args)}")
+                self._run_checked_encode(args, "Собираю хардсаб для хардсабберов...", "Hardsub encode")
+            self._outputs_finished(fingerprint, [self.paths.hardsub])
             
     def raw_repairing(self):
         self.config.log('RenderThread', 'raw_repairing', "Starting raw repairing...")
         # Repair mode: fix broken raw video
-        if self.config.build_settings.build_state == BuildState.RAW_REPAIR:
+        if self.context.build_state == BuildState.RAW_REPAIR:
             args = [
                 '-y',
+                *progress_args(),
                 '-i', str(self.paths.raw),
                 '-c:v', 'libx264',
                 '-c:a', 'copy',
                 '-c:s', 'copy',
-                str(self.paths.softsub)
+                str(self.output_paths.softsub)
             ]
             self.config.log('RenderThread', 'raw_repairing', f"Generated args: {args}")
-            self._run_encode(args, "Востанавливаю равку...")
+            if self._run_checked_encode(args, "Востанавливаю равку...", "Raw repair"):
+                self._outputs_finished(None, [self.paths.softsub])
 
     def ffmpeg_analysis(self):
         self.config.log('RenderThread', 'ffmpeg_analysis', "Starting ffmpeg analysis...")
-        args = [str(self.paths.raw)]
+        if self.probe_cache is not None:
+            cached = self.probe_cache.get(self.paths.raw)
+            if cached is not None:
+                self.config.log('RenderThread', 'ffmpeg_analysis', "Using cached probe")
+                self._apply_video_info(cached)
+                return
+
+        args = build_ffprobe_args(self.paths.raw)
         self.config.log('RenderThread', 'ffmpeg_analysis', f"Generated args: {args}")
         process = self._run_process_safe(args, is_ffprobe=True)
         self.ffmpeg_analysis_decoding(process)
     
-    def calculate_encoding_params(self, file_size_gb, resolution) -> EncodingParams:
-        """Calculate encoding parameters based on file size and resolution.
+    def calculate_encoding_params(self, info: VideoInfo, target_size_bytes: Optional[int] = None) -> EncodingParams:
+        """Calculate encoding parameters from the probed raw.
+
+        Wraps the pure bitrate model with logging; the raw's size on disk
+        stands in when the probe did not report one (legacy text probe).
 
         Args:
-            file_size_gb: Input file size in GB
-            resolution: Video resolution (e.g., "1080p", "720p")
+            info: Probed raw metadata
+            target_size_bytes: Optional desired output size
 
         Returns:
             EncodingParams dataclass with calculated values
         """
-        avg_bitrate = (file_size_gb * 1024 * 8) / self.total_duration_sec
-        avg_bitrate = avg_bitrate if avg_bitrate < 6 else 6
-
-        if self.config.potato_PC:
-            avg_bitrate /= 2
-
-        max_bitrate = avg_bitrate * 1.5
-        buffer_size = max_bitrate * 2
+        if not info.bit_rate and not info.size_bytes:
+            try:
+                info = replace(info, size_bytes=self.paths.raw.stat().st_size)
+            except OSError:
+                pass  # Bitrate model falls back to resolution budget only
 
-        if resolution in ["1080p", "4K"]:
-            crf = 18
-            cq = 19
-        elif resolution == "720p":
-            crf = 20
-            cq = 21
-        else:
-            crf = 23
-            cq = 23
-
-        if self.config.potato_PC:
-            crf = 23
-            cq = 21
-
-        qmin = cq - 2
-        qmax = cq + 4
-
-        params = EncodingParams(
-            avg_bitrate=f"{int(avg_bitrate)}M",
-            max_bitrate=f"{int(max_bitrate)}M",
-            buffer_size=f"{int(buffer_size)}M",
-            crf=crf,
-            cq=cq,
-            qmin=qmin,
-            qmax=qmax
-        )
+        params = estimate_encoding_params(info, potato=self.context.potato_mode,
+                                          target_size_bytes=target_size_bytes)
+        target_kbps = target_bitrate_kbps(info, target_size_bytes)
+        if target_kbps is not None and target_kbps < EncodingDefaults.MIN_TARGET_BITRATE_KBPS:
+            self.config.log('RenderThread', 'calculate_encoding_params',
+                           f"Target size {target_size_bytes} bytes allows only {target_kbps:.0f} kbit/s; "
+                           f"raised to {params.avg_bitrate}, the output will be larger")
 
         self.config.log('RenderThread', 'calculate_encoding_params',
                        f"EncodingParams: {params}")
         return params
-    
+
+    def search_crf(self, params: EncodingParams) -> EncodingParams:
+        """Replace the ladder CRF with one picked by measuring sampled segments.
+
+        Only for quality-based encodes with crf_search enabled. Samples are
+        encoded with the settings of the job's primary encoded output
+        (softsub unless it remuxes the raw's video); a failed search keeps
+        the ladder values.
+
+        Args:
+            params: Ladder encoding parameters
+
+        Returns:
+            EncodingParams with the searched CRF/CQ, or params unchanged
+        """
+        build_state = self.context.build_state
+        if (not self.config.crf_search or self.runner is None or self.context.potato_mode
+                or self._target_size_bytes() or build_state == BuildState.RAW_REPAIR):
+            return params
+
+        softsub_encoded = self.paths.previous_softsub is None and not self._softsub_copies_video()
+        if build_state == BuildState.SOFT_ONLY and not softsub_encoded:
+            return params  # Nothing is encoded
+        if build_state in [BuildState.SOFT_AND_HARD, BuildState.SOFT_ONLY] and softsub_encoded:
+            options = self.ffmpeg_factory.create_softsub_options(
+                paths=self.paths,
+                video_settings=self.context.softsub_settings,
+                encoding_params=params,
+                **self._softsub_flags()
+            )
+        else:
+            options = self.ffmpeg_factory.create_hardsub_options(
+                paths=self.paths,
+                video_settings=self.context.hardsub_settings,
+                encoding_params=params,
+                **self._hardsub_flags()
+            )
+
+        self.state_update("Подбираю CRF...")
+        search = CrfSearch(self.runner, self.config.main_paths.temp,
+                           log=lambda message: self.config.log('RenderThread', 'search_crf', message))
+        try:
+            result = search.run(options, self.total_duration_sec, cache=self.crf_cache)
+        except (RuntimeError, OSError) as e:
+            self.config.log('RenderThread', 'search_crf', f"CRF search failed, keeping CRF {params.crf}: {e}")
+            return params
+
+        if result is None:
+            return params
+        return with_crf(params, result.crf)
+
     def ffmpeg_analysis_decoding(self, proc):
         """Parse video metadata from ffprobe output and apply to config.
 
-        Wraps pure parsing function with logging and state application.
+        Wraps pure parsing functions with logging and state application.
+        JSON probe output is preferred; human-readable output is still
+        understood for the legacy shell fallback.
         """
-        # Collect all output lines for parsing
-        lines = []
-        for line in proc.stdout:
-            self.config.log('RenderThread', 'ffmpeg_analysis_decoding', line)
-            lines.append(line)
+        # Collect all output for parsing
+        lines = list(proc.stdout)
+        output = ''.join(lines)
+        self.config.log('RenderThread', 'ffmpeg_analysis_decoding', output)
 
-        # Parse using pure function
-        info = parse_ffprobe_output(lines)
+        # Parse using pure functions
+        try:
+            data = load_ffprobe_json(output)
+        except ValueError:
+            info = parse_ffprobe_output(lines)
+        else:
+            info = video_info_from_probe_data(data)
+            if self.probe_cache is not None and data.get('streams'):
+                self.probe_cache.put(self.paths.raw, data)
 
         # Log parsed results
         self.config.log('RenderThread', 'ffmpeg_analysis_decoding',
-                       f"Parsed: {info.resolution}, {info.pixel_format}, {info.video_profile}")
+                       f"Parsed: {info.resolution}, {info.pixel_format}, {info.video_profile}, "
+                       f"{info.frame_rate:.3f} fps, {info.total_frames:.0f} frames")
 
         # Apply parsed info to state
         self._apply_video_info(info)
 
     def _apply_video_info(self, info: VideoInfo):
-        """Apply parsed video info to config settings.
+        """Apply parsed video info to the job's render context.
 
         Separate from parsing for cleaner separation of concerns.
-        Handles potato mode overrides and format/profile mapping for codec compatibility.
+        Pixel formats and profiles are matched to the raw (see
+        RenderContext.with_video_info); the shared config is left as is.
         """
         # Set runtime state
+        self.video_info = info
         self.total_duration_sec = info.duration_seconds
         self.total_frames = info.total_frames
         self.video_res = info.resolution
         self.time_upd.emit(info.total_frames)
 
-        # Potato mode: force compatible settings
-        if self.config.potato_PC:
-            soft_pixel_fmt = 'yuv420p'
-            hard_pixel_fmt = 'yuv420p'
-            soft_profile = 'main'
-            hard_profile = 'main'
-            self.config.log('RenderThread', '_apply_video_info',
-                          "Potato mode: forcing yuv420p and main profile")
-        else:
-            # Map parsed formats to output formats based on codec compatibility
-            soft_pixel_fmt, hard_pixel_fmt = self._map_pixel_formats(info.pixel_format)
-            soft_profile, hard_profile = self._map_profiles(info.video_profile)
-
-        # Apply to build settings
-        self.config.build_settings.softsub_settings.pixel_format = soft_pixel_fmt
-        self.config.build_settings.hardsub_settings.pixel_format = hard_pixel_fmt
-        self.config.build_settings.softsub_settings.video_profile = soft_profile
-        self.config.build_settings.hardsub_settings.video_profile = hard_profile
-
+        self.context = self.context.with_video_info(info)
+        soft, hard = self.context.softsub_settings, self.context.hardsub_settings
         self.config.log('RenderThread', '_apply_video_info',
-                       f"Applied settings: soft({soft_pixel_fmt}, {soft_profile}), "
-                       f"hard({hard_pixel_fmt}, {hard_profile})")
-
-    def _map_pixel_formats(self, parsed_format: str) -> tuple[str, str]:
-        """Map parsed pixel format to softsub and hardsub formats.
-
-        Handles codec compatibility - 10-bit formats need conversion for softsub.
-
-        Args:
-            parsed_format: Pixel format from video metadata
-
-        Returns:
-            Tuple of (softsub_format, hardsub_format)
-        """
-        if parsed_format in ['yuv420p10le', 'p010le']:
-            # 10-bit formats: softsub uses 8-bit, hardsub preserves 10-bit
-            softsub_fmt = 'yuv420p'
-            # Hardsub format depends on nvenc usage
-            if self.config.build_settings.nvenc_state in [NvencState.NVENC_SOFT_ONLY, NvencState.NVENC_NONE]:
-                hardsub_fmt = 'yuv420p10le'
-            else:
-                hardsub_fmt = 'p010le'
-            return softsub_fmt, hardsub_fmt
-        else:
-            # 8-bit: use as-is for both
-            return parsed_format, parsed_format
-
-    def _map_profiles(self, parsed_profile: str) -> tuple[str, str]:
-        """Map parsed video profile to softsub and hardsub profiles.
-
-        Different codecs need different profile mappings for compatibility.
+                       f"Applied settings: soft({soft.pixel_format}, {soft.video_profile}), "
+                       f"hard({hard.pixel_format}, {hard.video_profile})"
+                       + (" (potato mode)" if self.context.potato_mode else ""))
 
-        Args:
-            parsed_profile: Video profile from metadata
-
-        Returns:
-            Tuple of (softsub_profile, hardsub_profile)
-        """
-        # Profile mapping based on parsed profile and nvenc usage
-        profile_map = {
-            'main': ('main', 'main'),
-            'main10': (
-                'high10' if self.config.build_settings.nvenc_state in [NvencState.NVENC_HARD_ONLY, NvencState.NVENC_NONE] else 'high',
-                'main10'
-            ),
-            'high': ('high', 'main10'),
-            'high10': (
-                'high10' if self.config.build_settings.nvenc_state in [NvencState.NVENC_HARD_ONLY, NvencState.NVENC_NONE] else 'high',
-                'main10'
-            )
-        }
-
-        return profile_map.get(parsed_profile, (parsed_profile, parsed_profile))
+    @staticmethod
+    def _context_from_config(config, options: JobOptions) -> RenderContext:
+        """Snapshot of the UI settings and job options for an immediate (not queued) render."""
+        settings = config.build_settings
+        return RenderContext(
+            build_state=settings.build_state,
+            nvenc_state=settings.nvenc_state,
+            logo_state=settings.logo_state,
+            softsub_settings=frozen_video_settings(settings.softsub_settings),
+            hardsub_settings=frozen_video_settings(settings.hardsub_settings),
+            potato_mode=config.potato_PC,
+            target_size_mb=options.target_size_mb,
+            patch_ranges=options.patch_ranges,
+        )
 
     def _run_process_safe(self, args: list[str], is_ffprobe: bool = False) -> subprocess.Popen:
         """Run ffmpeg/ffprobe using ProcessRunner if available, else fall back to old method.
@@ -376,7 +1191,7 @@ class ThreadClassRender(QThread):
         else:
             # Old approach: shell=True (kept for backward compatibility)
             if is_ffprobe:
-                cmd = f'ffprobe "{args[0]}"'
+                cmd = subprocess.list2cmdline(['ffprobe', *args])
             else:
                 cmd = ' '.join(args)
             return subprocess.Popen(
@@ -389,7 +1204,7 @@ class ThreadClassRender(QThread):
                 errors='replace'
             )
 
-    def _run_encode(self, args: list[str], state_label: str) -> None:
+    def _run_encode(self, args: list[str], state_label: str) -> int:
         """Phase 5.7: Consolidated encode execution helper.
 
         Encapsulates the common pattern of:
@@ -400,63 +1215,171 @@ class ThreadClassRender(QThread):
         Args:
             args: FFmpeg arguments as a list
             state_label: Status message to display (e.g., "Собираю софтсаб...")
+
+        Returns:
+            ffmpeg exit code
         """
         self.state_update(state_label)
         process = self._run_process_safe(args)
         self.frame_update(process)
+        return process.wait()  # Outputs (and pass logs) are complete before the next step
+
+    def _run_checked_encode(self, args: list[str], state_label: str, step: str) -> bool:
+        """Run an encode whose output the job needs.
+
+        Args:
+            args: FFmpeg arguments as a list
+            state_label: Status message to display
+            step: Name of the encode in the error message
+
+        Returns:
+            True if it finished, False if the job was cancelled meanwhile
+
+        Raises:
+            RuntimeError: If ffmpeg fails
+        """
+        exit_code = self._run_encode(args, state_label)
+        if self._cancelled:
+            return False
+        if exit_code:
+            raise RuntimeError(f"{step} failed with exit code {exit_code}")
+        return True
 
     def _cleanup_temp_files(self):
-        """Clean up temporary subtitle files created by FFmpegOptionsFactory."""
-        import shutil
-        temp_dir = self.config.main_paths.temp
-        if temp_dir.exists():
-            # Remove all files in temp directory (factory creates subtitle copies here)
-            for temp_file in temp_dir.glob('*'):
-                if temp_file.is_file():
-                    try:
-                        temp_file.unlink()
-                        self.config.log('RenderThread', '_cleanup_temp_files',
-                                      f"Removed temp file: {temp_file.name}")
-                    except Exception as e:
-                        self.config.log('RenderThread', '_cleanup_temp_files',
-                                      f"Failed to remove {temp_file.name}: {e}")
+        """Remove this job's temp dir (subtitle copies, merged subtitles, extracted fonts).
+
+        Only the job's own dir is removed: other queue jobs may be running
+        and keep their files in the shared temp dir.
+        """
+        shutil.rmtree(self._job_dir(), ignore_errors=True)
+        self.config.log('RenderThread', '_cleanup_temp_files', f"Removed temp dir: {self._job_dir().name}")
 
     # Coding commands
     def stop(self):
         """Stop the entire render job (all encoding steps)."""
         self._cancelled = True
+        for encoder in list(self._chunked_encoders):
+            encoder.cancel()
         if self.runner:
             self.runner.kill_ffmpeg()
         self.config.log('RenderThread', 'stop', "Render job cancelled")
 
-    def run(self):
-        try:
-            self.config.log('RenderThread', 'run', "Running ffmpeg thread...")
-            self.ffmpeg_analysis()
-            if self._cancelled:
-                return
+    # Render graph
+    def render_steps(self) -> list[RenderStep]:
+        """Steps of this job and what each one waits for.
 
-            self.encoding_params = self.calculate_encoding_params(2, self.video_res)
-            if self._cancelled:
-                return
+        The probe feeds the CRF search; the audio encode and the subtitle
+        preparation run after it side by side, and the encodes start once
+        both are done. Softsub and hardsub encodes of a job run at once
+        when their encoders fit the budget (say, a libx264 hardsub next to
+        an NVENC softsub). A subtitle remux needs nothing else; without a
+        hardsub it is the whole job. A new step is one more RenderStep here.
+
+        Returns:
+            Steps of the render graph, in start order
+        """
+        build_state = self.context.build_state
+        softsub = self._encoder_demand(self.context.softsub_nvenc)
+        hardsub = self._encoder_demand(self.context.hardsub_nvenc)
+        steps = []
+        if self.paths.previous_softsub is not None:
+            steps.append(RenderStep('remux', self._progress_step('remux', self.remux_subtitles),
+                                    demand=ResourceDemand(io=1), retries=1))
+        if self.paths.previous_softsub is None or build_state in HARDSUB_STATES:
+            prepared = ('audio', 'merge')
+            steps += [
+                RenderStep('probe', self._probe_step, retries=1),
+                RenderStep('crf', self._crf_step, after=('probe',)),
+                RenderStep('audio', self.prepare_audio, after=('crf',)),
+                RenderStep('fonts', self.prepare_fonts, after=('crf',)),
+                RenderStep('logo', self.prepare_logo, after=('fonts',)),
+                RenderStep('merge', self.merge_logo_subtitles, after=('logo',)),
+                RenderStep('softsub_and_hardsub', self._progress_step('softsub_and_hardsub', self._combined_step),
+                           after=prepared, demand=softsub + hardsub),
+                RenderStep('softsub', self._progress_step('softsub', self._softsub_step),
+                           after=prepared, demand=softsub),
+                RenderStep('hardsub', self._progress_step('hardsub', self._hardsub_step),
+                           after=prepared, demand=hardsub),
+                RenderStep('hardsubbering', self._progress_step('hardsubbering', self.hardsubbering),
+                           after=prepared, demand=hardsub),
+                RenderStep('raw_repair', self._progress_step('raw_repair', self.raw_repairing),
+                           after=('probe',), demand=ResourceDemand(cpu_encodes=1)),
+            ]
+        steps += [
+            RenderStep('verify', self.verify_outputs, after=tuple(step.name for step in steps)),
+            RenderStep('deliver', self._deliver_outputs, after=('verify',)),
+        ]
+        return steps
+
+    @staticmethod
+    def _encoder_demand(use_nvenc: bool) -> ResourceDemand:
+        """Budget slot held by an encode step."""
+        return ResourceDemand(nvenc_sessions=1) if use_nvenc else ResourceDemand(cpu_encodes=1)
+
+    def _probe_step(self):
+        self.ffmpeg_analysis()
+        if self._cancelled:
+            return
+        self.encoding_params = self.calculate_encoding_params(
+            self.video_info or VideoInfo(), target_size_bytes=self._target_size_bytes() or None
+        )
+
+    def _crf_step(self):
+        self.encoding_params = self.search_crf(self.encoding_params)
+
+    def _single_decode(self) -> bool:
+        """True if one decode feeds both the softsub and the hardsub encoder."""
+        return (self.context.build_state == BuildState.SOFT_AND_HARD
+                and not self._target_size_bytes() and not self._softsub_copies_video()
+                and self.paths.previous_softsub is None and not self._patch_ranges())
 
+    def _combined_step(self):
+        if self._single_decode():
+            self.softsub_and_hardsub()
+
+    def _softsub_step(self):
+        if not self._single_decode():
             self.softsub()
-            if self._cancelled:
-                return
 
+    def _hardsub_step(self):
+        if not self._single_decode():
             self.hardsub()
-            if self._cancelled:
-                return
 
-            self.hardsubbering()
-            if self._cancelled:
-                return
+    def verify_outputs(self):
+        """Check that this run produced every output of the job.
 
-            self.raw_repairing()
-            if self._cancelled:
-                return
+        An output counts only if one of the job's steps finished it with a
+        clean exit (or found it up to date in the render cache), so a
+        previous release or a file left by a crashed encode never passes.
 
-            self._cleanup_temp_files()
+        Raises:
+            RuntimeError: If an output was not produced or is empty
+        """
+        build_state = self.context.build_state
+        outputs = []
+        if build_state in SOFTSUB_STATES or build_state == BuildState.RAW_REPAIR:
+            outputs.append(self.paths.softsub)
+        if build_state in HARDSUB_STATES:
+            outputs.append(self.paths.hardsub)
+        missing = [output for output in outputs
+                   if output not in self._produced
+                   or not self._produced[output].exists() or self._produced[output].stat().st_size == 0]
+        if missing:
+            raise RuntimeError(f"Outputs not written: {', '.join(path.name for path in missing)}")
+        self.outputs_verified = True
 
+    def run(self):
+        try:
+            self.config.log('RenderThread', 'run', "Running ffmpeg thread...")
+            self._prepare_scratch()
+            executor = StepExecutor(
+                ResourceBudget.from_config(self.config),
+                cancelled=lambda: self._cancelled,
+                log=lambda message: self.config.log('RenderThread', 'run', message)
+            )
+            self.step_results = executor.run(self.render_steps())
         except Exception as e:
+            self.error = e  # The queue fails the job with it
             self.handle_exception(type(e), e, e.__traceback__)
+        finally:
+            self._cleanup_temp_files()  # Also after a failed or cancelled job
@@ -9,10 +9,15 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QListWidget,
     QListWidgetItem,
+    QCheckBox,
+    QLineEdit,
+    QSpinBox,
 )
 
+from models.job import JobOptions
 from models.job_queue import QueuedJob
 from models.enums import JobStatus
+from models.patching import parse_time_ranges
 
 
 class JobListItem(QWidget):
@@ -21,6 +26,7 @@ class JobListItem(QWidget):
     Shows:
     - Status icon (waiting/running/completed/failed/cancelled)
     - Episode name
+    - Progress of a running job (several jobs can run at once)
     - Action buttons based on state:
         - WAITING: move up/down, remove
         - RUNNING: stop
@@ -48,16 +54,19 @@ class JobListItem(QWidget):
         JobStatus.CANCELLED: "⊗ CANCELLED",
     }
 
-    def __init__(self, queued_job: QueuedJob, parent=None):
+    def __init__(self, queued_job: QueuedJob, parent=None, progress: str = ""):
         """Initialize job list item widget.
 
         Args:
             queued_job: QueuedJob to display
             parent: Parent widget (optional)
+            progress: Last progress text of a running job (or input staging of a waiting one)
         """
         super().__init__(parent)
         self.queued_job = queued_job
         self.job_id = queued_job.id
+        self.progress_label = None
+        self._progress = progress
 
         # Initialize attributes that may not exist depending on status
         self.move_up_button = None
@@ -113,6 +122,11 @@ class JobListItem(QWidget):
         Args:
             layout: Layout to add buttons to
         """
+        # Input staging progress of this job
+        self.progress_label = QLabel(self._progress)
+        self.progress_label.setObjectName("jobProgress")
+        layout.addWidget(self.progress_label)
+
         # Move up button
         self.move_up_button = QPushButton("↑")
         self.move_up_button.setObjectName("move_up")
@@ -146,6 +160,11 @@ class JobListItem(QWidget):
         Args:
             layout: Layout to add buttons to
         """
+        # Progress of this job
+        self.progress_label = QLabel(self._progress)
+        self.progress_label.setObjectName("jobProgress")
+        layout.addWidget(self.progress_label)
+
         # Stop button
         self.stop_button = QPushButton("Stop")
         self.stop_button.setObjectName("stop")
@@ -170,12 +189,24 @@ class JobListItem(QWidget):
         self.remove_button.clicked.connect(lambda: self.remove_requested.emit(self.job_id))
         layout.addWidget(self.remove_button)
 
+    def set_progress(self, text: str):
+        """Show the progress of a running job, or the input staging of a waiting one.
+
+        Args:
+            text: Progress text (state and percent done)
+        """
+        self._progress = text
+        if self.progress_label is not None:
+            self.progress_label.setText(text)
+
 
 class JobQueueWidget(QWidget):
     """Container widget displaying job queue with controls.
 
     Shows:
+    - Options of the next job (re-release remux, target size, patch ranges)
     - QListWidget with all queued jobs (as JobListItem widgets)
+    - Backlog of the outputs still being moved to their folders
     - Resume button to start processing waiting jobs
     - Clear Completed button to remove finished jobs
 
@@ -205,6 +236,8 @@ class JobQueueWidget(QWidget):
             parent: Parent widget (optional)
         """
         super().__init__(parent)
+        self._items: dict[str, JobListItem] = {}  # job_id → displayed item
+        self._progress: dict[str, str] = {}  # job_id → progress text of running and staging jobs
         self._setup_ui()
 
     def _setup_ui(self):
@@ -212,11 +245,39 @@ class JobQueueWidget(QWidget):
         layout = QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
 
+        # Options of the next job (reset once it is added)
+        options_layout = QHBoxLayout()
+        self.subtitle_remux_checkbox = QCheckBox("Перевыпуск сабов")
+        self.subtitle_remux_checkbox.setObjectName("subtitleRemuxCheckbox")
+        self.subtitle_remux_checkbox.setToolTip("Remux the new subtitles into the existing softsub instead of encoding")
+        options_layout.addWidget(self.subtitle_remux_checkbox)
+
+        self.target_size_spinbox = QSpinBox()
+        self.target_size_spinbox.setObjectName("targetSizeSpinbox")
+        self.target_size_spinbox.setRange(0, 100000)
+        self.target_size_spinbox.setSuffix(" МБ")
+        self.target_size_spinbox.setSpecialValueText("Размер: авто")
+        self.target_size_spinbox.setToolTip("Two-pass encode to this output size (0 = quality-based)")
+        options_layout.addWidget(self.target_size_spinbox)
+
+        self.patch_ranges_editline = QLineEdit()
+        self.patch_ranges_editline.setObjectName("patchRangesEditline")
+        self.patch_ranges_editline.setPlaceholderText("Патч: 12:30-12:45, ...")
+        self.patch_ranges_editline.setToolTip("Re-encode only these ranges of the existing hardsub")
+        options_layout.addWidget(self.patch_ranges_editline)
+        layout.addLayout(options_layout)
+
         # Job list widget
         self.job_list_widget = QListWidget()
         self.job_list_widget.setObjectName("jobQueueList")
         layout.addWidget(self.job_list_widget)
 
+        # Output mover backlog (hidden while nothing is being moved)
+        self.mover_label = QLabel("")
+        self.mover_label.setObjectName("outputMoverLabel")
+        self.mover_label.setVisible(False)
+        layout.addWidget(self.mover_label)
+
         # Resume button
         self.resume_button = QPushButton("Продолжить обработку")
         self.resume_button.setObjectName("resumeQueueButton")
@@ -244,11 +305,16 @@ class JobQueueWidget(QWidget):
         """
         # Clear existing items
         self.job_list_widget.clear()
+        self._items.clear()
+        active = {queued_job.id for queued_job in jobs
+                  if queued_job.status in (JobStatus.RUNNING, JobStatus.WAITING)}
+        self._progress = {job_id: text for job_id, text in self._progress.items() if job_id in active}
 
         # Add each job as a JobListItem
         for queued_job in jobs:
             # Create JobListItem widget
-            job_item_widget = JobListItem(queued_job)
+            job_item_widget = JobListItem(queued_job, progress=self._progress.get(queued_job.id, ""))
+            self._items[queued_job.id] = job_item_widget
 
             # Connect signals to propagate
             job_item_widget.move_up_requested.connect(self.move_up_requested.emit)
@@ -261,3 +327,42 @@ class JobQueueWidget(QWidget):
             list_item.setSizeHint(job_item_widget.sizeHint())
             self.job_list_widget.addItem(list_item)
             self.job_list_widget.setItemWidget(list_item, job_item_widget)
+
+    def set_job_progress(self, job_id: str, text: str):
+        """Show the progress of a running or staging job in its item.
+
+        Args:
+            job_id: ID of the job
+            text: Progress text (state and percent done)
+        """
+        self._progress[job_id] = text
+        item = self._items.get(job_id)
+        if item is not None:
+            item.set_progress(text)
+
+    def job_options(self) -> JobOptions:
+        """Options set for the next job.
+
+        Raises:
+            ValueError: If the patch ranges are malformed
+        """
+        return JobOptions(
+            subtitle_remux=self.subtitle_remux_checkbox.isChecked(),
+            target_size_mb=self.target_size_spinbox.value(),
+            patch_ranges=parse_time_ranges(self.patch_ranges_editline.text()),
+        )
+
+    def reset_job_options(self):
+        """Clear the options once they were used, so they do not carry over to the next job."""
+        self.subtitle_remux_checkbox.setChecked(False)
+        self.target_size_spinbox.setValue(0)
+        self.patch_ranges_editline.clear()
+
+    def set_mover_status(self, text: str):
+        """Show the backlog of the output mover (empty text hides it).
+
+        Args:
+            text: Pending outputs and throughput
+        """
+        self.mover_label.setText(text)
+        self.mover_label.setVisible(bool(text))
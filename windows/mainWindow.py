@@ -10,7 +10,7 @@ import modules.ConfigModule as ConfigModule
 
 from modules.GlobalExceptionHandler import get_global_handler
 from typing import Optional
-from PyQt5 import QtWidgets
+from PyQt5 import QtCore, QtWidgets
 from PyQt5.QtWidgets import QMessageBox, QApplication, QMainWindow
 from UI.normUI2 import Ui_MainWindow
 from windows.FAQWindow import FAQWindow
@@ -18,13 +18,28 @@ from threads.RenderThread import ThreadClassRender
 from modules.AppUpdater import UpdaterUI
 from models.protocols import ProcessRunner
 from models.render_paths import RenderPaths
+from models.job import JobOptions
+from models.video_info import VideoInfo
+from modules.ass_cache import BurnedSubtitleCache, MergedAssCache
+from modules.crf_search import CrfSearchCache
+from modules.font_index import FontIndex
+from modules.keyframe_cache import KeyframeCache
+from modules.logo_cache import LogoCache
+from modules.output_mover import MoverStatus, OutputMover
+from modules.probe_cache import ProbeCache
+from modules.render_cache import RenderCache
 from models.job_queue import JobQueue
 from models.enums import JobStatus, ErrorSeverity
 from threads.QueueProcessor import QueueProcessor
+from threads.FontCacheWarmupThread import FontCacheWarmupThread
+from threads.QueueCheckThread import QueueCheckThread
 from widgets.job_queue_widget import JobQueueWidget
 
 # Main window class
 class MainWindow(QMainWindow):
+    # Output mover status (reported from the mover thread, shown in the main thread)
+    mover_status_upd = QtCore.pyqtSignal(object)
+
     # Main window init
     def __init__(self, config, runner: Optional[ProcessRunner] = None):
         super().__init__()
@@ -51,9 +66,30 @@ class MainWindow(QMainWindow):
         # Load application stylesheet
         self._load_stylesheet()
 
+        # Shared ffprobe cache (queue validation and render threads reuse probes)
+        self.probe_cache = ProbeCache(config.main_paths.cache)
+        self.keyframe_cache = KeyframeCache(config.main_paths.cache / "keyframes")
+        self.crf_cache = CrfSearchCache(config.main_paths.cache)
+        self.burned_subs = BurnedSubtitleCache(config.main_paths.cache)
+        self.render_cache = RenderCache(config.main_paths.cache)
+        self.logo_cache = LogoCache(config.main_paths.cache, ass_cache=self.burned_subs.ass_cache)
+        self.merged_subs = MergedAssCache()
+        self.output_mover = OutputMover.from_config(
+            config, log=lambda message: config.log('mainWindow', 'output_mover', message),
+            on_status=self.mover_status_upd.emit
+        )
+        self.font_index = FontIndex(config.main_paths.cache)
+        self._queue_checks: set[QueueCheckThread] = set()  # Jobs being checked before they are queued
+
         # Initialize queue components
         self.job_queue = JobQueue()
-        self.queue_processor = QueueProcessor(self.job_queue, config=config, runner=runner)
+        self.queue_processor = QueueProcessor(
+            self.job_queue, config=config, runner=runner,
+            probe_cache=self.probe_cache, keyframe_cache=self.keyframe_cache,
+            crf_cache=self.crf_cache, burned_subs=self.burned_subs,
+            render_cache=self.render_cache, logo_cache=self.logo_cache,
+            merged_subs=self.merged_subs, output_mover=self.output_mover
+        )
         self.queue_widget = JobQueueWidget()
 
         # Add queue widget to UI layout (below existing controls)
@@ -76,11 +112,14 @@ class MainWindow(QMainWindow):
         self.queue_processor.job_cancelled.connect(self.on_job_cancelled)
         self.queue_processor.queue_finished.connect(self.on_queue_finished)
 
-        # Connect progress signals forwarded from RenderThread
-        self.queue_processor.frame_upd.connect(self.frame_update)
-        self.queue_processor.time_upd.connect(self.time_update)
-        self.queue_processor.state_upd.connect(self.state_update)
-        self.queue_processor.elapsed_time_upd.connect(self.elapsed_time_update)
+        # Connect progress signals forwarded from RenderThread (tagged with the job ID)
+        self._job_progress: dict[str, dict] = {}  # job_id → last frame, frame count and state
+        self.queue_processor.frame_upd.connect(self.on_job_frame_update)
+        self.queue_processor.time_upd.connect(self.on_job_time_update)
+        self.queue_processor.state_upd.connect(self.on_job_state_update)
+        self.queue_processor.elapsed_time_upd.connect(self.on_job_elapsed_time_update)
+        self.queue_processor.staging_upd.connect(self.on_job_staging_update)
+        self.mover_status_upd.connect(self.on_mover_status_update)
 
         # Connect queue widget signals
         self.queue_widget.move_up_requested.connect(self.on_move_up_requested)
@@ -109,7 +148,10 @@ class MainWindow(QMainWindow):
             self.ui.audio_path_editline,
             self.ui.subtitle_path_editline,
             self.ui.softsub_path_editline,
-            self.ui.config_save_button
+            self.ui.config_save_button,
+            self.queue_widget.subtitle_remux_checkbox,
+            self.queue_widget.target_size_spinbox,
+            self.queue_widget.patch_ranges_editline
         ]
         # Keep both Start and Stop buttons visible
         self.ui.render_start_button.setText("Добавить в очередь")  # Change label
@@ -140,6 +182,34 @@ class MainWindow(QMainWindow):
                 self.updater_ui.start_updater()
             else:
                 self.config.log('mainWindow', 'showEvent', "Updater disabled.")
+            if self.runner is not None:
+                # Pay the system font scan now instead of in the first hardsub
+                self.font_warmup_thread = FontCacheWarmupThread(self.config, self.runner, self.font_index)
+                self.font_warmup_thread.start()
+
+    def closeEvent(self, event):
+        """Let outputs still being moved into place finish before the app quits."""
+        if self.output_mover is not None and self.output_mover.busy:
+            answer = QMessageBox.question(
+                self, "Перенос не завершён",
+                "Готовые файлы ещё переносятся в папки назначения.\n"
+                "Дождаться окончания переноса?\n"
+                "(«Нет» — выйти сейчас, файлы будут перенесены при следующем запуске задачи.)",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes
+            )
+            if answer == QMessageBox.Cancel:
+                event.ignore()
+                return
+            if answer == QMessageBox.Yes:
+                self.display_error("Переношу готовые файлы...", ErrorSeverity.INFO)
+                QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+                try:
+                    self.output_mover.wait()
+                finally:
+                    QApplication.restoreOverrideCursor()
+            self.config.log('mainWindow', 'closeEvent',
+                            f"Closed while moving outputs, waited: {answer == QMessageBox.Yes}")
+        super().closeEvent(event)
 
     def universal_update(self, setting_path, value, log_message, type, post_operation=None):
         # Handle UI paths specially - store locally, not on config
@@ -566,8 +636,60 @@ class MainWindow(QMainWindow):
         self.config.log('mainWindow', 'elapsed_time_update', f"Elapsed time updated: {time}")
         self.ui.elapsed_time_label.setText(time)
 
-    def _create_render_paths(self) -> RenderPaths:
-        """Factory: create RenderPaths from current UI state."""
+    # Queue progress: every running job in its queue item, the first one also in the progress bar
+    def _is_tracked_job(self, job_id: str) -> bool:
+        running = self.queue_processor.running_job_ids
+        return not running or running[0] == job_id
+
+    def _show_job_progress(self, job_id: str):
+        progress = self._job_progress.setdefault(job_id, {})
+        text = progress.get('state', '')
+        frames = progress.get('time') or 0
+        if frames:
+            percent = min(100, int(float(progress.get('frame', 0)) * 100 / frames))
+            text = f"{text} {percent}%".strip()
+        self.queue_widget.set_job_progress(job_id, text)
+
+    def on_job_frame_update(self, job_id: str, frame):
+        self._job_progress.setdefault(job_id, {})['frame'] = frame
+        self._show_job_progress(job_id)
+        if self._is_tracked_job(job_id):
+            self.frame_update(frame)
+
+    def on_job_time_update(self, job_id: str, time):
+        self._job_progress.setdefault(job_id, {})['time'] = time
+        self._show_job_progress(job_id)
+        if self._is_tracked_job(job_id):
+            self.time_update(time)
+
+    def on_job_state_update(self, job_id: str, state):
+        self._job_progress.setdefault(job_id, {})['state'] = state
+        self._show_job_progress(job_id)
+        if self._is_tracked_job(job_id):
+            self.state_update(state)
+
+    def on_job_elapsed_time_update(self, job_id: str, time):
+        if self._is_tracked_job(job_id):
+            self.elapsed_time_update(time)
+
+    def on_job_staging_update(self, job_id: str, text):
+        # Waiting job: shown in its queue item only, the progress bar belongs to the running jobs
+        self.queue_widget.set_job_progress(job_id, text)
+
+    def on_mover_status_update(self, status: MoverStatus):
+        text = ''
+        if status.pending_files:
+            text = f"Перенос: {status.pending_files} файл(ов), {status.pending_bytes / 1024 ** 3:.1f} ГБ"
+            if status.bytes_per_sec:
+                text += f", {status.bytes_per_sec / 1024 ** 2:.0f} МБ/с"
+        self.queue_widget.set_mover_status(text)
+
+    def on_delivery_failed(self, message: str):
+        """Warn that the outputs of a finished render did not reach their folders."""
+        self.display_error(f"Не удалось перенести готовые файлы: {message}", ErrorSeverity.ERROR)
+
+    def _create_render_paths(self, options: JobOptions = JobOptions()) -> RenderPaths:
+        """Factory: create RenderPaths from current UI state and the options of the job."""
         return RenderPaths.from_ui_state(
             raw_path=self._ui_paths['raw'],
             audio_path=self._ui_paths['audio'],
@@ -575,12 +697,22 @@ class MainWindow(QMainWindow):
             episode_name=self.config.build_settings.episode_name,
             softsub_dir=self.config.main_paths.softsub,
             hardsub_dir=self.config.main_paths.hardsub,
+            subtitle_remux=options.subtitle_remux,
         )
 
-    def _validate_before_render(self) -> bool:
+    def _read_job_options(self) -> Optional[JobOptions]:
+        """Options of the next job from the queue panel (None if malformed; an error is shown)."""
+        try:
+            return self.queue_widget.job_options()
+        except ValueError as e:
+            self.display_error(str(e), ErrorSeverity.ERROR)
+            self.config.log('mainWindow', '_read_job_options', f"Invalid job options: {e}")
+            return None
+
+    def _validate_before_render(self, options: JobOptions = JobOptions()) -> bool:
         """Validate paths before starting render. Returns True if valid."""
         try:
-            paths = self._create_render_paths()
+            paths = self._create_render_paths(options)
             errors = paths.validate()
 
             if errors:
@@ -663,6 +795,7 @@ class MainWindow(QMainWindow):
             job_id: ID of the job that completed
         """
         self.config.log('mainWindow', 'on_job_completed', f"Job completed: {job_id}")
+        self._job_progress.pop(job_id, None)
         # TODO: Update UI to show job completion
         self.refresh_queue_display()
 
@@ -674,6 +807,7 @@ class MainWindow(QMainWindow):
             error_message: Error message from job execution
         """
         self.config.log('mainWindow', 'on_job_failed', f"Job failed: {job_id} - {error_message}")
+        self._job_progress.pop(job_id, None)
 
         # Get job details for context
         episode_name = "Unknown"
@@ -699,8 +833,9 @@ class MainWindow(QMainWindow):
             job_id: ID of the job that was cancelled
         """
         self.config.log('mainWindow', 'on_job_cancelled', f"Job cancelled: {job_id}")
-        # Re-enable buttons (queue is paused after cancellation)
-        self.ui.render_stop_button.setEnabled(False)
+        self._job_progress.pop(job_id, None)
+        # Re-enable buttons if the queue is paused (a single stopped job leaves the others running)
+        self.ui.render_stop_button.setEnabled(not self.queue_processor.cancelled and self.queue_processor.isRunning())
         # Note: NOT calling locker() - UI stays unlocked during queue processing
         self.refresh_queue_display()
 
@@ -759,8 +894,8 @@ class MainWindow(QMainWindow):
             job_id: ID of the job to stop
         """
         self.config.log('mainWindow', 'on_stop_requested', f"Stop requested: {job_id}")
-        # TODO: Implement job cancellation
-        self.queue_processor.cancel_current_job()
+        # Only this job stops; other running jobs and the rest of the queue continue
+        self.queue_processor.cancel_job(job_id)
 
     def on_resume_requested(self):
         """Handle resume request from queue widget.
@@ -806,13 +941,16 @@ class MainWindow(QMainWindow):
         1. Adds the current job to the queue (if UI has valid paths)
         2. Starts/resumes processing if there are waiting jobs and processor is not running
         """
-        # Try to add to queue (might fail if UI fields are empty, which is OK)
-        self.on_add_to_queue_clicked()
+        # Try to add to queue (might fail if UI fields are empty, which is OK);
+        # an added job starts the queue once its checks pass
+        if not self.on_add_to_queue_clicked(start_queue=True):
+            self._start_queue()
 
-        # Start/resume processing if there are waiting jobs and processor is not running
+    def _start_queue(self):
+        """Start processing if there are waiting jobs and the processor is not running."""
         if not self.queue_processor.isRunning():
             if self.job_queue.has_waiting_jobs():
-                self.config.log('mainWindow', 'on_add_to_queue_and_start',
+                self.config.log('mainWindow', '_start_queue',
                                "Starting queue processor")
                 # Reset cancelled flag (important if queue was stopped previously)
                 self.queue_processor.cancelled = False
@@ -855,35 +993,53 @@ class MainWindow(QMainWindow):
             self.coding_error('name')
             return
 
+        options = self._read_job_options()
+        if options is None:
+            return
+
         self.ui.app_state_label.setText("Работаю....(наверное)")
         self.ui.render_progress_bar.setValue(0)
 
         # Validate input paths using new centralized validation
-        if not self._validate_before_render():
+        if not self._validate_before_render(options):
             return
 
         # Create validated, immutable paths
-        paths = self._create_render_paths()
+        paths = self._create_render_paths(options)
 
         self.config.log('mainWindow', 'start_immediate_render', "Starting ffmpeg with validated paths...")
-        self.threadMain = ThreadClassRender(self.config, runner=self.runner, paths=paths)
+        self.threadMain = ThreadClassRender(
+            self.config, runner=self.runner, paths=paths,
+            probe_cache=self.probe_cache, keyframe_cache=self.keyframe_cache,
+            crf_cache=self.crf_cache, burned_subs=self.burned_subs,
+            render_cache=self.render_cache, logo_cache=self.logo_cache,
+            merged_subs=self.merged_subs, output_mover=self.output_mover, options=options
+        )
+        self.queue_widget.reset_job_options()  # Options belong to this render only
         self.threadMain.finished.connect(self.finished)
         self.threadMain.frame_upd.connect(self.frame_update)
         self.threadMain.time_upd.connect(self.time_update)
         self.threadMain.state_upd.connect(self.state_update)
         self.threadMain.elapsed_time_upd.connect(self.elapsed_time_update)
+        self.threadMain.delivery_failed.connect(self.on_delivery_failed)
         self.locker(True)
         self.ui.render_start_button.setEnabled(False)
         self.ui.render_stop_button.setEnabled(True)
         self.threadMain.start()
 
-    def on_add_to_queue_clicked(self) -> bool:
+    def on_add_to_queue_clicked(self, start_queue: bool = False) -> bool:
         """Handle Add to Queue button click.
 
-        Validates inputs, creates RenderJob, adds to queue, clears UI.
+        Validates inputs and creates the RenderJob; the raw probe and font
+        audit run in a QueueCheckThread, and the job is queued (and the UI
+        cleared) once they pass. The inputs stay locked meanwhile, so the
+        job is not added twice and nothing typed is lost when it is queued.
+
+        Args:
+            start_queue: Start processing the queue once the job is added
 
         Returns:
-            True if job was added successfully, False otherwise.
+            True if the job is being checked for the queue, False if the inputs are invalid.
         """
         # Validate episode name first
         if not re.match(r'^[a-zA-Zа-яА-Я0-9 _.\-\[\]!(),@~]+$', self.config.build_settings.episode_name):
@@ -899,12 +1055,16 @@ class MainWindow(QMainWindow):
             self.coding_error('softsub')
             return False
 
+        options = self._read_job_options()
+        if options is None:
+            return False
+
         # Validate input paths using centralized validation
-        if not self._validate_before_render():
+        if not self._validate_before_render(options):
             return False
 
         # Create validated, immutable paths
-        paths = self._create_render_paths()
+        paths = self._create_render_paths(options)
 
         # Create encoding parameters (using same defaults as RenderThread)
         from models.encoding import EncodingParams
@@ -931,14 +1091,46 @@ class MainWindow(QMainWindow):
             logo_state=self.config.build_settings.logo_state,
             encoding_params=encoding_params,
             video_settings=video_settings,
-            potato_mode=self.config.potato_PC
+            hardsub_settings=self.config.build_settings.hardsub_settings,
+            potato_mode=self.config.potato_PC,
+            target_size_mb=options.target_size_mb,
+            patch_ranges=options.patch_ranges
+        )
+
+        # Probe the raw (cached for the render thread) and audit fonts off the GUI thread
+        check = QueueCheckThread(self.config, self.runner, job, self.probe_cache,
+                                 self.font_index, self.burned_subs.ass_cache)
+        check.checked.connect(
+            lambda checked_job, video_info, error: self._on_queue_check_finished(
+                checked_job, video_info, error, start_queue
+            )
         )
+        check.finished.connect(lambda: self._queue_checks.discard(check))
+        self._queue_checks.add(check)
+        self.locker(True)
+        check.start()
+        return True
+
+    def _on_queue_check_finished(self, job, video_info: Optional[VideoInfo], error: str, start_queue: bool):
+        """Queue a job whose checks passed (show the error otherwise)."""
+        self.locker(False)
+        if error:
+            self.config.log('mainWindow', '_on_queue_check_finished', f"Job not queued: {error}")
+            self.display_error(error, ErrorSeverity.ERROR)
+            return
+
+        # Probe results feed ETA estimation for the queued job
+        if video_info is not None:
+            job.total_duration_sec = video_info.duration_seconds
+            job.total_frames = video_info.total_frames
+            job.video_res = video_info.resolution
 
         # Add to queue
         job_id = self.job_queue.add(job)
-        self.config.log('mainWindow', 'on_add_to_queue_clicked', f"Added job to queue: {job_id}")
+        self.config.log('mainWindow', '_on_queue_check_finished', f"Added job to queue: {job_id}")
 
-        # Clear UI fields
+        # Clear UI fields (the job options belong to this job only)
+        self.queue_widget.reset_job_options()
         self.ui.raw_path_editline.clear()
         self.ui.audio_path_editline.clear()
         self.ui.subtitle_path_editline.clear()
@@ -951,5 +1143,6 @@ class MainWindow(QMainWindow):
         # Refresh queue display
         self.refresh_queue_display()
 
-        self.config.log('mainWindow', 'on_add_to_queue_clicked', "Job added successfully, UI cleared")
-        return True  # Successfully added
+        self.config.log('mainWindow', '_on_queue_check_finished', "Job added successfully, UI cleared")
+        if start_queue:
+            self._start_queue()